@@ -21,6 +21,9 @@ class Control_Panel_Devices_View(Control_Panel_View):
         self._timer = None
         self._discover_interval = self._settings.get("devices_discover_delay")
         self._tree_view = None
+        self._metrics_timer = None
+        self._metrics_interval = self._settings.get("devices_metrics_delay")
+        self._metrics_view = None
         self._devices = []
 
     def load(self, data):
@@ -56,10 +59,25 @@ class Control_Panel_Devices_View(Control_Panel_View):
         self._tree_view.setHeaderItem(header)
         self._tree_view.header().setResizeMode(0, QtGui.QHeaderView.Stretch)
 
+        # Create the tree view for the radio metrics of the ground station. 
+        # The vehicles do not send their metrics over the network, so these 
+        # are only available in the metrics files of the vehicles.
+        self._metrics_view = QtGui.QTreeWidget()
+        self._metrics_view.setHeaderItem(QtGui.QTreeWidgetItem(["Ground station radio metric", "Value"]))
+        self._metrics_view.header().setResizeMode(0, QtGui.QHeaderView.Stretch)
+
         # Refresh immediately to fill the tree view with the devices and to 
         # discover any vehicles that are already connected.
         self._refresh()
 
+        # Periodically refresh the radio metrics.
+        self._update_metrics()
+        self._metrics_timer = QtCore.QTimer()
+        self._metrics_timer.setInterval(self._metrics_interval * 1000)
+        self._metrics_timer.setSingleShot(False)
+        self._metrics_timer.timeout.connect(self._update_metrics)
+        self._metrics_timer.start()
+
         # Create the refresh button.
         refresh_button = QtGui.QPushButton("Refresh")
         refresh_button.clicked.connect(self._refresh)
@@ -72,12 +90,17 @@ class Control_Panel_Devices_View(Control_Panel_View):
         vbox = QtGui.QVBoxLayout(self._controller.central_widget)
         vbox.addLayout(hbox)
         vbox.addWidget(self._tree_view)
+        vbox.addWidget(self._metrics_view)
 
     def clear(self, layout=None):
         super(Control_Panel_Devices_View, self).clear(layout)
         if self._timer is not None:
             self._timer.stop()
 
+        if self._metrics_timer is not None:
+            self._metrics_timer.stop()
+            self._metrics_timer = None
+
     def _fill(self):
         """
         Fill the tree view with the device information.
@@ -99,6 +122,39 @@ class Control_Panel_Devices_View(Control_Panel_View):
         # Expand all items in the tree view.
         self._tree_view.expandToDepth(0)
 
+    def _update_metrics(self):
+        """
+        Fill the metrics tree view with the current radio metrics of the
+        ground station. The rates are measured since the previous snapshot.
+        """
+
+        metrics = self._controller.rf_sensor.metrics
+
+        self._metrics_view.clear()
+
+        counters = QtGui.QTreeWidgetItem(self._metrics_view, ["Counters"])
+        for name, value in sorted(metrics["counters"].iteritems()):
+            rate = metrics["rates"][name]
+            text = "{} ({:.2f} per second)".format(value, rate)
+            counters.addChild(QtGui.QTreeWidgetItem([name, text]))
+
+        queues = QtGui.QTreeWidgetItem(self._metrics_view, ["Queue depths"])
+        for name, depth in sorted(metrics["queues"].iteritems()):
+            queues.addChild(QtGui.QTreeWidgetItem([name, str(depth)]))
+
+        histograms = QtGui.QTreeWidgetItem(self._metrics_view, ["Durations"])
+        for name, histogram in sorted(metrics["histograms"].iteritems()):
+            mean = histogram["sum"] / histogram["count"]
+            text = "{:.4f} s mean over {} samples".format(mean, histogram["count"])
+            histograms.addChild(QtGui.QTreeWidgetItem([name, text]))
+
+        links = QtGui.QTreeWidgetItem(self._metrics_view, ["Link ages"])
+        for link in metrics["links"]:
+            name = "{} to {}".format(link["from"], link["to"])
+            links.addChild(QtGui.QTreeWidgetItem([name, "{:.2f} s".format(link["age"])]))
+
+        self._metrics_view.expandToDepth(0)
+
     def _refresh(self):
         """
         Refresh the status of the ground station and the vehicles.
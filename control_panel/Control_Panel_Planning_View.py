@@ -779,3 +779,5 @@ class Control_Panel_Planning_View(Control_Panel_View):
         self._add_graph_data("it/second", speed, t)
         for key, value in data["deletions"].iteritems():
             self._add_graph_data(key, value, t)
+
+        self._add_graph_data("cache hits", data["cache"]["hits"], t)
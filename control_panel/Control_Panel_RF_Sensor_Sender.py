@@ -1,10 +1,18 @@
+import threading
 from functools import partial
 from PyQt4 import QtGui, QtCore
 from ..zigbee.Packet import Packet
+from ..zigbee.Receive_Window import Receive_Window
 
 class Control_Panel_RF_Sensor_Sender(object):
     """
     Handler for sending packets to the RF sensors on the vehicles.
+
+    The packets are sent to all vehicles at once using a sliding window. Up to
+    a window size of packets beyond the last cumulative acknowledgement are
+    sent without waiting for their acknowledgements. Packets that are not
+    acknowledged by the next retry interval are sent again, except for those
+    that the vehicle reports as already received out of order.
     """
 
     def __init__(self, controller, data, total, configuration):
@@ -18,13 +26,27 @@ class Control_Panel_RF_Sensor_Sender(object):
 
         self._max_retries = configuration["max_retries"]
         self._retry_interval = configuration["retry_interval"]
+        self._window_size = min(configuration["window_size"], Receive_Window.SIZE)
 
         self._vehicles = sorted(data.keys())
 
         self._labels = dict([(vehicle, "") for vehicle in data])
 
         self._retry_counts = dict([(vehicle, self._max_retries) for vehicle in data])
+
+        # The cumulatively acknowledged index of each vehicle, which is -1
+        # until the clear packet is acknowledged, and the bitmap of indexes
+        # beyond it that the vehicle has received out of order.
         self._indexes = dict([(vehicle, -1) for vehicle in data])
+        self._selective_acks = dict([(vehicle, 0) for vehicle in data])
+
+        # The index after the last packet that has been sent to each vehicle,
+        # and the indexes that have been sent since the last retry interval.
+        self._sent_indexes = dict([(vehicle, 0) for vehicle in data])
+        self._recent_indexes = dict([(vehicle, set()) for vehicle in data])
+
+        # Acknowledgements are received in another thread than the timers.
+        self._lock = threading.Lock()
 
         self._timers = {}
 
@@ -52,24 +74,18 @@ class Control_Panel_RF_Sensor_Sender(object):
         # Create a progress dialog and send the data to the vehicles.
         self._progress.open()
 
+        for vehicle in self._vehicles:
+            self._start_vehicle(vehicle)
 
-        self._start_vehicle(0)
-
-    def _start_vehicle(self, index):
-        if len(self._vehicles) <= index:
-            self._progress.accept()
-            return
-
-        vehicle = self._vehicles[index]
-
+    def _start_vehicle(self, vehicle):
         timer = QtCore.QTimer()
         timer.setInterval(self._retry_interval * 1000)
-        timer.setSingleShot(True)
         # Bind timeout signal to retry for the current vehicle.
-        timer.timeout.connect(partial(self._retry, index, vehicle))
+        timer.timeout.connect(partial(self._retry, vehicle))
         self._timers[vehicle] = timer
 
         self._send_clear(vehicle)
+        timer.start()
 
     def _send_clear(self, vehicle):
         packet = Packet()
@@ -78,9 +94,7 @@ class Control_Panel_RF_Sensor_Sender(object):
 
         self._controller.rf_sensor.enqueue(packet, to=vehicle)
 
-        self._set_label(vehicle, "Clearing old {}s".format(self._name))
-        if vehicle in self._timers:
-            self._timers[vehicle].start()
+        self._labels[vehicle] = "Clearing old {}s".format(self._name)
 
     def _is_done(self, vehicle):
         # We are only done when the vehicle sends an acknowledgement to the 
@@ -97,69 +111,112 @@ class Control_Panel_RF_Sensor_Sender(object):
 
         self._controller.rf_sensor.enqueue(packet, to=vehicle)
 
-        self._set_label(vehicle, "Sending {} done packet".format(self._name))
+        self._labels[vehicle] = "Sending {} done packet".format(self._name)
 
-        if vehicle in self._timers:
-            self._timers[vehicle].start()
-
-    def _send_one(self, vehicle):
-        index = self._indexes[vehicle]
+    def _send_one(self, vehicle, index):
         data = self._data[vehicle][index]
 
         packet = self._add_callback(vehicle, index, data)
 
         self._controller.rf_sensor.enqueue(packet, to=vehicle)
 
-        self._set_label(vehicle, "Sending {} #{}: {}".format(self._name, index+1, data))
+        self._labels[vehicle] = "Sending {} #{}: {}".format(self._name, index+1, data)
+
+    def _send_window(self, vehicle):
+        # Send the packets in the window that have not been sent before. Once
+        # all packets are acknowledged, send the done packet instead.
+        index = self._indexes[vehicle]
+        length = len(self._data[vehicle])
+        if index == length:
+            if self._sent_indexes[vehicle] <= length:
+                self._send_done(vehicle)
+                self._sent_indexes[vehicle] = length + 1
+                self._recent_indexes[vehicle].add(length)
+
+            return
+
+        end = min(index + self._window_size, length)
+        for new_index in xrange(max(index, self._sent_indexes[vehicle]), end):
+            self._send_one(vehicle, new_index)
+            self._recent_indexes[vehicle].add(new_index)
+
+        self._sent_indexes[vehicle] = max(self._sent_indexes[vehicle], end)
+
+    def _resend_window(self, vehicle):
+        # Send the packets in the window again that have been sent before
+        # the last retry interval and that the vehicle has not received.
+        index = self._indexes[vehicle]
+        if index == -1:
+            self._send_clear(vehicle)
+            return
+
+        selective_acks = self._selective_acks[vehicle]
+        recent_indexes = self._recent_indexes[vehicle]
+        for old_index in xrange(index, self._sent_indexes[vehicle]):
+            offset = old_index - index - 1
+            if offset >= 0 and selective_acks & (1 << offset):
+                continue
 
-        if vehicle in self._timers:
-            self._timers[vehicle].start()
+            if old_index not in recent_indexes:
+                if old_index == len(self._data[vehicle]):
+                    self._send_done(vehicle)
+                else:
+                    self._send_one(vehicle, old_index)
 
     def _receive_ack(self, packet):
         vehicle = packet.get("sensor_id")
         index = packet.get("next_index")
+        selective_acks = packet.get("window")
 
-        if vehicle not in self._timers:
-            return
+        with self._lock:
+            if vehicle not in self._timers:
+                return
+
+            # Ignore acknowledgements that arrive out of order.
+            if index < self._indexes[vehicle]:
+                return
 
-        self._indexes[vehicle] = index
-        self._retry_counts[vehicle] = self._max_retries + 1
+            if index > self._indexes[vehicle] or selective_acks != self._selective_acks[vehicle]:
+                self._retry_counts[vehicle] = self._max_retries + 1
 
-    def _retry(self, index, vehicle):
+            self._indexes[vehicle] = index
+            self._selective_acks[vehicle] = selective_acks
+
+            # Immediately fill the window with new packets, since the window
+            # may have moved beyond the packets that are in flight.
+            if not self._is_done(vehicle):
+                self._send_window(vehicle)
+
+    def _retry(self, vehicle):
         # Update the progress value and check if we are done in the retry 
-        # function, which is called after a packet is being sent. Because we 
-        # cannot update GUI parts when we receive the acknowledgement, we need 
+        # function, which is called periodically for each vehicle. Because we 
+        # cannot update GUI parts when we receive the acknowledgement, we need
         # to do this here.
         self._update_label(vehicle)
         self._update_value()
 
         if self._is_done(vehicle):
-            self._start_vehicle(index + 1)
+            self._timers[vehicle].stop()
+            if all(self._is_done(other) for other in self._vehicles):
+                self._progress.accept()
+
             return
 
-        self._retry_counts[vehicle] -= 1
-        if self._retry_counts[vehicle] > 0:
-            if self._indexes[vehicle] == -1:
-                self._send_clear(vehicle)
-            elif self._indexes[vehicle] >= len(self._data[vehicle]):
-                # No more indices can be sent, so send a done message.
-                self._send_done(vehicle)
-            else:
-                self._send_one(vehicle)
+        with self._lock:
+            self._retry_counts[vehicle] -= 1
+            if self._retry_counts[vehicle] > 0:
+                self._resend_window(vehicle)
+                self._recent_indexes[vehicle] = set()
+                return
+
+        # Maximum retry attempts reached, cancel the send action
+        if self._indexes[vehicle] == -1:
+            send = "clearing {}s".format(self._name)
+        elif self._indexes[vehicle] >= len(self._data[vehicle]):
+            send = "sending done packet"
         else:
-            # Maximum retry attempts reached, cancel the send action
-            if self._indexes[vehicle] == -1:
-                send = "clearing {}s".format(self._name)
-            elif self._indexes[vehicle] >= len(self._data[vehicle]):
-                send = "sending done packet"
-            else:
-                send = "{} #{}".format(self._name, self._indexes[vehicle])
-            self._cancel("Vehicle {}: Maximum retry attempts for {} reached".format(vehicle, send))
-
-    def _set_label(self, vehicle, text):
-        self._labels[vehicle] = text
-        self._update_label(vehicle)
-        self._update_value()
+            send = "{} #{}".format(self._name, self._indexes[vehicle])
+        self._cancel("Vehicle {}: Maximum retry attempts for {} reached".format(vehicle, send))
 
     def _update_label(self, vehicle):
         if vehicle not in self._labels:
@@ -198,7 +255,8 @@ class Control_Panel_RF_Sensor_Sender(object):
         for timer in self._timers.values():
             timer.stop()
 
-        self._timers = {}
+        with self._lock:
+            self._timers = {}
 
         if self._progress is not None:
             self._progress.cancel()
@@ -224,7 +224,8 @@ class Control_Panel_Settings_View(Control_Panel_View):
             "done_message": "setting_done",
             "ack_message": "setting_ack",
             "max_retries": self._settings.get("settings_max_retries"),
-            "retry_interval": self._settings.get("settings_retry_interval")
+            "retry_interval": self._settings.get("settings_retry_interval"),
+            "window_size": self._settings.get("settings_window_size")
         }
         sender = Control_Panel_RF_Sensor_Sender(self._controller, vehicle_settings,
                                                 count, configuration)
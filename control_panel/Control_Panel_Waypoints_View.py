@@ -19,6 +19,7 @@ class Control_Panel_Waypoints_View(Control_Panel_View):
 
         self._max_retries = self._settings.get("waypoints_max_retries")
         self._retry_interval = self._settings.get("waypoints_retry_interval")
+        self._window_size = self._settings.get("waypoints_window_size")
 
         self._vehicle_labels = []
         self._tables = []
@@ -345,7 +346,7 @@ class Control_Panel_Waypoints_View(Control_Panel_View):
         return self._geometry.get_location_range(previous_loc, current_loc,
                                                  count=count)
 
-    def _compress_waypoints(self, vehicle, data):
+    def _compress_waypoints(self, vehicle, data, start_row=0):
         """
         Compress the given formatted list of waypoints `data` that was retrieved
         from the table for the given vehicle ID `vehicle`.
@@ -366,9 +367,10 @@ class Control_Panel_Waypoints_View(Control_Panel_View):
         then these are compressed into one waypoint with correct "wait_count".
         The last waypoint cannot be the start of a range, although it can be
         the end of a compressed range, in which case its wait count is updated.
+        Waypoints before `start_row` are kept as they are.
         """
 
-        row = 0
+        row = start_row
         while row < len(data) - 1:
             # The "previous" location upon which we may be able to create 
             # a range of subsequent waypoints.
@@ -390,9 +392,9 @@ class Control_Panel_Waypoints_View(Control_Panel_View):
             # the "wait_count" of the compressed range.
             wait_count = len(L)
             for range_row in range(row + 1, len(data)):
-                # If the waypoint type is not "wait", then it is not a part of 
-                # the range.
-                if data[range_row][self._fields["type"]] != Waypoint_Type.WAIT:
+                # Only a sequence of "wait" waypoints can form a range.
+                types = (data[row][self._fields["type"]], data[range_row][self._fields["type"]])
+                if types != (Waypoint_Type.WAIT, Waypoint_Type.WAIT):
                     break
 
                 # If the next row has a different vehicle wait ID, then the 
@@ -903,6 +905,13 @@ class Control_Panel_Waypoints_View(Control_Panel_View):
                                        "There are no vehicles with waypoints.")
             return
 
+        # Send ranges as one waypoint, but keep the first one since it has no start.
+        for vehicle, data in waypoints.iteritems():
+            self._uncompress_waypoints(vehicle, data)
+            self._compress_waypoints(vehicle, data, start_row=1)
+
+        total = sum(len(data) for data in waypoints.itervalues())
+
         configuration = {
             "name": "waypoint",
             "clear_message": "waypoint_clear",
@@ -910,7 +919,8 @@ class Control_Panel_Waypoints_View(Control_Panel_View):
             "done_message": "waypoint_done",
             "ack_message": "waypoint_ack",
             "max_retries": self._max_retries,
-            "retry_interval": self._retry_interval
+            "retry_interval": self._retry_interval,
+            "window_size": self._window_size
         }
         sender = Control_Panel_RF_Sensor_Sender(self._controller, waypoints,
                                                 total, configuration)
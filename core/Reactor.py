@@ -0,0 +1,263 @@
+# Core imports
+import errno
+import fcntl
+import heapq
+import itertools
+import os
+import select
+import thread
+import threading
+import time
+
+# Package imports
+from Threadable import Threadable
+
+class Reactor(Threadable):
+    """
+    Single-threaded I/O loop that multiplexes file descriptors and timers.
+
+    Objects register read handlers for file-like objects, such as sockets or
+    serial connections, which are called when data is available for reading.
+    Additionally, callbacks can be scheduled to run after a delay. The loop
+    waits in `select` until either happens, so that many objects can share one
+    thread without polling.
+    """
+
+    def __init__(self, thread_manager):
+        """
+        Initialize the reactor.
+        """
+
+        super(Reactor, self).__init__("reactor", thread_manager)
+
+        self._activated = False
+
+        # An event that is set when no loop is running, so that a new loop 
+        # only starts after the loop of an earlier activation has exited.
+        self._stopped = threading.Event()
+        self._stopped.set()
+
+        self._readers = {}
+        self._timers = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+        # A pipe that allows other threads to wake up the loop when they
+        # change the registered handlers or timers. The loop closes the pipe 
+        # when it exits, and it is opened again upon activation.
+        self._wakeup_read = None
+        self._wakeup_write = None
+        self._open_wakeup()
+
+    def activate(self):
+        """
+        Activate the reactor to start running the loop in its own thread.
+
+        If the loop of an earlier activation is still running, then this waits
+        until that loop has exited, so that only one loop runs at a time.
+        """
+
+        super(Reactor, self).activate()
+
+        if not self._activated:
+            self._stopped.wait()
+            self._stopped.clear()
+            self._open_wakeup()
+
+            self._activated = True
+            thread.start_new_thread(self._loop, ())
+
+    def deactivate(self):
+        """
+        Deactivate the reactor to stop running the loop.
+
+        The loop exits after it is woken up, and then closes the wake up pipe.
+        """
+
+        super(Reactor, self).deactivate()
+
+        self._activated = False
+        self.wake()
+
+    def register(self, fileobj, callback):
+        """
+        Register a read handler `callback` for a file-like object `fileobj`.
+
+        The `fileobj` must have a `fileno` method. The `callback` is called
+        without arguments whenever data is available for reading.
+        """
+
+        if not hasattr(callback, "__call__"):
+            raise TypeError("Provided read handler is not callable")
+
+        with self._lock:
+            self._readers[fileobj.fileno()] = (fileobj, callback)
+
+        self.wake()
+
+    def unregister(self, fileobj):
+        """
+        Unregister the read handler for a file-like object `fileobj`.
+
+        A `fileobj` that is not registered is ignored. The object may already
+        be closed.
+        """
+
+        with self._lock:
+            for descriptor, reader in self._readers.items():
+                if reader[0] is fileobj:
+                    del self._readers[descriptor]
+
+        self.wake()
+
+    def schedule(self, delay, callback):
+        """
+        Schedule a `callback` to be called once after `delay` seconds.
+
+        The returned timer can be given to `cancel`.
+        """
+
+        if not hasattr(callback, "__call__"):
+            raise TypeError("Provided timer callback is not callable")
+
+        timer = [time.time() + delay, next(self._sequence), callback]
+        with self._lock:
+            heapq.heappush(self._timers, timer)
+
+        self.wake()
+        return timer
+
+    def cancel(self, timer):
+        """
+        Cancel a `timer` that was returned by `schedule`.
+
+        Timers that have already been called are ignored.
+        """
+
+        timer[2] = None
+
+    def wake(self):
+        """
+        Wake up the loop from waiting.
+
+        If the loop has exited and closed the wake up pipe, then this does
+        nothing.
+        """
+
+        with self._lock:
+            if self._wakeup_write is None:
+                return
+
+            try:
+                os.write(self._wakeup_write, "\0")
+            except OSError as e:
+                # The pipe is full, so the loop wakes up anyway.
+                if e.errno != errno.EAGAIN:
+                    raise
+
+    def run_once(self, timeout=None):
+        """
+        Wait for data to read or for a timer to expire, and call the handlers.
+
+        The `timeout` limits the time to wait in seconds. If it is `None`, then
+        the reactor waits until it is woken up when no timers are scheduled.
+        """
+
+        with self._lock:
+            # Discard cancelled timers at the front of the queue.
+            while self._timers and self._timers[0][2] is None:
+                heapq.heappop(self._timers)
+
+            if self._timers:
+                delay = max(0.0, self._timers[0][0] - time.time())
+                if timeout is None or delay < timeout:
+                    timeout = delay
+
+            readers = dict(self._readers)
+
+        descriptors = readers.keys() + [self._wakeup_read]
+        try:
+            readable = select.select(descriptors, [], [], timeout)[0]
+        except select.error as e:
+            if e.args[0] == errno.EINTR:
+                return
+
+            raise
+
+        for descriptor in readable:
+            if descriptor == self._wakeup_read:
+                self._drain()
+            else:
+                readers[descriptor][1]()
+
+        self._run_timers()
+
+    def _open_wakeup(self):
+        """
+        Open the nonblocking wake up pipe, unless it is already open.
+        """
+
+        with self._lock:
+            if self._wakeup_read is not None:
+                return
+
+            self._wakeup_read, self._wakeup_write = os.pipe()
+            for descriptor in (self._wakeup_read, self._wakeup_write):
+                flags = fcntl.fcntl(descriptor, fcntl.F_GETFL)
+                fcntl.fcntl(descriptor, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+    def _close_wakeup(self):
+        """
+        Close the wake up pipe, unless it is already closed.
+        """
+
+        with self._lock:
+            if self._wakeup_read is None:
+                return
+
+            os.close(self._wakeup_read)
+            os.close(self._wakeup_write)
+            self._wakeup_read = None
+            self._wakeup_write = None
+
+    def _drain(self):
+        """
+        Read all wake up signals from the pipe.
+        """
+
+        try:
+            while os.read(self._wakeup_read, 4096):
+                pass
+        except OSError as e:
+            if e.errno != errno.EAGAIN:
+                raise
+
+    def _run_timers(self):
+        """
+        Call the callbacks of the timers that have expired.
+        """
+
+        current_time = time.time()
+        while True:
+            with self._lock:
+                if not self._timers or self._timers[0][0] > current_time:
+                    return
+
+                callback = heapq.heappop(self._timers)[2]
+
+            if callback is not None:
+                callback()
+
+    def _loop(self):
+        """
+        Execute the reactor loop. This runs in a separate thread.
+        """
+
+        try:
+            while self._activated:
+                self.run_once()
+        except:
+            super(Reactor, self).interrupt()
+        finally:
+            self._close_wakeup()
+            self._stopped.set()
@@ -2,6 +2,7 @@ import datetime
 import logging
 import sys
 import thread
+from Reactor import Reactor
 
 class Thread_Manager(object):
     def __init__(self):
@@ -11,6 +12,21 @@ class Thread_Manager(object):
 
         self._threads = {}
         self._logger = None
+        self._reactor = None
+
+    @property
+    def reactor(self):
+        """
+        Get the `Reactor` object that threadable objects can share for their
+        I/O instead of running their own threads.
+
+        The reactor is created when it is first requested.
+        """
+
+        if self._reactor is None:
+            self._reactor = Reactor(self)
+
+        return self._reactor
 
     def register(self, name, threadable):
         """
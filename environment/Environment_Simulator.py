@@ -28,6 +28,12 @@ class Environment_Simulator(Environment):
 
         self._load_objects(scenefile, translation)
 
+        # Let a simulated RF sensor synthesize the signal strength attenuation 
+        # caused by the objects.
+        synthesizer = getattr(self.get_rf_sensor(), "synthesizer", None)
+        if synthesizer is not None:
+            synthesizer.load_objects(self.objects, self.geometry)
+
     def _load_objects(self, scenefile=None, translation=None):
         if scenefile is not None:
             loader = VRML_Loader(self, scenefile, translation)
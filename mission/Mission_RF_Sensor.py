@@ -4,6 +4,7 @@ import time
 from Mission_Auto import Mission_Auto
 from ..waypoint.Waypoint import Waypoint, Waypoint_Type
 from ..zigbee.Packet import Packet
+from ..zigbee.Receive_Window import Receive_Window
 
 class Mission_RF_Sensor(Mission_Auto):
     def setup(self):
@@ -33,9 +34,11 @@ class Mission_RF_Sensor(Mission_Auto):
         # Whether the vehicle has received its "waypoint_done" packet.
         self._waypoints_complete = False
 
-        # The index of the waypoint that should be sent after this one, or if 
-        # the "waypoint_done" packet is received, one more than the length.
-        self._next_index = 0
+        # The window of waypoint indexes that we accept from the ground 
+        # station. Its next index is the index of the waypoint that should be 
+        # sent after the ones we have added, or if the "waypoint_done" packet 
+        # is received, one more than the length.
+        self._window = Receive_Window()
 
         # The `Location` object related to the previously added waypoint.
         self._point = None
@@ -47,6 +50,7 @@ class Mission_RF_Sensor(Mission_Auto):
             with open(self._dump_file, "r") as dump_file:
                 for data in json.load(dump_file):
                     self._add_waypoint(data)
+                    self._window.advance()
 
             self._waypoints_complete = True
         except (IOError, ValueError):
@@ -74,7 +78,7 @@ class Mission_RF_Sensor(Mission_Auto):
         # Send an acknowledgement to the ground station so that it knows that 
         # we have received a "done" packet. Increment the next index to signify 
         # this acknowledgement as totally done.
-        self._next_index += 1
+        self._window.advance()
         self._send_ack()
 
         with open(self._dump_file, "w") as dump_file:
@@ -95,7 +99,7 @@ class Mission_RF_Sensor(Mission_Auto):
         ground station.
         """
 
-        return self._next_index
+        return self._window.next_index
 
     def get_points(self):
         # We do not have points for commands that are automatically added, 
@@ -112,12 +116,14 @@ class Mission_RF_Sensor(Mission_Auto):
 
         This packet mentions which waypoint index we expect next, which is 0
         when we do not have any waypoints anymore or the next unused index
-        otherwise.
+        otherwise. The window field indicates which waypoints beyond that
+        index we have already received, so that these are not sent again.
         """
 
         packet = Packet()
         packet.set("specification", "waypoint_ack")
-        packet.set("next_index", self._next_index)
+        packet.set("next_index", self._window.next_index)
+        packet.set("window", self._window.selective_acks)
         packet.set("sensor_id", self._rf_sensor.id)
 
         self._rf_sensor.enqueue(packet, to=0)
@@ -148,23 +154,21 @@ class Mission_RF_Sensor(Mission_Auto):
         Add a waypoint to the mission based on a "waypoint_add" packet.
 
         The packet must have the RF sensor ID in the "to_id" field and the
-        index must be the next waypoint index; otherwise, the waypoint is not
-        added to the vehicle's waypoints.
+        index must be within the receive window; otherwise, the waypoint is
+        not added to the vehicle's waypoints. Waypoints that arrive out of
+        order are held back until the waypoints before them are received.
         """
 
         if self._rf_sensor.id != packet.get("to_id"):
             # Ignore packets not meant for us.
             return
 
-        index = packet.get("index")
-        if index != self._next_index:
-            # Send a reply saying what index were are currently at and ignore 
-            # the packet, which may be duplicate or out of order.
-            self._send_ack()
-            return
+        # Add the waypoints that are now in order. Duplicate packets and 
+        # packets outside the window do not add anything, but we still send 
+        # a reply saying which indexes we are currently at.
+        for data in self._window.receive(packet.get("index"), packet.get_all()):
+            self._add_waypoint(data)
 
-        data = packet.get_all()
-        self._add_waypoint(data)
         self._send_ack()
 
     def _add_waypoint(self, data):
@@ -215,5 +219,4 @@ class Mission_RF_Sensor(Mission_Auto):
 
         waypoint.update_vehicle(self.vehicle)
 
-        self._next_index += 1
         self._point = location
@@ -0,0 +1,30 @@
+# Core imports
+import json
+import sys
+
+# Package imports
+from __init__ import __package__
+from core.Import_Manager import Import_Manager
+from planning.Benchmark import Planning_Benchmark
+from settings import Arguments
+
+def main(argv):
+    arguments = Arguments("settings.json", argv)
+
+    benchmark = Planning_Benchmark(arguments, Import_Manager())
+
+    arguments.check_help()
+
+    results = benchmark.run()
+
+    benchmark_file = benchmark.settings.get("benchmark_file")
+    if benchmark_file:
+        with open(benchmark_file, "w") as output_file:
+            json.dump(results, output_file, indent=4)
+
+        print("Wrote benchmark results to {}".format(benchmark_file))
+    else:
+        print(json.dumps(results, indent=4))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -62,6 +62,7 @@ def iteration_callback(algorithm, data):
     cur_time = data["cur_time"]
     speed = t/float(cur_time)
     print("Iteration {} ({} sec, {} it/s)".format(t, cur_time, speed))
+    print("Evaluation cache: {hits} hits, {misses} misses".format(**data["cache"]))
 
     if speed != 0.0:
         rate = (algorithm.t_max - t) / speed
@@ -2,12 +2,16 @@
 import itertools
 import time
 from collections import OrderedDict
-from functools import partial
 
 # Library imports
 import numpy as np
 
 # Package imports
+from Checkpoint import Checkpoint
+from Evaluation_Cache import Evaluation_Cache
+from Evaluator import Evaluator, Pool_Evaluator
+from Hypervolume import Hypervolume
+from Pareto_Archive import Pareto_Archive
 from ..settings import Arguments
 
 __all__ = ["NSGA", "SMS_EMOA"]
@@ -29,6 +33,42 @@ class Algorithm(object):
         self.t_callback = self.settings.get("iteration_callback")
         self.iteration_callback = None
 
+        # Callback that exchanges individuals with other populations every 
+        # number of iterations, for example in an island model.
+        self.t_migration = 0
+        self.migration_callback = None
+
+        # Number of processes that evaluate populations, where zero means one 
+        # process per CPU core. The evaluator only exists while evolving.
+        self.processes = self.settings.get("evaluation_processes")
+        self.evaluator = None
+
+        # Number of offspring (lambda) that are created and evaluated in each 
+        # iteration. With one offspring, the population is updated in 
+        # a steady state; otherwise, the best of the parents and offspring 
+        # survive (mu + lambda).
+        self.offspring_size = self.settings.get("offspring_size")
+
+        # Whether to keep the intermediate results of the evaluations of the 
+        # individuals, so that their mutations only evaluate the changes.
+        self.delta_evaluation = self.settings.get("delta_evaluation")
+
+        # Cache of the evaluation results of recently created individuals, so 
+        # that duplicate individuals are not evaluated again.
+        self.cache = Evaluation_Cache(self.settings.get("evaluation_cache_size"))
+
+        # Checkpoint file that the state of the algorithm is written to every 
+        # number of iterations, and whether to resume from it if it exists.
+        checkpoint_file = self.settings.get("checkpoint_file")
+        self.checkpoint = Checkpoint(checkpoint_file) if checkpoint_file else None
+        self.t_checkpoint = self.settings.get("checkpoint_interval")
+        self.resume = self.settings.get("resume")
+
+        # Archive of the nondominated and dominated feasible individuals, 
+        # indexed by their position in the population. This only exists for 
+        # problems with two objectives once the algorithm is evolving.
+        self.archive = None
+
         # Make steps as long as necessary, and convert to numpy array for easy 
         # per-component application.
         self.steps = self.problem.format_steps(self.settings.get("step_size"))
@@ -39,24 +79,77 @@ class Algorithm(object):
 
         self.iteration_callback = callback
 
+    def set_migration_callback(self, callback, interval):
+        """
+        Register a `callback` that exchanges individuals with other populations
+        every `interval` iterations.
+
+        The callback receives the algorithm and a list of tuples with the
+        variable values, feasibility and objective values of the nondominated
+        feasible individuals. It returns a list of tuples of the same form with
+        the individuals to add to the population.
+        """
+
+        if not hasattr(callback, "__call__"):
+            raise TypeError("Migration callback is not callable")
+
+        self.migration_callback = callback
+        self.t_migration = interval
+
+    def create_evaluator(self):
+        """
+        Create an evaluator for populations of the problem.
+
+        When more than one evaluation process is requested, then the evaluator
+        divides the evaluations over a pool of processes.
+        """
+
+        if self.processes == 1:
+            return Evaluator(self.problem)
+
+        return Pool_Evaluator(self.problem,
+                              processes=self.processes if self.processes > 0 else None)
+
     def evolve(self):
         """
         Perform the evolutionary algorithm and find solutions.
         """
 
-        # For our initial population of size mu, generate random vectors with 
-        # values in a feasible interval using domain specification.
-        P = [self.problem.get_random_vector() for _ in range(self.mu)]
+        self.evaluator = self.create_evaluator()
+        try:
+            return self._evolve()
+        finally:
+            self.evaluator.close()
+            self.evaluator = None
+
+    def _evolve(self):
+        if self.resume and self.checkpoint is not None and \
+           self.checkpoint.exists():
+            P, Feasible, Objectives, States, Deletions, elapsed = \
+                self._read_checkpoint()
+        else:
+            # For our initial population of size mu, generate random vectors 
+            # with values in a feasible interval using domain specification.
+            P = [self.problem.get_random_vector() for _ in range(self.mu)]
+
+            # Evaluate objectives and constraints for points in the population.
+            Feasible, Objectives, States = self._evaluate(P)
+
+            Deletions = {
+                "infeasible": 0,
+                "dominated": 0,
+                "contribution": 0
+            }
+            elapsed = 0.0
 
-        # Evaluate objectives and constraints for points in the population.
-        Feasible, Objectives = self.problem.evaluate(P)
-        Deletions = {
-            "infeasible": 0,
-            "dominated": 0,
-            "contribution": 0
-        }
+        self.archive = self.create_archive(Feasible, Objectives)
+        self.cache.clear()
+        for i, point in enumerate(P):
+            self.cache.put(self._get_key(point),
+                           (Feasible[i], Objectives[i], States[i]))
 
-        start_time = time.time()
+        # Continue the time from the checkpoint when resuming.
+        start_time = time.time() - elapsed
 
         # For t_current = 1, 2, ..., t_max (updated at the end of the loop).
         # We use an infinite iterable and stop when the maximum iteration is 
@@ -75,17 +168,106 @@ class Algorithm(object):
                     "population": P,
                     "feasible": Feasible,
                     "objectives": Objectives,
-                    "deletions": Deletions
+                    "deletions": Deletions,
+                    "cache": {
+                        "hits": self.cache.hits,
+                        "misses": self.cache.misses
+                    }
                 })
 
+            if self.checkpoint is not None and \
+               (self.t_current % self.t_checkpoint == 0 or
+                self.t_current >= self.t_max):
+                self._write_checkpoint(P, Feasible, Objectives, Deletions,
+                                       time.time() - start_time)
+
             if self.t_current >= self.t_max:
                 break
 
-            self._mutate_and_select(P, Feasible, Objectives, Deletions)
+            if self.offspring_size == 1:
+                self._mutate_and_select(P, Feasible, Objectives, States,
+                                        Deletions)
+            else:
+                self._generate_and_select(P, Feasible, Objectives, States,
+                                          Deletions)
+
+            if self.migration_callback is not None and \
+               (self.t_current + 1) % self.t_migration == 0:
+                self._migrate(P, Feasible, Objectives, States, Deletions)
 
         return P, Objectives, Feasible
 
-    def _mutate_and_select(self, P, Feasible, Objectives, Deletions):
+    def _write_checkpoint(self, P, Feasible, Objectives, Deletions, elapsed):
+        # Write the state at the start of the current iteration, including the 
+        # states of the random number generators. The evaluation states and 
+        # the cache are not stored, since they can be recreated from the points.
+        deletion_types = sorted(Deletions.keys())
+        self.checkpoint.write({
+            "algorithm": self.get_name(),
+            "iteration": self.t_current,
+            "time": elapsed,
+            "population": np.array(P),
+            "feasible": np.array(Feasible, dtype=bool),
+            "objectives": np.array(Objectives),
+            "deletion_types": np.array(deletion_types),
+            "deletions": np.array([Deletions[key] for key in deletion_types])
+        }, self._get_random_states())
+
+    def _read_checkpoint(self):
+        # Restore the population and the iteration from the checkpoint, and 
+        # evaluate the points again for their states if we use them. The 
+        # random number generators continue from the checkpoint afterward.
+        state = self.checkpoint.read(self._get_random_states().keys())
+        if state["algorithm"] != self.get_name():
+            raise ValueError("Checkpoint '{}' is for algorithm {}, not {}".format(
+                self.checkpoint.path, state["algorithm"], self.get_name()
+            ))
+
+        population = state["population"]
+        if population.shape != (self.mu, self.problem.dim):
+            raise ValueError("Checkpoint '{}' has a population of shape {}, not {}".format(
+                self.checkpoint.path, population.shape, (self.mu, self.problem.dim)
+            ))
+
+        P = list(population)
+        Feasible = state["feasible"].tolist()
+        Objectives = state["objectives"].tolist()
+        if self.delta_evaluation:
+            States = self._evaluate(P)[2]
+        else:
+            States = [None for _ in P]
+
+        Deletions = dict(zip(state["deletion_types"].tolist(),
+                             state["deletions"].tolist()))
+
+        self.t_current = state["iteration"]
+        np.random.set_state(state["random_state"])
+        self._set_random_states(state["random_states"])
+        return P, Feasible, Objectives, States, Deletions, state["time"]
+
+    def _get_random_states(self):
+        # The states of the random number generators that the algorithm uses 
+        # besides the global NumPy one, by name, for storing in checkpoints.
+        return {}
+
+    def _set_random_states(self, random_states):
+        # Restore the states of the random number generators that the 
+        # algorithm uses besides the global NumPy one from a checkpoint.
+        pass
+
+    def _evaluate(self, points, parents=None):
+        # Evaluate the points with the evaluator, and keep the states of the 
+        # evaluations if we use them for evaluating mutations.
+        if self.delta_evaluation:
+            return self.evaluator.evaluate_states(points, parents)
+
+        Feasible, Objectives = self.evaluator.evaluate(points)
+        return Feasible, Objectives, [None for _ in points]
+
+    def _get_key(self, point):
+        return self.cache.get_key(self.problem.format_point(point))
+
+    def _mutate_and_select(self, P, Feasible, Objectives, States, Deletions):
         # Select random index s of the mu points
         s = np.random.randint(self.mu)
         # Create a mutated point x_new from x(s) by altering each component 
@@ -93,11 +275,25 @@ class Algorithm(object):
         # each component using numpy broadcasting.
         x_new = self.problem.mutate(P[s], self.steps)
 
-        # Evaluate objectives and constraints for x_new
-        NewFeasible, NewObjectives = self.problem.evaluate([x_new])
+        # Evaluate objectives and constraints for x_new, possibly using the 
+        # state of the evaluation of x(s), unless it is in the cache.
+        key = self._get_key(x_new)
+        result = self.cache.get(key)
+        if result is None:
+            NewFeasible, NewObjectives, NewState = \
+                self.problem.evaluate_state(x_new, self.problem.context,
+                                            parent=States[s])
+            result = (NewFeasible, NewObjectives,
+                      NewState if self.delta_evaluation else None)
+            self.cache.put(key, result)
+
+        NewFeasible, NewObjectives, NewState = result
         P.append(x_new)
-        Feasible.append(NewFeasible[0])
-        Objectives.append(NewObjectives[0])
+        Feasible.append(NewFeasible)
+        Objectives.append(NewObjectives)
+        States.append(NewState)
+        if self.archive is not None and NewFeasible:
+            self.archive.insert(len(P) - 1, NewObjectives)
 
         # Track which points are dominated or infeasible. We track the indices 
         # from the points list.
@@ -109,7 +305,11 @@ class Algorithm(object):
         if len(Delete) > 0:
             Deletions["infeasible"] += 1
         else:
-            R = self.sort_nondominated(Objectives, all_layers=False)
+            if self.archive is not None:
+                R = self.archive.get_layers()
+            else:
+                R = self.sort_nondominated(Objectives, all_layers=False)
+
             Delete = list(itertools.chain(*[Rk.keys() for Rk in R[1:]]))
             if len(Delete) > 0:
                 Deletions["dominated"] += 1
@@ -124,15 +324,158 @@ class Algorithm(object):
             idx = Delete[np.random.randint(len(Delete))]
         else:
             # Delete the individual with the smallest crowding distance (NSGA) 
-            # or hypervolume contribution (SMS-EMOA)
+            # or hypervolume contribution (SMS-EMOA). The contributions are in 
+            # the order of the nondominated layer.
             C = self.sort_contribution(R[0])
 
-            idx = np.argmin(C)
+            idx = R[0].keys()[np.argmin(C)]
             Deletions["contribution"] += 1
 
-        del P[idx]
-        del Feasible[idx]
-        del Objectives[idx]
+        # Replace the deleted individual with the last one, which keeps the 
+        # indices of the other individuals in the archive intact.
+        last = len(P) - 1
+        if self.archive is not None:
+            if idx in self.archive:
+                self.archive.remove(idx)
+            if idx != last and last in self.archive:
+                self.archive.replace(last, idx)
+
+        P[idx] = P[last]
+        Feasible[idx] = Feasible[last]
+        Objectives[idx] = Objectives[last]
+        States[idx] = States[last]
+        del P[last]
+        del Feasible[last]
+        del Objectives[last]
+        del States[last]
+
+    def _generate_and_select(self, P, Feasible, Objectives, States, Deletions):
+        # Create offspring by mutating randomly selected parents, and evaluate 
+        # them all at once so that the evaluator can divide the work.
+        parents = np.random.randint(self.mu, size=self.offspring_size)
+        Offspring = [self.problem.mutate(P[s], self.steps) for s in parents]
+        # Only evaluate the offspring that are not in the cache.
+        keys = [self._get_key(x_new) for x_new in Offspring]
+        results = [self.cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        NewFeasible, NewObjectives, NewStates = \
+            self._evaluate([Offspring[i] for i in missing],
+                           [States[parents[i]] for i in missing])
+        for j, i in enumerate(missing):
+            results[i] = (NewFeasible[j], NewObjectives[j], NewStates[j])
+            self.cache.put(keys[i], results[i])
+
+        P.extend(Offspring)
+        Feasible.extend(result[0] for result in results)
+        Objectives.extend(result[1] for result in results)
+        States.extend(result[2] for result in results)
+
+        self._select_survivors(P, Feasible, Objectives, States, Deletions)
+
+    def _migrate(self, P, Feasible, Objectives, States, Deletions):
+        # Send the nondominated feasible individuals to the migration callback 
+        # and receive the individuals from other populations.
+        if self.archive is not None:
+            front = self.archive.front
+        else:
+            feasible = np.nonzero(Feasible)[0]
+            R = self.sort_nondominated([Objectives[i] for i in feasible],
+                                       all_layers=False)
+            front = [feasible[i] for i in R[0].keys()] if R else []
+
+        emigrants = [(P[i], Feasible[i], Objectives[i]) for i in front]
+        immigrants = self.migration_callback(self, emigrants)
+        if not immigrants:
+            return
+
+        # Add the immigrants and select the individuals that survive, like 
+        # the offspring of a generation.
+        for point, feasible, objectives in immigrants:
+            P.append(point)
+            Feasible.append(feasible)
+            Objectives.append(objectives)
+            States.append(None)
+
+        self._select_survivors(P, Feasible, Objectives, States, Deletions)
+
+    def _select_survivors(self, P, Feasible, Objectives, States, Deletions):
+        # Select the individuals that do not survive to the next generation 
+        # and delete them in reverse order so that the subsequent indexes are 
+        # still correct.
+        Delete = self._select_deletions(Feasible, Objectives,
+                                        len(P) - self.mu, Deletions)
+        for idx in sorted(Delete, reverse=True):
+            del P[idx]
+            del Feasible[idx]
+            del Objectives[idx]
+            del States[idx]
+
+        # The indices have changed, so create the archive again.
+        self.archive = self.create_archive(Feasible, Objectives)
+
+    def _select_deletions(self, Feasible, Objectives, count, Deletions):
+        """
+        Select `count` individuals to delete from a population with the given
+        feasibility and objective values.
+
+        Infeasible individuals are deleted first, in random order. Then the
+        individuals in the worst nondominated layers are deleted. If only part
+        of a layer needs to be deleted, then its individuals with the smallest
+        contribution are deleted one by one.
+
+        Returns the list of indices of the individuals to delete.
+        """
+
+        infeasible = np.nonzero(np.logical_not(np.array(Feasible)))[0]
+        Delete = list(np.random.permutation(infeasible)[:count])
+        Deletions["infeasible"] += len(Delete)
+        count -= len(Delete)
+        if count == 0:
+            return Delete
+
+        # Sort the feasible individuals into nondominated layers, indexed by 
+        # their position in the list of feasible individuals.
+        feasible = np.nonzero(Feasible)[0]
+        R = self.sort_nondominated([Objectives[i] for i in feasible])
+        while count > 0:
+            Rk = R.pop()
+            if len(Rk) <= count:
+                Delete.extend(feasible[i] for i in Rk.keys())
+                Deletions["dominated"] += len(Rk)
+                count -= len(Rk)
+                continue
+
+            # Remove the individuals with the smallest crowding distance 
+            # (NSGA) or hypervolume contribution (SMS-EMOA) one at a time.
+            Rk = OrderedDict(Rk)
+            while count > 0:
+                C = self.sort_contribution(Rk)
+                i = Rk.keys()[np.argmin(C)]
+                Delete.append(feasible[i])
+                del Rk[i]
+                Deletions["contribution"] += 1
+                count -= 1
+
+        return Delete
+
+    def create_archive(self, Feasible, Objectives):
+        """
+        Create a Pareto archive of the feasible individuals with the given
+        objective values, indexed by their position in the population.
+
+        The archive only supports two objectives, so this returns `None` for
+        problems with another number of objectives.
+        """
+
+        if len(self.problem.objectives) != 2:
+            return None
+
+        archive = Pareto_Archive()
+        for i, objectives in enumerate(Objectives):
+            if Feasible[i]:
+                archive.insert(i, objectives)
+
+        return archive
 
     def KLP(self, P, Objectives):
         """
@@ -146,7 +489,6 @@ class Algorithm(object):
         should be removed from P for another run because they are nondominated.
         """
 
-        # For now just 2D-KLP, we don't need anything else in our cases.
         T = OrderedDict()
         # Since we perform minimization, we want to find lower values instead 
         # of higher values like in the original 2D-KLP algorithm. Thus yStar 
@@ -164,6 +506,33 @@ class Algorithm(object):
 
         return T, todelete
 
+    def find_nondominated(self, P, Objectives):
+        """
+        Determine the nondominated solutions among individuals with any number
+        of objective values. The given list P must be sorted in the first
+        objective value already. Of individuals with the same objective values,
+        only the first one in P is nondominated.
+
+        We return a dictionary of objective values that should be kept,
+        indexed by the original individual indices, and a list of indices that
+        should be removed from P for another run because they are nondominated.
+        """
+
+        values = np.array([Objectives[i] for i in P], dtype=float)
+        if np.all(np.isinf(values)):
+            return OrderedDict([(i, Objectives[i]) for i in P]), range(len(P))
+
+        # Compare all pairs of individuals, where the rows are the individuals 
+        # that may dominate the individuals in the columns.
+        weak = np.all(values[:, np.newaxis, :] <= values[np.newaxis, :, :], axis=2)
+        strict = np.any(values[:, np.newaxis, :] < values[np.newaxis, :, :], axis=2)
+        earlier = np.tri(len(P), k=-1, dtype=bool).T
+        dominated = np.any(weak & (strict | earlier), axis=0)
+
+        todelete = np.flatnonzero(~dominated).tolist()
+        T = OrderedDict([(P[idx], Objectives[P[idx]]) for idx in todelete])
+        return T, todelete
+
     def sort_nondominated(self, Objectives, all_layers=True):
         """
         Sort a list of objective values for individuals into groups of
@@ -172,6 +541,10 @@ class Algorithm(object):
         The resulting list contains dictionaries with the original indices of
         the given list and their objective values. The first dictionary in this
         list are nondominated individuals, the rest are dominated.
+
+        Individuals with two objective values are sorted with the Kung, Luccio
+        and Preparata algorithm, and those with any other number of objective
+        values are compared in pairs.
         """
 
         # Sort P by first coordinate in ascending order, since we do 
@@ -184,7 +557,10 @@ class Algorithm(object):
         # group after one go. They are all nondominated anyway and probably do 
         # not use them for anything else.
         while len(P) > 0 and (all_layers or first_layer):
-            Rk, todelete = self.KLP(P, Objectives)
+            if len(Objectives[P[0]]) == 2:
+                Rk, todelete = self.KLP(P, Objectives)
+            else:
+                Rk, todelete = self.find_nondominated(P, Objectives)
             R.append(Rk)
             first_layer = False
             # Need to delete in reverse order so that the subsequent indexes 
@@ -216,34 +592,34 @@ class NSGA(Algorithm):
         algorithm. The individuals are nondominated and have their objective
         values. This function can work with any number of objective functions.
 
-        The resulting list contains values that indicate how useful each
-        individual is to have in a potential Pareto front; points that are less
-        close to others are more useful to keep.
+        The resulting array contains values, in the order of the individuals
+        in `Rk`, that indicate how useful each individual is to have in
+        a potential Pareto front; points that are less close to others are more
+        useful to keep.
         """
 
-        C = np.zeros(len(Rk))
-        i = 0
-
         if len(Rk) == 0:
-            return C
-
-        keys = []
-        for obj in xrange(len(Rk.values()[0])):
-            # Sort the keys of the points according to the objective j (obj)
-            keys.append(sorted(Rk.keys(), key=partial(lambda j, i: Rk[i][j], obj)))
-
-        for idx in Rk.keys():
-            for j in xrange(len(Rk[idx])):
-                # Location of the index idx in the sorted keys
-                k = keys[j]
-                v = k.index(idx)
-                l = Rk[k[v-1]][j] if v > 0 else np.NINF
-                u = Rk[k[v+1]][j] if v < len(Rk)-1 else np.inf
-                C[i] += 2 * (u - l)
-
-            i += 1
-
-        return C
+            return np.zeros(0)
+
+        # Sort the points according to each objective separately. The columns 
+        # of the order contain the positions of the points in the layer.
+        values = np.array(Rk.values(), dtype=float)
+        order = np.argsort(values, axis=0, kind='mergesort')
+        columns = np.arange(values.shape[1])
+        sorted_values = values[order, columns]
+
+        # The distance between the neighbors of each point in the sorted 
+        # objective values, where the boundary points have infinite distance.
+        distances = np.empty(values.shape)
+        distances[1:-1] = sorted_values[2:] - sorted_values[:-2]
+        distances[0] = np.inf
+        distances[-1] = np.inf
+
+        # Move the distances back to the positions of the points in the layer 
+        # and sum them over the objectives.
+        C = np.empty(values.shape)
+        C[order, columns] = 2 * distances
+        return C.sum(axis=1)
 
     def sort_contribution(self, Rk):
         return self.crowding_distance(Rk)
@@ -252,30 +628,43 @@ class NSGA(Algorithm):
         return "NSGA-II"
 
 class SMS_EMOA(Algorithm):
+    def __init__(self, problem, arguments):
+        super(SMS_EMOA, self).__init__(problem, arguments)
+
+        self.hypervolume = Hypervolume(
+            exact_dimensions=self.settings.get("hypervolume_exact_dimensions"),
+            samples=self.settings.get("hypervolume_samples"),
+            seed=self.settings.get("hypervolume_seed")
+        )
+
     def hypervolume_contribution(self, Rk):
         """
-        Calculate the 2D hypervolume contribution of individuals for the
+        Calculate the hypervolume contribution of individuals for the
         SMS-EMOA algorithm. The individuals are nondominated and have their
-        objective values.
-
-        The resulting list contains values that indicate how useful each
-        individual is to have in a potential Pareto front; points that have
-        a larger hypervolume around themselves are more useful to keep.
+        objective values. This function can work with any number of objective
+        functions, although the contributions are approximated for many
+        objectives.
+
+        The resulting array contains values, in the order of the individuals
+        in `Rk`, that indicate how useful each individual is to have in
+        a potential Pareto front; points that have a larger hypervolume around
+        themselves are more useful to keep.
         """
 
-        # 2D only.
-        # Sort by first coordinate
-        X = sorted(Rk.keys(), key=lambda i: Rk[i][0])
-        C = np.zeros(len(X))
-        for i, idx in enumerate(X):
-            l = Rk[X[i-1]][1] if i > 0 else np.NINF
-            u = Rk[X[i+1]][0] if i < len(Rk)-1 else np.inf
-            C[i] = (Rk[idx][1] - l) * (u - Rk[idx][0])
-
-        return C
+        return self.hypervolume.contributions(Rk.values())
 
     def sort_contribution(self, Rk):
         return self.hypervolume_contribution(Rk)
 
+    def _get_random_states(self):
+        # The hypervolume samples with its own random number generator.
+        return {"hypervolume_random": self.hypervolume.random_state}
+
+    def _set_random_states(self, random_states):
+        # Checkpoints without the state of the hypervolume samples keep the 
+        # seeded random number generator.
+        if "hypervolume_random" in random_states:
+            self.hypervolume.random_state = random_states["hypervolume_random"]
+
     def get_name(self):
         return "SMS-EMOA"
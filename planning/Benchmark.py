@@ -0,0 +1,235 @@
+# Core imports
+import multiprocessing
+import resource
+import time
+import traceback
+from collections import OrderedDict
+from subprocess import check_output, CalledProcessError
+
+# Library imports
+import numpy as np
+
+# Package imports
+from Hypervolume import Hypervolume
+from Phase_Timer import Phase_Timer
+from Runner import Planning_Runner
+from ..core.Thread_Manager import Thread_Manager
+
+# Scenarios of the planning problem with a network size in grid cells, 
+# a number of measurements and a population size. Each scenario overrides 
+# the settings in the given groups.
+SCENARIOS = OrderedDict([
+    ("small", {
+        "planning": {"network_size": [11, 11]},
+        "planning_problem": {"number_of_measurements": 50},
+        "planning_algorithm": {"population_size": 10}
+    }),
+    ("medium", {
+        "planning": {"network_size": [19, 19]},
+        "planning_problem": {"number_of_measurements": 150},
+        "planning_algorithm": {"population_size": 15}
+    }),
+    ("large", {
+        "planning": {"network_size": [31, 31]},
+        "planning_problem": {"number_of_measurements": 350},
+        "planning_algorithm": {"population_size": 20}
+    })
+])
+
+# Phases of an algorithm run that the benchmark measures separately.
+PHASES = ["evaluation", "assignment", "mutation", "sorting", "selection"]
+
+def _run_scenario(benchmark, name, messages):
+    """
+    Run the scenario with the given `name` in a worker process, so that the
+    scenario does not share memory or settings with other scenarios.
+
+    The result or the error is put in the `messages` queue as a tuple of
+    a message type and the data.
+    """
+
+    try:
+        messages.put(("result", benchmark.run_scenario(name)))
+    except Exception:  # pylint: disable=broad-except
+        messages.put(("error", traceback.format_exc()))
+
+class Planning_Benchmark(object):
+    """
+    Benchmark of the planning problem and algorithm, which runs scenarios of
+    different sizes with a fixed random seed.
+
+    The benchmark measures the number of evaluations per second, the time
+    spent in each phase of the algorithm, the peak memory usage and the
+    hypervolume of the final population. The results can be compared between
+    versions of the planner.
+    """
+
+    def __init__(self, arguments, import_manager):
+        self.arguments = arguments
+        self.settings = self.arguments.get_settings("planning_benchmark")
+        self._import_manager = import_manager
+
+        # Create a runner once, so that the settings of the planning problem 
+        # and the algorithm are registered as arguments.
+        Planning_Runner(self.arguments, Thread_Manager(), self._import_manager)
+
+    def get_scenarios(self):
+        """
+        Retrieve the names of the scenarios that the benchmark runs.
+        """
+
+        return self.settings.get("benchmark_scenarios")
+
+    def run(self):
+        """
+        Run all the scenarios of the benchmark, each in its own process.
+
+        Returns a dictionary with the results, which can be written in JSON
+        format.
+        """
+
+        return OrderedDict([
+            ("commit", self._get_commit()),
+            ("algorithm", self.settings.get("algorithm_class")),
+            ("discrete", self.settings.get("discrete")),
+            ("seed", self.settings.get("benchmark_seed")),
+            ("delta_evaluation", self.settings.get("benchmark_delta_evaluation")),
+            ("iteration_limit", self.settings.get("benchmark_iterations")),
+            ("scenarios", [
+                self._run_process(name) for name in self.get_scenarios()
+            ])
+        ])
+
+    def run_scenario(self, name):
+        """
+        Run the scenario with the given `name` in the current process.
+
+        The settings of the scenario replace the current settings. The
+        evaluations take place in the current process, so that the phases are
+        measured correctly.
+
+        Returns a dictionary with the results of the scenario.
+        """
+
+        self._set_scenario(name)
+        np.random.seed(self.settings.get("benchmark_seed"))
+
+        # Keep the objective values of the initial population, which 
+        # determine the reference point of the hypervolume.
+        initial = []
+        def iteration_callback(algorithm, data):
+            if data["iteration"] == 0:
+                initial.extend(
+                    objectives for i, objectives in enumerate(data["objectives"])
+                    if data["feasible"][i]
+                )
+
+        runner = Planning_Runner(self.arguments, Thread_Manager(),
+                                 self._import_manager, iteration_callback)
+
+        timer = Phase_Timer()
+        for phase in PHASES:
+            timer.add_phase(phase)
+
+        self._instrument(timer, runner.problem, runner.algorithm)
+
+        start_time = time.time()
+        P, Objectives, Feasible = runner.algorithm.evolve()
+        total_time = time.time() - start_time
+
+        times = timer.times
+        times["other"] = total_time - sum(times.values())
+        evaluations = timer.calls["evaluation"]
+
+        front = [Objectives[i] for i in range(len(P)) if Feasible[i]]
+        hypervolume, reference = self._get_hypervolume(front, initial)
+
+        return OrderedDict([
+            ("name", name),
+            ("network_size", self.settings.get("network_size")),
+            ("number_of_measurements", runner.problem.N),
+            ("population_size", runner.algorithm.mu),
+            ("evaluations", evaluations),
+            ("time", total_time),
+            ("evaluations_per_second", evaluations / total_time),
+            ("phases", times),
+            # Maximum resident set size of the process in kilobytes.
+            ("peak_memory", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss),
+            ("feasible", len(front)),
+            ("hypervolume", hypervolume),
+            ("reference", reference)
+        ])
+
+    def _set_scenario(self, name):
+        # Replace the settings with those of the scenario, and run the 
+        # algorithm on one island that evaluates in the current process.
+        for group, values in SCENARIOS[name].iteritems():
+            settings = self.arguments.get_settings(group)
+            for key, value in values.iteritems():
+                settings.set(key, value)
+
+        iterations = self.settings.get("benchmark_iterations")
+        self.arguments.get_settings("planning_runner").set("islands", 1)
+        algorithm_settings = self.arguments.get_settings("planning_algorithm")
+        algorithm_settings.set("evaluation_processes", 1)
+        algorithm_settings.set("delta_evaluation",
+                               self.settings.get("benchmark_delta_evaluation"))
+        algorithm_settings.set("iteration_limit", iterations)
+        algorithm_settings.set("iteration_callback", max(1, iterations))
+
+    def _get_hypervolume(self, front, initial):
+        # The reference point depends on the objective values of the initial 
+        # feasible individuals, which only depend on the seed of the 
+        # scenario, so that the hypervolumes of runs are comparable.
+        hypervolume = Hypervolume()
+        if initial:
+            reference = hypervolume.get_reference(initial)
+        elif front:
+            reference = hypervolume.get_reference(front)
+        else:
+            return 0.0, None
+
+        return hypervolume.compute(front, reference), reference.tolist()
+
+    def _instrument(self, timer, problem, algorithm):
+        # Measure the time of the methods of the problem and the algorithm 
+        # that belong to each phase. Evaluations of individuals include the 
+        # assignment of their waypoints, which is measured separately.
+        timer.instrument("evaluation", problem, "evaluate_state")
+        timer.instrument("assignment", problem.assigner, "assign")
+        timer.instrument("mutation", problem, "mutate")
+        timer.instrument("sorting", algorithm, "sort_nondominated")
+        timer.instrument("selection", algorithm, "sort_contribution")
+        timer.instrument("selection", algorithm, "_select_deletions")
+
+        # The Pareto archive keeps the population sorted, so its operations 
+        # are part of the sorting phase.
+        create_archive = timer.wrap("sorting", algorithm.create_archive)
+        def create_timed_archive(Feasible, Objectives):
+            archive = create_archive(Feasible, Objectives)
+            if archive is not None:
+                for name in ("insert", "remove", "replace", "get_layers"):
+                    timer.instrument("sorting", archive, name)
+
+            return archive
+
+        algorithm.create_archive = create_timed_archive
+
+    def _run_process(self, name):
+        messages = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_run_scenario,
+                                          args=(self, name, messages))
+        process.start()
+        message, data = messages.get()
+        process.join()
+
+        if message == "error":
+            raise RuntimeError("Scenario {} failed: {}".format(name, data))
+
+        return data
+
+    def _get_commit(self):
+        try:
+            return check_output(["git", "rev-parse", "HEAD"]).strip()
+        except (OSError, CalledProcessError):
+            return None
@@ -0,0 +1,115 @@
+# Core imports
+import os
+
+# Library imports
+import numpy as np
+
+class Checkpoint(object):
+    """
+    File with the state of a run of a planning algorithm, which is written
+    periodically so that an interrupted run can be resumed from it.
+
+    The state is stored as a compressed NumPy archive of arrays, together with
+    the state of the NumPy random number generator and possibly the states of
+    other random number generators. The file is replaced at once, so that an
+    interruption while writing keeps the previous checkpoint.
+    """
+
+    # Names of the items in the state of a random number generator, which are 
+    # stored as arrays with the name of the generator as prefix.
+    RANDOM_STATE_FIELDS = [
+        "generator", "keys", "position", "has_gauss", "cached_gaussian"
+    ]
+
+    def __init__(self, path):
+        """
+        Initialize the checkpoint that is stored in the file at `path`.
+        """
+
+        self._path = path
+
+    @property
+    def path(self):
+        """
+        Retrieve the path to the checkpoint file.
+        """
+
+        return self._path
+
+    def exists(self):
+        """
+        Check whether the checkpoint file exists.
+        """
+
+        return os.path.isfile(self._path)
+
+    def get_island(self, index):
+        """
+        Create a checkpoint for the island with the given `index`, which is
+        stored in a file next to this checkpoint.
+        """
+
+        root, extension = os.path.splitext(self._path)
+        return Checkpoint("{}-{}{}".format(root, index, extension))
+
+    def write(self, state, random_states=None):
+        """
+        Write the `state` dictionary to the checkpoint file, along with the
+        current state of the random number generator.
+
+        The values of the state must be scalars, strings or arrays that NumPy
+        can store without pickling. The `random_states` dictionary may contain
+        the states of other `numpy.random.RandomState` objects by name.
+        """
+
+        arrays = dict(state)
+        random_states = dict(random_states or {})
+        random_states["random"] = np.random.get_state()
+        for name, random_state in random_states.iteritems():
+            arrays.update(
+                ("{}_{}".format(name, field), value)
+                for field, value in zip(self.RANDOM_STATE_FIELDS, random_state)
+            )
+
+        temporary_path = "{}.tmp".format(self._path)
+        with open(temporary_path, "wb") as checkpoint_file:
+            np.savez_compressed(checkpoint_file, **arrays)
+
+        os.rename(temporary_path, self._path)
+
+    def read(self, random_names=()):
+        """
+        Read the state dictionary from the checkpoint file.
+
+        Scalar values are converted back from arrays. The state of the random
+        number generator is in the `random_state` item, which can be passed to
+        `numpy.random.set_state`. The states of the other random number
+        generators with the given `random_names` are in a dictionary in the
+        `random_states` item, as far as the checkpoint contains them.
+        """
+
+        with open(self._path, "rb") as checkpoint_file:
+            data = np.load(checkpoint_file)
+            state = dict(
+                (key, data[key].item() if data[key].ndim == 0 else data[key])
+                for key in data.files
+            )
+
+        state["random_state"] = self._pop_random_state(state, "random")
+        state["random_states"] = dict(
+            (name, self._pop_random_state(state, name))
+            for name in random_names
+            if "{}_generator".format(name) in state
+        )
+        return state
+
+    def _pop_random_state(self, state, name):
+        """
+        Remove the arrays of the random number generator with the given `name`
+        from the `state` dictionary, and return them as a state tuple.
+        """
+
+        return tuple(
+            state.pop("{}_{}".format(name, field))
+            for field in self.RANDOM_STATE_FIELDS
+        )
@@ -1,4 +1,5 @@
 import numpy as np
+from Evaluation_Cache import Evaluation_Cache
 from ..environment.Location_Proxy import Location_Proxy
 from ..location.AStar import AStar
 from ..trajectory.Memory_Map import Memory_Map
@@ -35,6 +36,12 @@ class Collision_Avoidance(Location_Proxy):
         self._memory_map = Memory_Map(self, max(self._network_size) + 1)
         self._astar = AStar(self._geometry, self._memory_map,
                             allow_at_bounds=True, use_indices=True)
+
+        # Cache of the results of the A* search algorithm, which is kept 
+        # across resets since assignments of similar positions search for the 
+        # same paths again.
+        self._path_cache = Evaluation_Cache(self._settings.get("path_cache_size"))
+
         self.reset()
 
     def reset(self):
@@ -83,6 +90,23 @@ class Collision_Avoidance(Location_Proxy):
         if value != 0:
             self._memory_map.set(route[-1], Collision_Type.VEHICLE)
 
+    def _find_path(self, start_index, goal_index, direction, turning_cost):
+        # The search only depends on the start and goal indices, the initial 
+        # direction, the turning cost and which cells of the memory map are 
+        # blocked by routes, vehicles or the network. The key contains the 
+        # packed blocked cells, so paths are no longer found in the cache 
+        # once a route that they avoid is removed.
+        blocked = np.packbits(self._memory_map.get_map() != 0).tostring()
+        key = (start_index, goal_index, direction, turning_cost, blocked)
+        result = self._path_cache.get(key)
+        if result is None:
+            result = self._astar.assign(start_index, goal_index, 1.0,
+                                        direction=direction,
+                                        turning_cost=turning_cost)
+            self._path_cache.put(key, result)
+
+        return result
+
     def _is_synchronized(self, other_vehicle):
         if self._current_vehicle == other_vehicle:
             return True
@@ -149,8 +173,7 @@ class Collision_Avoidance(Location_Proxy):
         goal_index = tuple(new_position)
 
         route, trend, distance, new_direction = \
-            self._astar.assign(start_index, goal_index, 1.0,
-                               direction=direction, turning_cost=turning_cost)
+            self._find_path(start_index, goal_index, direction, turning_cost)
 
         # If we could not find a route, then there is no safe route. This is 
         # made known through the distance, which becomes the cost of traveling 
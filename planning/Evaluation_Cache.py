@@ -0,0 +1,107 @@
+# Core imports
+import hashlib
+from collections import OrderedDict
+
+# Library imports
+import numpy as np
+
+class Evaluation_Cache(object):
+    """
+    Bounded cache of evaluation results of individuals, which discards the
+    least recently used results when it is full.
+
+    The results are stored by a key that is a hash of the variable values of
+    an individual, so that identical individuals are only evaluated once.
+    The cache tracks the number of hits and misses when looking up results.
+    """
+
+    def __init__(self, size):
+        """
+        Initialize the cache, which holds at most `size` results. If `size` is
+        zero, then the cache does not store any results.
+        """
+
+        self._size = size
+        self._results = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._results)
+
+    def __contains__(self, key):
+        return key in self._results
+
+    @property
+    def size(self):
+        """
+        Retrieve the maximum number of results in the cache.
+        """
+
+        return self._size
+
+    @property
+    def hits(self):
+        """
+        Retrieve the number of lookups that found a result in the cache.
+        """
+
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        Retrieve the number of lookups that did not find a result.
+        """
+
+        return self._misses
+
+    def get_key(self, point):
+        """
+        Determine the key of an individual `point`, which is a vector of
+        variable values that has its final form provided by `format_point`.
+        """
+
+        values = np.ascontiguousarray(point, dtype=float)
+        return hashlib.sha1(values.tostring()).digest()
+
+    def get(self, key):
+        """
+        Retrieve the result with the given `key`, or `None` if the cache does
+        not contain a result for the key.
+
+        The result becomes the most recently used result.
+        """
+
+        if key not in self._results:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        result = self._results.pop(key)
+        self._results[key] = result
+        return result
+
+    def put(self, key, result):
+        """
+        Store a `result` with the given `key` in the cache.
+
+        If the cache is full, then the least recently used result is removed.
+        """
+
+        if self._size == 0:
+            return
+
+        self._results.pop(key, None)
+        self._results[key] = result
+        if len(self._results) > self._size:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all results from the cache and reset the hit and miss counts.
+        """
+
+        self._results = OrderedDict()
+        self._hits = 0
+        self._misses = 0
@@ -0,0 +1,146 @@
+# Core imports
+import multiprocessing
+
+class Evaluator(object):
+    """
+    Evaluator of populations of individuals for a planning problem.
+
+    This evaluator works through the individuals one by one in the current
+    process, using the context of the problem instance.
+    """
+
+    def __init__(self, problem):
+        self._problem = problem
+
+    @property
+    def problem(self):
+        """
+        Retrieve the problem whose individuals are evaluated.
+        """
+
+        return self._problem
+
+    def evaluate(self, points):
+        """
+        Evaluate a list of vectors containing variable values.
+
+        The feasibility and objective function values are returned as two
+        lists with an evaluation for every vector, like `Problem.evaluate`.
+        """
+
+        return self._problem.evaluate(points)
+
+    def evaluate_states(self, points, parents=None):
+        """
+        Evaluate a list of vectors containing variable values, and keep the
+        intermediate results of the evaluations.
+
+        If `parents` is given, then it is a list with the state dictionary of
+        the parent of each vector, or `None` for vectors without a parent,
+        which the problem may use to evaluate only the changes.
+
+        The feasibility, objective function values and state dictionaries are
+        returned as three lists with an evaluation for every vector.
+        """
+
+        if parents is None:
+            parents = [None for _ in points]
+
+        context = self._problem.context
+        results = [
+            self._problem.evaluate_state(point, context, parent=parent)
+            for point, parent in zip(points, parents)
+        ]
+        return self._split(results)
+
+    def close(self):
+        """
+        Release any resources that the evaluator uses.
+        """
+
+        pass
+
+    def _split(self, results):
+        Feasible = [result[0] for result in results]
+        Objectives = [result[1] for result in results]
+        States = [result[2] for result in results]
+        return Feasible, Objectives, States
+
+# Problem and context of the evaluation in a worker process of the pool.
+_worker = {}
+
+def _initialize_worker(problem):
+    _worker["problem"] = problem
+    _worker["context"] = problem.create_context()
+
+def _evaluate_worker(point):
+    return _worker["problem"].evaluate_state(point, _worker["context"])[:2]
+
+def _evaluate_state_worker(task):
+    point, parent = task
+    return _worker["problem"].evaluate_state(point, _worker["context"],
+                                             parent=parent)
+
+class Pool_Evaluator(Evaluator):
+    """
+    Evaluator of populations of individuals that divides the evaluations
+    over a pool of worker processes.
+
+    Each worker process has its own copy of the problem and creates its own
+    context for the evaluations, such as a weight matrix and an assigner, so
+    that the workers do not share any state.
+    """
+
+    def __init__(self, problem, processes=None):
+        """
+        Initialize the evaluator with a pool of `processes` worker processes.
+        If `processes` is `None`, then one process for each CPU core is used.
+        """
+
+        super(Pool_Evaluator, self).__init__(problem)
+
+        self._processes = multiprocessing.cpu_count() if processes is None else processes
+        self._pool = multiprocessing.Pool(self._processes,
+                                          initializer=_initialize_worker,
+                                          initargs=(problem,))
+
+    @property
+    def processes(self):
+        """
+        Retrieve the number of worker processes.
+        """
+
+        return self._processes
+
+    def evaluate(self, points):
+        if not points:
+            return [], []
+
+        results = self._pool.map(_evaluate_worker, points,
+                                 self._get_chunksize(points))
+
+        Feasible = [feasible for feasible, objectives in results]
+        Objectives = [objectives for feasible, objectives in results]
+        return Feasible, Objectives
+
+    def evaluate_states(self, points, parents=None):
+        if not points:
+            return [], [], []
+
+        if parents is None:
+            parents = [None for _ in points]
+
+        # The states of the parents and the results are sent between the 
+        # processes, so the workers need not share any state.
+        results = self._pool.map(_evaluate_state_worker, zip(points, parents),
+                                 self._get_chunksize(points))
+        return self._split(results)
+
+    def _get_chunksize(self, points):
+        # Divide the points in a few chunks per worker, which balances the
+        # load while limiting the communication overhead.
+        return max(1, len(points) / (self._processes * 4))
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
@@ -35,12 +35,18 @@ class Greedy_Assignment(object):
         self._vehicle_pairs = list(
             itertools.permutations(range(1, self._number_of_vehicles + 1), r=2)
         )
+        # Indices of the first and second vehicle of each vehicle pair in the 
+        # distance matrix.
+        self._pair_indices = np.array(self._vehicle_pairs, dtype=np.int).reshape(-1, 2) - 1
         self._collision_avoider = Collision_Avoidance(arguments, geometry)
 
         self._export = True
 
         self._assignment = None
         self._positions = None
+        self._remaining = None
+        self._coordinates = None
+        self._distances = None
         self._current_positions = None
         self._current_directions = None
         self._number_of_waits = None
@@ -78,28 +84,32 @@ class Greedy_Assignment(object):
 
         self._assignment[vehicle].append(waypoint)
 
-    def _calculate_vehicle_distances(self):
-        V = np.full((self._number_of_vehicles, 2, len(self._positions)), np.nan)
-        for vehicle in range(self._number_of_vehicles):
-            for i in range(2):
-                # The traveling distance: Manhattan grid distance
-                D = self._positions[:, i, :] - self._current_positions[vehicle]
-                # Indications of whether we travel upward/downward/neutral and 
-                # leftward/rightward/neutral.
-                S = np.sign(D)
-
-                # Determine how many turns the vehicle needs to make to get to 
-                # the positions, so whether we need to turn left/right and then 
-                # optionally turn in the same direction again, or turn around 
-                # completely.
-                cur = self._current_directions[vehicle]
-                right = abs(S[:, (cur.axis + 1) % 2])
-                straight = (2 - right) * (S[:, cur.axis] == -cur.sign)
-                T = straight + right
-
-                V[vehicle, i, :] = abs(D).sum(axis=1) + self._turning_cost * T
-
-        return V
+    def _calculate_vehicle_distances(self, vehicles):
+        # Calculate the distances from the current positions of the given 
+        # vehicle indices to both positions of every pair at once. The result 
+        # has a row for each vehicle and each position within a pair, where 
+        # the distances to assigned positions are infinite.
+        current = np.array([self._current_positions[v] for v in vehicles])
+        axes = np.array([self._current_directions[v].axis for v in vehicles])
+        signs = np.array([self._current_directions[v].sign for v in vehicles])
+        rows = np.arange(len(vehicles))
+
+        # The traveling distance along the axis that the vehicle is facing and 
+        # along the other axis, which together form the Manhattan distance.
+        forward = self._coordinates[axes] - \
+                  current[rows, axes][:, np.newaxis, np.newaxis]
+        sideways = self._coordinates[1 - axes] - \
+                   current[rows, 1 - axes][:, np.newaxis, np.newaxis]
+
+        # Determine how many turns the vehicle needs to make to get to the 
+        # positions, so whether we need to turn left/right and then optionally 
+        # turn in the same direction again, or turn around completely.
+        right = sideways != 0
+        behind = forward * signs[:, np.newaxis, np.newaxis] < 0
+        T = right + behind * (2 - right)
+
+        V = abs(forward) + abs(sideways) + self._turning_cost * T
+        return np.where(self._remaining, V, np.inf)
 
     def _get_new_direction(self, vehicle, new_position):
         up = new_position[0] - self._current_positions[vehicle-1][0]
@@ -128,17 +138,14 @@ class Greedy_Assignment(object):
         return self._current_directions[vehicle-1].invert()
 
     def _get_closest_pair(self):
-        V = self._calculate_vehicle_distances()
-        distances = np.array([
-            [
-                V[vehicle-1, i, :] for i, vehicle in enumerate(vehicle_pair)
-            ] for vehicle_pair in self._vehicle_pairs
-        ])
+        first = self._distances[self._pair_indices[:, 0], 0, :]
+        second = self._distances[self._pair_indices[:, 1], 1, :]
 
         # Given that both vehicles operate at the same time and synchronize at 
         # the next waypoint, the time needed depends on the longest distance 
-        # that either vehicle needs to move. Thus take the maximum.
-        totals = distances.max(axis=1)
+        # that either vehicle needs to move. Thus take the maximum. Positions 
+        # that are already assigned have infinite distances.
+        totals = np.where(first > second, first, second)
 
         # Determine the indices of the combination of vehicle and sensor pair 
         # that minimize the distances.
@@ -215,7 +222,9 @@ class Greedy_Assignment(object):
         self._export = export
         self._collision_avoider.reset()
 
-        self._positions = np.array(positions_pairs, dtype=np.int)
+        self._positions = np.array(positions_pairs, dtype=np.int).reshape(-1, 2, 2)
+        self._remaining = np.ones(len(self._positions), dtype=bool)
+        self._coordinates = np.ascontiguousarray(self._positions.transpose(2, 1, 0))
         self._current_positions = list(self._home_locations)
         self._current_directions = [
             Line_Follower_Direction(d) for d in self._home_directions
@@ -231,9 +240,14 @@ class Greedy_Assignment(object):
             self._add_waypoint(vehicle + 1, home_location, Waypoint_Type.HOME,
                                home_direction=self._current_directions[vehicle])
 
+        # The distances of all vehicles to the positions, which are updated for 
+        # the vehicles that move to a position pair.
+        vehicles = range(self._number_of_vehicles)
+        self._distances = self._calculate_vehicle_distances(vehicles)
+
         total_distance = 0
 
-        while len(self._positions) > 0:
+        for _ in xrange(len(self._positions)):
             # The index of the distances matrix and the distance value itself.
             idx, distance = self._get_closest_pair()
 
@@ -247,6 +261,9 @@ class Greedy_Assignment(object):
 
             total_distance += distance
 
-            self._positions = np.delete(self._positions, closest_pair, axis=0)
+            self._remaining[closest_pair] = False
+            self._distances[:, :, closest_pair] = np.inf
+            moved = self._pair_indices[vehicle_pair]
+            self._distances[moved] = self._calculate_vehicle_distances(moved)
 
         return self._assignment, total_distance
@@ -0,0 +1,243 @@
+# Core imports
+import numpy as np
+
+class Hypervolume(object):
+    """
+    Calculator of the hypervolume that points with any number of objective
+    values dominate with respect to a reference point, as well as the
+    exclusive contributions of the individual points to that hypervolume.
+
+    The hypervolume uses sweeps for two and three objectives and the WFG
+    algorithm of While, Bradstreet and Barone for more objectives. The
+    contributions are exact up to a number of objectives, above which they
+    are approximated with Monte Carlo sampling.
+    """
+
+    def __init__(self, exact_dimensions=5, samples=10000, seed=None):
+        """
+        Initialize the calculator. The contributions of points with more
+        than `exact_dimensions` objectives are estimated from `samples`
+        uniformly distributed points. The samples are drawn from a random
+        number generator of the calculator itself, which is initialized with
+        the given `seed`.
+        """
+
+        self._exact_dimensions = exact_dimensions
+        self._samples = samples
+        self._random = np.random.RandomState(seed)
+
+    @property
+    def exact_dimensions(self):
+        """
+        Retrieve the maximum number of objectives for which the contributions
+        are calculated exactly.
+        """
+
+        return self._exact_dimensions
+
+    @property
+    def samples(self):
+        """
+        Retrieve the number of samples used for approximating contributions.
+        """
+
+        return self._samples
+
+    @property
+    def random_state(self):
+        """
+        Retrieve the state of the random number generator for the samples.
+        """
+
+        return self._random.get_state()
+
+    @random_state.setter
+    def random_state(self, random_state):
+        """
+        Restore the state of the random number generator for the samples.
+        """
+
+        self._random.set_state(random_state)
+
+    def get_reference(self, points):
+        """
+        Determine a reference point for the given `points`, which is worse
+        than all the points in every objective.
+
+        The reference point lies beyond the worst objective values by the
+        range of the objective values, or by one if the range is empty.
+        """
+
+        points = np.asarray(points, dtype=float)
+        low = points.min(axis=0)
+        high = points.max(axis=0)
+        span = high - low
+        span[span == 0] = 1.0
+        return high + span
+
+    def compute(self, points, reference):
+        """
+        Calculate the hypervolume that the `points` dominate up until the
+        `reference` point. The points may be dominated by other points.
+        """
+
+        points = np.asarray(points, dtype=float)
+        reference = np.asarray(reference, dtype=float)
+        if points.size == 0:
+            return 0.0
+
+        # Points that are not better than the reference point in every
+        # objective do not dominate any volume.
+        points = points[np.all(points < reference, axis=1)]
+        return self._volume(self._nondominated(points), reference)
+
+    def contributions(self, points, reference=None):
+        """
+        Calculate the exclusive hypervolume contributions of the `points`,
+        namely the volume that only that point dominates. The result is an
+        array of contributions in the order of the points.
+
+        If `reference` is `None`, then the reference point is infinitely far
+        away, which means that the points at the boundary of the front have
+        infinite contributions. For two objectives, the other contributions
+        do not depend on the reference point. For more objectives, a point
+        from `get_reference` bounds the contributions of the other points.
+        """
+
+        points = np.asarray(points, dtype=float)
+        if points.size == 0:
+            return np.zeros(0)
+
+        if reference is None and points.shape[1] == 2:
+            return self._contributions_2d(points)
+
+        if reference is None:
+            C = self._contributions(points, self.get_reference(points))
+
+            # The points with the unique best value in an objective dominate
+            # an unbounded volume.
+            for column in points.T:
+                best = np.flatnonzero(column == column.min())
+                if best.size == 1:
+                    C[best] = np.inf
+
+            return C
+
+        return self._contributions(points, np.asarray(reference, dtype=float))
+
+    def least_contributor(self, points, reference=None):
+        """
+        Determine the index of the point with the smallest hypervolume
+        contribution among the `points`.
+        """
+
+        return int(np.argmin(self.contributions(points, reference)))
+
+    def _contributions(self, points, reference):
+        if points.shape[1] > self._exact_dimensions:
+            return self._sample_contributions(points, reference)
+
+        # The exclusive contribution of a point is the volume of its box up
+        # to the reference point, minus the volume within that box that the
+        # other points dominate, which are limited to the box.
+        C = np.zeros(len(points))
+        for i, point in enumerate(points):
+            if np.any(point >= reference):
+                continue
+
+            others = np.delete(points, i, axis=0)
+            limited = np.where(others > point, others, point)
+            C[i] = np.prod(reference - point) - self.compute(limited, reference)
+
+        return C
+
+    def _contributions_2d(self, points):
+        # Sort the points on the first objective, so that nondominated points
+        # are sorted in reverse on the second objective. The box between the
+        # neighbors of a point is its contribution.
+        order = np.lexsort((points[:, 1], points[:, 0]))
+        ordered = points[order]
+        width = np.append(ordered[1:, 0], np.inf) - ordered[:, 0]
+        height = np.insert(ordered[:-1, 1], 0, np.inf) - ordered[:, 1]
+
+        # Duplicate points at the boundaries have an empty and an infinite
+        # side, but they do not contribute anything.
+        with np.errstate(invalid='ignore'):
+            area = width * height
+
+        area[np.isnan(area)] = 0.0
+        C = np.empty(len(points))
+        C[order] = area
+        return C
+
+    def _sample_contributions(self, points, reference):
+        # Sample uniformly in the box between the best objective values and
+        # the reference point. Samples that only one point dominates are
+        # part of the contribution of that point.
+        low = points.min(axis=0)
+        volume = np.prod(reference - low)
+        samples = low + self._random.rand(self._samples, points.shape[1]) * (reference - low)
+
+        dominated = np.all(points[np.newaxis, :, :] <= samples[:, np.newaxis, :], axis=2)
+        exclusive = dominated[dominated.sum(axis=1) == 1]
+        return volume * exclusive.sum(axis=0) / float(self._samples)
+
+    def _nondominated(self, points):
+        # Remove points that another point dominates, as well as duplicates
+        # of earlier points.
+        weak = np.all(points[:, np.newaxis, :] <= points[np.newaxis, :, :], axis=2)
+        strict = np.any(points[:, np.newaxis, :] < points[np.newaxis, :, :], axis=2)
+        earlier = np.tri(len(points), k=-1, dtype=bool).T
+        dominated = np.any(weak & (strict | earlier), axis=0)
+        return points[~dominated]
+
+    def _volume(self, points, reference):
+        if points.size == 0:
+            return 0.0
+
+        dimensions = points.shape[1]
+        if dimensions == 1:
+            return float(reference[0] - points[:, 0].min())
+        if dimensions == 2:
+            return self._volume_2d(points, reference)
+        if dimensions == 3:
+            return self._volume_3d(points, reference)
+
+        return self._volume_wfg(points, reference)
+
+    def _volume_2d(self, points, reference):
+        # Sweep over the first objective, where each point starts a strip up
+        # to the next point that is as high as the best second objective
+        # value so far allows.
+        order = np.lexsort((points[:, 1], points[:, 0]))
+        ordered = points[order]
+        width = np.diff(np.append(ordered[:, 0], reference[0]))
+        height = reference[1] - np.minimum.accumulate(ordered[:, 1])  # pylint: disable=no-member
+        return float(np.sum(width * height))
+
+    def _volume_3d(self, points, reference):
+        # Sweep over the third objective, where each slice has the area that
+        # the points so far dominate in the first two objectives.
+        ordered = points[np.argsort(points[:, 2], kind='mergesort')]
+        depth = np.diff(np.append(ordered[:, 2], reference[2]))
+        volume = 0.0
+        for i in xrange(len(ordered)):
+            if depth[i] > 0:
+                area = self._volume_2d(ordered[:i+1, :2], reference[:2])
+                volume += depth[i] * area
+
+        return volume
+
+    def _volume_wfg(self, points, reference):
+        # Sort the points in reverse on the last objective, which keeps the
+        # limited sets of the later points small. The volume is the sum of
+        # the exclusive volumes of each point with respect to later points.
+        ordered = points[np.argsort(-points[:, -1], kind='mergesort')]
+        volume = 0.0
+        for i, point in enumerate(ordered):
+            later = ordered[i+1:]
+            limited = np.where(later > point, later, point)
+            volume += np.prod(reference - point)
+            volume -= self._volume(self._nondominated(limited), reference)
+
+        return volume
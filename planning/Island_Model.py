@@ -0,0 +1,263 @@
+# Core imports
+import multiprocessing
+import Queue
+import traceback
+
+# Library imports
+import numpy as np
+
+def _run_island(index, algorithm_class, problem, arguments, seed, limit,
+                migration_size, inbox, outbox, messages):
+    """
+    Run the algorithm of one island in a worker process.
+
+    The island uses its own random `seed`. The iteration limit is read from
+    the shared `limit` value at every callback, so that the islands can be
+    stopped. Every migration, at most `migration_size` random nondominated
+    individuals are sent to the `outbox` queue of the next island in the
+    ring, and all individuals in the `inbox` queue are received.
+
+    Progress, the final population and errors are put in the `messages`
+    queue as tuples of a message type, the island index and the data.
+    """
+
+    # pylint: disable=too-many-arguments
+
+    # Do not wait for the next island to receive the last emigrants when
+    # this process ends, since it may have stopped already.
+    outbox.cancel_join_thread()
+
+    try:
+        np.random.seed(seed)
+        algorithm = algorithm_class(problem, arguments)
+
+        # Each island evaluates its population in its own process.
+        algorithm.processes = 1
+
+        # Each island writes its checkpoints to its own file.
+        if algorithm.checkpoint is not None:
+            algorithm.checkpoint = algorithm.checkpoint.get_island(index)
+
+        def iteration_callback(algorithm, data):
+            algorithm.t_max = limit.value
+            messages.put(("iteration", index, {
+                "iteration": data["iteration"],
+                "cur_time": data["cur_time"],
+                "population": list(data["population"]),
+                "feasible": list(data["feasible"]),
+                "objectives": list(data["objectives"]),
+                "deletions": dict(data["deletions"]),
+                "cache": dict(data["cache"])
+            }))
+
+        def migration_callback(algorithm, emigrants):
+            algorithm.t_max = limit.value
+            if emigrants:
+                choices = np.random.permutation(len(emigrants))[:migration_size]
+                outbox.put([emigrants[i] for i in choices])
+
+            immigrants = []
+            while True:
+                try:
+                    immigrants.extend(inbox.get_nowait())
+                except Queue.Empty:
+                    return immigrants
+
+        algorithm.set_iteration_callback(iteration_callback)
+        algorithm.set_migration_callback(migration_callback,
+                                         algorithm.settings.get("migration_interval"))
+
+        messages.put(("result", index, algorithm.evolve()))
+    except Exception:  # pylint: disable=broad-except
+        messages.put(("error", index, traceback.format_exc()))
+
+class Island_Model(object):
+    """
+    Island model that runs multiple instances of an evolutionary algorithm on
+    the same problem, each in its own process and with its own random seed.
+
+    The islands form a ring, where each island regularly sends some of its
+    nondominated individuals to the next island. The populations of the
+    islands are merged for the progress and the final result.
+
+    The island model has the same interface as an algorithm for the planning
+    runner, although changes to the iteration limit only take effect at the
+    next iteration callback of the islands.
+    """
+
+    def __init__(self, problem, arguments, algorithm_class, islands=None):
+        """
+        Initialize the island model with a `problem` instance, `arguments` and
+        the class of the algorithm to run on each island.
+
+        If `islands` is `None`, then there is one island for each CPU core.
+        """
+
+        self.problem = problem
+        self.arguments = arguments
+        self.settings = arguments.get_settings("planning_algorithm")
+
+        self._algorithm_class = algorithm_class
+        self._algorithm = algorithm_class(problem, arguments)
+        self._islands = multiprocessing.cpu_count() if islands is None else islands
+
+        self.t_current = 0
+        self._limit = multiprocessing.Value('i', self._algorithm.t_max)
+        self.iteration_callback = None
+
+        # The merged population is never kept in an archive.
+        self.archive = None
+
+    @property
+    def islands(self):
+        """
+        Retrieve the number of islands.
+        """
+
+        return self._islands
+
+    @property
+    def mu(self):
+        """
+        Retrieve the total number of individuals on all the islands.
+        """
+
+        return self._algorithm.mu * self._islands
+
+    @property
+    def steps(self):
+        """
+        Retrieve the mutation step sizes of the algorithm on the islands.
+        """
+
+        return self._algorithm.steps
+
+    @property
+    def t_max(self):
+        """
+        Retrieve the maximum number of iterations of the islands.
+        """
+
+        return self._limit.value
+
+    @t_max.setter
+    def t_max(self, t_max):
+        self._limit.value = t_max
+
+    def set_iteration_callback(self, callback):
+        if not hasattr(callback, "__call__"):
+            raise TypeError("Iteration callback is not callable")
+
+        self.iteration_callback = callback
+
+    def sort_nondominated(self, Objectives, all_layers=True):
+        """
+        Sort a list of objective values for individuals into groups of
+        nondominated and dominated solutions, like the algorithm does.
+        """
+
+        return self._algorithm.sort_nondominated(Objectives,
+                                                 all_layers=all_layers)
+
+    def get_name(self):
+        """
+        Get the displayable name of the algorithm and the number of islands.
+        """
+
+        return "{} ({} islands)".format(self._algorithm.get_name(),
+                                        self._islands)
+
+    def evolve(self):
+        """
+        Perform the evolutionary algorithm on all islands and merge the
+        populations of the islands.
+        """
+
+        queues = [multiprocessing.Queue() for _ in range(self._islands)]
+        messages = multiprocessing.Queue()
+        seeds = np.random.randint(np.iinfo(np.int32).max, size=self._islands)
+        migration_size = self.settings.get("migration_size")
+
+        processes = []
+        for index in range(self._islands):
+            args = (
+                index, self._algorithm_class, self.problem, self.arguments,
+                seeds[index], self._limit, migration_size, queues[index],
+                queues[(index + 1) % self._islands], messages
+            )
+            process = multiprocessing.Process(target=_run_island, args=args)
+            process.daemon = True
+            process.start()
+            processes.append(process)
+
+        try:
+            results = self._receive(messages)
+        finally:
+            for process in processes:
+                process.join()
+
+        return self._merge([results[index] for index in range(self._islands)])
+
+    def _receive(self, messages):
+        # Handle the messages of the islands until all of them are done.
+        results = {}
+        errors = []
+        progress = {}
+        while len(results) + len(errors) < self._islands:
+            message, index, data = messages.get()
+            if message == "error":
+                # Stop the other islands, but keep receiving their messages so 
+                # that their processes can finish.
+                self.t_max = 0
+                errors.append("Island {} failed: {}".format(index, data))
+            elif message == "result":
+                results[index] = data
+            else:
+                self._handle_progress(index, data, progress)
+
+        if errors:
+            raise RuntimeError("\n".join(errors))
+
+        return results
+
+    def _handle_progress(self, index, data, progress):
+        # Report the merged progress once all islands reach an iteration.
+        iteration = data["iteration"]
+        progress.setdefault(iteration, {})[index] = data
+        if len(progress[iteration]) < self._islands:
+            return
+
+        islands = progress.pop(iteration)
+        self.t_current = iteration
+        if self.iteration_callback is None:
+            return
+
+        P, Objectives, Feasible = self._merge([
+            (islands[i]["population"], islands[i]["objectives"],
+             islands[i]["feasible"]) for i in range(self._islands)
+        ])
+        self.iteration_callback(self, {
+            "iteration": iteration,
+            "cur_time": max(island["cur_time"] for island in islands.values()),
+            "population": P,
+            "feasible": Feasible,
+            "objectives": Objectives,
+            "deletions": self._sum([island["deletions"] for island in islands.values()]),
+            "cache": self._sum([island["cache"] for island in islands.values()])
+        })
+
+    def _merge(self, results):
+        P = []
+        Objectives = []
+        Feasible = []
+        for population, objectives, feasible in results:
+            P.extend(population)
+            Objectives.extend(objectives)
+            Feasible.extend(feasible)
+
+        return P, Objectives, Feasible
+
+    def _sum(self, counts):
+        return dict(
+            (key, sum(count[key] for count in counts)) for key in counts[0]
+        )
@@ -0,0 +1,216 @@
+# Core imports
+import bisect
+from collections import OrderedDict
+
+class Pareto_Archive(object):
+    """
+    Archive of individuals with two objective values that keeps track of
+    which individuals are nondominated.
+
+    The nondominated front is kept sorted on the first objective, which means
+    that it is sorted in reverse on the second objective as well. Binary
+    search on the front finds the position of a new individual, where only
+    its neighbors determine whether it is dominated. Inserting an individual
+    therefore does not sort the other individuals again, like the Kung,
+    Luccio and Preparata algorithm does. Individuals with the same objective
+    values as an individual in the front are dominated.
+
+    The dominated individuals are sorted on the first objective as well, so
+    that removing an individual from the front only visits the dominated
+    individuals between it and its next neighbor in the front.
+    """
+
+    def __init__(self):
+        # Objective values of all the individuals in the archive.
+        self._objectives = {}
+
+        # Nondominated individuals as tuples of their objective values and
+        # their key, sorted in ascending order.
+        self._front = []
+
+        # Dominated individuals as tuples of their objective values and their
+        # key, sorted in ascending order.
+        self._dominated = []
+
+    def __len__(self):
+        return len(self._objectives)
+
+    def __contains__(self, key):
+        return key in self._objectives
+
+    @property
+    def front(self):
+        """
+        Retrieve the keys of the nondominated individuals, sorted on the first
+        objective value.
+        """
+
+        return [entry[2] for entry in self._front]
+
+    @property
+    def dominated(self):
+        """
+        Retrieve the keys of the dominated individuals, sorted on the first
+        objective value.
+        """
+
+        return [entry[2] for entry in self._dominated]
+
+    def get(self, key):
+        """
+        Retrieve the objective values of the individual with the given `key`.
+        """
+
+        return self._objectives[key]
+
+    def is_dominated(self, key):
+        """
+        Check whether the individual with the given `key` is dominated.
+        """
+
+        if key not in self._objectives:
+            return False
+
+        return self._find(self._dominated, key) is not None
+
+    def insert(self, key, objectives):
+        """
+        Add an individual with the given `key` and `objectives` values to the
+        archive. The key must not yet be in the archive.
+
+        Individuals in the front that the new individual dominates become
+        dominated. Returns whether the new individual is nondominated.
+
+        The archive only supports individuals with two objective values, so
+        a `ValueError` is raised for other numbers of objectives.
+        """
+
+        if key in self._objectives:
+            raise KeyError("Key {} is already in the archive".format(key))
+        if len(objectives) != 2:
+            raise ValueError("The archive only supports two objectives, not {}".format(len(objectives)))
+
+        values = (objectives[0], objectives[1])
+        self._objectives[key] = values
+        return self._add(key, values)
+
+    def remove(self, key):
+        """
+        Remove the individual with the given `key` from the archive.
+
+        If the individual is nondominated, then the dominated individuals that
+        it dominated are checked again, so that they may become nondominated.
+        """
+
+        position = self._find(self._dominated, key)
+        values = self._objectives.pop(key)
+        if position is not None:
+            del self._dominated[position]
+            return
+
+        position = bisect.bisect_left(self._front, values + (key,))
+        del self._front[position]
+
+        # Only dominated individuals in the region that the removed individual
+        # dominated may become nondominated. The next individual in the front
+        # has a higher first objective value and a lower second objective
+        # value, so it still dominates the individuals from its first
+        # objective value onward. Add the others to the front again in sorted
+        # order.
+        start = bisect.bisect_left(self._dominated, values[:1])
+        if position < len(self._front):
+            end = bisect.bisect_left(self._dominated, self._front[position][:1])
+        else:
+            end = len(self._dominated)
+
+        region = self._dominated[start:end]
+        self._dominated[start:end] = [
+            entry for entry in region if entry[1] < values[1]
+        ]
+        for candidate in region:
+            if candidate[1] >= values[1]:
+                self._add(candidate[2], candidate[:2])
+
+    def replace(self, key, new_key):
+        """
+        Change the key of the individual with the given `key` to `new_key`.
+
+        The individual keeps its position in the archive. The new key must not
+        yet be in the archive.
+        """
+
+        if new_key in self._objectives:
+            raise KeyError("Key {} is already in the archive".format(new_key))
+
+        position = self._find(self._dominated, key)
+        values = self._objectives.pop(key)
+        self._objectives[new_key] = values
+        if position is not None:
+            del self._dominated[position]
+            bisect.insort(self._dominated, values + (new_key,))
+            return
+
+        position = bisect.bisect_left(self._front, values + (key,))
+        self._front[position] = values + (new_key,)
+
+    def clear(self):
+        """
+        Remove all individuals from the archive.
+        """
+
+        self._objectives = {}
+        self._front = []
+        self._dominated = []
+
+    def get_layers(self):
+        """
+        Retrieve the nondominated individuals and the dominated individuals.
+
+        The result is a list with an ordered dictionary of keys and objective
+        values of the front, and one for the dominated individuals, if there
+        are any. Both are sorted on the first objective value.
+        """
+
+        layers = [
+            OrderedDict((entry[2], entry[:2]) for entry in self._front)
+        ]
+        if self._dominated:
+            layers.append(OrderedDict(
+                (entry[2], entry[:2]) for entry in self._dominated
+            ))
+
+        return layers
+
+    def _find(self, entries, key):
+        # Find the position of the individual with the given key in the sorted
+        # entries, or `None` if it is not in there.
+        entry = self._objectives[key] + (key,)
+        position = bisect.bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            return position
+
+        return None
+
+    def _add(self, key, values):
+        # The individual before the position in the front has a lower first
+        # objective value, or the same value with a lower second objective
+        # value. If its second objective value is not higher, then it
+        # dominates the new individual. An individual at the position with the
+        # same values also dominates it.
+        position = bisect.bisect_left(self._front, values)
+        if position > 0 and self._front[position-1][1] <= values[1]:
+            bisect.insort(self._dominated, values + (key,))
+            return False
+        if position < len(self._front) and self._front[position][:2] == values:
+            bisect.insort(self._dominated, values + (key,))
+            return False
+
+        # The individuals after the position with a second objective value
+        # that is not lower are dominated by the new individual.
+        end = position
+        while end < len(self._front) and self._front[end][1] >= values[1]:
+            bisect.insort(self._dominated, self._front[end])
+            end += 1
+
+        self._front[position:end] = [values + (key,)]
+        return True
@@ -0,0 +1,103 @@
+# Core imports
+import time
+from collections import OrderedDict
+from functools import wraps
+
+class Phase_Timer(object):
+    """
+    Timer that accumulates the time spent in named phases of a run, such as
+    the evaluation of individuals or the selection of survivors.
+
+    Phases may be nested, in which case the time spent in the inner phase is
+    not counted for the outer phase. The times of all phases therefore add up
+    to at most the total time of the run.
+    """
+
+    def __init__(self):
+        self._times = OrderedDict()
+        self._calls = OrderedDict()
+
+        # Phases that are currently running, as lists of the phase name, the 
+        # start time and the time spent in nested phases.
+        self._stack = []
+
+    @property
+    def times(self):
+        """
+        Retrieve a dictionary of the time in seconds spent in each phase,
+        excluding the time of nested phases.
+        """
+
+        return OrderedDict(self._times)
+
+    @property
+    def calls(self):
+        """
+        Retrieve a dictionary of the number of times each phase took place.
+        """
+
+        return OrderedDict(self._calls)
+
+    def add_phase(self, phase):
+        """
+        Register a phase without any time, so that it is reported even if it
+        never takes place.
+        """
+
+        self._times.setdefault(phase, 0.0)
+        self._calls.setdefault(phase, 0)
+
+    def start(self, phase):
+        """
+        Start measuring the time of the given `phase`.
+        """
+
+        self.add_phase(phase)
+        self._stack.append([phase, time.time(), 0.0])
+
+    def stop(self):
+        """
+        Stop measuring the time of the most recently started phase.
+        """
+
+        phase, start, nested = self._stack.pop()
+        elapsed = time.time() - start
+        self._times[phase] += elapsed - nested
+        self._calls[phase] += 1
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def wrap(self, phase, function):
+        """
+        Create a wrapper of `function` that measures the time of its calls as
+        the given `phase`.
+        """
+
+        self.add_phase(phase)
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            self.start(phase)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.stop()
+
+        return timed
+
+    def instrument(self, phase, instance, name):
+        """
+        Replace the method with the given `name` of an `instance` with
+        a wrapper that measures the time of its calls as the given `phase`.
+        """
+
+        setattr(instance, name, self.wrap(phase, getattr(instance, name)))
+
+    def reset(self):
+        """
+        Forget the times and calls of all phases.
+        """
+
+        self._times = OrderedDict()
+        self._calls = OrderedDict()
+        self._stack = []
@@ -2,6 +2,7 @@ import itertools
 import math
 import numpy as np
 
+from Evaluation_Cache import Evaluation_Cache
 from Greedy_Assignment import Greedy_Assignment
 from ..geometry.Geometry_Grid import Geometry_Grid
 from ..reconstruction.Weight_Matrix import Weight_Matrix
@@ -51,6 +52,9 @@ class Problem(object):
         self.objectives = self.get_objectives()
         self.constraints = self.get_constraints()
 
+        # Resources that evaluations in the current process use and change.
+        self.context = None
+
     def format_steps(self, steps):
         """
         Convert a list of `steps` to a full list of the problem's dimension.
@@ -101,8 +105,27 @@ class Problem(object):
 
         return Feasible, Objectives
 
-    def is_feasible(self, point):
-        return all(constraint(point) for constraint in self.constraints)
+    def create_context(self):
+        """
+        Create the resources that an evaluation uses and changes.
+
+        Evaluations with different contexts do not share any state, so they
+        can take place at the same time, for example in multiple processes.
+        The generic problem does not need any resources, so this is `None`.
+        """
+
+        return None
+
+    def is_feasible(self, point, state=None):
+        """
+        Check whether the individual `point` satisfies all the constraints.
+
+        The `state` is a dictionary of intermediate results of the evaluation
+        of the point, which the constraints may use.
+        """
+
+        state = {} if state is None else state
+        return all(constraint(point, state) for constraint in self.constraints)
 
     def evaluate_point(self, point, feasible=None):
         """
@@ -117,20 +140,49 @@ class Problem(object):
         If `feasible` is given, then this method assumes that the feasibility
         of the point is the values of `feasible`, and that the point already
         has its final form provided by `format_point`.
+
+        The evaluation uses the context of the problem instance, so it must
+        not take place in multiple threads at once. Use `evaluate_state` with
+        separate contexts to do so.
+        """
+
+        return self.evaluate_state(point, self.context, feasible=feasible)[:2]
+
+    def evaluate_state(self, point, context, feasible=None, parent=None):
+        """
+        Evaluate a single individual `point` using the resources in `context`,
+        which is created by `create_context`.
+
+        This method does not change the problem instance. It returns the
+        feasibility and the objective function values like `evaluate_point`,
+        as well as a dictionary with the intermediate results of the
+        evaluation that the objectives and constraints use.
+
+        If `parent` is given, then it is the state dictionary of an individual
+        that the point is a mutation of. Problems may use the intermediate
+        results of the parent to only evaluate the parts of the point that
+        changed. The generic problem always evaluates the entire point.
         """
 
+        state = {}
         if feasible is None:
             point = self.format_point(point)
-            Feasible = self.is_feasible(point)
-        else:
-            Feasible = feasible
+            feasible = self.is_feasible(point, state)
 
-        if Feasible:
-            Objective = [float(objective(point)) for objective in self.objectives]
-        else:
-            Objective = [np.inf for objective in self.objectives]
+        return feasible, self.get_objective_values(point, state, feasible), state
 
-        return Feasible, Objective
+    def get_objective_values(self, point, state, feasible):
+        """
+        Calculate the objective function values of the individual `point`.
+
+        The `state` is a dictionary of intermediate results of the evaluation.
+        If the point is not `feasible`, then all the values are infinite.
+        """
+
+        if feasible:
+            return [float(objective(point, state)) for objective in self.objectives]
+
+        return [np.inf for objective in self.objectives]
 
     def mutate(self, point, steps):
         """
@@ -203,12 +255,13 @@ class Problem(object):
         """
         Get a list of objective functions.
 
-        The functions in the list are lambdas that accept a vector of values,
-        and returns a floating point objective value for the entire individual.
+        The functions in the list are lambdas that accept a vector of values
+        and a dictionary of intermediate results of the evaluation, and return
+        a floating point objective value for the entire individual.
         Since we model minimization problems, this value should become smaller
         when an individual is better than another one.
-        One can use member variables and numpy tiling tricks to calculate the
-        objective function values in one go.
+        One can use the intermediate results and numpy tiling tricks to
+        calculate the objective function values in one go.
         """
 
         return []
@@ -227,8 +280,9 @@ class Problem(object):
         """
         Get a list of constraint functions.
 
-        The functions in the list are lambdas that accept a vector of values,
-        and returns a boolean feasibility value for the entire individual.
+        The functions in the list are lambdas that accept a vector of values
+        and a dictionary of intermediate results of the evaluation, and return
+        a boolean feasibility value for the entire individual.
         An unfit individual should be given a `False` value by at least one of
         the constraints that it violates. Subclasses should extend the list
         provided by the `Problem` class, which generates constraints for the
@@ -236,21 +290,21 @@ class Problem(object):
         """
 
         constraints = [
-            lambda x: np.all(x >= self.domain[0])
+            lambda x, state: np.all(x >= self.domain[0])
         ]
         if len(self.domain) > 2 and len(self._bool_indices[0]) > 0:
             # Using + and * as logical OR/AND operators to allow binary values.
             # We check whether either the normal bound is satisfied, or that 
             # the value is binary and is at most 1.
             constraints.extend([
-                lambda x: np.all(
+                lambda x, state: np.all(
                     (x < self.domain[1]) +
                     ((self.domain[2] == bool) * (x <= self.domain[2]))
                 )
             ])
         else:
             constraints.extend([
-                lambda x: np.all(x < self.domain[1])
+                lambda x, state: np.all(x < self.domain[1])
             ])
 
         return constraints
@@ -294,15 +348,6 @@ class Reconstruction_Plan(Problem):
         self.network_height = self.network_size[1] - self.padding[1]*2
         self.size = [self.network_width, self.network_height]
 
-        # Initial weight matrix object which can be filled with current 
-        # locations during evaluations and reset to be reused.
-        self.weight_matrix = self.get_weight_matrix()
-
-        # Resulting output from the weight matrix.
-        self.matrix = None
-        self.unsnappable = 0
-        self.distances = None
-
         # The maximum number of unsnappable points in an individual.
         self.unsnappable_max = self.N * self.settings.get("unsnappable_rate")
 
@@ -310,12 +355,22 @@ class Reconstruction_Plan(Problem):
         # make lines and points, if necessary.
         self.geometry = Geometry_Grid()
 
-        self.assigner = Greedy_Assignment(self.arguments, self.geometry,
-                                          self._import_manager)
         self.delta_rate = self.settings.get("delta_rate")
 
-        self.travel_distance = 0.0
-        self.sensor_distances = np.empty(0)
+        # The footprints of links are packed bitsets with a bit for each pixel 
+        # that the link intersects. Keep the footprint of a link intersecting 
+        # all pixels and the number of bits in each byte value for counting.
+        self.pixels = self.network_width * self.network_height
+        self.full_footprint = np.packbits(np.ones(self.pixels, dtype=bool))
+        self._popcount = np.array([bin(i).count("1") for i in xrange(256)])
+
+        # Initial weight matrix object which can be filled with current 
+        # locations during evaluations and reset to be reused, and the 
+        # assigner of waypoints to vehicles. These form the context of 
+        # evaluations in the current process.
+        self.context = self.create_context()
+        self.weight_matrix = self.context["weight_matrix"]
+        self.assigner = self.context["assigner"]
 
     def get_domain(self):
         """
@@ -333,6 +388,13 @@ class Reconstruction_Plan(Problem):
         return Weight_Matrix(self.arguments, self.padding, self.size,
                              snap_inside=True, number_of_links=self.N)
 
+    def create_context(self):
+        return {
+            "weight_matrix": self.get_weight_matrix(),
+            "assigner": Greedy_Assignment(self.arguments, self.geometry,
+                                          self._import_manager)
+        }
+
     def format_steps(self, steps):
         # Convert a list of step sizes that has the same number of elements as 
         # there are variables for a single measurement so that they apply to 
@@ -361,8 +423,7 @@ class Reconstruction_Plan(Problem):
 
         The positions are checked against the given `weight_matrix` for
         snappability and other constraints. The weight matrix is therefore
-        updated in this method, and it is not safe to use the same weight matrix
-        on multiple individuals without resetting it in between.
+        reset and updated in this method.
 
         The result is a numpy array of selected (potentially snapped) positions
         and the number of unsnappable positions. The numpy array has three
@@ -371,21 +432,69 @@ class Reconstruction_Plan(Problem):
         positions.
         """
 
-        unsnappable = 0
+        point = self.format_point(point)
+        measurements = self.get_measurements(point, range(self.N),
+                                             weight_matrix)[0]
+        positions = [pair for pair in measurements if pair is not None]
+
+        return np.array(positions), self.N - len(positions)
+
+    def get_measurements(self, point, indices, weight_matrix, links=None):
+        """
+        Generate the pairs of positions of the measurements with the given
+        `indices` from an individual `point` that has its final form provided
+        by `format_point`.
+
+        The weight matrix in `weight_matrix` is reset and updated with the
+        selected positions. The result is a list of selected position pairs in
+        the order of the indices, where unsnappable measurements are `None`,
+        and a numpy array with the packed footprint bitset of each link. The
+        footprints of unsnappable measurements have no bits set.
+
+        If `links` is an `Evaluation_Cache`, then it caches the selected
+        positions and footprint of each link by its generated positions, and
+        links in the cache do not update the weight matrix.
+        """
+
+        weight_matrix.reset()
+
+        measurements = [None for _ in indices]
+        footprints = np.zeros((len(indices), len(self.full_footprint)),
+                              dtype=np.uint8)
+        rows = []
+        new_links = []
+        for i, index in enumerate(indices):
+            sensor_points = self.generate_positions(point, index)
+            if links is not None:
+                key = tuple(itertools.chain(*sensor_points))
+                link = links.get(key)
+                if link is not None:
+                    measurements[i], footprints[i] = link
+                    continue
 
-        # Generate positions, check snappability and create weight matrix
-        positions = []
+                new_links.append((i, key))
 
-        point = self.format_point(point)
-        for i in range(self.N):
-            sensor_points = self.generate_positions(point, i)
-            snapped_points = self.select_positions(sensor_points, weight_matrix)
-            if snapped_points is None:
-                unsnappable += 1
-            else:
-                positions.append(snapped_points)
+            measurements[i] = self.select_positions(sensor_points, weight_matrix)
+            if measurements[i] is not None:
+                rows.append(i)
+
+        matrix = weight_matrix.output()[:len(rows)]
+        footprints[rows] = np.packbits(matrix > 0, axis=1)
+        for i, key in new_links:
+            links.put(key, (measurements[i], np.copy(footprints[i])))
+
+        return measurements, footprints
 
-        return np.array(positions), unsnappable
+    def get_changed_measurements(self, point, parent_point):
+        """
+        Determine the indices of the measurements whose variables differ
+        between an individual `point` and a `parent_point`, which both have
+        their final form provided by `format_point`.
+        """
+
+        variables = np.reshape(point, (-1, self.N))
+        parent_variables = np.reshape(parent_point, (-1, self.N))
+        return np.flatnonzero(np.any(variables != parent_variables, axis=0))
 
     def select_positions(self, sensor_points, weight_matrix):
         """
@@ -401,54 +510,86 @@ class Reconstruction_Plan(Problem):
         snapped_points = weight_matrix.update(*sensor_points)
         return snapped_points
 
-    def evaluate_point(self, point, feasible=None):
-        self.weight_matrix.reset()
-        positions, unsnappable = self.get_positions(point, self.weight_matrix)
-
-        # Set up variables used by the constraint and objective functions.
+    def evaluate_state(self, point, context, feasible=None, parent=None):
+        point = self.format_point(point)
+        if parent is None:
+            indices = range(self.N)
+            measurements = [None] * self.N
+            footprints = np.zeros((self.N, len(self.full_footprint)),
+                                  dtype=np.uint8)
+        else:
+            # Only generate positions and footprints for the measurements that 
+            # the mutation changed.
+            indices = self.get_changed_measurements(point, parent["point"])
+            measurements = list(parent["measurements"])
+            footprints = np.copy(parent["footprints"])
+
+        changes, changed_footprints = \
+            self.get_measurements(point, indices, context["weight_matrix"],
+                                  links=context.get("links"))
+        footprints[indices] = changed_footprints
+        for i, index in enumerate(indices):
+            measurements[index] = changes[i]
+
+        positions = np.array([pair for pair in measurements if pair is not None])
+
+        # Set up variables used by the constraint and objective functions, as 
+        # well as the evaluation of mutations of this individual. The coverage 
+        # is the union of the link footprints, and the number of intersections 
+        # counts the set bits in all footprints.
+        state = {
+            "point": point,
+            "measurements": measurements,
+            "footprints": footprints,
+            "coverage": np.bitwise_or.reduce(footprints, axis=0),  # pylint: disable=no-member
+            "intersections": self._popcount[footprints].sum(),
+            "positions": positions,
+            "unsnappable": self.N - len(positions),
+            "travel_distance": 0.0,
+            "assigned": False
+        }
         if positions.size > 0:
             # Generate distances between all the pairs of sensor positions.
             pair_diffs = positions[:, 0, :] - positions[:, 1, :]
-            self.sensor_distances = np.linalg.norm(pair_diffs, axis=1)
+            state["sensor_distances"] = np.linalg.norm(pair_diffs, axis=1)
         else:
-            self.sensor_distances = np.empty(0)
-
-        self.unsnappable = unsnappable
+            state["sensor_distances"] = np.empty(0)
 
         # Check whether the point is feasible before performing more 
         # calculations that are only used for objective functions.
         if feasible is None:
-            point = self.format_point(point)
-            feasible = self.is_feasible(point)
-
-        if feasible:
-            self.matrix = self.weight_matrix.output()
-
-            # If the sensor distances to waypoint distances ratio is 1, then 
-            # there is no need to calculate the waypoint distance.
-            if self.delta_rate < 1.0:
-                distance = self.assigner.assign(positions)[1]
-                self.travel_distance = float(distance)
-                if self.travel_distance == np.inf:
-                    feasible = False
+            feasible = self.is_feasible(point, state)
+
+        # If the sensor distances to waypoint distances ratio is 1, then there 
+        # is no need to calculate the waypoint distance. The assignment of the 
+        # parent is reused when the positions remain the same.
+        if feasible and self.delta_rate < 1.0:
+            if parent is not None and parent["assigned"] and \
+               np.array_equal(parent["positions"], positions):
+                state["travel_distance"] = parent["travel_distance"]
             else:
-                self.travel_distance = 0.0
+                distance = context["assigner"].assign(positions)[1]
+                state["travel_distance"] = float(distance)
+
+            state["assigned"] = True
+            if state["travel_distance"] == np.inf:
+                feasible = False
 
-        return super(Reconstruction_Plan, self).evaluate_point(point, feasible)
+        return feasible, self.get_objective_values(point, state, feasible), state
 
     def get_objectives(self):
         return [
             # Matrix should have many columns (pixels) that have multiple links 
             # (measurements) intersecting that pixel.
-            lambda x: -np.sum(np.sum(self.matrix > 0, axis=0)),
+            lambda x, state: -state["intersections"],
             # The distances of the links should be minimized, since a longer 
             # link is weaker and thus contributes less clearly to a solution of 
             # the reconstruction.
-            lambda x: self.delta_rate * self.sensor_distances.sum() + \
-                      (1 - self.delta_rate) * self.travel_distance
+            lambda x, state: self.delta_rate * state["sensor_distances"].sum() + \
+                             (1 - self.delta_rate) * state["travel_distance"]
             # Matrix should have values that are similar to each other in the 
             # columns, so that pixels are evenly measured by links
-            #lambda x: np.var(self.matrix, axis=0).mean()
+            #lambda x, state: np.var(state["matrix"], axis=0).mean()
         ]
 
     def get_objective_names(self):
@@ -462,14 +603,14 @@ class Reconstruction_Plan(Problem):
             # This is mostly a baseline to push the evolutionary algorithm in 
             # the right direction, since we also have an objective to make them 
             # intersect more often.
-            lambda x: self.weight_matrix.check(),
+            lambda x, state: np.array_equal(state["coverage"], self.full_footprint),
             # Variables should not be in such a way that a pair of positions do 
             # not intersect with the network. At least it should not happen too 
             # often, otherwise the mission is useless. It can be useful to 
             # allow a number of them, since then we can have missions that 
             # solve the problem with fewer measurements than the fixed 
             # parameter.
-            lambda x: self.unsnappable < self.unsnappable_max
+            lambda x, state: state["unsnappable"] < self.unsnappable_max
         ])
         return constraints
 
@@ -534,6 +675,14 @@ class Reconstruction_Plan_Discrete(Reconstruction_Plan):
                                                            import_manager)
         self._use_mutation_operator = self.settings.get("mutation_operator")
 
+    def create_context(self):
+        # The links are between grid positions, so there are a limited number 
+        # of them. Cache the footprints of recently used links so that they are 
+        # usually only calculated once in each context.
+        context = super(Reconstruction_Plan_Discrete, self).create_context()
+        context["links"] = Evaluation_Cache(self.settings.get("link_cache_size"))
+        return context
+
     def get_domain(self):
         num_variables = self.N*4
         # Variables:
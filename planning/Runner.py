@@ -8,6 +8,7 @@ import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle
 
 # Package imports
+from Island_Model import Island_Model
 from Problem import Reconstruction_Plan_Continuous, Reconstruction_Plan_Discrete
 from ..core.Threadable import Threadable
 
@@ -49,7 +50,14 @@ class Planning_Runner(Threadable):
         algo_class = self._import_manager.load_class(algo, module="Algorithm",
                                                      relative_module="planning")
 
-        self.algorithm = algo_class(self.problem, self.arguments)
+        islands = self.settings.get("islands")
+        if islands == 1:
+            self.algorithm = algo_class(self.problem, self.arguments)
+        else:
+            self.algorithm = Island_Model(self.problem, self.arguments,
+                                          algo_class,
+                                          islands=islands if islands > 0 else None)
+
         self.algorithm.set_iteration_callback(self._handle_algorithm_data)
 
         # Whether the algorithm is done running.
@@ -78,7 +86,11 @@ class Planning_Runner(Threadable):
         self.P = np.copy(P)
         self.Objectives = np.copy(Objectives)
         self.Feasible = np.copy(Feasible)
-        self.R = self.algorithm.sort_nondominated(self.Objectives)
+        if self.algorithm.archive is not None:
+            # The archive of the algorithm already keeps track of the front.
+            self.R = self.algorithm.archive.get_layers()
+        else:
+            self.R = self.algorithm.sort_nondominated(self.Objectives)
 
     def _handle_algorithm_data(self, algorithm, data):
         # Pass through to the actual algorithm iteration callback, and track 
@@ -325,12 +337,14 @@ class Planning_Runner(Threadable):
         names = self.problem.get_objective_names()
         axes.set_xlabel("Objective 1 ({})".format(names[0]))
         axes.set_ylabel("Objective 2 ({})".format(names[1]))
-        for Rk in self.R:
-            # Plot the front line of objective values for feasible individuals.
-            # Enable the picker events for uses in the control panel.
+        for k, Rk in enumerate(self.R):
+            # Plot the front line of objective values for feasible individuals 
+            # and only the markers of the dominated individuals. Enable the 
+            # picker events for uses in the control panel.
             o1 = [self.Objectives[i][0] for i in Rk if self.Feasible[i]]
             o2 = [self.Objectives[i][1] for i in Rk if self.Feasible[i]]
-            axes.plot(o1, o2, marker='o', picker=5)
+            axes.plot(o1, o2, marker='o', linestyle='-' if k == 0 else 'none',
+                      picker=5)
 
     def get_assignment(self, i, export=True):
         """
@@ -0,0 +1,153 @@
+# Core imports
+import thread
+import threading
+
+# Package imports
+from ..core.Threadable import Threadable
+from ..zigbee.Clock import Clock
+from ..zigbee.Packet_Capture import Packet_Capture
+from Buffer import Buffer
+
+class Capture_Replay(Threadable):
+    """
+    Replay of a packet capture of the ground station RF sensor into a buffer.
+
+    The replay acts as a source of packets in place of an RF sensor, so that
+    stream buffers can register it like one. The packets are put into the
+    buffer with the same relative timing as when they were received, sped up
+    by a speed factor, or as fast as possible.
+    """
+
+    def __init__(self, arguments, thread_manager, clock=None):
+        """
+        Initialize the capture replay.
+
+        The `clock` is used for pacing the replay. If it is not given, then
+        the system clock is used.
+        """
+
+        super(Capture_Replay, self).__init__("capture_replay", thread_manager)
+
+        self._settings = arguments.get_settings("reconstruction_stream")
+        self._capture = Packet_Capture(self._settings.get("stream_replay_file"))
+        self._speed = self._settings.get("stream_replay_speed")
+
+        base_settings = arguments.get_settings("zigbee_base")
+        self._number_of_sensors = base_settings.get("number_of_sensors")
+
+        self._clock = Clock() if clock is None else clock
+
+        self._buffer = None
+        self._count = 0
+        self._activated = False
+        self._stopped = threading.Event()
+
+    @property
+    def number_of_sensors(self):
+        """
+        Get the number of sensors in the network.
+        """
+
+        return self._number_of_sensors
+
+    @property
+    def buffer(self):
+        """
+        Get the buffer that the packets are replayed into.
+        """
+
+        return self._buffer
+
+    @buffer.setter
+    def buffer(self, buffer):
+        """
+        Set the buffer that the packets are replayed into.
+
+        The `buffer` argument must be a `Buffer` object.
+        """
+
+        if not isinstance(buffer, Buffer):
+            raise ValueError("The `buffer` argument must be a `Buffer` object")
+
+        self._buffer = buffer
+
+    @property
+    def count(self):
+        """
+        Get the number of packets that have been replayed into the buffer.
+        """
+
+        return self._count
+
+    def activate(self):
+        """
+        Activate the replay to start putting packets into the buffer in its
+        own thread.
+        """
+
+        super(Capture_Replay, self).activate()
+
+        if not self._activated:
+            self._activated = True
+            self._stopped.clear()
+            thread.start_new_thread(self._loop, ())
+
+    def deactivate(self):
+        """
+        Deactivate the replay to stop putting packets into the buffer.
+        """
+
+        super(Capture_Replay, self).deactivate()
+
+        self._activated = False
+        self._stopped.set()
+
+    def run(self):
+        """
+        Replay all files of the packet capture into the buffer, from the
+        oldest to the current file.
+
+        Only RSSI ground station packets are put into the buffer. Returns the
+        number of packets that have been replayed, or stops early when the
+        replay is deactivated.
+        """
+
+        if self._buffer is None:
+            raise ValueError("A buffer must be set before replaying the capture")
+
+        start_time = self._clock.time()
+        first_timestamp = None
+
+        for filename in self._capture.get_filenames():
+            for timestamp, packet in self._capture.read(filename):
+                if packet.get("specification") != "rssi_ground_station":
+                    continue
+
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+
+                if self._speed > 0.0:
+                    # Wait until the packet is due relative to the start of
+                    # the replay, which may be cut short by deactivation.
+                    due_time = start_time + (timestamp - first_timestamp) / self._speed
+                    delay = due_time - self._clock.time()
+                    if delay > 0.0 and self._stopped.wait(delay):
+                        return self._count
+
+                if self._stopped.is_set():
+                    return self._count
+
+                self._buffer.put(packet)
+                self._count += 1
+
+        return self._count
+
+    def _loop(self):
+        """
+        Execute the replay in its own thread.
+        """
+
+        try:
+            self.run()
+        except:
+            super(Capture_Replay, self).interrupt()
@@ -0,0 +1,298 @@
+# Library imports
+import numpy as np
+from matplotlib import image
+
+# Package imports
+from ..core.Import_Manager import Import_Manager
+from ..settings import Arguments
+
+class RSSI_Synthesizer(object):
+    """
+    Synthesizer for physics-based signal strength measurements between sensors
+    around a network.
+
+    The synthesized RSSI of a link follows the log-distance path loss model
+    with log-normal shadowing. Additionally, the signal is attenuated by the
+    objects in the network. The attenuation of each pixel on a grid covering
+    the network is weighted using the signal disruption model that is also
+    used for the weight matrix of the reconstruction, which makes the
+    attenuation of a link a line integral over the grid. The computations are
+    done for many links at once.
+    """
+
+    def __init__(self, arguments, origin, size):
+        """
+        Initialize the RSSI synthesizer.
+
+        The `arguments` is an `Arguments` object. The `origin` is a tuple of two
+        coordinates in `(x, y)` form of the bottom left point of the network.
+        `size` is a tuple of the same form, containing the width and height of
+        the network.
+
+        If an attenuation image is given in the settings, then it is loaded
+        into the attenuation grid. Otherwise, the network is empty.
+        """
+
+        if isinstance(arguments, Arguments):
+            self._settings = arguments.get_settings("rssi_synthesizer")
+            reconstruction_settings = arguments.get_settings("reconstruction")
+        else:
+            raise TypeError("'arguments' must be an instance of Arguments")
+
+        self._reference_rssi = self._settings.get("reference_rssi")
+        self._path_loss_exponent = self._settings.get("path_loss_exponent")
+        self._shadowing = self._settings.get("shadowing")
+        self._object_attenuation = self._settings.get("object_attenuation")
+        self._minimum_rssi = self._settings.get("minimum_rssi")
+        self._batch_size = self._settings.get("batch_size")
+        self._random_state = np.random.RandomState(self._settings.get("random_seed"))
+
+        # Create the signal disruption model object.
+        import_manager = Import_Manager()
+        model_class = reconstruction_settings.get("model_class")
+        model_type = import_manager.load_class(model_class,
+                                               relative_module="reconstruction")
+        self._model = model_type(arguments)
+
+        self._origin = origin
+        self._width, self._height = size
+
+        # Create a grid for the space covered by the network in the same way
+        # as the weight matrix, using the center of each pixel.
+        offset_x, offset_y = self._origin
+        x = np.linspace(offset_x + 0.5, offset_x + self._width - 0.5, self._width)
+        y = np.linspace(offset_y + 0.5, offset_y + self._height - 0.5, self._height)
+        self._grid_x, self._grid_y = np.meshgrid(x, y)
+
+        self._attenuation = np.zeros((self._height, self._width))
+
+        attenuation_image = self._settings.get("attenuation_image")
+        if attenuation_image is not None:
+            self.load_image(attenuation_image)
+
+    @property
+    def attenuation(self):
+        """
+        Get the attenuation grid in dB per pixel.
+
+        The grid is a NumPy array with a row for each pixel in the height of
+        the network, starting at the origin, and a column for each pixel in
+        the width of the network.
+        """
+
+        return self._attenuation
+
+    @attenuation.setter
+    def attenuation(self, attenuation):
+        """
+        Set the attenuation grid in dB per pixel.
+
+        The `attenuation` must be a NumPy array with the same shape as the grid.
+        """
+
+        attenuation = np.asarray(attenuation, dtype=np.float)
+        if attenuation.shape != self._attenuation.shape:
+            raise ValueError("The attenuation grid must have shape {}, not {}".format(self._attenuation.shape, attenuation.shape))
+
+        self._attenuation = attenuation
+
+    def load_image(self, filename):
+        """
+        Load the attenuation grid from an image file with the name `filename`.
+
+        The image must have one pixel for each pixel of the network. Brighter
+        pixels attenuate the signal more, where white pixels have the object
+        attenuation from the settings. The top row of the image is the row of
+        the network that is furthest away from the origin.
+        """
+
+        data = image.imread(filename)
+        if data.ndim == 3:
+            # Use the mean of the color channels, excluding any alpha channel,
+            # as the intensity.
+            data = np.mean(data[:, :, :3], axis=2)
+
+        if data.dtype == np.uint8:
+            data = data / 255.0
+
+        self.attenuation = np.flipud(data) * self._object_attenuation
+
+    def load_objects(self, objects, geometry):
+        """
+        Add the simulated `objects` of an `Environment_Simulator` to the
+        attenuation grid.
+
+        The `geometry` is the `Geometry` object of the environment, which
+        converts the locations of the objects to the coordinates of the
+        network. Each pixel whose center lies inside an object has the object
+        attenuation from the settings. Spherical objects cover a circle around
+        their center, while the other objects cover the projections of their
+        faces onto the network.
+        """
+
+        inside = np.zeros(self._attenuation.shape, dtype=np.bool)
+        for obj in objects:
+            if isinstance(obj, dict):
+                center = geometry.get_coordinates(obj['center'])
+                distances = (self._grid_x - center[0]) ** 2 + (self._grid_y - center[1]) ** 2
+                inside |= distances <= obj['radius'] ** 2
+            elif isinstance(obj, list):
+                for face in obj:
+                    inside |= self._get_polygon_mask(face, geometry)
+            else:
+                inside |= self._get_polygon_mask(obj, geometry)
+
+        self._attenuation = np.where(inside, self._object_attenuation,
+                                     self._attenuation)
+
+    def _get_polygon_mask(self, points, geometry):
+        """
+        Determine which pixels of the grid have their center inside the
+        polygon with the given location `points`.
+
+        This uses the even-odd rule by casting rays from the pixel centers for
+        each edge of the polygon at once. Edges that are parallel to the rays
+        never cross them.
+        """
+
+        coordinates = [geometry.get_coordinates(point)[:2] for point in points]
+        inside = np.zeros(self._attenuation.shape, dtype=np.bool)
+        for i, start in enumerate(coordinates):
+            end = coordinates[i - 1]
+            if start[1] == end[1]:
+                continue
+
+            crosses = (start[1] > self._grid_y) != (end[1] > self._grid_y)
+            slope = float(end[0] - start[0]) / (end[1] - start[1])
+            intersection = start[0] + slope * (self._grid_y - start[1])
+            inside ^= crosses & (self._grid_x < intersection)
+
+        return inside
+
+    def get_path_loss(self, sources, destinations):
+        """
+        Calculate the RSSI without shadowing for links between the `sources`
+        and the `destinations`, both given as sequences of coordinate tuples
+        of equal length.
+
+        The RSSI values are returned as a NumPy array of floats. Links that are
+        shorter than the reference distance of one unit are treated as having
+        the reference distance.
+        """
+
+        sources = np.asarray(sources, dtype=np.float).reshape(-1, 2)
+        destinations = np.asarray(destinations, dtype=np.float).reshape(-1, 2)
+        if sources.shape != destinations.shape:
+            raise ValueError("The number of sources and destinations must be equal")
+
+        grid_x = self._grid_x.ravel()
+        grid_y = self._grid_y.ravel()
+        attenuation = self._attenuation.ravel()
+
+        rssi = np.empty(len(sources))
+        for start in range(0, len(sources), self._batch_size):
+            batch = slice(start, start + self._batch_size)
+            source = sources[batch]
+            destination = destinations[batch]
+
+            length = np.sqrt(np.sum((destination - source) ** 2, axis=1))
+            length[length < 1.0] = 1.0
+
+            # Calculate the distance from each sensor to each center of
+            # a pixel on the grid, with a row for each link in the batch.
+            source_distances = np.sqrt((grid_x - source[:, 0:1]) ** 2 +
+                                       (grid_y - source[:, 1:2]) ** 2)
+            destination_distances = np.sqrt((grid_x - destination[:, 0:1]) ** 2 +
+                                            (grid_y - destination[:, 1:2]) ** 2)
+
+            weights = self._model.assign(length[:, np.newaxis],
+                                         source_distances,
+                                         destination_distances)
+
+            rssi[batch] = (self._reference_rssi -
+                           10 * self._path_loss_exponent * np.log10(length) -
+                           np.dot(weights, attenuation))
+
+        return rssi
+
+    def synthesize(self, sources, destinations):
+        """
+        Synthesize RSSI measurements for links between the `sources` and the
+        `destinations`, both given as sequences of coordinate tuples of equal
+        length.
+
+        The RSSI values are returned as a NumPy array of integers in dBm. They
+        include the shadowing and are limited to the range of the receiver
+        sensitivity from the settings up to zero.
+        """
+
+        rssi = self.get_path_loss(sources, destinations)
+        if self._shadowing > 0.0:
+            rssi += self._random_state.normal(0.0, self._shadowing, len(rssi))
+
+        return np.clip(np.round(rssi), self._minimum_rssi, 0).astype(np.int)
+
+    def get_boundary_links(self, positions):
+        """
+        Create links between sensor positions on the boundary of the network.
+
+        There are `positions` sensor positions evenly spread along each side of
+        the network. Links are created in both directions between all pairs of
+        positions that are not on the same side. The sources and destinations
+        of the links are returned as NumPy arrays with a row of coordinates
+        for each link.
+        """
+
+        offset_x, offset_y = self._origin
+        steps = (np.arange(positions) + 0.5) / positions
+        xs = offset_x + steps * self._width
+        ys = offset_y + steps * self._height
+
+        sides = [
+            [(x, offset_y) for x in xs],
+            [(offset_x + self._width, y) for y in ys],
+            [(x, offset_y + self._height) for x in xs],
+            [(offset_x, y) for y in ys]
+        ]
+
+        sources = []
+        destinations = []
+        for i, side in enumerate(sides):
+            for j, other_side in enumerate(sides):
+                if i == j:
+                    continue
+
+                for source in side:
+                    for destination in other_side:
+                        sources.append(source)
+                        destinations.append(destination)
+
+        return np.array(sources), np.array(destinations)
+
+    def create_dump(self, sources, destinations, number_of_sensors=2):
+        """
+        Create a dump of synthesized measurements for links between the
+        `sources` and the `destinations`.
+
+        The dump is a dictionary with the structure of the JSON files that
+        the `Dump_Buffer` reads, for a network with the given number of
+        vehicle sensors.
+        """
+
+        rssi = self.synthesize(sources, destinations)
+
+        packets = []
+        for i, (source, destination) in enumerate(zip(sources, destinations)):
+            packets.append([
+                i % number_of_sensors + 1,
+                float(source[0]), float(source[1]), True,
+                float(destination[0]), float(destination[1]), True,
+                int(rssi[i])
+            ])
+
+        return {
+            "number_of_sensors": number_of_sensors,
+            "origin": list(self._origin),
+            "size": [self._width, self._height],
+            "packets": packets
+        }
@@ -0,0 +1,29 @@
+import sys
+import time
+from __init__ import __package__
+from core.Thread_Manager import Thread_Manager
+from reconstruction.Capture_Replay import Capture_Replay
+from reconstruction.Stream_Buffer import Stream_Buffer
+from settings import Arguments
+
+def main(argv):
+    thread_manager = Thread_Manager()
+
+    arguments = Arguments("settings.json", argv)
+
+    buffer = Stream_Buffer(arguments.get_settings("reconstruction_stream"))
+    replay = Capture_Replay(arguments, thread_manager)
+
+    arguments.check_help()
+
+    buffer.register_rf_sensor(replay)
+
+    start_time = time.time()
+    count = replay.run()
+    duration = time.time() - start_time
+
+    rate = count / duration if duration > 0.0 else float("inf")
+    print("Replayed {} packets in {:.2f} seconds ({:.1f} packets per second).".format(count, duration, rate))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
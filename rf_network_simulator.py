@@ -0,0 +1,20 @@
+import json
+import sys
+from __init__ import __package__
+from core.Thread_Manager import Thread_Manager
+from settings import Arguments
+from zigbee.RF_Network_Simulator import RF_Network_Simulator
+
+def main(argv):
+    thread_manager = Thread_Manager()
+
+    arguments = Arguments("settings.json", argv)
+    network_simulator = RF_Network_Simulator(arguments, thread_manager)
+
+    arguments.check_help()
+
+    report = network_simulator.run()
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,35 @@
+import json
+import sys
+from __init__ import __package__
+from reconstruction.RSSI_Synthesizer import RSSI_Synthesizer
+from settings import Arguments
+
+def main(argv):
+    arguments = Arguments("settings.json", argv)
+
+    settings = arguments.get_settings("rssi_synthesizer")
+    stream_settings = arguments.get_settings("reconstruction_stream")
+    origin = stream_settings.get("stream_network_origin")
+    size = stream_settings.get("stream_network_size")
+
+    synthesizer = RSSI_Synthesizer(arguments, origin, size)
+
+    arguments.check_help()
+
+    sources, destinations = synthesizer.get_boundary_links(settings.get("synthetic_positions"))
+
+    # Write the dump of the network with its attenuation, followed by the 
+    # calibration dump of the empty network.
+    dump = synthesizer.create_dump(sources, destinations)
+    with open(settings.get("synthetic_dump_file"), "w") as dump_file:
+        json.dump(dump, dump_file)
+
+    synthesizer.attenuation[:] = 0.0
+    calibration = synthesizer.create_dump(sources, destinations)
+    with open(settings.get("synthetic_calibration_file"), "w") as calibration_file:
+        json.dump(calibration, calibration_file)
+
+    print("Synthesized {} measurements.".format(len(sources)))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,268 @@
+import errno
+import fcntl
+import os
+import select
+import thread
+import threading
+import time
+from mock import patch, MagicMock
+from ..core.Reactor import Reactor
+from ..core.Thread_Manager import Thread_Manager
+from core_thread_manager import ThreadableTestCase
+
+class TestCoreReactor(ThreadableTestCase):
+    def setUp(self):
+        super(TestCoreReactor, self).setUp()
+
+        self.thread_manager = Thread_Manager()
+        self.reactor = Reactor(self.thread_manager)
+
+        # Create a pipe that acts as a file-like object with data to read.
+        self.read_descriptor, self.write_descriptor = os.pipe()
+        self.fileobj = os.fdopen(self.read_descriptor, "r")
+
+    def tearDown(self):
+        super(TestCoreReactor, self).tearDown()
+
+        self.fileobj.close()
+        os.close(self.write_descriptor)
+        self.reactor._close_wakeup()
+
+    def test_initialization(self):
+        self.assertEqual(self.reactor.thread_name, "reactor")
+        self.assertFalse(self.reactor._activated)
+        self.assertTrue(self.reactor._stopped.is_set())
+        self.assertEqual(self.reactor._readers, {})
+        self.assertEqual(self.reactor._timers, [])
+
+        # The wake up pipe must not block.
+        for descriptor in (self.reactor._wakeup_read, self.reactor._wakeup_write):
+            flags = fcntl.fcntl(descriptor, fcntl.F_GETFL)
+            self.assertTrue(flags & os.O_NONBLOCK)
+
+    @patch.object(thread, "start_new_thread")
+    def test_activate(self, start_new_thread_mock):
+        self.reactor.activate()
+
+        self.assertTrue(self.reactor._activated)
+        self.assertEqual(self.thread_manager._threads, {
+            "reactor": self.reactor
+        })
+        start_new_thread_mock.assert_called_once_with(self.reactor._loop, ())
+
+        # Activating the reactor again does not start another loop.
+        self.reactor.activate()
+        start_new_thread_mock.assert_called_once_with(self.reactor._loop, ())
+
+        # After deactivation, a new loop only starts once the loop of the 
+        # earlier activation has exited.
+        self.reactor.deactivate()
+        start_new_thread_mock.reset_mock()
+
+        stopped = []
+        def stop():
+            stopped.append(True)
+            self.reactor._stopped.set()
+
+        timer = threading.Timer(0.05, stop)
+        timer.start()
+        self.reactor.activate()
+
+        self.assertEqual(stopped, [True])
+        start_new_thread_mock.assert_called_once_with(self.reactor._loop, ())
+
+        timer.join()
+        self.reactor.deactivate()
+
+    @patch.object(thread, "start_new_thread")
+    def test_deactivate(self, start_new_thread_mock):
+        self.reactor.activate()
+
+        with patch.object(Reactor, "wake") as wake_mock:
+            self.reactor.deactivate()
+
+            self.assertFalse(self.reactor._activated)
+            self.assertEqual(self.thread_manager._threads, {})
+            wake_mock.assert_called_once_with()
+
+    def test_deactivate_loop(self):
+        # The loop exits after deactivation and closes the wake up pipe, which 
+        # is opened again when the reactor is activated again.
+        for _ in range(2):
+            self.reactor.activate()
+            self.assertIsNotNone(self.reactor._wakeup_read)
+            self.reactor.deactivate()
+
+            self.reactor._stopped.wait(1.0)
+            self.assertTrue(self.reactor._stopped.is_set())
+            self.assertIsNone(self.reactor._wakeup_read)
+            self.assertIsNone(self.reactor._wakeup_write)
+
+    def test_register(self):
+        # The read handler must be callable.
+        with self.assertRaises(TypeError):
+            self.reactor.register(self.fileobj, None)
+
+        callback = MagicMock()
+        with patch.object(Reactor, "wake") as wake_mock:
+            self.reactor.register(self.fileobj, callback)
+
+            self.assertEqual(self.reactor._readers, {
+                self.read_descriptor: (self.fileobj, callback)
+            })
+            wake_mock.assert_called_once_with()
+
+    def test_unregister(self):
+        self.reactor.register(self.fileobj, MagicMock())
+
+        with patch.object(Reactor, "wake") as wake_mock:
+            # Unknown objects are ignored.
+            self.reactor.unregister(MagicMock())
+            self.assertIn(self.read_descriptor, self.reactor._readers)
+
+            self.reactor.unregister(self.fileobj)
+            self.assertEqual(self.reactor._readers, {})
+            self.assertEqual(wake_mock.call_count, 2)
+
+    def test_schedule(self):
+        # The timer callback must be callable.
+        with self.assertRaises(TypeError):
+            self.reactor.schedule(1.0, None)
+
+        callback = MagicMock()
+        with patch.object(time, "time", return_value=10.0):
+            with patch.object(Reactor, "wake") as wake_mock:
+                first_timer = self.reactor.schedule(2.0, callback)
+                second_timer = self.reactor.schedule(1.0, callback)
+
+                self.assertEqual(first_timer[0], 12.0)
+                self.assertEqual(first_timer[2], callback)
+                self.assertEqual(second_timer[0], 11.0)
+                self.assertEqual(wake_mock.call_count, 2)
+
+        # The timer that expires first is at the front of the queue.
+        self.assertEqual(self.reactor._timers[0], second_timer)
+
+    def test_cancel(self):
+        callback = MagicMock()
+        timer = self.reactor.schedule(0.0, callback)
+        self.reactor.cancel(timer)
+
+        self.reactor._run_timers()
+        callback.assert_not_called()
+        self.assertEqual(self.reactor._timers, [])
+
+    def test_wake(self):
+        self.reactor.wake()
+        self.assertEqual(os.read(self.reactor._wakeup_read, 4096), "\0")
+
+        # A full pipe is ignored, but other errors are passed through.
+        with patch.object(os, "write", side_effect=OSError(errno.EAGAIN, "")):
+            self.reactor.wake()
+
+        with patch.object(os, "write", side_effect=OSError(errno.EBADF, "")):
+            with self.assertRaises(OSError):
+                self.reactor.wake()
+
+        # Waking up the reactor after the pipe is closed does nothing.
+        self.reactor._close_wakeup()
+        with patch.object(os, "write") as write_mock:
+            self.reactor.wake()
+            write_mock.assert_not_called()
+
+    def test_run_once(self):
+        read_callback = MagicMock()
+        timer_callback = MagicMock()
+
+        self.reactor.register(self.fileobj, read_callback)
+        cancelled_timer = self.reactor.schedule(0.0, timer_callback)
+        self.reactor.cancel(cancelled_timer)
+        self.reactor.schedule(60.0, timer_callback)
+
+        # The wake up signals are drained, while the read handler is not
+        # called when there is no data and the timer has not expired.
+        self.reactor.run_once(timeout=0.0)
+        read_callback.assert_not_called()
+        timer_callback.assert_not_called()
+        self.assertEqual(len(self.reactor._timers), 1)
+        with self.assertRaises(OSError):
+            os.read(self.reactor._wakeup_read, 4096)
+
+        # The read handler is called when there is data.
+        os.write(self.write_descriptor, "data")
+        self.reactor.run_once(timeout=0.0)
+        read_callback.assert_called_once_with()
+
+        # The loop waits at most until the first timer expires.
+        with patch.object(select, "select", return_value=([], [], [])) as select_mock:
+            self.reactor.run_once()
+
+            timeout = select_mock.call_args[0][3]
+            self.assertGreater(timeout, 0.0)
+            self.assertLessEqual(timeout, 60.0)
+
+            self.reactor.run_once(timeout=1.0)
+            self.assertEqual(select_mock.call_args[0][3], 1.0)
+
+        # Expired timers are called.
+        self.reactor._timers[0][0] = 0.0
+        self.reactor.run_once()
+        timer_callback.assert_called_once_with()
+
+        # Interrupted system calls are ignored, while other errors are passed
+        # through.
+        error = select.error(errno.EINTR, "Interrupted system call")
+        with patch.object(select, "select", side_effect=error):
+            self.reactor.run_once(timeout=0.0)
+
+        error = select.error(errno.EBADF, "Bad file descriptor")
+        with patch.object(select, "select", side_effect=error):
+            with self.assertRaises(select.error):
+                self.reactor.run_once(timeout=0.0)
+
+    def test_drain(self):
+        self.reactor.wake()
+        self.reactor.wake()
+        self.reactor._drain()
+
+        with self.assertRaises(OSError):
+            os.read(self.reactor._wakeup_read, 4096)
+
+        # Errors other than an empty pipe are passed through.
+        with patch.object(os, "read", side_effect=OSError(errno.EBADF, "")):
+            with self.assertRaises(OSError):
+                self.reactor._drain()
+
+    def test_run_timers(self):
+        first_callback = MagicMock()
+        second_callback = MagicMock()
+
+        self.reactor.schedule(0.0, first_callback)
+        self.reactor.schedule(60.0, second_callback)
+        self.reactor._run_timers()
+
+        first_callback.assert_called_once_with()
+        second_callback.assert_not_called()
+        self.assertEqual(len(self.reactor._timers), 1)
+
+    def test_loop(self):
+        self.reactor._activated = True
+
+        def run_once():
+            self.reactor._activated = False
+
+        self.reactor._stopped.clear()
+        with patch.object(Reactor, "run_once", side_effect=run_once) as run_once_mock:
+            self.reactor._loop()
+            run_once_mock.assert_called_once_with()
+
+        # The loop closes the wake up pipe and signals that it has exited.
+        self.assertIsNone(self.reactor._wakeup_read)
+        self.assertTrue(self.reactor._stopped.is_set())
+
+        # Exceptions in the loop interrupt the main thread.
+        self.reactor._activated = True
+        with patch.object(Reactor, "run_once", side_effect=RuntimeError):
+            with patch.object(Thread_Manager, "interrupt") as interrupt_mock:
+                self.reactor._loop()
+                interrupt_mock.assert_called_once_with("reactor")
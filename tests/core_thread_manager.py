@@ -3,6 +3,7 @@ import thread
 import threading
 import unittest
 from mock import patch, call, MagicMock
+from ..core.Reactor import Reactor
 from ..core.Threadable import Threadable
 from ..core.Thread_Manager import Thread_Manager
 
@@ -77,6 +78,13 @@ class TestCoreThreadManager(ThreadableTestCase):
     def test_initialization(self):
         # Initially the thread storage must be empty.
         self.assertEqual(self.thread_manager._threads, {})
+        self.assertIsNone(self.thread_manager._reactor)
+
+    def test_reactor(self):
+        # The reactor is created once when it is first requested.
+        reactor = self.thread_manager.reactor
+        self.assertIsInstance(reactor, Reactor)
+        self.assertEqual(self.thread_manager.reactor, reactor)
 
     def test_register(self):
         # The thread storage must contain a registered thread.
@@ -1,6 +1,8 @@
 from dronekit import LocationLocal
 from mock import patch
+from ..environment.Environment_Simulator import Environment_Simulator
 from ..geometry.Geometry_Spherical import Geometry_Spherical
+from ..reconstruction.RSSI_Synthesizer import RSSI_Synthesizer
 from environment import EnvironmentTestCase
 
 class TestEnvironmentSimulator(EnvironmentTestCase):
@@ -10,7 +12,7 @@ class TestEnvironmentSimulator(EnvironmentTestCase):
             "--vehicle-class", "Mock_Vehicle",
             "--translation", "1", "2", "3",
             "--scenefile", "tests/vrml/castle.wrl",
-            "--location-check"
+            "--location-check", "--rssi-synthesis"
         ], distance_sensors=[0, 90], use_infrared_sensor=False)
 
         super(TestEnvironmentSimulator, self).setUp()
@@ -23,6 +25,21 @@ class TestEnvironmentSimulator(EnvironmentTestCase):
         actual, expected = self.environment.geometry.equalize(home, translation)
         self.assertEqual(actual, expected)
 
+        # The objects must be loaded into the RSSI synthesizer of the 
+        # simulated RF sensor.
+        with patch.object(RSSI_Synthesizer, "load_objects") as load_objects_mock:
+            environment = Environment_Simulator(self.environment.vehicle,
+                                                self.environment.geometry,
+                                                self.arguments,
+                                                self.environment.import_manager,
+                                                self.environment.thread_manager,
+                                                self.environment.usb_manager)
+
+            synthesizer = environment.get_rf_sensor().synthesizer
+            self.assertIsInstance(synthesizer, RSSI_Synthesizer)
+            load_objects_mock.assert_called_once_with(environment.objects,
+                                                      environment.geometry)
+
     def test_get_objects(self):
         self.assertNotEqual(self.environment.get_objects(), [])
 
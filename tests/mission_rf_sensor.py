@@ -186,6 +186,7 @@ class TestMissionRFSensor(EnvironmentTestCase):
         self.assertEqual(args[0].get_all(), {
             "specification": "waypoint_ack",
             "next_index": 0,
+            "window": 0,
             "sensor_id": self.rf_sensor.id
         })
         self.assertEqual(kwargs, {"to": 0})
@@ -224,6 +225,7 @@ class TestMissionRFSensor(EnvironmentTestCase):
         self.assertEqual(args[0].get_all(), {
             "specification": "waypoint_ack",
             "next_index": 1,
+            "window": 0,
             "sensor_id": self.rf_sensor.id
         })
         self.assertEqual(kwargs, {"to": 0})
@@ -260,6 +262,7 @@ class TestMissionRFSensor(EnvironmentTestCase):
         self.assertEqual(args[0].get_all(), {
             "specification": "waypoint_ack",
             "next_index": 1,
+            "window": 0,
             "sensor_id": self.rf_sensor.id
         })
         self.assertEqual(kwargs, {"to": 0})
@@ -291,6 +294,27 @@ class TestMissionRFSensor(EnvironmentTestCase):
             }
         })
 
+    def test_add_waypoint_range(self):
+        with patch('sys.stdout'):
+            self.mission.setup()
+
+        # A waypoint with a "wait_count" after another waypoint is expanded 
+        # into a range of evenly spaced waypoints starting after the previous 
+        # waypoint, each with their own wait waypoint index.
+        self._send_waypoint_add(0, 1.0, 0.0, wait_id=2, wait_waypoint=0)
+        self._send_waypoint_add(1, 4.0, 0.0, wait_id=2, wait_count=3,
+                                wait_waypoint=1)
+
+        self.assertEqual(self.mission.next_index, 2)
+        self.assertEqual(self.mission._point, LocationLocal(4.0, 0.0, 0.0))
+        self.assertEqual(self.vehicle._waypoints, [
+            (1, 0), None, (2, 0), None, (3, 0), None, (4, 0), None
+        ])
+        self.assertEqual([
+            self.mission._wait_waypoints[index]["other_waypoint"]
+            for index in sorted(self.mission._wait_waypoints)
+        ], [0, 1, 2, 3])
+
     def test_add_waypoint_wrong_index(self):
         with patch('sys.stdout'):
             self.mission.setup()
@@ -304,6 +328,7 @@ class TestMissionRFSensor(EnvironmentTestCase):
         self.assertEqual(args[0].get_all(), {
             "specification": "waypoint_ack",
             "next_index": 0,
+            "window": 0,
             "sensor_id": self.rf_sensor.id
         })
         self.assertEqual(kwargs, {"to": 0})
@@ -311,6 +336,40 @@ class TestMissionRFSensor(EnvironmentTestCase):
         self.assertEqual(self.mission.next_index, 0)
         self.assertEqual(self.vehicle._waypoints, [])
 
+    def test_add_waypoint_out_of_order(self):
+        with patch('sys.stdout'):
+            self.mission.setup()
+
+        # Waypoints within the window are held back until the waypoints 
+        # before them are received, which the acknowledgement indicates.
+        self._send_waypoint_add(2, 3.0, 0.0)
+        self._send_waypoint_add(1, 2.0, 0.0)
+
+        args = self.enqueue_mock.call_args[0]
+        self.assertEqual(args[0].get_all(), {
+            "specification": "waypoint_ack",
+            "next_index": 0,
+            "window": (1 << 0) | (1 << 1),
+            "sensor_id": self.rf_sensor.id
+        })
+        self.assertEqual(self.mission.next_index, 0)
+        self.assertEqual(self.vehicle._waypoints, [])
+
+        self._send_waypoint_add(0, 1.0, 0.0)
+
+        args = self.enqueue_mock.call_args[0]
+        self.assertEqual(args[0].get("next_index"), 3)
+        self.assertEqual(args[0].get("window"), 0)
+        self.assertEqual(self.mission.next_index, 3)
+        self.assertEqual(self.vehicle._waypoints, [
+            (1, 0), None, (2, 0), None, (3, 0), None
+        ])
+
+        # Duplicate waypoints are not added again.
+        self._send_waypoint_add(1, 2.0, 0.0)
+        self.assertEqual(self.mission.next_index, 3)
+        self.assertEqual(len(self.vehicle._waypoints), 6)
+
     def test_complete_waypoints(self):
         with patch('sys.stdout'):
             self.mission.setup()
@@ -337,6 +396,7 @@ class TestMissionRFSensor(EnvironmentTestCase):
         self.assertEqual(args[0].get_all(), {
             "specification": "waypoint_ack",
             "next_index": 5,
+            "window": 0,
             "sensor_id": self.rf_sensor.id
         })
         self.assertEqual(kwargs, {"to": 0})
@@ -0,0 +1,692 @@
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+import numpy as np
+from mock import patch, MagicMock
+from ..bench.Method_Coverage import covers
+from ..planning.Algorithm import Algorithm, NSGA, SMS_EMOA
+from ..planning.Checkpoint import Checkpoint
+from ..planning.Evaluator import Evaluator, Pool_Evaluator
+from ..planning.Hypervolume import Hypervolume
+from ..planning.Pareto_Archive import Pareto_Archive
+from ..settings import Arguments
+from settings import SettingsTestCase
+
+class Linear_Problem(object):
+    """
+    Problem whose objective values are the first variables of a point, where
+    a point is feasible if its last variable is not negative.
+    """
+
+    def __init__(self, objectives=2):
+        self.dim = objectives + 1
+        self.objectives = range(objectives)
+        self.context = self.create_context()
+
+    def create_context(self):
+        return {"count": 0}
+
+    def format_steps(self, steps):
+        return np.full(self.dim, steps[0])
+
+    def format_point(self, point):
+        return np.asarray(point, dtype=float)
+
+    def get_random_vector(self):
+        return np.random.uniform(-1.0, 10.0, self.dim)
+
+    def mutate(self, point, steps):
+        return point + np.random.normal(0.0, steps)
+
+    def evaluate(self, points):
+        results = [self.evaluate_state(point, self.context)[:2] for point in points]
+        return [result[0] for result in results], [result[1] for result in results]
+
+    def evaluate_state(self, point, context, parent=None):
+        context["count"] += 1
+        feasible = bool(point[-1] >= 0)
+        if feasible:
+            objectives = [float(value) for value in point[:-1]]
+        else:
+            objectives = [np.inf for _ in self.objectives]
+
+        return feasible, objectives, {"parent": parent}
+
+class Named_Algorithm(Algorithm):
+    def get_name(self):
+        return "Named"
+
+class TestPlanningAlgorithm(SettingsTestCase):
+    def setUp(self):
+        np.random.seed(1)
+
+        self.arguments = Arguments("settings.json", [
+            "--population-size", "4", "--iteration-limit", "10",
+            "--iteration-callback", "5", "--step-size", "0.5"
+        ])
+        self.settings = self.arguments.get_settings("planning_algorithm")
+        self.problem = Linear_Problem()
+        self.algorithm = Named_Algorithm(self.problem, self.arguments)
+
+    def _create_algorithm(self, problem=None, algorithm_class=Named_Algorithm):
+        algorithm = algorithm_class(problem or self.problem, self.arguments)
+        algorithm.evaluator = algorithm.create_evaluator()
+        return algorithm
+
+    def _create_population(self, points):
+        P = [np.array(point, dtype=float) for point in points]
+        Feasible, Objectives, States = Evaluator(self.problem).evaluate_states(P)
+        return P, Feasible, Objectives, States
+
+    def test_initialization(self):
+        with self.assertRaises(ValueError):
+            Named_Algorithm(self.problem, "arguments")
+
+        self.assertEqual(self.algorithm.problem, self.problem)
+        self.assertEqual(self.algorithm.mu, 4)
+        self.assertEqual(self.algorithm.t_current, 0)
+        self.assertEqual(self.algorithm.t_max, 10)
+        self.assertEqual(self.algorithm.t_callback, 5)
+        self.assertIsNone(self.algorithm.iteration_callback)
+        self.assertEqual(self.algorithm.t_migration, 0)
+        self.assertIsNone(self.algorithm.migration_callback)
+        self.assertEqual(self.algorithm.processes, 1)
+        self.assertIsNone(self.algorithm.evaluator)
+        self.assertEqual(self.algorithm.offspring_size, 1)
+        self.assertIsNone(self.algorithm.checkpoint)
+        self.assertFalse(self.algorithm.resume)
+        self.assertIsNone(self.algorithm.archive)
+        self.assertEqual(self.algorithm.steps.tolist(), [0.5, 0.5, 0.5])
+
+    def test_set_iteration_callback(self):
+        with self.assertRaises(TypeError):
+            self.algorithm.set_iteration_callback(None)
+
+        callback = MagicMock()
+        self.algorithm.set_iteration_callback(callback)
+        self.assertEqual(self.algorithm.iteration_callback, callback)
+
+    def test_set_migration_callback(self):
+        with self.assertRaises(TypeError):
+            self.algorithm.set_migration_callback(None, 3)
+
+        callback = MagicMock()
+        self.algorithm.set_migration_callback(callback, 3)
+        self.assertEqual(self.algorithm.migration_callback, callback)
+        self.assertEqual(self.algorithm.t_migration, 3)
+
+    def test_create_evaluator(self):
+        evaluator = self.algorithm.create_evaluator()
+        self.assertIsInstance(evaluator, Evaluator)
+        self.assertNotIsInstance(evaluator, Pool_Evaluator)
+        self.assertEqual(evaluator.problem, self.problem)
+
+        # Multiple processes divide the evaluations over a pool, where zero
+        # processes means one process per CPU core.
+        with patch("multiprocessing.Pool") as pool_mock:
+            with patch("multiprocessing.cpu_count", return_value=3):
+                self.algorithm.processes = 0
+                evaluator = self.algorithm.create_evaluator()
+
+        self.assertIsInstance(evaluator, Pool_Evaluator)
+        self.assertEqual(evaluator.processes, 3)
+        pool_mock.assert_called_once()
+
+    def test_evolve(self):
+        iterations = []
+        def iteration_callback(algorithm, data):
+            iterations.append(data["iteration"])
+            self.assertEqual(len(data["population"]), 4)
+            self.assertEqual(len(data["feasible"]), 4)
+            self.assertEqual(len(data["objectives"]), 4)
+            self.assertEqual(set(data["deletions"].keys()),
+                             set(["infeasible", "dominated", "contribution"]))
+            self.assertIn("hits", data["cache"])
+
+        self.algorithm.set_iteration_callback(iteration_callback)
+        P, Objectives, Feasible = self.algorithm.evolve()
+
+        # The callback is called at the start and at the last iteration.
+        self.assertEqual(iterations, [0, 5, 10])
+        self.assertEqual(self.algorithm.t_current, 10)
+        self.assertIsNone(self.algorithm.evaluator)
+        self.assertIsInstance(self.algorithm.archive, Pareto_Archive)
+
+        # The population keeps its size, and the archive is consistent with
+        # the final population.
+        self.assertEqual(len(P), 4)
+        self.assertEqual(len(Objectives), 4)
+        self.assertEqual(len(Feasible), 4)
+        for i, objectives in enumerate(Objectives):
+            self.assertEqual(i in self.algorithm.archive, Feasible[i])
+            if Feasible[i]:
+                self.assertEqual(self.algorithm.archive.get(i), tuple(objectives))
+
+    def test_evolve_offspring(self):
+        self.settings.set("offspring_size", 3)
+        algorithm = Named_Algorithm(self.problem, self.arguments)
+
+        with patch.object(Named_Algorithm, "_generate_and_select",
+                          wraps=algorithm._generate_and_select) as generate_mock:
+            P, Objectives, Feasible = algorithm.evolve()
+
+        self.assertEqual(generate_mock.call_count, 10)
+        self.assertEqual(len(P), 4)
+        self.assertEqual(len(Objectives), 4)
+        self.assertEqual(len(Feasible), 4)
+
+    def test_evolve_migration(self):
+        immigrant = (np.array([-5.0, -5.0, 1.0]), True, [-5.0, -5.0])
+        calls = []
+        def migration_callback(algorithm, emigrants):
+            calls.append(emigrants)
+            return [immigrant] if len(calls) == 1 else []
+
+        self.algorithm.set_migration_callback(migration_callback, 4)
+        P = self.algorithm.evolve()[0]
+
+        # The individuals migrate before iterations 4 and 8.
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(P), 4)
+
+        # The immigrant dominates the initial individuals, so the emigrants 
+        # afterward are the immigrant or mutations that it does not dominate.
+        self.assertNotEqual(calls[0], [])
+        for emigrant in calls[1]:
+            self.assertTrue(emigrant[2] == [-5.0, -5.0] or min(emigrant[2]) < -5.0)
+
+    def test_evolve_checkpoint(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "checkpoint.npz")
+
+        self.settings.set("checkpoint_file", path)
+        self.settings.set("checkpoint_interval", 4)
+
+        # An uninterrupted run without checkpoints.
+        np.random.seed(2)
+        algorithm = Named_Algorithm(Linear_Problem(), self.arguments)
+        algorithm.checkpoint = None
+        expected = algorithm.evolve()
+
+        # An interrupted run writes checkpoints every interval and at its 
+        # last iteration.
+        np.random.seed(2)
+        algorithm = Named_Algorithm(Linear_Problem(), self.arguments)
+        algorithm.t_max = 6
+        iterations = []
+        write_checkpoint = algorithm._write_checkpoint
+        def track_checkpoint(*args):
+            iterations.append(algorithm.t_current)
+            write_checkpoint(*args)
+
+        with patch.object(algorithm, "_write_checkpoint",
+                          side_effect=track_checkpoint):
+            algorithm.evolve()
+
+        self.assertEqual(iterations, [0, 4, 6])
+        self.assertTrue(algorithm.checkpoint.exists())
+
+        # A resumed run continues from the checkpoint, which gives the same 
+        # result as the uninterrupted run.
+        self.settings.set("resume", True)
+        for delta_evaluation in (True, False):
+            self.settings.set("delta_evaluation", delta_evaluation)
+            resume_path = os.path.join(directory,
+                                       "resume-{}.npz".format(delta_evaluation))
+            shutil.copy(path, resume_path)
+
+            np.random.seed(3)
+            algorithm = Named_Algorithm(Linear_Problem(), self.arguments)
+            algorithm.checkpoint = Checkpoint(resume_path)
+            P, Objectives, Feasible = algorithm.evolve()
+
+            self.assertEqual(algorithm.t_current, 10)
+            self.assertEqual([point.tolist() for point in P],
+                             [point.tolist() for point in expected[0]])
+            self.assertEqual(Objectives, expected[1])
+            self.assertEqual(Feasible, expected[2])
+
+    def test_read_checkpoint(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.settings.set("checkpoint_file",
+                          os.path.join(directory, "checkpoint.npz"))
+        self.settings.set("resume", True)
+
+        algorithm = self._create_algorithm()
+        P, Feasible, Objectives, _ = self._create_population([
+            [1.0, 2.0, 0.0], [2.0, 1.0, 0.0], [3.0, 3.0, -1.0], [0.0, 5.0, 1.0]
+        ])
+        algorithm.t_current = 3
+        algorithm._write_checkpoint(P, Feasible, Objectives,
+                                    {"infeasible": 1, "dominated": 2,
+                                     "contribution": 3}, 1.5)
+
+        state = np.random.get_state()
+        np.random.seed(3)
+        algorithm.t_current = 0
+        P2, Feasible2, Objectives2, States2, Deletions2, elapsed = \
+            algorithm._read_checkpoint()
+
+        self.assertEqual([point.tolist() for point in P2],
+                         [point.tolist() for point in P])
+        self.assertEqual(Feasible2, Feasible)
+        self.assertEqual(Objectives2, Objectives)
+        self.assertEqual(len(States2), 4)
+        self.assertEqual(Deletions2, {"infeasible": 1, "dominated": 2,
+                                      "contribution": 3})
+        self.assertEqual(elapsed, 1.5)
+        self.assertEqual(algorithm.t_current, 3)
+        self.assertEqual(np.random.get_state()[1].tolist(), state[1].tolist())
+
+        # A checkpoint of another algorithm or population size is rejected.
+        with self.assertRaises(ValueError):
+            self._create_algorithm(algorithm_class=NSGA)._read_checkpoint()
+
+        self.settings.set("population_size", 5)
+        with self.assertRaises(ValueError):
+            self._create_algorithm()._read_checkpoint()
+
+    def test_evaluate(self):
+        algorithm = self._create_algorithm()
+        points = [np.array([1.0, 2.0, 0.0]), np.array([1.0, 2.0, -1.0])]
+
+        # The states of the evaluations are kept for delta evaluation.
+        algorithm.delta_evaluation = True
+        Feasible, Objectives, States = algorithm._evaluate(points, [{"a": 1}, None])
+        self.assertEqual(Feasible, [True, False])
+        self.assertEqual(Objectives, [[1.0, 2.0], [np.inf, np.inf]])
+        self.assertEqual(States, [{"parent": {"a": 1}}, {"parent": None}])
+
+        algorithm.delta_evaluation = False
+        Feasible, Objectives, States = algorithm._evaluate(points)
+        self.assertEqual(Feasible, [True, False])
+        self.assertEqual(Objectives, [[1.0, 2.0], [np.inf, np.inf]])
+        self.assertEqual(States, [None, None])
+
+    def _mutate_and_select(self, algorithm, population, x_new):
+        with patch.object(Linear_Problem, "mutate",
+                          return_value=np.array(x_new, dtype=float)):
+            algorithm._mutate_and_select(*population)
+
+    def test_mutate_and_select(self):
+        algorithm = self._create_algorithm(algorithm_class=NSGA)
+        P, Feasible, Objectives, States = self._create_population([
+            [1.0, 4.0, 0.0], [2.0, 2.0, 0.0], [4.0, 1.0, 0.0], [3.0, 3.0, 0.0]
+        ])
+        Deletions = {"infeasible": 0, "dominated": 0, "contribution": 0}
+        population = (P, Feasible, Objectives, States, Deletions)
+        algorithm.archive = algorithm.create_archive(Feasible, Objectives)
+
+        # A dominated individual is replaced by the new individual, which 
+        # takes over its index in the archive.
+        self._mutate_and_select(algorithm, population, [0.0, 5.0, 0.0])
+        self.assertEqual(Objectives, [[1.0, 4.0], [2.0, 2.0], [4.0, 1.0], [0.0, 5.0]])
+        self.assertEqual(len(States), 4)
+        self.assertEqual(Deletions["dominated"], 1)
+        self.assertEqual(algorithm.archive.front, [3, 0, 1, 2])
+
+        # An infeasible new individual is deleted.
+        self._mutate_and_select(algorithm, population, [1.0, 1.0, -1.0])
+        self.assertEqual(Feasible, [True, True, True, True])
+        self.assertEqual(len(P), 4)
+        self.assertEqual(Deletions["infeasible"], 1)
+
+        # The individual with the smallest contribution is deleted when all 
+        # individuals are nondominated.
+        self._mutate_and_select(algorithm, population, [3.0, 1.5, 0.0])
+        self.assertEqual(Objectives, [[1.0, 4.0], [2.0, 2.0], [4.0, 1.0], [0.0, 5.0]])
+        self.assertEqual(Deletions["contribution"], 1)
+        self.assertEqual(len(algorithm.archive), 4)
+
+        # Individuals in the cache are not evaluated again.
+        count = self.problem.context["count"]
+        self._mutate_and_select(algorithm, population, [3.0, 1.5, 0.0])
+        self.assertEqual(self.problem.context["count"], count)
+        self.assertEqual(Deletions["contribution"], 2)
+
+    def test_mutate_and_select_without_archive(self):
+        problem = Linear_Problem(objectives=3)
+        algorithm = self._create_algorithm(problem=problem)
+        P = [np.array([i, i, i, 0.0]) for i in range(4)]
+        Feasible, Objectives, States = algorithm._evaluate(P)
+        Deletions = {"infeasible": 0, "dominated": 0, "contribution": 0}
+        self.assertIsNone(algorithm.create_archive(Feasible, Objectives))
+
+        with patch.object(Linear_Problem, "mutate",
+                          return_value=np.array([-1.0, -1.0, -1.0, 0.0])):
+            with patch.object(np.random, "randint", return_value=0):
+                algorithm._mutate_and_select(P, Feasible, Objectives, States,
+                                             Deletions)
+
+        self.assertEqual(Objectives[0], [-1.0, -1.0, -1.0])
+        self.assertEqual(Deletions["dominated"], 1)
+
+    def test_mutate_and_select_archive(self):
+        algorithm = self._create_algorithm(algorithm_class=NSGA)
+        P, Feasible, Objectives, States = self._create_population([
+            [1.0, 4.0, 0.0], [2.0, 2.0, -1.0], [4.0, 1.0, 0.0], [3.0, 3.0, 0.0]
+        ])
+        Deletions = {"infeasible": 0, "dominated": 0, "contribution": 0}
+        algorithm.archive = algorithm.create_archive(Feasible, Objectives)
+
+        # The deleted individual is swapped with the last individual, whose 
+        # key is replaced in the archive. The archive then has the same keys, 
+        # objective values and layers as a new archive of the population.
+        for _ in range(50):
+            algorithm._mutate_and_select(P, Feasible, Objectives, States,
+                                         Deletions)
+
+            expected = algorithm.create_archive(Feasible, Objectives)
+            self.assertEqual(len(algorithm.archive), len(expected))
+            for i, objectives in enumerate(Objectives):
+                self.assertEqual(i in algorithm.archive, Feasible[i])
+                if Feasible[i]:
+                    self.assertEqual(algorithm.archive.get(i), tuple(objectives))
+
+            self.assertEqual(algorithm.archive.front, expected.front)
+            self.assertEqual(algorithm.archive.dominated, expected.dominated)
+
+        self.assertEqual(sum(Deletions.values()), 50)
+
+    def test_generate_and_select(self):
+        self.settings.set("offspring_size", 3)
+        algorithm = self._create_algorithm(algorithm_class=NSGA)
+        P, Feasible, Objectives, States = self._create_population([
+            [1.0, 4.0, 0.0], [2.0, 2.0, 0.0], [4.0, 1.0, 0.0], [3.0, 3.0, 0.0]
+        ])
+        Deletions = {"infeasible": 0, "dominated": 0, "contribution": 0}
+
+        # Exactly lambda individuals are deleted in each generation. The 
+        # infeasible offspring is deleted first, followed by the worst 
+        # nondominated layers.
+        offspring = [[5.0, 5.0, -1.0], [2.5, 2.5, 0.0], [0.0, 7.0, 0.0]]
+        with patch.object(Linear_Problem, "mutate",
+                          side_effect=[np.array(x) for x in offspring]):
+            algorithm._generate_and_select(P, Feasible, Objectives, States,
+                                           Deletions)
+
+        self.assertEqual(Objectives, [[1.0, 4.0], [2.0, 2.0], [4.0, 1.0], [0.0, 7.0]])
+        self.assertEqual(len(P), 4)
+        self.assertEqual(len(States), 4)
+        self.assertEqual(Deletions, {"infeasible": 1, "dominated": 2, "contribution": 0})
+        self.assertEqual(algorithm.archive.front, [3, 0, 1, 2])
+
+        # When only part of the nondominated layer survives, the individuals 
+        # with the smallest crowding distance are deleted one at a time. 
+        # Offspring that are in the cache are not evaluated again.
+        algorithm.cache.put(algorithm._get_key(np.array([3.0, 1.5, 0.0])),
+                            (True, [3.0, 1.5], None))
+        count = self.problem.context["count"]
+        offspring = [[3.0, 1.5, 0.0], [0.5, 5.0, 0.0], [6.0, 0.5, 0.0]]
+        with patch.object(Linear_Problem, "mutate",
+                          side_effect=[np.array(x) for x in offspring]):
+            algorithm._generate_and_select(P, Feasible, Objectives, States,
+                                           Deletions)
+
+        self.assertEqual(self.problem.context["count"], count + 2)
+        self.assertEqual(Objectives, [[1.0, 4.0], [2.0, 2.0], [0.0, 7.0], [6.0, 0.5]])
+        self.assertEqual(Deletions, {"infeasible": 1, "dominated": 2, "contribution": 3})
+
+    def test_select_deletions(self):
+        Deletions = {"infeasible": 0, "dominated": 0, "contribution": 0}
+        Feasible = [True, False, False, True]
+        Objectives = [[1.0, 1.0], [np.inf, np.inf], [np.inf, np.inf], [2.0, 2.0]]
+
+        # Only infeasible individuals are deleted if there are enough of them.
+        Delete = self.algorithm._select_deletions(Feasible, Objectives, 1, Deletions)
+        self.assertEqual(len(Delete), 1)
+        self.assertIn(Delete[0], [1, 2])
+        self.assertEqual(Deletions, {"infeasible": 1, "dominated": 0, "contribution": 0})
+
+        # Afterward, the dominated individuals are deleted.
+        Delete = self.algorithm._select_deletions(Feasible, Objectives, 3, Deletions)
+        self.assertEqual(sorted(Delete), [1, 2, 3])
+        self.assertEqual(Delete[-1], 3)
+        self.assertEqual(Deletions, {"infeasible": 3, "dominated": 1, "contribution": 0})
+
+    def test_migrate(self):
+        problem = Linear_Problem(objectives=3)
+        algorithm = self._create_algorithm(problem=problem)
+        P = [np.array([i, 3 - i, 1.0, -1.0]) for i in range(4)]
+        Feasible, Objectives, States = algorithm._evaluate(P)
+        Deletions = {"infeasible": 0, "dominated": 0, "contribution": 0}
+
+        # Without feasible individuals, there are no emigrants.
+        algorithm.migration_callback = MagicMock(return_value=[])
+        algorithm._migrate(P, Feasible, Objectives, States, Deletions)
+        algorithm.migration_callback.assert_called_once_with(algorithm, [])
+        self.assertEqual(len(P), 4)
+
+        # Immigrants replace infeasible individuals.
+        immigrant = (np.array([1.0, 1.0, 1.0, 0.0]), True, [1.0, 1.0, 1.0])
+        algorithm.migration_callback = MagicMock(return_value=[immigrant])
+        algorithm._migrate(P, Feasible, Objectives, States, Deletions)
+        self.assertEqual(len(P), 4)
+        self.assertEqual(Objectives[-1], [1.0, 1.0, 1.0])
+        self.assertEqual(States[-1], None)
+        self.assertEqual(Deletions["infeasible"], 1)
+
+    def test_create_archive(self):
+        archive = self.algorithm.create_archive([True, False, True],
+                                                [[1.0, 2.0], [0.0, 0.0], [2.0, 1.0]])
+        self.assertIsInstance(archive, Pareto_Archive)
+        self.assertEqual(archive.front, [0, 2])
+        self.assertNotIn(1, archive)
+
+        # There is no archive for other numbers of objectives.
+        self.algorithm.problem = Linear_Problem(objectives=3)
+        self.assertIsNone(self.algorithm.create_archive([True], [[1.0, 2.0, 3.0]]))
+
+    def test_KLP(self):
+        Objectives = [[1.0, 3.0], [2.0, 1.0], [3.0, 2.0]]
+        T, todelete = self.algorithm.KLP([0, 1, 2], Objectives)
+        self.assertEqual(T, OrderedDict([(0, [1.0, 3.0]), (1, [2.0, 1.0])]))
+        self.assertEqual(todelete, [0, 1])
+
+        # Individuals with infinite objective values are all kept together.
+        Objectives = [[np.inf, np.inf], [np.inf, np.inf]]
+        T, todelete = self.algorithm.KLP([1, 0], Objectives)
+        self.assertEqual(T.keys(), [1, 0])
+        self.assertEqual(todelete, [0, 1])
+
+    def test_sort_nondominated(self):
+        Objectives = [[3.0, 2.0], [1.0, 3.0], [2.0, 1.0], [4.0, 4.0]]
+        R = self.algorithm.sort_nondominated(Objectives)
+        self.assertEqual([Rk.keys() for Rk in R], [[1, 2], [0], [3]])
+
+        # Only the first layer is sorted, and the other individuals are in 
+        # the second layer.
+        R = self.algorithm.sort_nondominated(Objectives, all_layers=False)
+        self.assertEqual([Rk.keys() for Rk in R], [[1, 2], [0, 3]])
+        self.assertEqual(R[1][3], [4.0, 4.0])
+
+        # With three objectives, the second individual is only nondominated 
+        # because of its third objective value, and it dominates the third.
+        Objectives = [[1.0, 1.0, 5.0], [2.0, 2.0, 1.0], [3.0, 3.0, 3.0],
+                      [0.5, 4.0, 4.0]]
+        R = self.algorithm.sort_nondominated(Objectives)
+        self.assertEqual([Rk.keys() for Rk in R], [[3, 0, 1], [2]])
+        self.assertEqual(R[1][2], [3.0, 3.0, 3.0])
+
+    def test_find_nondominated(self):
+        Objectives = [[1.0, 3.0, 2.0], [2.0, 1.0, 2.0], [2.0, 3.0, 3.0],
+                      [1.0, 3.0, 2.0], [3.0, 3.0, 1.0]]
+        T, todelete = self.algorithm.find_nondominated([0, 3, 1, 2, 4], Objectives)
+        self.assertEqual(T, OrderedDict([(0, [1.0, 3.0, 2.0]), (1, [2.0, 1.0, 2.0]),
+                                         (4, [3.0, 3.0, 1.0])]))
+        self.assertEqual(todelete, [0, 2, 4])
+
+        # The KLP algorithm gives the same result for two objectives.
+        Objectives = [[1.0, 3.0], [2.0, 1.0], [3.0, 2.0], [1.0, 3.0]]
+        self.assertEqual(self.algorithm.find_nondominated([0, 3, 1, 2], Objectives),
+                         self.algorithm.KLP([0, 3, 1, 2], Objectives))
+
+        # Individuals with infinite objective values are all kept together.
+        Objectives = [[np.inf, np.inf, np.inf], [np.inf, np.inf, np.inf]]
+        T, todelete = self.algorithm.find_nondominated([1, 0], Objectives)
+        self.assertEqual(T.keys(), [1, 0])
+        self.assertEqual(todelete, [0, 1])
+
+    def test_sort_contribution(self):
+        Rk = OrderedDict([(0, [1.0, 2.0])])
+        self.assertEqual(self.algorithm.sort_contribution(Rk), Rk)
+
+    def test_get_name(self):
+        with self.assertRaises(NotImplementedError):
+            Algorithm(self.problem, self.arguments).get_name()
+
+        self.assertEqual(self.algorithm.get_name(), "Named")
+
+@covers(NSGA)
+class TestPlanningAlgorithmNSGA(SettingsTestCase):
+    def setUp(self):
+        np.random.seed(1)
+        self.arguments = Arguments("settings.json", [])
+        self.algorithm = NSGA(Linear_Problem(), self.arguments)
+
+    def test_crowding_distance(self):
+        self.assertEqual(self.algorithm.crowding_distance(OrderedDict()).tolist(), [])
+
+        # The boundary individuals have an infinite distance, and the others 
+        # have the distance between their neighbors in each objective.
+        Rk = OrderedDict([(4, [2.0, 2.0]), (1, [0.0, 7.0]), (2, [1.0, 4.0]),
+                          (7, [6.0, 0.5])])
+        C = self.algorithm.crowding_distance(Rk)
+        self.assertEqual(C.tolist(), [2 * (5.0 + 3.5), np.inf, 2 * (2.0 + 5.0), np.inf])
+
+        # The distances are the same as those of a loop over the sorted keys 
+        # for each objective, including ties and boundaries, for layers of 
+        # any size and number of objectives with their keys in any order.
+        for size in [1, 2, 3, 10, 30]:
+            for objectives in [2, 3]:
+                keys = np.random.permutation(size * 2)[:size]
+                values = np.random.randint(0, 5, size=(size, objectives))
+                Rk = OrderedDict(zip(keys, (values / 2.0).tolist()))
+                C = self.algorithm.crowding_distance(Rk)
+                self.assertEqual(C.tolist(), self._crowding_distance_loop(Rk))
+
+    def _crowding_distance_loop(self, Rk):
+        keys = [
+            sorted(Rk.keys(), key=lambda i, j=j: Rk[i][j])
+            for j in range(len(Rk.values()[0]))
+        ]
+
+        C = []
+        for idx in Rk.keys():
+            distance = 0.0
+            for j, k in enumerate(keys):
+                v = k.index(idx)
+                l = Rk[k[v-1]][j] if v > 0 else -np.inf
+                u = Rk[k[v+1]][j] if v < len(Rk)-1 else np.inf
+                distance += 2 * (u - l)
+
+            C.append(distance)
+
+        return C
+
+    def test_sort_contribution(self):
+        Rk = OrderedDict([(0, [0.0, 2.0]), (1, [1.0, 1.0]), (2, [2.0, 0.0])])
+        self.assertEqual(self.algorithm.sort_contribution(Rk).tolist(),
+                         self.algorithm.crowding_distance(Rk).tolist())
+
+    def test_select_deletions(self):
+        # The second individual is only nondominated because of its third 
+        # objective value, so the third individual that it dominates is 
+        # deleted first and the second individual survives.
+        Objectives = [[1.0, 1.0, 5.0], [2.0, 2.0, 1.0], [3.0, 3.0, 3.0],
+                      [0.5, 4.0, 4.0]]
+        Deletions = {"infeasible": 0, "dominated": 0, "contribution": 0}
+        Delete = self.algorithm._select_deletions([True] * 4, Objectives, 2,
+                                                  Deletions)
+        self.assertEqual(Delete[0], 2)
+        self.assertNotIn(1, Delete)
+        self.assertEqual(Deletions, {"infeasible": 0, "dominated": 1, "contribution": 1})
+
+    def test_get_name(self):
+        self.assertEqual(self.algorithm.get_name(), "NSGA-II")
+
+@covers(SMS_EMOA)
+class TestPlanningAlgorithmSMSEMOA(SettingsTestCase):
+    def setUp(self):
+        self.arguments = Arguments("settings.json", [
+            "--hypervolume-exact-dimensions", "3", "--hypervolume-samples", "100",
+            "--hypervolume-seed", "5"
+        ])
+        self.algorithm = SMS_EMOA(Linear_Problem(), self.arguments)
+
+    def test_initialization(self):
+        self.assertIsInstance(self.algorithm.hypervolume, Hypervolume)
+        self.assertEqual(self.algorithm.hypervolume.exact_dimensions, 3)
+        self.assertEqual(self.algorithm.hypervolume.samples, 100)
+
+        # The hypervolume has its own random number generator with the seed.
+        self.assertEqual(self.algorithm.hypervolume._random.rand(),
+                         np.random.RandomState(5).rand())
+
+    def test_evolve_checkpoint(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "checkpoint.npz")
+
+        settings = self.arguments.get_settings("planning_algorithm")
+        settings.set("population_size", 4)
+        settings.set("iteration_limit", 10)
+        settings.set("checkpoint_file", path)
+        settings.set("checkpoint_interval", 4)
+
+        # The contributions of the four objectives are approximated with 
+        # samples, so the hypervolume uses its random number generator.
+        np.random.seed(2)
+        algorithm = SMS_EMOA(Linear_Problem(objectives=4), self.arguments)
+        algorithm.checkpoint = None
+        expected = algorithm.evolve()
+
+        np.random.seed(2)
+        algorithm = SMS_EMOA(Linear_Problem(objectives=4), self.arguments)
+        algorithm.t_max = 6
+        algorithm.evolve()
+
+        # A resumed run continues both random number generators from the 
+        # checkpoint, which gives the same result as the uninterrupted run.
+        settings.set("resume", True)
+        np.random.seed(3)
+        algorithm = SMS_EMOA(Linear_Problem(objectives=4), self.arguments)
+        P, Objectives, Feasible = algorithm.evolve()
+
+        self.assertEqual(algorithm.t_current, 10)
+        self.assertEqual([point.tolist() for point in P],
+                         [point.tolist() for point in expected[0]])
+        self.assertEqual(Objectives, expected[1])
+        self.assertEqual(Feasible, expected[2])
+
+    def test_hypervolume_contribution(self):
+        # The boundary individuals have an infinite contribution, and the 
+        # others have the area between their neighbors.
+        Rk = OrderedDict([(4, [2.0, 2.0]), (1, [0.0, 7.0]), (2, [1.0, 4.0]),
+                          (7, [6.0, 0.5])])
+        C = self.algorithm.hypervolume_contribution(Rk)
+        self.assertEqual(C.tolist(), [4.0 * 2.0, np.inf, 1.0 * 3.0, np.inf])
+
+    def test_sort_contribution(self):
+        Rk = OrderedDict([(0, [0.0, 2.0]), (1, [1.0, 1.0]), (2, [2.0, 0.0])])
+        self.assertEqual(self.algorithm.sort_contribution(Rk).tolist(),
+                         [np.inf, 1.0, np.inf])
+
+    def test_select_deletions(self):
+        # The second individual is only nondominated because of its third 
+        # objective value, so the third individual that it dominates is 
+        # deleted first and the second individual survives.
+        Objectives = [[1.0, 1.0, 5.0], [2.0, 2.0, 1.0], [3.0, 3.0, 3.0],
+                      [0.5, 4.0, 4.0]]
+        Deletions = {"infeasible": 0, "dominated": 0, "contribution": 0}
+        Delete = self.algorithm._select_deletions([True] * 4, Objectives, 2,
+                                                  Deletions)
+        self.assertEqual(Delete[0], 2)
+        self.assertNotIn(1, Delete)
+        self.assertEqual(Deletions, {"infeasible": 0, "dominated": 1, "contribution": 1})
+
+    def test_get_name(self):
+        self.assertEqual(self.algorithm.get_name(), "SMS-EMOA")
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from ..planning.Checkpoint import Checkpoint
+
+class TestPlanningCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.filename = os.path.join(self.directory, "checkpoint.npz")
+
+        self.checkpoint = Checkpoint(self.filename)
+
+    def test_initialization(self):
+        self.assertEqual(self.checkpoint._path, self.filename)
+
+    def test_path(self):
+        self.assertEqual(self.checkpoint.path, self.filename)
+
+    def test_exists(self):
+        self.assertFalse(self.checkpoint.exists())
+
+        self.checkpoint.write({"iteration": 1})
+        self.assertTrue(self.checkpoint.exists())
+
+    def test_get_island(self):
+        island = self.checkpoint.get_island(3)
+        self.assertIsInstance(island, Checkpoint)
+        self.assertEqual(island.path,
+                         os.path.join(self.directory, "checkpoint-3.npz"))
+
+    def test_write(self):
+        self.checkpoint.write({"iteration": 1})
+
+        # The temporary file is replaced by the checkpoint file.
+        self.assertEqual(os.listdir(self.directory), ["checkpoint.npz"])
+
+        # Writing again replaces the previous checkpoint.
+        self.checkpoint.write({"iteration": 2})
+        self.assertEqual(os.listdir(self.directory), ["checkpoint.npz"])
+        self.assertEqual(self.checkpoint.read()["iteration"], 2)
+
+    def test_read(self):
+        np.random.seed(42)
+        self.checkpoint.write({
+            "algorithm": "SMS-EMOA",
+            "iteration": 10,
+            "time": 1.5,
+            "population": np.array([[1.0, 2.0], [3.0, 4.0]]),
+            "feasible": np.array([True, False])
+        })
+        expected = np.random.rand(3)
+
+        state = self.checkpoint.read()
+        self.assertEqual(state["algorithm"], "SMS-EMOA")
+        self.assertEqual(state["iteration"], 10)
+        self.assertEqual(state["time"], 1.5)
+        self.assertEqual(state["population"].tolist(), [[1.0, 2.0], [3.0, 4.0]])
+        self.assertEqual(state["feasible"].tolist(), [True, False])
+
+        # The state of the random number generator is restored from the
+        # moment that the checkpoint was written.
+        self.assertNotIn("random_keys", state)
+        np.random.set_state(state["random_state"])
+        self.assertEqual(np.random.rand(3).tolist(), expected.tolist())
+        self.assertEqual(state["random_states"], {})
+
+        # The states of other random number generators are restored by name, 
+        # as far as the checkpoint contains them.
+        random = np.random.RandomState(7)
+        self.checkpoint.write({"iteration": 11}, {"other": random.get_state()})
+        expected = random.rand(3)
+
+        state = self.checkpoint.read(["other", "missing"])
+        self.assertEqual(sorted(state.keys()),
+                         ["iteration", "random_state", "random_states"])
+        self.assertEqual(state["random_states"].keys(), ["other"])
+        random.set_state(state["random_states"]["other"])
+        self.assertEqual(random.rand(3).tolist(), expected.tolist())
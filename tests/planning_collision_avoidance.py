@@ -1,8 +1,10 @@
 import numpy as np
 from dronekit import LocationLocal
+from mock import patch
 from ..geometry.Geometry_Grid import Geometry_Grid
 from ..location.AStar import AStar
 from ..planning.Collision_Avoidance import Collision_Avoidance, Collision_Type
+from ..planning.Evaluation_Cache import Evaluation_Cache
 from ..settings import Arguments
 from ..trajectory.Memory_Map import Memory_Map
 from geometry import LocationTestCase
@@ -44,6 +46,9 @@ class TestPlanningCollisionAvoidance(LocationTestCase, SettingsTestCase):
         self.assertEqual(self.collision_avoidance._memory_map.get_size(),
                          self.size)
         self.assertIsInstance(self.collision_avoidance._astar, AStar)
+        self.assertIsInstance(self.collision_avoidance._path_cache,
+                              Evaluation_Cache)
+        self.assertEqual(self.collision_avoidance._path_cache.size, 10000)
 
     def test_reset(self):
         # Fill the current map with data, to ensure that it is cleared.
@@ -104,6 +109,56 @@ class TestPlanningCollisionAvoidance(LocationTestCase, SettingsTestCase):
                          LocationLocal(0, 5, 0))
         self.assertEqual(self.collision_avoidance.distance, np.inf)
 
+    def test_update_path_cache(self):
+        astar = self.collision_avoidance._astar
+        cache = self.collision_avoidance._path_cache
+        with patch.object(astar, "assign", wraps=astar.assign) as assign_mock:
+            self.collision_avoidance.update(self.home_locations,
+                                            self.first_position, 1, 2, 6)
+            self.assertEqual(assign_mock.call_count, 1)
+            self.assertEqual(len(cache), 1)
+
+            # The same search after a reset uses the cached path, even though 
+            # the collision avoidance does not keep its routes.
+            self.collision_avoidance.reset()
+            self.collision_avoidance.update(self.home_locations,
+                                            self.first_position, 1, 2, 6)
+            self.assertEqual(assign_mock.call_count, 1)
+            self.assertEqual(cache.hits, 1)
+            self.assertEqual(self.collision_avoidance.distance, 6)
+
+            # A search with the same start and goal is performed again when 
+            # other cells are blocked.
+            self.collision_avoidance.reset()
+            self.collision_avoidance._memory_map.set((3, 3), Collision_Type.ROUTE)
+            self.collision_avoidance.update(self.home_locations,
+                                            self.first_position, 1, 2, 6)
+            self.assertEqual(assign_mock.call_count, 2)
+            self.assertEqual(len(cache), 2)
+
+            # A different initial direction leads to another search as well.
+            self.collision_avoidance.reset()
+            self.collision_avoidance.update(self.home_locations,
+                                            self.first_position, 1, 2, 6,
+                                            direction=0.0, turning_cost=1.0)
+            self.assertEqual(assign_mock.call_count, 3)
+
+    def test_update_path_cache_disabled(self):
+        arguments = Arguments("settings.json", [
+            "--network-size", "10", "10", "--network-padding", "1", "1",
+            "--collision-avoidance", "--path-cache-size", "0"
+        ])
+        collision_avoidance = Collision_Avoidance(arguments, self.geometry)
+        astar = collision_avoidance._astar
+        with patch.object(astar, "assign", wraps=astar.assign) as assign_mock:
+            for _ in range(2):
+                collision_avoidance.reset()
+                collision_avoidance.update(self.home_locations,
+                                           self.first_position, 1, 2, 6)
+
+            self.assertEqual(assign_mock.call_count, 2)
+            self.assertEqual(len(collision_avoidance._path_cache), 0)
+
     def test_update_disabled(self):
         self.collision_avoidance._enabled = False
         self.collision_avoidance.update(self.home_locations,
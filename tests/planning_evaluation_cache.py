@@ -0,0 +1,81 @@
+import unittest
+import numpy as np
+from ..planning.Evaluation_Cache import Evaluation_Cache
+
+class TestPlanningEvaluationCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = Evaluation_Cache(2)
+
+    def test_initialization(self):
+        self.assertEqual(self.cache._size, 2)
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache._hits, 0)
+        self.assertEqual(self.cache._misses, 0)
+
+    def test_len(self):
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_contains(self):
+        self.cache.put("a", 1)
+        self.assertIn("a", self.cache)
+        self.assertNotIn("b", self.cache)
+
+    def test_size(self):
+        self.assertEqual(self.cache.size, 2)
+
+    def test_hits(self):
+        self.cache.put("a", 1)
+        self.cache.get("a")
+        self.cache.get("a")
+        self.assertEqual(self.cache.hits, 2)
+
+    def test_misses(self):
+        self.cache.get("a")
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_get_key(self):
+        key = self.cache.get_key(np.array([1.0, 2.0, 3.0]))
+        self.assertIsInstance(key, str)
+        self.assertEqual(len(key), 20)
+
+        # Equal values have the same key regardless of their type.
+        self.assertEqual(self.cache.get_key([1, 2, 3]), key)
+        self.assertNotEqual(self.cache.get_key([1.0, 2.0, 3.5]), key)
+
+    def test_get(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.misses, 1)
+
+        self.cache.put("a", (True, [1.0, 2.0], None))
+        self.assertEqual(self.cache.get("a"), (True, [1.0, 2.0], None))
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_put(self):
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.cache.put("a", 3)
+        self.assertEqual(self.cache.get("a"), 3)
+
+        # The least recently used result is removed when the cache is full.
+        self.cache.get("b")
+        self.cache.put("c", 4)
+        self.assertNotIn("a", self.cache)
+        self.assertEqual(self.cache.get("b"), 2)
+        self.assertEqual(self.cache.get("c"), 4)
+
+        # A cache without a size does not store anything.
+        cache = Evaluation_Cache(0)
+        cache.put("a", 1)
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get("a"))
+
+    def test_clear(self):
+        self.cache.put("a", 1)
+        self.cache.get("a")
+        self.cache.get("b")
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(self.cache.misses, 0)
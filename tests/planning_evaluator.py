@@ -0,0 +1,140 @@
+import multiprocessing
+import multiprocessing.pool
+import unittest
+from mock import patch
+from ..bench.Method_Coverage import covers
+from ..planning import Evaluator as Evaluator_Module
+from ..planning.Evaluator import Evaluator, Pool_Evaluator
+
+class Counting_Problem(object):
+    """
+    Problem with a context that counts the evaluations that use it.
+    """
+
+    def __init__(self):
+        self.context = self.create_context()
+
+    def create_context(self):
+        return {"count": 0}
+
+    def evaluate(self, points):
+        results = [self.evaluate_state(point, self.context)[:2] for point in points]
+        return [result[0] for result in results], [result[1] for result in results]
+
+    def evaluate_state(self, point, context, parent=None):
+        context["count"] += 1
+        state = {"point": point, "parent": None if parent is None else parent["point"]}
+        return point > 0, [float(point), -float(point)], state
+
+class TestPlanningEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.problem = Counting_Problem()
+        self.evaluator = Evaluator(self.problem)
+
+    def test_initialization(self):
+        self.assertEqual(self.evaluator._problem, self.problem)
+
+    def test_problem(self):
+        self.assertEqual(self.evaluator.problem, self.problem)
+
+    def test_evaluate(self):
+        Feasible, Objectives = self.evaluator.evaluate([1, -2])
+        self.assertEqual(Feasible, [True, False])
+        self.assertEqual(Objectives, [[1.0, -1.0], [-2.0, 2.0]])
+
+        # The context of the problem instance is used.
+        self.assertEqual(self.problem.context["count"], 2)
+
+    def test_evaluate_states(self):
+        Feasible, Objectives, States = self.evaluator.evaluate_states([1, -2])
+        self.assertEqual(Feasible, [True, False])
+        self.assertEqual(Objectives, [[1.0, -1.0], [-2.0, 2.0]])
+        self.assertEqual(States, [
+            {"point": 1, "parent": None},
+            {"point": -2, "parent": None}
+        ])
+
+        # The states of the parents are passed to the problem.
+        States = self.evaluator.evaluate_states([3, 4], [None, States[0]])[2]
+        self.assertEqual(States, [
+            {"point": 3, "parent": None},
+            {"point": 4, "parent": 1}
+        ])
+        self.assertEqual(self.problem.context["count"], 4)
+
+    def test_close(self):
+        self.evaluator.close()
+        self.assertEqual(self.evaluator.evaluate([3])[0], [True])
+
+@covers(Pool_Evaluator)
+class TestPlanningPoolEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.problem = Counting_Problem()
+        self.evaluator = Pool_Evaluator(self.problem, processes=2)
+        self.addCleanup(self.evaluator.close)
+
+    def test_initialization(self):
+        self.assertEqual(self.evaluator.problem, self.problem)
+        self.assertEqual(self.evaluator._processes, 2)
+
+        # The number of CPU cores is used by default.
+        with patch.object(multiprocessing, "Pool") as pool_mock:
+            evaluator = Pool_Evaluator(self.problem)
+            self.assertEqual(evaluator.processes, multiprocessing.cpu_count())
+            pool_mock.assert_called_once()
+
+    def test_processes(self):
+        self.assertEqual(self.evaluator.processes, 2)
+
+    def test_evaluate(self):
+        self.assertEqual(self.evaluator.evaluate([]), ([], []))
+
+        points = range(-5, 15)
+        Feasible, Objectives = self.evaluator.evaluate(points)
+        self.assertEqual(Feasible, [point > 0 for point in points])
+        self.assertEqual(Objectives, [[float(point), -float(point)] for point in points])
+
+        # The workers use their own contexts rather than the context of the
+        # problem instance in this process.
+        self.assertEqual(self.problem.context["count"], 0)
+
+    def test_evaluate_states(self):
+        self.assertEqual(self.evaluator.evaluate_states([]), ([], [], []))
+
+        points = range(-5, 15)
+        Feasible, Objectives, States = self.evaluator.evaluate_states(points)
+        self.assertEqual(Feasible, [point > 0 for point in points])
+        self.assertEqual(Objectives, [[float(point), -float(point)] for point in points])
+        self.assertEqual(States, [{"point": point, "parent": None} for point in points])
+
+        States = self.evaluator.evaluate_states([20, 21], [States[0], None])[2]
+        self.assertEqual(States, [
+            {"point": 20, "parent": -5},
+            {"point": 21, "parent": None}
+        ])
+        self.assertEqual(self.problem.context["count"], 0)
+
+    def test_worker(self):
+        # The worker functions normally run in the pool processes, so check 
+        # them in this process as well.
+        self.addCleanup(Evaluator_Module._worker.clear)
+        Evaluator_Module._initialize_worker(self.problem)
+        self.assertEqual(Evaluator_Module._worker["problem"], self.problem)
+        self.assertEqual(Evaluator_Module._worker["context"], {"count": 0})
+
+        self.assertEqual(Evaluator_Module._evaluate_worker(2), (True, [2.0, -2.0]))
+        self.assertEqual(Evaluator_Module._worker["context"], {"count": 1})
+
+        parent = {"point": 2, "parent": None}
+        result = Evaluator_Module._evaluate_state_worker((3, parent))
+        self.assertEqual(result, (True, [3.0, -3.0], {"point": 3, "parent": 2}))
+        self.assertEqual(Evaluator_Module._worker["context"], {"count": 2})
+        self.assertEqual(self.problem.context["count"], 0)
+
+    def test_close(self):
+        self.evaluator.close()
+
+        # The pool no longer accepts evaluations and its workers are done.
+        self.assertEqual(self.evaluator._pool._state, multiprocessing.pool.CLOSE)
+        for process in self.evaluator._pool._pool:
+            self.assertFalse(process.is_alive())
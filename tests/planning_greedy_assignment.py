@@ -113,6 +113,32 @@ class TestPlanningGreedyAssignment(SettingsTestCase):
         self.assertEqual(second_waypoint.wait_id, 1)
         self.assertEqual(second_waypoint.wait_count, 1)
 
+    def test_calculate_vehicle_distances(self):
+        self.assigner._positions = np.array([[[3, 0], [5, 16]],
+                                             [[0, 0], [0, 19]]])
+        self.assigner._coordinates = self.assigner._positions.transpose(2, 1, 0)
+        self.assigner._remaining = np.array([True, False])
+        self.assigner._current_positions = [[0, 0], [0, 19]]
+        self.assigner._current_directions = [
+            Line_Follower_Direction.UP, Line_Follower_Direction.RIGHT
+        ]
+
+        V = self.assigner._calculate_vehicle_distances([0, 1])
+        self.assertEqual(V.shape, (2, 2, 2))
+
+        # The first vehicle drives straight to the first position, and needs 
+        # to turn once to the second position. The second vehicle faces away 
+        # from both positions, so it needs to turn twice for each of them. 
+        # Assigned positions have infinite distances.
+        cost = self.assigner._turning_cost
+        self.assertEqual(V[0, :, 0].tolist(), [3.0, 21.0 + cost])
+        self.assertEqual(V[1, :, 0].tolist(), [22.0 + 2 * cost, 8.0 + 2 * cost])
+        self.assertTrue(np.all(V[:, :, 1] == np.inf))
+
+        # Distances for a subset of the vehicles are in the given order.
+        V = self.assigner._calculate_vehicle_distances([1])
+        self.assertEqual(V[0, :, 0].tolist(), [22.0 + 2 * cost, 8.0 + 2 * cost])
+
     def test_get_new_direction(self):
         cases = [
             # current direction, new north, new east, expected new direction
@@ -0,0 +1,139 @@
+import itertools
+import unittest
+import numpy as np
+from ..planning.Hypervolume import Hypervolume
+
+class TestPlanningHypervolume(unittest.TestCase):
+    def setUp(self):
+        self.hypervolume = Hypervolume(exact_dimensions=4, samples=20000)
+        self.random_state = np.random.get_state()
+        np.random.seed(42)
+
+    def tearDown(self):
+        np.random.set_state(self.random_state)
+
+    def _count_cells(self, points, reference):
+        # Count the unit cells below the reference point that one or more 
+        # integer points dominate.
+        cells = itertools.product(*[range(r) for r in reference])
+        return sum(
+            1 for cell in cells
+            if any(all(p <= c for p, c in zip(point, cell)) for point in points)
+        )
+
+    def _random_points(self, count, dimensions):
+        return np.random.randint(0, 5, size=(count, dimensions)).tolist()
+
+    def test_initialization(self):
+        self.assertEqual(self.hypervolume._exact_dimensions, 4)
+        self.assertEqual(self.hypervolume._samples, 20000)
+        self.assertIsInstance(self.hypervolume._random, np.random.RandomState)
+
+        hypervolume = Hypervolume()
+        self.assertEqual(hypervolume.exact_dimensions, 5)
+        self.assertEqual(hypervolume.samples, 10000)
+
+    def test_exact_dimensions(self):
+        self.assertEqual(self.hypervolume.exact_dimensions, 4)
+
+    def test_samples(self):
+        self.assertEqual(self.hypervolume.samples, 20000)
+
+    def test_random_state(self):
+        # The state of the random number generator can be restored.
+        random_state = self.hypervolume.random_state
+        expected = self.hypervolume._random.rand(3)
+
+        self.hypervolume.random_state = random_state
+        self.assertEqual(self.hypervolume._random.rand(3).tolist(),
+                         expected.tolist())
+
+    def test_get_reference(self):
+        reference = self.hypervolume.get_reference([[1.0, 2.0, 3.0], [3.0, 1.0, 3.0]])
+        self.assertEqual(reference.tolist(), [5.0, 3.0, 4.0])
+
+    def test_compute(self):
+        self.assertEqual(self.hypervolume.compute([], [1.0, 1.0]), 0.0)
+        self.assertEqual(self.hypervolume.compute([[0.0]], [2.0]), 2.0)
+
+        # Points that are not better than the reference do not contribute.
+        self.assertEqual(self.hypervolume.compute([[1.0, 3.0]], [2.0, 2.0]), 0.0)
+        self.assertEqual(self.hypervolume.compute([[1.0, 1.0], [1.0, 3.0]], [2.0, 2.0]), 1.0)
+
+        # Compare the sweeps and the WFG algorithm, including dominated and 
+        # duplicate points, to counting cells in a grid.
+        for dimensions in range(2, 6):
+            reference = [5] * dimensions
+            for _ in range(5):
+                points = self._random_points(6, dimensions)
+                points.append(points[0])
+                self.assertAlmostEqual(self.hypervolume.compute(points, reference),
+                                       self._count_cells(points, reference))
+
+    def test_contributions(self):
+        self.assertEqual(self.hypervolume.contributions([]).tolist(), [])
+
+        # With two objectives, the boundary points have infinite contributions 
+        # and the others are the boxes between their neighbors, in the order 
+        # of the input points.
+        points = [[2.0, 3.0], [4.0, 1.0], [1.0, 5.0], [3.0, 1.5]]
+        C = self.hypervolume.contributions(points)
+        self.assertEqual(C.tolist(), [2.0, np.inf, np.inf, 1.5])
+
+        # Duplicate points do not contribute, even at the boundary.
+        C = self.hypervolume.contributions([[1.0, 2.0], [1.0, 2.0], [2.0, 1.0]])
+        self.assertEqual(C.tolist(), [0.0, 0.0, np.inf])
+
+        # The exact contributions are the differences in hypervolume without 
+        # each point.
+        for dimensions in range(2, 5):
+            reference = [5.0] * dimensions
+            points = self._random_points(6, dimensions)
+            total = self.hypervolume.compute(points, reference)
+            C = self.hypervolume.contributions(points, reference)
+            for i in range(len(points)):
+                others = points[:i] + points[i+1:]
+                expected = total - self.hypervolume.compute(others, reference)
+                self.assertAlmostEqual(C[i], expected)
+
+        # Points outside the reference point do not contribute.
+        C = self.hypervolume.contributions([[1.0, 1.0, 1.0], [3.0, 0.0, 0.0]],
+                                           [2.0, 2.0, 2.0])
+        self.assertEqual(C.tolist(), [1.0, 0.0])
+
+        # Without a reference point, the points with the unique best value in 
+        # an objective have infinite contributions.
+        points = [[1.0, 2.0, 2.0], [2.0, 1.0, 2.0], [2.0, 2.0, 1.0],
+                  [1.5, 1.5, 1.5], [1.5, 1.5, 1.5]]
+        C = self.hypervolume.contributions(points)
+        self.assertEqual(C[:3].tolist(), [np.inf, np.inf, np.inf])
+        self.assertEqual(C[3:].tolist(), [0.0, 0.0])
+
+        C = self.hypervolume.contributions([[1.0, 2.0, 2.0], [1.0, 2.0, 2.0]])
+        self.assertEqual(C.tolist(), [0.0, 0.0])
+
+        # Above the exact dimensions, the contributions are approximated.
+        points = [[0.0, 2.0, 2.0, 2.0, 2.0], [2.0, 0.0, 2.0, 2.0, 2.0],
+                  [1.0, 1.0, 1.0, 1.0, 1.0]]
+        reference = [3.0] * 5
+        C = self.hypervolume.contributions(points, reference)
+        expected = Hypervolume(exact_dimensions=5).contributions(points, reference)
+        self.assertEqual(expected.tolist(), [1.0, 1.0, 29.0])
+        for i in range(len(points)):
+            # The error is small compared to the volume of the sampled box.
+            self.assertAlmostEqual(C[i], expected[i], delta=0.02 * 3.0**5)
+
+        # The samples are drawn from the random number generator of the 
+        # calculator, which is reproducible with a seed.
+        state = np.random.get_state()
+        first = Hypervolume(exact_dimensions=4, samples=100, seed=3)
+        second = Hypervolume(exact_dimensions=4, samples=100, seed=3)
+        self.assertEqual(first.contributions(points, reference).tolist(),
+                         second.contributions(points, reference).tolist())
+        self.assertEqual(np.random.get_state()[1].tolist(), state[1].tolist())
+        self.assertEqual(np.random.get_state()[2], state[2])
+
+    def test_least_contributor(self):
+        points = [[2.0, 3.0], [4.0, 1.0], [1.0, 5.0], [3.0, 1.5]]
+        self.assertEqual(self.hypervolume.least_contributor(points), 3)
+        self.assertEqual(self.hypervolume.least_contributor(points, [5.0, 6.0]), 1)
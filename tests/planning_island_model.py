@@ -0,0 +1,215 @@
+import multiprocessing
+import Queue
+from collections import OrderedDict
+import numpy as np
+from ..planning import Island_Model as Island_Model_Module
+from ..planning.Checkpoint import Checkpoint
+from ..planning.Island_Model import Island_Model
+from ..settings import Arguments
+from settings import SettingsTestCase
+
+class Fake_Algorithm(object):
+    """
+    Algorithm that creates a fixed population and reports it every iteration.
+    """
+
+    def __init__(self, problem, arguments):
+        self.problem = problem
+        self.settings = arguments.get_settings("planning_algorithm")
+        self.mu = 2
+        self.t_max = self.settings.get("iteration_limit")
+        self.steps = np.array([0.5, 0.5])
+        self.processes = 4
+        checkpoint_file = self.settings.get("checkpoint_file")
+        self.checkpoint = Checkpoint(checkpoint_file) if checkpoint_file else None
+        self.iteration_callback = None
+        self.migration_callback = None
+        self.migration_interval = None
+        self.immigrants = []
+
+    def set_iteration_callback(self, callback):
+        self.iteration_callback = callback
+
+    def set_migration_callback(self, callback, interval):
+        self.migration_callback = callback
+        self.migration_interval = interval
+
+    def sort_nondominated(self, Objectives, all_layers=True):
+        return [OrderedDict(enumerate(Objectives))]
+
+    def get_name(self):
+        return "Fake"
+
+    def evolve(self):
+        if self.problem == "error":
+            raise ValueError("Broken problem")
+
+        P = [np.array([1.0, 2.0]), np.array([3.0, 4.0])]
+        Feasible = [True, False]
+        Objectives = [[1.0, 2.0], [np.inf, np.inf]]
+        for t in range(self.t_max + 1):
+            self.iteration_callback(self, {
+                "iteration": t,
+                "cur_time": 0.5,
+                "population": P,
+                "feasible": Feasible,
+                "objectives": Objectives,
+                "deletions": {"infeasible": 1},
+                "cache": {"hits": 2, "misses": 3}
+            })
+            if t >= self.t_max:
+                break
+
+            emigrants = [(P[0], True, Objectives[0]), (P[0], True, Objectives[0])]
+            self.immigrants.extend(self.migration_callback(self, emigrants))
+
+        return P, Objectives, Feasible
+
+class Local_Queue(Queue.Queue):
+    """
+    Queue within the current process with the interface of a process queue.
+    """
+
+    def cancel_join_thread(self):
+        pass
+
+class TestPlanningIslandModel(SettingsTestCase):
+    def setUp(self):
+        self.arguments = Arguments("settings.json", [
+            "--iteration-limit", "2", "--migration-size", "1"
+        ])
+        self.island_model = Island_Model("problem", self.arguments,
+                                         Fake_Algorithm, islands=2)
+
+    def test_initialization(self):
+        self.assertEqual(self.island_model.problem, "problem")
+        self.assertEqual(self.island_model.arguments, self.arguments)
+        self.assertEqual(self.island_model._algorithm_class, Fake_Algorithm)
+        self.assertIsInstance(self.island_model._algorithm, Fake_Algorithm)
+        self.assertEqual(self.island_model.t_current, 0)
+        self.assertIsNone(self.island_model.iteration_callback)
+        self.assertIsNone(self.island_model.archive)
+
+        # There is one island per CPU core by default.
+        island_model = Island_Model("problem", self.arguments, Fake_Algorithm)
+        self.assertEqual(island_model.islands, multiprocessing.cpu_count())
+
+    def test_islands(self):
+        self.assertEqual(self.island_model.islands, 2)
+
+    def test_mu(self):
+        self.assertEqual(self.island_model.mu, 4)
+
+    def test_steps(self):
+        self.assertEqual(self.island_model.steps.tolist(), [0.5, 0.5])
+
+    def test_t_max(self):
+        self.assertEqual(self.island_model.t_max, 2)
+        self.island_model.t_max = 0
+        self.assertEqual(self.island_model.t_max, 0)
+        self.assertEqual(self.island_model._limit.value, 0)
+
+    def test_set_iteration_callback(self):
+        with self.assertRaises(TypeError):
+            self.island_model.set_iteration_callback(None)
+
+        callback = lambda algorithm, data: None
+        self.island_model.set_iteration_callback(callback)
+        self.assertEqual(self.island_model.iteration_callback, callback)
+
+    def test_sort_nondominated(self):
+        R = self.island_model.sort_nondominated([[1.0, 2.0]])
+        self.assertEqual(R, [OrderedDict([(0, [1.0, 2.0])])])
+
+    def test_get_name(self):
+        self.assertEqual(self.island_model.get_name(), "Fake (2 islands)")
+
+    def test_evolve(self):
+        calls = []
+        self.island_model.set_iteration_callback(
+            lambda algorithm, data: calls.append((algorithm, data))
+        )
+
+        P, Objectives, Feasible = self.island_model.evolve()
+        self.assertEqual(len(P), 4)
+        self.assertEqual(Objectives, [[1.0, 2.0], [np.inf, np.inf]] * 2)
+        self.assertEqual(Feasible, [True, False, True, False])
+
+        # The progress of all islands is merged for each iteration.
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(self.island_model.t_current, 2)
+        for t, call in enumerate(calls):
+            algorithm, data = call
+            self.assertEqual(algorithm, self.island_model)
+            self.assertEqual(data["iteration"], t)
+            self.assertEqual(data["cur_time"], 0.5)
+            self.assertEqual(len(data["population"]), 4)
+            self.assertEqual(data["feasible"], [True, False, True, False])
+            self.assertEqual(data["deletions"], {"infeasible": 2})
+            self.assertEqual(data["cache"], {"hits": 4, "misses": 6})
+
+        # Progress without a callback is tracked as well.
+        self.island_model.iteration_callback = None
+        self.island_model.t_max = 1
+        self.assertEqual(len(self.island_model.evolve()[0]), 4)
+        self.assertEqual(self.island_model.t_current, 1)
+
+        # Errors in the islands are raised after all islands are done.
+        island_model = Island_Model("error", self.arguments, Fake_Algorithm,
+                                    islands=2)
+        with self.assertRaisesRegexp(RuntimeError, "Island 0 failed"):
+            island_model.evolve()
+
+    def test_run_island(self):
+        inbox = Local_Queue()
+        outbox = Local_Queue()
+        messages = Local_Queue()
+        limit = multiprocessing.Value('i', 1)
+        immigrant = (np.array([5.0, 6.0]), True, [0.0, 3.0])
+        inbox.put([immigrant])
+
+        Island_Model_Module._run_island(0, Fake_Algorithm, "problem",
+                                        self.arguments, 42, limit, 1, inbox,
+                                        outbox, messages)
+
+        # The island sends at most the migration size of its nondominated 
+        # individuals to the next island, and receives the immigrants.
+        emigrants = outbox.get_nowait()
+        self.assertEqual(len(emigrants), 1)
+        self.assertEqual(emigrants[0][2], [1.0, 2.0])
+        self.assertTrue(outbox.empty())
+
+        message, index, data = messages.get_nowait()
+        self.assertEqual((message, index), ("iteration", 0))
+        self.assertEqual(data["iteration"], 0)
+        self.assertEqual(data["deletions"], {"infeasible": 1})
+        self.assertEqual(messages.get_nowait()[2]["iteration"], 1)
+
+        message, index, data = messages.get_nowait()
+        self.assertEqual((message, index), ("result", 0))
+        self.assertEqual(data[1], [[1.0, 2.0], [np.inf, np.inf]])
+        self.assertTrue(messages.empty())
+
+        # Each island writes to its own checkpoint file.
+        self.arguments.get_settings("planning_algorithm").set("checkpoint_file",
+                                                              "run.npz")
+        algorithms = []
+        def algorithm_class(problem, arguments):
+            algorithm = Fake_Algorithm(problem, arguments)
+            algorithms.append(algorithm)
+            return algorithm
+
+        Island_Model_Module._run_island(2, algorithm_class, "problem",
+                                        self.arguments, 42, limit, 1, inbox,
+                                        outbox, messages)
+        self.assertEqual(algorithms[0].checkpoint.path, "run-2.npz")
+        while not messages.empty():
+            messages.get_nowait()
+
+        # Errors are reported as messages.
+        Island_Model_Module._run_island(1, Fake_Algorithm, "error",
+                                        self.arguments, 42, limit, 1, inbox,
+                                        outbox, messages)
+        message, index, data = messages.get_nowait()
+        self.assertEqual((message, index), ("error", 1))
+        self.assertIn("Broken problem", data)
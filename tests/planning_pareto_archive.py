@@ -0,0 +1,150 @@
+import random
+import unittest
+from collections import OrderedDict
+from ..planning.Pareto_Archive import Pareto_Archive
+
+class TestPlanningParetoArchive(unittest.TestCase):
+    def setUp(self):
+        self.archive = Pareto_Archive()
+        self.archive.insert(0, [1.0, 5.0])
+        self.archive.insert(1, [2.0, 3.0])
+        self.archive.insert(2, [4.0, 1.0])
+        self.archive.insert(3, [3.0, 4.0])
+
+    def _check_dominance(self):
+        # Compare the archive against a brute force dominance check.
+        keys = [key for key in range(100) if key in self.archive]
+        for key in keys:
+            values = self.archive.get(key)
+            dominated = any(
+                other != key and (
+                    self.archive.get(other) == values and other in self.archive.front
+                    or all(o <= v for o, v in zip(self.archive.get(other), values))
+                    and self.archive.get(other) != values
+                )
+                for other in keys
+            )
+            self.assertEqual(self.archive.is_dominated(key), dominated)
+
+    def test_initialization(self):
+        archive = Pareto_Archive()
+        self.assertEqual(len(archive), 0)
+        self.assertEqual(archive.front, [])
+        self.assertEqual(archive.dominated, [])
+
+    def test_len(self):
+        self.assertEqual(len(self.archive), 4)
+
+    def test_contains(self):
+        self.assertIn(3, self.archive)
+        self.assertNotIn(4, self.archive)
+
+    def test_front(self):
+        self.assertEqual(self.archive.front, [0, 1, 2])
+
+    def test_dominated(self):
+        self.assertEqual(self.archive.dominated, [3])
+
+    def test_get(self):
+        self.assertEqual(self.archive.get(1), (2.0, 3.0))
+        with self.assertRaises(KeyError):
+            self.archive.get(4)
+
+    def test_is_dominated(self):
+        self.assertFalse(self.archive.is_dominated(0))
+        self.assertTrue(self.archive.is_dominated(3))
+        self.assertFalse(self.archive.is_dominated(4))
+
+    def test_insert(self):
+        with self.assertRaises(KeyError):
+            self.archive.insert(1, [0.0, 0.0])
+        with self.assertRaises(ValueError):
+            self.archive.insert(4, [0.0, 0.0, 0.0])
+
+        # An individual with the same values as one in the front is dominated.
+        self.assertFalse(self.archive.insert(4, [2.0, 3.0]))
+        self.assertEqual(self.archive.dominated, [4, 3])
+
+        # An individual that dominates part of the front replaces it.
+        self.assertTrue(self.archive.insert(5, [1.5, 2.0]))
+        self.assertEqual(self.archive.front, [0, 5, 2])
+        self.assertEqual(self.archive.dominated, [1, 4, 3])
+        self._check_dominance()
+
+        # An individual that dominates the entire front replaces all of it.
+        self.assertTrue(self.archive.insert(6, [0.5, 0.5]))
+        self.assertEqual(self.archive.front, [6])
+        self._check_dominance()
+
+    def test_remove(self):
+        with self.assertRaises(KeyError):
+            self.archive.remove(4)
+
+        # Removing a dominated individual does not alter the front.
+        self.archive.remove(3)
+        self.assertNotIn(3, self.archive)
+        self.assertEqual(self.archive.front, [0, 1, 2])
+        self.assertEqual(self.archive.dominated, [])
+
+        # Removing an individual from the front makes individuals that only it 
+        # dominated nondominated again.
+        self.archive.insert(3, [3.0, 4.0])
+        self.archive.insert(4, [2.0, 3.0])
+        self.archive.insert(5, [2.5, 3.5])
+        self.archive.remove(1)
+        self.assertEqual(self.archive.front, [0, 4, 2])
+        self.assertEqual(self.archive.dominated, [5, 3])
+        self._check_dominance()
+
+        self.archive.remove(4)
+        self.assertEqual(self.archive.front, [0, 5, 2])
+        self.assertEqual(self.archive.dominated, [3])
+        self._check_dominance()
+
+        # Dominated individuals beyond the next individual in the front stay 
+        # dominated by it.
+        self.archive.insert(6, [5.0, 4.0])
+        self.archive.remove(5)
+        self.assertEqual(self.archive.front, [0, 3, 2])
+        self.assertEqual(self.archive.dominated, [6])
+        self._check_dominance()
+
+    def test_replace(self):
+        with self.assertRaises(KeyError):
+            self.archive.replace(0, 1)
+
+        self.archive.replace(1, 7)
+        self.assertEqual(self.archive.front, [0, 7, 2])
+        self.assertEqual(self.archive.get(7), (2.0, 3.0))
+        self.assertNotIn(1, self.archive)
+
+        self.archive.replace(3, 8)
+        self.assertEqual(self.archive.dominated, [8])
+        self.assertTrue(self.archive.is_dominated(8))
+
+    def test_clear(self):
+        self.archive.clear()
+        self.assertEqual(len(self.archive), 0)
+        self.assertEqual(self.archive.front, [])
+        self.assertEqual(self.archive.dominated, [])
+
+    def test_get_layers(self):
+        self.assertEqual(self.archive.get_layers(), [
+            OrderedDict([(0, (1.0, 5.0)), (1, (2.0, 3.0)), (2, (4.0, 1.0))]),
+            OrderedDict([(3, (3.0, 4.0))])
+        ])
+
+        self.archive.remove(3)
+        self.assertEqual(len(self.archive.get_layers()), 1)
+
+    def test_random(self):
+        random.seed(42)
+        keys = []
+        for key in range(100):
+            if keys and random.random() < 0.3:
+                self.archive.remove(keys.pop(random.randrange(len(keys))))
+            elif key not in self.archive:
+                self.archive.insert(key, [random.randint(0, 10), random.randint(0, 10)])
+                keys.append(key)
+
+            self._check_dominance()
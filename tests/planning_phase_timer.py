@@ -0,0 +1,122 @@
+import time
+import unittest
+from mock import patch
+from ..planning.Phase_Timer import Phase_Timer
+
+class Timed_Object(object):
+    def compute(self, value, offset=0):
+        return value * 2 + offset
+
+    def fail(self):
+        raise ValueError("Failure")
+
+class TestPlanningPhaseTimer(unittest.TestCase):
+    def setUp(self):
+        self.timer = Phase_Timer()
+
+    def test_initialization(self):
+        self.assertEqual(self.timer._times, {})
+        self.assertEqual(self.timer._calls, {})
+        self.assertEqual(self.timer._stack, [])
+
+    def test_times(self):
+        with patch.object(time, "time", side_effect=[1.0, 3.5]):
+            self.timer.start("evaluation")
+            self.timer.stop()
+
+        self.assertEqual(self.timer.times, {"evaluation": 2.5})
+
+        # The times are a copy of the internal times.
+        self.timer.times["evaluation"] = 0.0
+        self.assertEqual(self.timer.times, {"evaluation": 2.5})
+
+    def test_calls(self):
+        with patch.object(time, "time", return_value=1.0):
+            self.timer.start("evaluation")
+            self.timer.stop()
+            self.timer.start("evaluation")
+            self.timer.stop()
+
+        self.assertEqual(self.timer.calls, {"evaluation": 2})
+
+    def test_add_phase(self):
+        self.timer.add_phase("sorting")
+        self.assertEqual(self.timer.times, {"sorting": 0.0})
+        self.assertEqual(self.timer.calls, {"sorting": 0})
+
+    def test_start(self):
+        with patch.object(time, "time", return_value=4.0):
+            self.timer.start("selection")
+
+        self.assertEqual(self.timer._stack, [["selection", 4.0, 0.0]])
+        self.assertEqual(self.timer.times, {"selection": 0.0})
+
+    def test_stop(self):
+        # The time of nested phases is not counted for the outer phase.
+        times = [1.0, 2.0, 4.0, 4.5, 5.0, 8.0]
+        with patch.object(time, "time", side_effect=times):
+            self.timer.start("evaluation")
+            self.timer.start("assignment")
+            self.timer.stop()
+            self.timer.start("assignment")
+            self.timer.stop()
+            self.timer.stop()
+
+        self.assertEqual(self.timer.times, {
+            "evaluation": 4.5,
+            "assignment": 2.5
+        })
+        self.assertEqual(self.timer.calls, {
+            "evaluation": 1,
+            "assignment": 2
+        })
+        self.assertEqual(self.timer._stack, [])
+
+    def test_wrap(self):
+        timed_object = Timed_Object()
+        compute = self.timer.wrap("evaluation", timed_object.compute)
+        self.assertEqual(compute.__name__, "compute")
+        self.assertEqual(self.timer.calls, {"evaluation": 0})
+
+        with patch.object(time, "time", side_effect=[1.0, 1.5]):
+            self.assertEqual(compute(3, offset=1), 7)
+
+        self.assertEqual(self.timer.times, {"evaluation": 0.5})
+        self.assertEqual(self.timer.calls, {"evaluation": 1})
+
+        # The phase stops when the function raises an exception.
+        fail = self.timer.wrap("evaluation", timed_object.fail)
+        with patch.object(time, "time", side_effect=[2.0, 4.0]):
+            with self.assertRaises(ValueError):
+                fail()
+
+        self.assertEqual(self.timer.times, {"evaluation": 2.5})
+        self.assertEqual(self.timer.calls, {"evaluation": 2})
+        self.assertEqual(self.timer._stack, [])
+
+    def test_instrument(self):
+        timed_object = Timed_Object()
+        self.timer.instrument("evaluation", timed_object, "compute")
+
+        with patch.object(time, "time", side_effect=[1.0, 2.0]):
+            self.assertEqual(timed_object.compute(2), 4)
+
+        self.assertEqual(self.timer.times, {"evaluation": 1.0})
+        self.assertEqual(self.timer.calls, {"evaluation": 1})
+
+        # Other instances are not affected.
+        with patch.object(time, "time", side_effect=[1.0, 2.0]):
+            self.assertEqual(Timed_Object().compute(2), 4)
+
+        self.assertEqual(self.timer.calls, {"evaluation": 1})
+
+    def test_reset(self):
+        with patch.object(time, "time", return_value=1.0):
+            self.timer.start("evaluation")
+            self.timer.stop()
+            self.timer.start("sorting")
+
+        self.timer.reset()
+        self.assertEqual(self.timer.times, {})
+        self.assertEqual(self.timer.calls, {})
+        self.assertEqual(self.timer._stack, [])
@@ -0,0 +1,494 @@
+import math
+import unittest
+import numpy as np
+from mock import patch
+from ..bench.Method_Coverage import covers
+from ..core.Import_Manager import Import_Manager
+from ..planning.Evaluation_Cache import Evaluation_Cache
+from ..planning.Greedy_Assignment import Greedy_Assignment
+from ..planning.Problem import Problem, Reconstruction_Plan, \
+    Reconstruction_Plan_Continuous, Reconstruction_Plan_Discrete
+from ..reconstruction.Weight_Matrix import Weight_Matrix
+from ..settings import Arguments
+from settings import SettingsTestCase
+
+class TestPlanningProblem(unittest.TestCase):
+    def setUp(self):
+        self.problem = Problem(3)
+
+        # A problem with a real, a binary and two integer variables.
+        self.typed_problem = Problem(4, (
+            np.array([0.0, 0.0, 0, 0]),
+            np.array([1.0, 1.0, 5, 5]),
+            np.array([np.float, bool, np.int, np.int])
+        ))
+
+    def test_initialization(self):
+        with self.assertRaises(ValueError):
+            Problem(2, (0.0,))
+
+        self.assertEqual(self.problem.dim, 3)
+        self.assertEqual(self.problem.domain, (0.0, 1.0))
+        self.assertEqual(self.problem._bool_indices, ())
+        self.assertEqual(self.problem._int_indices, ())
+        self.assertEqual(self.problem.objectives, [])
+        self.assertEqual(len(self.problem.constraints), 2)
+        self.assertIsNone(self.problem.context)
+
+        self.assertEqual(self.typed_problem._bool_indices[0].tolist(), [1])
+        self.assertEqual(self.typed_problem._int_indices[0].tolist(), [2, 3])
+
+    def test_format_steps(self):
+        self.assertEqual(self.problem.format_steps([0.5]).tolist(), [0.5, 0.5, 0.5])
+        self.assertEqual(self.problem.format_steps([1, 2]).tolist(), [1, 2, 1])
+
+    def test_get_random_vector(self):
+        vector = self.problem.get_random_vector()
+        self.assertEqual(vector.shape, (3,))
+        self.assertTrue(np.all((vector >= 0.0) & (vector < 1.0)))
+
+        vector = self.typed_problem.get_random_vector()
+        self.assertIn(vector[1], [0, 1])
+        self.assertTrue(np.all((vector[2:] >= 0) & (vector[2:] < 5)))
+
+    def test_evaluate(self):
+        Feasible, Objectives = self.problem.evaluate([
+            np.array([0.5, 0.5, 0.5]), np.array([1.5, 0.5, 0.5])
+        ])
+        self.assertEqual(Feasible, [True, False])
+        self.assertEqual(Objectives, [[], []])
+
+    def test_create_context(self):
+        self.assertIsNone(self.problem.create_context())
+
+    def test_is_feasible(self):
+        self.assertTrue(self.problem.is_feasible(np.array([0.5, 0.5, 0.5])))
+        self.assertFalse(self.problem.is_feasible(np.array([-0.5, 0.5, 0.5]), {}))
+
+        # Binary variables may have the value of their upper bound.
+        self.assertTrue(self.typed_problem.is_feasible(np.array([0.5, 1.0, 2.0, 3.0])))
+        self.assertFalse(self.typed_problem.is_feasible(np.array([0.5, 1.0, 5.0, 3.0])))
+
+    def test_evaluate_point(self):
+        self.problem.objectives = [lambda x, state: x.sum()]
+        self.assertEqual(self.problem.evaluate_point(np.array([0.5, 0.5, 0.5])),
+                         (True, [1.5]))
+        self.assertEqual(self.problem.evaluate_point(np.array([0.5, 0.5, 0.5]),
+                                                     feasible=False),
+                         (False, [np.inf]))
+
+    def test_evaluate_state(self):
+        point = np.array([0.5, 1.0, 2.4, 2.6])
+        self.typed_problem.objectives = [lambda x, state: x[2] + x[3]]
+        feasible, objectives, state = \
+            self.typed_problem.evaluate_state(point, None)
+        self.assertTrue(feasible)
+        self.assertEqual(objectives, [5.0])
+        self.assertEqual(state, {})
+
+        # A given feasibility means that the point is already formatted.
+        feasible, objectives, state = \
+            self.typed_problem.evaluate_state(point, None, feasible=True)
+        self.assertEqual(objectives, [5.0])
+
+    def test_get_objective_values(self):
+        self.problem.objectives = [
+            lambda x, state: x.sum(), lambda x, state: state["value"]
+        ]
+        point = np.array([0.5, 0.5, 0.5])
+        self.assertEqual(self.problem.get_objective_values(point, {"value": 2}, True),
+                         [1.5, 2.0])
+        self.assertEqual(self.problem.get_objective_values(point, {}, False),
+                         [np.inf, np.inf])
+
+    def test_mutate(self):
+        point = np.array([0.5, 0.5, 0.5])
+        self.assertEqual(self.problem.mutate(point, np.zeros(3)).tolist(),
+                         point.tolist())
+        self.assertNotEqual(self.problem.mutate(point, np.ones(3)).tolist(),
+                            point.tolist())
+
+        # Binary variables flip when a random value is above their step size,
+        # and integer variables are kept within their domain.
+        point = np.array([0.5, 1.0, 2.0, 3.0])
+        for _ in range(10):
+            mutation = self.typed_problem.mutate(point, [0.0, 0.0, 100.0, 100.0])
+            self.assertEqual(mutation[:2].tolist(), [0.5, 0.0])
+            self.assertTrue(np.all((mutation[2:] >= 0) & (mutation[2:] < 5)))
+
+            mutation = self.typed_problem.mutate(point, [0.0, 1.0, 0.0, 0.0])
+            self.assertEqual(mutation.tolist(), point.tolist())
+
+    def test_format_point(self):
+        point = np.array([0.25, 1.0, 2.4, 2.6])
+        self.assertIs(self.problem.format_point(point), point)
+        self.assertEqual(self.typed_problem.format_point(point).tolist(),
+                         [0.25, 1.0, 2.0, 3.0])
+        self.assertEqual(point.tolist(), [0.25, 1.0, 2.4, 2.6])
+
+    def test_get_objectives(self):
+        self.assertEqual(self.problem.get_objectives(), [])
+
+    def test_get_objective_names(self):
+        self.assertEqual(self.problem.get_objective_names(), [])
+
+    def test_get_constraints(self):
+        constraints = self.problem.get_constraints()
+        self.assertEqual(len(constraints), 2)
+        self.assertTrue(constraints[0](np.array([0.0, 0.5, 0.5]), {}))
+        self.assertFalse(constraints[1](np.array([0.0, 1.0, 0.5]), {}))
+
+class Reconstruction_Plan_Test_Case(SettingsTestCase):
+    """
+    Test case with a small network for the reconstruction planning problems.
+    """
+
+    def setUp(self):
+        np.random.seed(1)
+        self.arguments = Arguments("settings.json", [
+            "--network-size", "7", "7", "--network-padding", "1", "1",
+            "--number-of-measurements", "12", "--delta-rate", "0.5"
+        ])
+        settings = self.arguments.get_settings("planning_assignment")
+        settings.set("vehicle_home_locations", [[0, 0], [0, 6]])
+        settings.set("vehicle_home_directions", [0, 3])
+
+        self.import_manager = Import_Manager()
+
+    def _get_reference(self, problem, point):
+        # Evaluate the coverage and intersections of a point using a weight
+        # matrix that has exactly one row for each link, like before the
+        # footprints of the links were used.
+        weight_matrix = Weight_Matrix(self.arguments, problem.padding,
+                                      problem.size, snap_inside=True,
+                                      number_of_links=1)
+        point = problem.format_point(point)
+        for i in range(problem.N):
+            weight_matrix.update(*problem.generate_positions(point, i))
+
+        matrix = weight_matrix.output()
+        if weight_matrix._link_count == 0:
+            return False, 0
+
+        return weight_matrix.check(), -np.sum(np.sum(matrix > 0, axis=0))
+
+@covers(Reconstruction_Plan)
+class TestPlanningProblemReconstructionPlan(Reconstruction_Plan_Test_Case):
+    def setUp(self):
+        super(TestPlanningProblemReconstructionPlan, self).setUp()
+        self.problem = Reconstruction_Plan_Discrete(self.arguments,
+                                                    self.import_manager)
+
+    def test_initialization(self):
+        with self.assertRaises(ValueError):
+            Reconstruction_Plan_Discrete("arguments", self.import_manager)
+
+        settings = self.arguments.get_settings("reconstruction")
+        self.assertEqual(settings.get("model_class"), "Ellipse_Model")
+        self.assertEqual(self.problem.N, 12)
+        self.assertEqual(self.problem.size, [5, 5])
+        self.assertEqual(self.problem.unsnappable_max, 12 * 0.75)
+        self.assertEqual(self.problem.delta_rate, 0.5)
+
+        # The footprint of a link that intersects all pixels has 25 bits set.
+        self.assertEqual(self.problem.pixels, 25)
+        self.assertEqual(self.problem.full_footprint.tolist(), [255, 255, 255, 128])
+        self.assertEqual(self.problem._popcount[self.problem.full_footprint].sum(), 25)
+
+        self.assertIsInstance(self.problem.weight_matrix, Weight_Matrix)
+        self.assertIsInstance(self.problem.assigner, Greedy_Assignment)
+        self.assertEqual(self.problem.context["weight_matrix"],
+                         self.problem.weight_matrix)
+
+    def test_get_domain(self):
+        with self.assertRaises(NotImplementedError):
+            Reconstruction_Plan.get_domain(self.problem)
+
+    def test_get_weight_matrix(self):
+        weight_matrix = self.problem.get_weight_matrix()
+        self.assertIsInstance(weight_matrix, Weight_Matrix)
+        self.assertIsNot(weight_matrix, self.problem.weight_matrix)
+
+    def test_create_context(self):
+        context = Reconstruction_Plan.create_context(self.problem)
+        self.assertEqual(sorted(context.keys()), ["assigner", "weight_matrix"])
+        self.assertIsInstance(context["weight_matrix"], Weight_Matrix)
+        self.assertIsInstance(context["assigner"], Greedy_Assignment)
+
+    def test_format_steps(self):
+        steps = self.problem.format_steps([1, 2, 3, 4])
+        self.assertEqual(steps.tolist(), [1] * 12 + [2] * 12 + [3] * 12 + [4] * 12)
+
+        steps = self.problem.format_steps([1, 2, 3])
+        self.assertEqual(steps.tolist()[:6], [1, 2, 3, 1, 2, 3])
+        self.assertEqual(len(steps), 48)
+
+    def test_generate_positions(self):
+        with self.assertRaises(NotImplementedError):
+            Reconstruction_Plan.generate_positions(self.problem, np.zeros(48), 0)
+
+    def test_get_positions(self):
+        point = np.array([0] * 12 + [1] * 12 + [6] * 12 + [5] * 12)
+        point[[0, 12, 24, 36]] = 0
+        positions, unsnappable = self.problem.get_positions(point, self.problem.weight_matrix)
+        self.assertEqual(positions.tolist(), [[[0, 1], [6, 5]]] * 11)
+        self.assertEqual(unsnappable, 1)
+
+    def test_get_measurements(self):
+        point = np.array([0] * 12 + [1] * 12 + [6] * 12 + [5] * 12)
+        point[[0, 12, 24, 36]] = 0
+        point[1] = 1
+        weight_matrix = self.problem.weight_matrix
+
+        measurements, footprints = \
+            self.problem.get_measurements(point, [0, 1, 2], weight_matrix)
+        self.assertEqual(measurements, [None, [[1, 1], [6, 5]], [[0, 1], [6, 5]]])
+        self.assertEqual(footprints.shape, (3, 4))
+        self.assertEqual(footprints[0].tolist(), [0, 0, 0, 0])
+
+        # The footprints are the packed pixels that the links intersect.
+        matrix = weight_matrix.output()[:2]
+        self.assertEqual(footprints[1:].tolist(),
+                         np.packbits(matrix > 0, axis=1).tolist())
+
+        # Links in the cache are not added to the weight matrix again.
+        links = Evaluation_Cache(10)
+        self.problem.get_measurements(point, [1, 3], weight_matrix, links)
+        self.assertEqual(len(links), 2)
+        self.assertEqual(weight_matrix._link_count, 2)
+
+        cached, cached_footprints = \
+            self.problem.get_measurements(point, [0, 1, 2], weight_matrix, links)
+        self.assertEqual(cached, measurements)
+        self.assertEqual(cached_footprints.tolist(), footprints.tolist())
+        self.assertEqual(weight_matrix._link_count, 0)
+        self.assertEqual(links.hits, 2)
+
+    def test_get_changed_measurements(self):
+        point = np.zeros(48)
+        parent_point = np.zeros(48)
+        self.assertEqual(self.problem.get_changed_measurements(point, parent_point).tolist(), [])
+
+        point[[1, 15, 40]] = 1
+        self.assertEqual(self.problem.get_changed_measurements(point, parent_point).tolist(),
+                         [1, 3, 4])
+
+    def test_select_positions(self):
+        weight_matrix = self.problem.weight_matrix
+        self.assertEqual(Reconstruction_Plan.select_positions(self.problem, [[0, 3], [6, 3]], weight_matrix),
+                         [(1, 3), (6, 3)])
+        self.assertIsNone(Reconstruction_Plan.select_positions(self.problem, [[0, 0], [0, 6]], weight_matrix))
+
+    def test_evaluate_state(self):
+        arguments = self.arguments
+        for discrete in (True, False):
+            if discrete:
+                problem = self.problem
+            else:
+                problem = Reconstruction_Plan_Continuous(arguments, self.import_manager)
+
+            # The constraint and objective values of the footprints are the
+            # same as those of the rows of a weight matrix, in both full and
+            # delta evaluation.
+            parent = None
+            point = problem.get_random_vector()
+            for _ in range(30):
+                feasible, objectives, state = \
+                    problem.evaluate_state(point, problem.context, parent=parent)
+                covered, intersections = self._get_reference(problem, point)
+                self.assertEqual(state["coverage"].tolist() == problem.full_footprint.tolist(),
+                                 covered)
+                self.assertEqual(-state["intersections"], intersections)
+                self.assertEqual(problem.constraints[-2](point, state), covered)
+                if feasible:
+                    self.assertEqual(objectives[0], intersections)
+
+                full_state = problem.evaluate_state(point, problem.create_context())[2]
+                self.assertEqual(state["measurements"], full_state["measurements"])
+                self.assertEqual(state["footprints"].tolist(),
+                                 full_state["footprints"].tolist())
+
+                if np.random.rand() < 0.5:
+                    parent = state
+                    point = problem.mutate(state["point"], problem.format_steps([1.0, 1.0]))
+                else:
+                    parent = None
+                    point = problem.get_random_vector()
+
+    def test_evaluate_state_assignment(self):
+        point = np.array([0] * 12 + [1] * 12 + [6] * 12 + [5] * 12)
+        context = self.problem.context
+        with patch.object(Greedy_Assignment, "assign",
+                          return_value=([], 10.0)) as assign:
+            feasible, objectives, state = \
+                self.problem.evaluate_state(point, context, feasible=True)
+            self.assertTrue(feasible)
+            self.assertEqual(state["travel_distance"], 10.0)
+            self.assertTrue(state["assigned"])
+            self.assertEqual(objectives[1],
+                             0.5 * state["sensor_distances"].sum() + 0.5 * 10.0)
+
+            # The assignment of the parent is reused for the same positions.
+            point2 = np.copy(point)
+            point2[1] = 0
+            state2 = self.problem.evaluate_state(point2, context,
+                                                 feasible=True,
+                                                 parent=state)[2]
+            self.assertEqual(state2["travel_distance"], 10.0)
+            assign.assert_called_once()
+
+        # Positions that cannot be assigned are infeasible.
+        with patch.object(Greedy_Assignment, "assign",
+                          return_value=([], np.inf)):
+            feasible, objectives = \
+                self.problem.evaluate_state(point, context, feasible=True)[:2]
+            self.assertFalse(feasible)
+            self.assertEqual(objectives, [np.inf, np.inf])
+
+        # Without measurements, there are no sensor distances.
+        point = np.zeros(48)
+        state = self.problem.evaluate_state(point, context)[2]
+        self.assertEqual(state["sensor_distances"].tolist(), [])
+        self.assertEqual(state["unsnappable"], 12)
+
+    def test_get_objectives(self):
+        objectives = self.problem.get_objectives()
+        state = {
+            "intersections": 30,
+            "sensor_distances": np.array([1.0, 2.0]),
+            "travel_distance": 5.0
+        }
+        self.assertEqual(objectives[0](None, state), -30)
+        self.assertEqual(objectives[1](None, state), 0.5 * 3.0 + 0.5 * 5.0)
+
+    def test_get_objective_names(self):
+        self.assertEqual(self.problem.get_objective_names(),
+                         ["intersections", "distances"])
+
+    def test_get_constraints(self):
+        constraints = self.problem.get_constraints()
+        self.assertEqual(len(constraints), 4)
+        full = self.problem.full_footprint
+        self.assertTrue(constraints[2](None, {"coverage": full}))
+        self.assertFalse(constraints[2](None, {"coverage": full - 1}))
+        self.assertTrue(constraints[3](None, {"unsnappable": 8}))
+        self.assertFalse(constraints[3](None, {"unsnappable": 9}))
+
+@covers(Reconstruction_Plan_Continuous)
+class TestPlanningProblemReconstructionPlanContinuous(Reconstruction_Plan_Test_Case):
+    def setUp(self):
+        super(TestPlanningProblemReconstructionPlanContinuous, self).setUp()
+        self.problem = Reconstruction_Plan_Continuous(self.arguments,
+                                                      self.import_manager)
+
+    def test_get_domain(self):
+        num_variables, domain = self.problem.get_domain()
+        self.assertEqual(num_variables, 36)
+        self.assertEqual(domain[0].tolist(), [-7] * 12 + [0.0] * 12 + [0] * 12)
+        self.assertEqual(domain[1].tolist(),
+                         [math.sqrt(98)] * 12 + [math.pi] * 12 + [1] * 12)
+        self.assertEqual(domain[2].tolist(), [np.float] * 24 + [bool] * 12)
+
+    def test_format_steps(self):
+        steps = self.problem.format_steps([1.0, 2.0])
+        self.assertEqual(steps.tolist(), [1.0] * 12 + [2.0] * 12 + [0.5] * 12)
+
+        steps = self.problem.format_steps([1.0, 2.0, 3.0])
+        self.assertEqual(steps.tolist(), [1.0] * 12 + [2.0] * 12 + [3.0] * 12)
+
+    def test_generate_positions(self):
+        point = np.zeros(36)
+        point[0:4] = [2.0, 2.0, 2.0, 2.0]
+        point[12:16] = [math.pi/2, 1.4, math.pi/4, 0.1]
+        point[24:28] = [0, 1, 0, 1]
+
+        # Vertical lines, including cardinal lines close to vertical.
+        self.assertEqual(self.problem.generate_positions(point, 0), [[2.0, 0], [2.0, 7]])
+        self.assertEqual(self.problem.generate_positions(point, 1), [[2.0, 0], [2.0, 7]])
+
+        b = 2.0 / math.sin(math.pi/4)
+        positions = self.problem.generate_positions(point, 2)
+        self.assertEqual(positions[0], [0, b])
+        self.assertAlmostEqual(positions[1][1], 7 + b)
+
+        # Cardinal lines close to horizontal have no slope.
+        b = 2.0 / math.sin(math.pi/2 - 0.1)
+        self.assertEqual(self.problem.generate_positions(point, 3), [[0, b], [7, b]])
+
+        point[12] = 3 * math.pi/4
+        b = 2.0 / math.sin(math.pi/4)
+        positions = self.problem.generate_positions(point, 0)
+        self.assertEqual(positions[0], [0, b])
+        self.assertAlmostEqual(positions[1][1], -7 + b)
+
+@covers(Reconstruction_Plan_Discrete)
+class TestPlanningProblemReconstructionPlanDiscrete(Reconstruction_Plan_Test_Case):
+    def setUp(self):
+        super(TestPlanningProblemReconstructionPlanDiscrete, self).setUp()
+        self.arguments.get_settings("planning_problem").set("link_cache_size", 5)
+        self.problem = Reconstruction_Plan_Discrete(self.arguments,
+                                                    self.import_manager)
+
+    def test_initialization(self):
+        self.assertFalse(self.problem._use_mutation_operator)
+
+    def test_create_context(self):
+        context = self.problem.create_context()
+        self.assertIsInstance(context["weight_matrix"], Weight_Matrix)
+        self.assertIsInstance(context["links"], Evaluation_Cache)
+        self.assertEqual(context["links"].size, 5)
+
+        # The cache keeps the most recently used links.
+        point = self.problem.get_random_vector()
+        self.problem.evaluate_state(point, context)
+        self.assertEqual(len(context["links"]), 5)
+
+    def test_get_domain(self):
+        num_variables, domain = self.problem.get_domain()
+        self.assertEqual(num_variables, 48)
+        self.assertEqual(domain[0].tolist(), [0] * 48)
+        self.assertEqual(domain[1].tolist(), [8] * 48)
+        self.assertEqual(domain[2].tolist(), [np.int] * 48)
+
+    def test_format_steps(self):
+        steps = self.problem.format_steps([1.0, 2.0])
+        self.assertEqual(steps.tolist(), ([1.0] * 12 + [2.0] * 12) * 2)
+
+        steps = self.problem.format_steps([1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(steps.tolist(), [1.0] * 12 + [2.0] * 12 + [3.0] * 12 + [4.0] * 12)
+
+    def test_mutate(self):
+        steps = self.problem.format_steps([1.0, 1.0])
+        for use_mutation_operator in (False, True):
+            self.problem._use_mutation_operator = use_mutation_operator
+            for _ in range(10):
+                point = self.problem.get_random_vector()
+                original = np.copy(point)
+                mutation = self.problem.mutate(point, steps)
+                self.assertEqual(point.tolist(), original.tolist())
+                self.assertTrue(np.all((mutation >= 0) & (mutation < 8)))
+
+        # The mutation operator moves the second position of a measurement to
+        # the other side of the grid.
+        point = np.array([0] * 12 + [3] * 12 + [0] * 12 + [3] * 12, dtype=float)
+        with patch.object(np.random, "choice", return_value=0):
+            mutation = self.problem.mutate(point, np.zeros(48))
+
+        self.assertEqual(mutation[24:36].tolist(), [5] * 12)
+        self.assertEqual(mutation[36:].tolist(), [3] * 12)
+
+    def test_generate_positions(self):
+        point = np.arange(48, dtype=float) + 0.5
+        self.assertEqual(self.problem.generate_positions(point, 1),
+                         [[1, 13], [25, 37]])
+
+    def test_select_positions(self):
+        weight_matrix = self.problem.weight_matrix
+        self.assertIsNone(self.problem.select_positions([[0, 0], [0, 6]], weight_matrix))
+
+        # Valid positions outside the network are kept, while others are
+        # snapped to the grid positions at the boundary of the network.
+        self.assertEqual(self.problem.select_positions([[0, 3], [6, 3]], weight_matrix),
+                         [[0, 3], [6, 3]])
+        self.assertEqual(self.problem.select_positions([[0, 3], [3, 3]], weight_matrix),
+                         [[0, 3], [6.0, 3.0]])
@@ -0,0 +1,161 @@
+import os
+import shutil
+import tempfile
+import thread
+from mock import patch, MagicMock
+from ..core.Thread_Manager import Thread_Manager
+from ..reconstruction.Buffer import Buffer
+from ..reconstruction.Capture_Replay import Capture_Replay
+from ..reconstruction.Stream_Buffer import Stream_Buffer
+from ..settings import Arguments
+from ..zigbee.Clock import Clock
+from ..zigbee.Packet import Packet
+from ..zigbee.Packet_Capture import Packet_Capture
+from core_thread_manager import ThreadableTestCase
+from settings import SettingsTestCase
+
+class TestReconstructionCaptureReplay(ThreadableTestCase, SettingsTestCase):
+    def setUp(self):
+        super(TestReconstructionCaptureReplay, self).setUp()
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.filename = os.path.join(directory, "capture.bin")
+
+        self.arguments = Arguments("settings.json", [
+            "--stream-replay-file", self.filename,
+            "--stream-replay-speed", "0",
+            "--stream-calibrate"
+        ])
+        self.settings = self.arguments.get_settings("reconstruction_stream")
+        self.thread_manager = Thread_Manager()
+        self.clock = MagicMock(spec=Clock)
+        self.clock.time.return_value = 0.0
+
+        self.replay = Capture_Replay(self.arguments, self.thread_manager,
+                                     clock=self.clock)
+
+        # Capture two RSSI ground station packets with an RSSI broadcast
+        # packet in between them, which is not replayed.
+        capture = Packet_Capture(self.filename)
+        for timestamp, specification in [(10.0, "rssi_ground_station"),
+                                         (11.0, "rssi_broadcast"),
+                                         (12.0, "rssi_ground_station")]:
+            packet = Packet()
+            packet.set("specification", specification)
+            for field in Packet._specifications[specification]:
+                if "value" not in field:
+                    packet.set(field["name"], 0)
+
+            capture.write(packet, timestamp)
+
+        capture.close()
+
+    def test_initialization(self):
+        self.assertEqual(self.replay.thread_name, "capture_replay")
+        self.assertEqual(self.replay._settings, self.settings)
+        self.assertIsInstance(self.replay._capture, Packet_Capture)
+        self.assertEqual(self.replay._capture.filename, self.filename)
+        self.assertEqual(self.replay._speed, 0.0)
+        self.assertEqual(self.replay._clock, self.clock)
+        self.assertIsNone(self.replay._buffer)
+        self.assertEqual(self.replay._count, 0)
+        self.assertFalse(self.replay._activated)
+        self.assertFalse(self.replay._stopped.is_set())
+
+        # The system clock is used by default.
+        replay = Capture_Replay(self.arguments, self.thread_manager)
+        self.assertIsInstance(replay._clock, Clock)
+
+    def test_number_of_sensors(self):
+        settings = self.arguments.get_settings("zigbee_base")
+        self.assertEqual(self.replay.number_of_sensors,
+                         settings.get("number_of_sensors"))
+
+    def test_buffer(self):
+        # Providing an invalid buffer raises an exception.
+        with self.assertRaises(ValueError):
+            self.replay.buffer = []
+
+        # Stream buffers can register the replay like an RF sensor.
+        buffer = Stream_Buffer(self.settings)
+        buffer.register_rf_sensor(self.replay)
+        self.assertEqual(self.replay.buffer, buffer)
+        self.assertEqual(buffer.number_of_sensors, self.replay.number_of_sensors)
+
+    def test_count(self):
+        self.assertEqual(self.replay.count, 0)
+
+        self.replay.buffer = Buffer(self.settings)
+        self.replay.run()
+        self.assertEqual(self.replay.count, 2)
+
+    def test_activate(self):
+        with patch.object(thread, "start_new_thread") as start_new_thread_mock:
+            self.replay.activate()
+
+            # The replay must be registered and its thread must be started.
+            self.assertTrue(self.replay._activated)
+            self.assertIn("capture_replay", self.thread_manager._threads)
+            start_new_thread_mock.assert_called_once_with(self.replay._loop, ())
+
+            # Activating again does not start another thread.
+            self.replay.activate()
+            self.assertEqual(start_new_thread_mock.call_count, 1)
+
+    def test_deactivate(self):
+        with patch.object(thread, "start_new_thread"):
+            self.replay.activate()
+
+        self.replay.deactivate()
+        self.assertFalse(self.replay._activated)
+        self.assertTrue(self.replay._stopped.is_set())
+        self.assertNotIn("capture_replay", self.thread_manager._threads)
+
+    def test_run(self):
+        # A buffer must be set.
+        with self.assertRaises(ValueError):
+            self.replay.run()
+
+        buffer = Buffer(self.settings)
+        self.replay.buffer = buffer
+
+        # All RSSI ground station packets must be replayed as fast as possible.
+        self.assertEqual(self.replay.run(), 2)
+        self.assertEqual(buffer.count(), 2)
+        for dummy in range(2):
+            self.assertEqual(buffer.get().get("specification"), "rssi_ground_station")
+
+    def test_run_paced(self):
+        # The packets must be paced according to the speed factor.
+        self.replay._speed = 2.0
+        self.replay.buffer = Buffer(self.settings)
+
+        with patch.object(self.replay._stopped, "wait", return_value=False) as wait_mock:
+            self.assertEqual(self.replay.run(), 2)
+
+            # The second packet arrived two seconds after the first one, so the
+            # replay waits one second.
+            wait_mock.assert_called_once_with(1.0)
+
+        # Deactivation stops the replay while it waits.
+        self.replay._count = 0
+        with patch.object(self.replay._stopped, "wait", return_value=True):
+            self.assertEqual(self.replay.run(), 1)
+
+        # Deactivation before a packet is due stops the replay.
+        self.replay._count = 0
+        self.replay._speed = 0.0
+        self.replay._stopped.set()
+        self.assertEqual(self.replay.run(), 0)
+
+    def test_loop(self):
+        self.replay.buffer = Buffer(self.settings)
+        self.replay._loop()
+        self.assertEqual(self.replay.count, 2)
+
+        # Exceptions must interrupt the main thread.
+        with patch.object(Capture_Replay, "run", side_effect=RuntimeError):
+            with patch.object(Thread_Manager, "interrupt") as interrupt_mock:
+                self.replay._loop()
+                interrupt_mock.assert_called_once_with("capture_replay")
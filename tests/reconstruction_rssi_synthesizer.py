@@ -0,0 +1,224 @@
+import os
+import tempfile
+import numpy as np
+from dronekit import LocationLocal
+from matplotlib import image
+from mock import patch
+from ..geometry.Geometry import Geometry
+from ..reconstruction.Gaussian_Model import Gaussian_Model
+from ..reconstruction.RSSI_Synthesizer import RSSI_Synthesizer
+from ..reconstruction.Weight_Matrix import Weight_Matrix
+from ..settings.Arguments import Arguments
+from settings import SettingsTestCase
+
+class TestReconstructionRSSISynthesizer(SettingsTestCase):
+    def setUp(self):
+        self.origin = (0, 0)
+        self.size = (4, 4)
+        self.arguments = Arguments("settings.json", ["--shadowing", "0"])
+        self.settings = self.arguments.get_settings("rssi_synthesizer")
+        self.synthesizer = RSSI_Synthesizer(self.arguments, self.origin,
+                                            self.size)
+
+    def _create_image(self, data):
+        """
+        Create a temporary image file with the given `data` and return the
+        file name. The file is removed after the test.
+        """
+
+        handle, filename = tempfile.mkstemp(suffix=".png")
+        os.close(handle)
+        self.addCleanup(os.remove, filename)
+        image.imsave(filename, data, cmap="gray", vmin=0.0, vmax=1.0)
+
+        return filename
+
+    def test_initialization(self):
+        # Verify that only `Arguments` objects can be used to initialize.
+        with self.assertRaises(TypeError):
+            RSSI_Synthesizer(self.settings, self.origin, self.size)
+        with self.assertRaises(TypeError):
+            RSSI_Synthesizer(None, self.origin, self.size)
+
+        # The settings must be loaded.
+        self.assertEqual(self.synthesizer._reference_rssi,
+                         self.settings.get("reference_rssi"))
+        self.assertEqual(self.synthesizer._path_loss_exponent,
+                         self.settings.get("path_loss_exponent"))
+        self.assertEqual(self.synthesizer._shadowing, 0.0)
+        self.assertEqual(self.synthesizer._object_attenuation,
+                         self.settings.get("object_attenuation"))
+        self.assertEqual(self.synthesizer._minimum_rssi,
+                         self.settings.get("minimum_rssi"))
+        self.assertEqual(self.synthesizer._batch_size,
+                         self.settings.get("batch_size"))
+        self.assertIsInstance(self.synthesizer._random_state,
+                              np.random.RandomState)
+
+        # The model from the reconstruction settings must be used.
+        self.assertIsInstance(self.synthesizer._model, Gaussian_Model)
+
+        # The grid must cover the network and be empty.
+        self.assertEqual(self.synthesizer._origin, self.origin)
+        self.assertEqual(self.synthesizer._width, self.size[0])
+        self.assertEqual(self.synthesizer._height, self.size[1])
+        self.assertEqual(self.synthesizer._grid_x[0, 0], 0.5)
+        self.assertEqual(self.synthesizer._grid_y[3, 0], 3.5)
+        self.assertTrue(np.array_equal(self.synthesizer._attenuation,
+                                       np.zeros((4, 4))))
+
+        # An attenuation image from the settings must be loaded.
+        filename = self._create_image(np.eye(4))
+        self.settings.set("attenuation_image", filename)
+        synthesizer = RSSI_Synthesizer(self.arguments, self.origin, self.size)
+        self.assertNotEqual(np.sum(synthesizer.attenuation), 0.0)
+
+    def test_attenuation(self):
+        # The attenuation grid must be returned.
+        self.assertEqual(self.synthesizer.attenuation.shape, (4, 4))
+
+        # Attenuation grids with an incorrect shape are not allowed.
+        with self.assertRaises(ValueError):
+            self.synthesizer.attenuation = np.zeros((3, 4))
+
+        # A valid attenuation grid must be set.
+        attenuation = np.arange(16).reshape(4, 4)
+        self.synthesizer.attenuation = attenuation
+        self.assertTrue(np.array_equal(self.synthesizer.attenuation,
+                                       attenuation))
+
+    def test_load_image(self):
+        object_attenuation = self.settings.get("object_attenuation")
+
+        # The image must be flipped such that its bottom row is at the origin.
+        data = np.zeros((4, 4))
+        data[0, 1] = 1.0
+        self.synthesizer.load_image(self._create_image(data))
+
+        expected = np.zeros((4, 4))
+        expected[3, 1] = object_attenuation
+        self.assertTrue(np.allclose(self.synthesizer.attenuation, expected))
+
+        # Images with integer intensities must be scaled.
+        with patch.object(image, "imread",
+                          return_value=np.full((4, 4), 255, dtype=np.uint8)):
+            self.synthesizer.load_image("attenuation.png")
+
+        self.assertTrue(np.allclose(self.synthesizer.attenuation,
+                                    object_attenuation))
+
+    def test_load_objects(self):
+        geometry = Geometry()
+        object_attenuation = self.settings.get("object_attenuation")
+
+        # Spherical objects cover the pixels within their radius.
+        self.synthesizer.load_objects([{
+            'center': LocationLocal(0.5, 0.5, 0.0),
+            'radius': 1.1
+        }], geometry)
+
+        expected = np.zeros((4, 4))
+        expected[0, 0:2] = object_attenuation
+        expected[1, 0] = object_attenuation
+        self.assertTrue(np.array_equal(self.synthesizer.attenuation, expected))
+
+        # Polygons and faces of objects cover the pixels inside them.
+        polygon = (
+            LocationLocal(2, 2, 0.0), LocationLocal(4, 2, 0.0),
+            LocationLocal(4, 4, 0.0), LocationLocal(2, 4, 0.0)
+        )
+        faces = [
+            [LocationLocal(0, 3, 0.0), LocationLocal(1, 3, 0.0),
+             LocationLocal(1, 4, 0.0)],
+            [LocationLocal(0, 3, 0.0), LocationLocal(0, 4, 0.0),
+             LocationLocal(0, 4, 5.0)]
+        ]
+        self.synthesizer.load_objects([polygon, faces], geometry)
+
+        expected[2:4, 2:4] = object_attenuation
+        expected[3, 0] = object_attenuation
+        self.assertTrue(np.array_equal(self.synthesizer.attenuation, expected))
+
+    def test_get_path_loss(self):
+        reference_rssi = self.settings.get("reference_rssi")
+        exponent = self.settings.get("path_loss_exponent")
+
+        # The number of sources and destinations must be equal.
+        with self.assertRaises(ValueError):
+            self.synthesizer.get_path_loss([(0, 0), (0, 1)], [(4, 4)])
+
+        # Links in an empty network only have the log-distance path loss,
+        # where short links have the reference distance.
+        rssi = self.synthesizer.get_path_loss([(0, 2), (1, 1)], [(4, 2), (1, 1)])
+        self.assertAlmostEqual(rssi[0], reference_rssi - 10 * exponent * np.log10(4))
+        self.assertAlmostEqual(rssi[1], reference_rssi)
+
+        # The attenuation must be weighted in the same way as in the weight
+        # matrix of the reconstruction, regardless of the batch size.
+        attenuation = np.arange(16, dtype=np.float).reshape(4, 4)
+        self.synthesizer.attenuation = attenuation
+        self.synthesizer._batch_size = 1
+
+        weight_matrix = Weight_Matrix(self.arguments, self.origin, self.size)
+        weight_matrix.update((0, 2), (4, 2))
+        weight_matrix.update((2, 0), (2, 4))
+        weights = weight_matrix.output()
+
+        rssi = self.synthesizer.get_path_loss([(0, 2), (2, 0)], [(4, 2), (2, 4)])
+        expected = reference_rssi - 10 * exponent * np.log10(4) - np.dot(weights, attenuation.ravel())
+        self.assertTrue(np.allclose(rssi, expected))
+
+    def test_synthesize(self):
+        sources = [(0, 2), (0, 0), (0, 0)]
+        destinations = [(4, 2), (1000, 0), (0, 0)]
+
+        # Without shadowing, the RSSI is rounded and limited to the range of
+        # the receiver sensitivity up to zero.
+        self.synthesizer._reference_rssi = 5.0
+        rssi = self.synthesizer.synthesize(sources, destinations)
+        self.assertEqual(rssi.dtype, np.int)
+        self.assertEqual(rssi.tolist(), [-7, -55, 0])
+
+        # Shadowing must be deterministic for a random seed.
+        self.synthesizer._shadowing = 4.0
+        rssi = self.synthesizer.synthesize(sources * 100, destinations * 100)
+        self.assertNotEqual(rssi[:3].tolist(), [-7, -55, 0])
+        self.assertGreaterEqual(np.min(rssi), self.settings.get("minimum_rssi"))
+        self.assertLessEqual(np.max(rssi), 0)
+
+        synthesizer = RSSI_Synthesizer(self.arguments, self.origin, self.size)
+        synthesizer._reference_rssi = 5.0
+        synthesizer._shadowing = 4.0
+        other_rssi = synthesizer.synthesize(sources * 100, destinations * 100)
+        self.assertEqual(rssi.tolist(), other_rssi.tolist())
+
+    def test_get_boundary_links(self):
+        sources, destinations = self.synthesizer.get_boundary_links(2)
+
+        # Each position links to all positions on the other three sides.
+        self.assertEqual(sources.shape, (8 * 6, 2))
+        self.assertEqual(destinations.shape, (8 * 6, 2))
+        self.assertEqual(sources[0].tolist(), [1.0, 0.0])
+        self.assertEqual(destinations[0].tolist(), [4.0, 1.0])
+        self.assertEqual(sources[-1].tolist(), [0.0, 3.0])
+        self.assertEqual(destinations[-1].tolist(), [3.0, 4.0])
+
+        # All positions must be on the boundary of the network.
+        weight_matrix = Weight_Matrix(self.arguments, self.origin, self.size)
+        for point in np.vstack([sources, destinations]):
+            self.assertTrue(weight_matrix.is_valid_point(point))
+
+    def test_create_dump(self):
+        sources = [(0, 2), (2, 0), (0, 1)]
+        destinations = [(4, 2), (2, 4), (4, 1)]
+        rssi = self.synthesizer.synthesize(sources, destinations)
+
+        dump = self.synthesizer.create_dump(sources, destinations)
+        self.assertEqual(dump["number_of_sensors"], 2)
+        self.assertEqual(dump["origin"], [0, 0])
+        self.assertEqual(dump["size"], [4, 4])
+        self.assertEqual(dump["packets"], [
+            [1, 0.0, 2.0, True, 4.0, 2.0, True, rssi[0]],
+            [2, 2.0, 0.0, True, 2.0, 4.0, True, rssi[1]],
+            [1, 0.0, 1.0, True, 4.0, 1.0, True, rssi[2]]
+        ])
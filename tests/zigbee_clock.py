@@ -0,0 +1,68 @@
+# Core imports
+import time
+import unittest
+
+# Library imports
+from mock import patch
+
+# Package imports
+from ..zigbee.Clock import Clock
+
+class TestZigBeeClock(unittest.TestCase):
+    def setUp(self):
+        super(TestZigBeeClock, self).setUp()
+
+        self.clock = Clock()
+
+    def test_initialization(self):
+        # The clock must initially follow the system clock.
+        self.assertEqual(self.clock._offset, 0.0)
+        self.assertEqual(self.clock._drift, 0.0)
+        self.assertEqual(self.clock._reference_time, 0.0)
+
+    @patch("time.time", return_value=1000.0)
+    def test_offset(self, time_mock):
+        # The offset must include the drift since the reference time.
+        self.clock.adjust(2.0, drift=0.01, reference_time=900.0)
+        self.assertAlmostEqual(self.clock.offset, 3.0)
+
+    def test_drift(self):
+        # The drift must be returned.
+        self.clock.adjust(2.0, drift=0.01)
+        self.assertEqual(self.clock.drift, 0.01)
+
+    @patch("time.time", return_value=1000.0)
+    def test_adjust(self, time_mock):
+        # The reference time is the current time if it is not given.
+        self.clock.adjust(2, drift=0.5)
+        self.assertEqual(self.clock._offset, 2.0)
+        self.assertEqual(self.clock._drift, 0.5)
+        self.assertEqual(self.clock._reference_time, 1000.0)
+
+        self.clock.adjust(-1.5, reference_time=990.0)
+        self.assertEqual(self.clock._offset, -1.5)
+        self.assertEqual(self.clock._drift, 0.0)
+        self.assertEqual(self.clock._reference_time, 990.0)
+
+    @patch("time.time", return_value=12345678.90)
+    def test_time(self, time_mock):
+        # The system time must be returned.
+        self.assertEqual(self.clock.time(), 12345678.90)
+        time_mock.assert_called_once_with()
+
+        # The offset and drift of an adjusted clock must be applied.
+        self.clock.adjust(2.0, drift=0.01, reference_time=12345578.90)
+        self.assertAlmostEqual(self.clock.time(), 12345681.90)
+
+    @patch.object(time, "sleep")
+    def test_sleep(self, sleep_mock):
+        # The system must delay for the given number of seconds.
+        self.clock.sleep(0.5)
+        sleep_mock.assert_called_once_with(0.5)
+
+    @patch("time.time", return_value=1000.0)
+    def test_get_offset(self, time_mock):
+        # The offset changes by the drift relative to the reference time.
+        self.clock.adjust(2.0, drift=-0.1, reference_time=1000.0)
+        self.assertEqual(self.clock._get_offset(1000.0), 2.0)
+        self.assertAlmostEqual(self.clock._get_offset(1010.0), 1.0)
@@ -14,6 +14,10 @@ class TestZigBeeNTP(unittest.TestCase):
 
     def test_initialization(self):
         self.assertEqual(self._ntp._sensor, self._sensor)
+        self.assertEqual(self._ntp._samples, 1)
+        self.assertFalse(self._ntp._drift)
+        self.assertEqual(self._ntp._measurements, [])
+        self.assertFalse(self._ntp._finished.is_set())
 
         # A valid `RF_Sensor` object must be provided.
         with self.assertRaises(TypeError):
@@ -39,6 +43,17 @@ class TestZigBeeNTP(unittest.TestCase):
         self.assertEqual(to, 0)
         time_mock.assert_called_once_with()
 
+        # A new exchange must not be finished yet.
+        self.assertFalse(self._ntp._finished.is_set())
+
+    def test_wait(self):
+        # Waiting for an exchange that has not finished times out.
+        self.assertFalse(self._ntp.wait(0.0))
+
+        # Waiting for a finished exchange returns immediately.
+        self._ntp._finished.set()
+        self.assertTrue(self._ntp.wait(0.0))
+
     @patch("time.time", side_effect=[43, 44])
     def test_process(self, time_mock):
         # Construct the NTP packet for the second and third timestamp.
@@ -96,18 +111,81 @@ class TestZigBeeNTP(unittest.TestCase):
         self.assertEqual(packet.get("timestamp_4"), 45)
         time_mock.assert_called_once_with()
 
-    @patch("subprocess.call")
-    def test_finish(self, mock_subprocess_call):
-        # Construct a complete NTP packet.
+    def _create_packet(self, timestamps):
+        """
+        Create a complete NTP packet with the given four `timestamps`.
+        """
+
         packet = Packet()
         packet.set("specification", "ntp")
         packet.set("sensor_id", 1)
-        packet.set("timestamp_1", 100)
-        packet.set("timestamp_2", 150)
-        packet.set("timestamp_3", 160)
-        packet.set("timestamp_4", 120)
+        for index, timestamp in enumerate(timestamps):
+            packet.set("timestamp_{}".format(index + 1), timestamp)
+
+        return packet
+
+    def test_finish(self):
+        packet = self._create_packet([100, 150, 160, 120])
+
+        # Verify that the clock offset is correctly calculated and that the 
+        # clock of the sensor is adjusted after one sample, without changing 
+        # the system clock.
+        with patch("subprocess.call") as subprocess_call_mock:
+            clock_offset = self._ntp.finish(packet)
+
+            subprocess_call_mock.assert_not_called()
+
+        self.assertEqual(clock_offset, 45)
+        self.assertTrue(self._ntp._finished.is_set())
+        self._sensor.clock.adjust.assert_called_once_with(45.0, drift=0.0,
+                                                          reference_time=110.0)
+        self.assertTrue(self._sensor._synchronized)
+        self.assertEqual(self._ntp._measurements, [])
+
+        # The clock is only adjusted once enough samples have been measured.
+        self._sensor.clock.adjust.reset_mock()
+        self._ntp._samples = 2
 
-        # Verify that the clock offset is correctly calculated.
         clock_offset = self._ntp.finish(packet)
         self.assertEqual(clock_offset, 45)
-        self.assertEqual(mock_subprocess_call.call_count, 1)
+        self.assertEqual(self._ntp._measurements, [(10.0, 45.0, 110.0)])
+        self._sensor.clock.adjust.assert_not_called()
+
+    def test_synchronize(self):
+        # The offset of the exchange with the minimum delay must be used.
+        self._ntp._measurements = [
+            (0.5, 10.2, 100.0),
+            (0.1, 10.0, 101.0),
+            (0.3, 9.7, 102.0)
+        ]
+        self._ntp._synchronize()
+
+        self._sensor.clock.adjust.assert_called_once_with(10.0, drift=0.0,
+                                                          reference_time=101.0)
+        self.assertTrue(self._sensor._synchronized)
+        self.assertEqual(self._ntp._measurements, [])
+
+        # The drift must be applied when it is enabled.
+        self._sensor.clock.adjust.reset_mock()
+        self._ntp._drift = True
+        self._ntp._measurements = [
+            (0.2, 10.0, 100.0),
+            (0.1, 10.5, 101.0)
+        ]
+        self._ntp._synchronize()
+
+        self._sensor.clock.adjust.assert_called_once_with(10.5, drift=0.5,
+                                                          reference_time=101.0)
+
+    def test_estimate_drift(self):
+        # The drift is the slope of the offsets over time.
+        self._ntp._measurements = [
+            (0.1, 1.0, 10.0),
+            (0.1, 1.1, 20.0),
+            (0.1, 1.2, 30.0)
+        ]
+        self.assertAlmostEqual(self._ntp._estimate_drift(), 0.01)
+
+        # Measurements that do not span any time have no drift.
+        self._ntp._measurements = [(0.1, 1.0, 10.0), (0.2, 1.5, 10.0)]
+        self.assertEqual(self._ntp._estimate_drift(), 0.0)
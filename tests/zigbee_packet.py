@@ -1,5 +1,6 @@
 import struct
 import unittest
+from mock import patch
 from ..zigbee.Packet import Packet
 
 class ZigBeePacketTestCase(unittest.TestCase):
@@ -39,8 +40,13 @@ class TestZigBeePacket(ZigBeePacketTestCase):
         # The packet must be empty.
         self.assertEqual(self.packet._contents, {})
 
-        # The specifications dictionary must be set.
+        # The specifications dictionary must be set and shared between 
+        # packets.
         self.assertIsInstance(self.packet._specifications, dict)
+        self.assertIsInstance(Packet._specifications, dict)
+
+        # The packet must not have been serialized yet.
+        self.assertIsNone(self.packet._serialized)
 
         # The packet must be private by default.
         self.assertTrue(self.packet._private)
@@ -71,6 +77,11 @@ class TestZigBeePacket(ZigBeePacketTestCase):
         # a KeyError, but instead does nothing.
         self.packet.unset("foo")
 
+        # Unsetting a field discards the serialized packet.
+        self.waypoint_add_packet.serialize()
+        self.waypoint_add_packet.unset("index")
+        self.assertIsNone(self.waypoint_add_packet._serialized)
+
     def test_get(self):
         # The value of a present key should be fetched.
         self.packet._contents["foo"] = "bar"
@@ -164,6 +175,25 @@ class TestZigBeePacket(ZigBeePacketTestCase):
         packed_message = self.waypoint_add_packet.serialize()
         self.assertEqual(packed_message, self.waypoint_add_message)
 
+        # The serialized packet must be kept and returned when serializing 
+        # again.
+        self.assertEqual(self.waypoint_add_packet._serialized,
+                         self.waypoint_add_message)
+        with patch.object(Packet, "_pack_field") as pack_field_mock:
+            packed_message = self.waypoint_add_packet.serialize()
+            self.assertEqual(packed_message, self.waypoint_add_message)
+            pack_field_mock.assert_not_called()
+
+        # Fields that are changed after serializing must be included.
+        self.waypoint_add_packet.set("to_id", 3)
+        self.waypoint_add_packet.set("latitude", 1.5)
+
+        packet = Packet()
+        for key, value in self.waypoint_add_packet.get_all().iteritems():
+            packet.set(key, value)
+
+        self.assertEqual(self.waypoint_add_packet.serialize(), packet.serialize())
+
     def test_serialize_object_packed(self):
         self.packet.set("specification", "setting_add")
         self.packet.set("index", 0)
@@ -184,6 +214,63 @@ class TestZigBeePacket(ZigBeePacketTestCase):
         packed_message = self.packet.serialize()
         self.assertEqual(packed_message, self.setting_add_list_message)
 
+    def test_get_offsets(self):
+        # Fields with a fixed size have offsets after the identifier.
+        offsets = self.packet._get_offsets("waypoint_add")
+        self.assertEqual(offsets["latitude"], (1, "d"))
+        self.assertEqual(offsets["longitude"], (9, "d"))
+        self.assertEqual(offsets["type"], (25, "B"))
+        self.assertEqual(offsets["to_id"], (39, "B"))
+        self.assertNotIn("id", offsets)
+
+        # Fields with a special format and the fields after them do not have 
+        # a fixed offset.
+        offsets = self.packet._get_offsets("setting_add")
+        self.assertEqual(offsets, {
+            "index": (1, "i"),
+            "key": None,
+            "value": None,
+            "to_id": None
+        })
+
+        # The offsets must be cached between packets.
+        self.assertIs(Packet()._get_offsets("setting_add"), offsets)
+
+    def test_update_serialized(self):
+        # Nothing happens when the packet has not been serialized.
+        self.waypoint_add_packet._update_serialized("to_id", 3)
+        self.assertIsNone(self.waypoint_add_packet._serialized)
+
+        # Fields with a fixed offset are updated in place.
+        self.waypoint_add_packet.serialize()
+        serialized = self.waypoint_add_packet._serialized
+        self.waypoint_add_packet._update_serialized("to_id", 3)
+        self.assertIs(self.waypoint_add_packet._serialized, serialized)
+        self.assertEqual(serialized[-1:], "\x03")
+
+        # Keys that are not in the specification do not change anything.
+        self.waypoint_add_packet._update_serialized("rssi", 42)
+        self.assertIs(self.waypoint_add_packet._serialized, serialized)
+
+        # Values that cannot be packed discard the serialized packet.
+        self.waypoint_add_packet._update_serialized("to_id", "3")
+        self.assertIsNone(self.waypoint_add_packet._serialized)
+
+        # Changing the specification discards the serialized packet.
+        self.waypoint_add_packet.serialize()
+        self.waypoint_add_packet._update_serialized("specification", "waypoint_add")
+        self.assertIsNone(self.waypoint_add_packet._serialized)
+
+        # Fields without a fixed offset discard the serialized packet.
+        self.packet.set("specification", "setting_add")
+        self.packet.set("index", 0)
+        self.packet.set("key", "bar")
+        self.packet.set("value", 42)
+        self.packet.set("to_id", 1)
+        self.packet.serialize()
+        self.packet._update_serialized("key", "quux")
+        self.assertIsNone(self.packet._serialized)
+
     def test_unserialize(self):
         # Empty strings must be refused.
         with self.assertRaises(struct.error):
@@ -199,10 +286,18 @@ class TestZigBeePacket(ZigBeePacketTestCase):
             self.packet.unserialize("\n\x00\x00\x00\x00\x03bar")
 
         # Reset the packet as the previous test changed some fields in the packet.
+        # The serialized packet of a failed attempt must be discarded.
+        self.assertIsNone(self.packet._serialized)
         self.packet = Packet()
 
-        # Valid messages must be unpacked.
-        self.packet.unserialize(self.waypoint_add_message)
+        # Valid messages must be unpacked, and the message must replace any 
+        # earlier serialized packet. Any padding is not included.
+        self.packet.set("specification", "waypoint_clear")
+        self.packet.set("to_id", 2)
+        self.packet.serialize()
+
+        self.packet.unserialize(self.waypoint_add_message + "\x00\x00")
+        self.assertEqual(self.packet._serialized, self.waypoint_add_message)
         self.assertEqual(self.packet.get_all(), {
             "specification": "waypoint_add",
             "latitude": 123456789.12,
@@ -0,0 +1,198 @@
+import os
+import shutil
+import struct
+import tempfile
+from ..zigbee.Packet import Packet
+from ..zigbee.Packet_Capture import Packet_Capture
+from zigbee_packet import ZigBeePacketTestCase
+
+class TestZigBeePacketCapture(ZigBeePacketTestCase):
+    def setUp(self):
+        super(TestZigBeePacketCapture, self).setUp()
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        self.filename = os.path.join(directory, "capture.bin")
+        self.record_size = struct.calcsize(Packet_Capture.RECORD_FORMAT)
+        self.capture = Packet_Capture(self.filename)
+        self.addCleanup(self.capture.close)
+
+    def test_initialization(self):
+        # The file is only opened when a packet is written.
+        self.assertEqual(self.capture._filename, self.filename)
+        self.assertEqual(self.capture._max_size, 10485760)
+        self.assertEqual(self.capture._max_files, 5)
+        self.assertIsNone(self.capture._file)
+        self.assertEqual(self.capture._size, 0)
+        self.assertEqual(self.capture._record_size, self.record_size)
+        self.assertFalse(os.path.exists(self.filename))
+
+    def test_filename(self):
+        self.assertEqual(self.capture.filename, self.filename)
+
+    def test_write(self):
+        # Only packets can be captured.
+        with self.assertRaises(TypeError):
+            self.capture.write(self.waypoint_add_message, 1.0)
+
+        self.capture.write(self.waypoint_add_packet, 1.0)
+        self.capture.write(self.waypoint_add_packet, 2.5)
+        self.capture.flush()
+
+        # The file must contain the header and a record for each packet.
+        with open(self.filename, "rb") as capture_file:
+            contents = capture_file.read()
+
+        header_length = len(Packet_Capture.HEADER)
+        record_length = self.record_size + len(self.waypoint_add_message)
+        self.assertEqual(contents[:header_length], Packet_Capture.HEADER)
+        self.assertEqual(len(contents), header_length + 2 * record_length)
+        self.assertEqual(self.capture._size, len(contents))
+
+        record = contents[header_length:header_length + self.record_size]
+        self.assertEqual(struct.unpack(Packet_Capture.RECORD_FORMAT, record),
+                         (1.0, len(self.waypoint_add_message)))
+        self.assertEqual(contents[header_length + self.record_size:header_length + record_length],
+                         self.waypoint_add_message)
+
+    def test_write_rotate(self):
+        # Each file of the log may only hold two records.
+        record_length = self.record_size + len(self.waypoint_add_message)
+        max_size = len(Packet_Capture.HEADER) + 2 * record_length
+        capture = Packet_Capture(self.filename, max_size=max_size, max_files=2)
+        self.addCleanup(capture.close)
+
+        for timestamp in range(7):
+            capture.write(self.waypoint_add_packet, float(timestamp))
+
+        capture.close()
+
+        # The oldest records must be removed, and the remaining records must
+        # be read in order.
+        filenames = capture.get_filenames()
+        self.assertEqual(filenames, ["{}.1".format(self.filename), self.filename])
+
+        timestamps = [
+            timestamp for filename in filenames
+            for timestamp, dummy in capture.read(filename)
+        ]
+        self.assertEqual(timestamps, [4.0, 5.0, 6.0])
+
+        for filename in filenames:
+            self.assertLessEqual(os.path.getsize(filename), max_size)
+
+        # A record that is larger than the maximum size is still written.
+        capture = Packet_Capture(self.filename, max_size=1, max_files=1)
+        self.addCleanup(capture.close)
+        capture.write(self.waypoint_add_packet, 7.0)
+        capture.write(self.waypoint_add_packet, 8.0)
+        capture.close()
+
+        self.assertEqual(capture.get_filenames(), [self.filename])
+        self.assertEqual([timestamp for timestamp, dummy in capture.read(self.filename)],
+                         [8.0])
+
+    def test_flush(self):
+        # Flushing without an open file does nothing.
+        self.capture.flush()
+        self.assertFalse(os.path.exists(self.filename))
+
+        self.capture.write(self.waypoint_add_packet, 1.0)
+        self.capture.flush()
+        self.assertGreater(os.path.getsize(self.filename), len(Packet_Capture.HEADER))
+
+    def test_close(self):
+        # Closing without an open file does nothing.
+        self.capture.close()
+
+        self.capture.write(self.waypoint_add_packet, 1.0)
+        self.capture.close()
+        self.assertIsNone(self.capture._file)
+
+        # Writing after closing appends to the same file without writing
+        # another header.
+        self.capture.write(self.waypoint_add_packet, 2.0)
+        self.capture.close()
+
+        records = list(self.capture.read(self.filename))
+        self.assertEqual([timestamp for timestamp, dummy in records], [1.0, 2.0])
+
+    def test_get_filenames(self):
+        # No files exist before a packet is written.
+        self.assertEqual(self.capture.get_filenames(), [])
+
+        self.capture.write(self.waypoint_add_packet, 1.0)
+        self.assertEqual(self.capture.get_filenames(), [self.filename])
+
+    def test_read(self):
+        # Files without the header cannot be read.
+        with open(self.filename, "wb") as capture_file:
+            capture_file.write("garbage")
+
+        with self.assertRaises(ValueError):
+            list(self.capture.read(self.filename))
+
+        os.remove(self.filename)
+
+        self.capture.write(self.waypoint_add_packet, 1.0)
+        self.capture.write(self.waypoint_add_packet, 2.0)
+        self.capture.close()
+
+        records = list(self.capture.read(self.filename))
+        self.assertEqual(len(records), 2)
+        for index, record in enumerate(records):
+            timestamp, packet = record
+            self.assertEqual(timestamp, float(index + 1))
+            self.assertIsInstance(packet, Packet)
+            self.assertEqual(packet.get_all(), self.waypoint_add_packet.get_all())
+
+        # Incomplete records at the end of the file are ignored.
+        for length in (self.record_size - 1, self.record_size + 1):
+            with open(self.filename, "rb") as capture_file:
+                contents = capture_file.read()
+
+            with open(self.filename, "wb") as capture_file:
+                capture_file.write(contents[:-len(self.waypoint_add_message) - self.record_size + length])
+
+            records = list(self.capture.read(self.filename))
+            self.assertEqual(len(records), 1)
+
+            with open(self.filename, "wb") as capture_file:
+                capture_file.write(contents)
+
+    def test_get_filename(self):
+        self.assertEqual(self.capture._get_filename(0), self.filename)
+        self.assertEqual(self.capture._get_filename(2), "{}.2".format(self.filename))
+
+    def test_open(self):
+        # A new file starts with the header.
+        self.capture._open()
+        self.assertEqual(self.capture._size, len(Packet_Capture.HEADER))
+        self.capture.close()
+
+        # An existing file is appended to.
+        self.capture._open()
+        self.assertEqual(self.capture._size, len(Packet_Capture.HEADER))
+        self.capture.close()
+
+        with open(self.filename, "rb") as capture_file:
+            self.assertEqual(capture_file.read(), Packet_Capture.HEADER)
+
+    def test_rotate(self):
+        self.capture.write(self.waypoint_add_packet, 1.0)
+        self.capture._rotate()
+
+        # The current file must be moved and a new file must be started.
+        self.assertEqual(self.capture.get_filenames(),
+                         ["{}.1".format(self.filename), self.filename])
+        self.assertEqual(self.capture._size, len(Packet_Capture.HEADER))
+
+        # With only one file, the current file is removed.
+        capture = Packet_Capture(self.filename, max_files=1)
+        self.addCleanup(capture.close)
+        capture.write(self.waypoint_add_packet, 2.0)
+        capture._rotate()
+        capture.close()
+
+        self.assertEqual(list(capture.read(self.filename)), [])
@@ -0,0 +1,68 @@
+import unittest
+from ..zigbee.Receive_Window import Receive_Window
+
+class TestZigBeeReceiveWindow(unittest.TestCase):
+    def setUp(self):
+        super(TestZigBeeReceiveWindow, self).setUp()
+
+        self.window = Receive_Window()
+
+    def test_initialization(self):
+        self.assertEqual(self.window._next_index, 0)
+        self.assertEqual(self.window._buffer, {})
+
+    def test_next_index(self):
+        self.assertEqual(self.window.next_index, 0)
+
+        self.window.receive(0, "a")
+        self.assertEqual(self.window.next_index, 1)
+
+    def test_selective_acks(self):
+        self.assertEqual(self.window.selective_acks, 0)
+
+        # Bits are set for items beyond the next index.
+        self.window.receive(1, "b")
+        self.window.receive(3, "d")
+        self.assertEqual(self.window.selective_acks, (1 << 0) | (1 << 2))
+
+        # The bitmap moves along with the window.
+        self.window.receive(0, "a")
+        self.assertEqual(self.window.selective_acks, 1 << 0)
+
+        # The item at the far end of the window uses the last bit.
+        self.window.receive(Receive_Window.SIZE + 2, "z")
+        self.assertEqual(self.window.selective_acks,
+                         (1 << 0) | (1 << (Receive_Window.SIZE - 1)))
+
+    def test_reset(self):
+        self.window.receive(0, "a")
+        self.window.receive(2, "c")
+        self.window.reset()
+
+        self.assertEqual(self.window.next_index, 0)
+        self.assertEqual(self.window.selective_acks, 0)
+
+    def test_advance(self):
+        self.assertEqual(self.window.advance(), [])
+        self.assertEqual(self.window.next_index, 1)
+
+        # Buffered items after the skipped index are delivered.
+        self.window.receive(2, "c")
+        self.window.receive(3, "d")
+        self.assertEqual(self.window.advance(), ["c", "d"])
+        self.assertEqual(self.window.next_index, 4)
+        self.assertEqual(self.window.selective_acks, 0)
+
+    def test_receive(self):
+        # Items are delivered in order of their index.
+        self.assertEqual(self.window.receive(0, "a"), ["a"])
+        self.assertEqual(self.window.receive(2, "c"), [])
+        self.assertEqual(self.window.receive(3, "d"), [])
+        self.assertEqual(self.window.receive(1, "b"), ["b", "c", "d"])
+        self.assertEqual(self.window.next_index, 4)
+
+        # Duplicates and items outside the window are ignored.
+        self.assertEqual(self.window.receive(2, "c"), [])
+        self.assertEqual(self.window.receive(4 + Receive_Window.SIZE + 1, "x"), [])
+        self.assertEqual(self.window.selective_acks, 0)
+        self.assertEqual(self.window.next_index, 4)
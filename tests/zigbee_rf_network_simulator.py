@@ -0,0 +1,392 @@
+# Core imports
+import random
+import socket
+import unittest
+
+# Library imports
+from mock import MagicMock, patch
+
+# Package imports
+from ..bench.Method_Coverage import covers
+from ..core.Thread_Manager import Thread_Manager
+from ..settings.Arguments import Arguments
+from ..zigbee.Clock import Clock
+from ..zigbee.Packet import Packet
+from ..zigbee.RF_Network_Simulator import RF_Network_Simulator, Virtual_Clock, Virtual_Connection
+from ..zigbee.RF_Sensor_Simulator import RF_Sensor_Simulator
+from settings import SettingsTestCase
+
+@covers(Virtual_Clock)
+class TestZigBeeVirtualClock(unittest.TestCase):
+    def setUp(self):
+        self.clock = Virtual_Clock()
+
+    def test_initialization(self):
+        # The virtual clock is a clock that starts at the given time.
+        self.assertIsInstance(self.clock, Clock)
+        self.assertEqual(self.clock._time, 0.0)
+
+        clock = Virtual_Clock(start=12.5)
+        self.assertEqual(clock._time, 12.5)
+
+    def test_time(self):
+        # The virtual time must be returned.
+        self.clock._time = 3.25
+        self.assertEqual(self.clock.time(), 3.25)
+
+    def test_sleep(self):
+        # Sleeping must advance the virtual time immediately.
+        self.clock.sleep(0.5)
+        self.clock.sleep(0.25)
+        self.assertEqual(self.clock.time(), 0.75)
+
+@covers(Virtual_Connection)
+class TestZigBeeVirtualConnection(unittest.TestCase):
+    def setUp(self):
+        self.network = MagicMock()
+        self.connection = Virtual_Connection(self.network, 2)
+
+    def test_sendto(self):
+        # Sending data must transmit it through the medium.
+        self.connection.sendto("data", ("127.0.0.1", 10001))
+        self.network.transmit.assert_called_once_with(2, ("127.0.0.1", 10001),
+                                                      "data")
+
+    def test_recv(self):
+        # Receiving data must take it from the medium.
+        self.network.receive.configure_mock(return_value="data")
+        self.assertEqual(self.connection.recv(128), "data")
+        self.network.receive.assert_called_once_with(2, 128)
+
+    def test_close(self):
+        # Closing the connection must not affect the medium.
+        self.connection.close()
+        self.assertEqual(self.network.method_calls, [])
+
+class TestZigBeeRFNetworkSimulator(SettingsTestCase):
+    def setUp(self):
+        super(TestZigBeeRFNetworkSimulator, self).setUp()
+
+        self.arguments = Arguments("settings.json", [
+            "--number-of-sensors", "2", "--network-duration", "2.0"
+        ])
+        self.settings = self.arguments.get_settings("rf_network_simulator")
+        self.thread_manager = Thread_Manager()
+
+        self.network_simulator = RF_Network_Simulator(self.arguments,
+                                                      self.thread_manager)
+
+        self.port = self.settings.get("socket_port")
+
+    def _create_packet(self, specification, sensor_id):
+        packet = Packet()
+        packet.set("specification", specification)
+        packet.set("sensor_id", sensor_id)
+        if specification == "rssi_broadcast":
+            packet.set("latitude", 0.0)
+            packet.set("longitude", 0.0)
+            packet.set("valid", True)
+            packet.set("valid_pair", True)
+            packet.set("waypoint_index", 0)
+            packet.set("timestamp", 0.0)
+            packet.set("sweep", 0)
+            packet.set("backlog", 0)
+        else:
+            packet.set("from_latitude", 0.0)
+            packet.set("from_longitude", 0.0)
+            packet.set("from_valid", True)
+            packet.set("to_latitude", 0.0)
+            packet.set("to_longitude", 0.0)
+            packet.set("to_valid", True)
+            packet.set("rssi", -50)
+
+        return packet.serialize()
+
+    def test_initialization(self):
+        # Not providing an `Arguments` object raises an exception.
+        with self.assertRaises(TypeError):
+            RF_Network_Simulator(None, self.thread_manager)
+
+        # Locations must be provided for each sensor.
+        with self.assertRaises(ValueError):
+            RF_Network_Simulator(self.arguments, self.thread_manager,
+                                 locations=[(0, 0)])
+
+        # The loop delay must be positive for the virtual time to advance.
+        self.settings.set("loop_delay", 0.0)
+        with self.assertRaises(ValueError):
+            RF_Network_Simulator(self.arguments, self.thread_manager)
+
+        self.settings.set("loop_delay", 0.01)
+
+        # The settings must be loaded.
+        self.assertEqual(self.network_simulator._number_of_sensors, 2)
+        self.assertEqual(self.network_simulator._port, self.port)
+        self.assertEqual(self.network_simulator._duration, 2.0)
+        self.assertEqual(self.network_simulator._loss_rate,
+                         self.settings.get("loss_rate"))
+        self.assertEqual(self.network_simulator._latency,
+                         self.settings.get("latency"))
+        self.assertEqual(self.network_simulator._bit_rate,
+                         self.settings.get("bit_rate"))
+        self.assertEqual(self.network_simulator._collisions,
+                         self.settings.get("collisions"))
+        self.assertEqual(self.network_simulator._seed,
+                         self.settings.get("random_seed"))
+
+        # All sensors are located at the origin by default.
+        self.assertEqual(self.network_simulator._locations, [(0, 0)] * 3)
+
+        # The medium must be empty.
+        self.assertEqual(self.network_simulator._safe_time, 0.0)
+        for sensor_id in range(3):
+            self.assertEqual(self.network_simulator._frames[sensor_id], [])
+            self.assertEqual(self.network_simulator._intervals[sensor_id], [])
+            self.assertEqual(len(self.network_simulator._measurements[sensor_id]), 0)
+
+        self.assertEqual(self.network_simulator._link_times, {})
+        self.assertEqual(self.network_simulator._air_times, [0.0] * 3)
+        self.assertEqual(self.network_simulator._slot_times, [0.0] * 3)
+        self.assertEqual(self.network_simulator._statistics, {
+            "sent": 0,
+            "delivered": 0,
+            "lost": 0,
+            "collided": 0,
+            "bytes": 0,
+            "measurements": 0
+        })
+
+        # The original RF sensor ID setting must be restored.
+        sensor_settings = self.arguments.get_settings("rf_sensor_simulator")
+        self.assertEqual(sensor_settings.get("rf_sensor_id"), 0)
+
+        # The callbacks of the sensors must be usable.
+        sensor = self.network_simulator.sensors[1]
+        self.assertIsNone(sensor._receive_callback(Packet()))
+        self.assertEqual(sensor._valid_callback(None), (True, True))
+
+    def test_sensors(self):
+        # Each sensor must be simulated in order with a virtual clock, a 
+        # virtual connection to the medium and the random number generator of 
+        # the network.
+        sensors = self.network_simulator.sensors
+        self.assertEqual(len(sensors), 3)
+        for sensor_id, sensor in enumerate(sensors):
+            self.assertIsInstance(sensor, RF_Sensor_Simulator)
+            self.assertEqual(sensor.id, sensor_id)
+            self.assertIsInstance(sensor.clock, Virtual_Clock)
+            self.assertEqual(sensor._scheduler.clock, sensor.clock)
+            self.assertIsInstance(sensor._connection, Virtual_Connection)
+            self.assertIs(sensor.random, self.network_simulator._random)
+
+    def test_get_location_callback(self):
+        network_simulator = RF_Network_Simulator(self.arguments,
+                                                 self.thread_manager,
+                                                 locations=[(0, 0), (1, 2), (3, 4)])
+
+        # The location callback must provide the location of the sensor.
+        callback = network_simulator._get_location_callback(2)
+        self.assertEqual(callback(), ((3, 4), 0))
+
+    def test_transmit(self):
+        sensor = self.network_simulator.sensors[1]
+        sensor.clock.sleep(0.5)
+
+        # A frame must be placed in the medium with its air time.
+        data = self._create_packet("rssi_broadcast", 1)
+        self.network_simulator.transmit(1, ("127.0.0.1", self.port + 2), data)
+
+        frames = self.network_simulator._frames[2]
+        self.assertEqual(len(frames), 1)
+        end, _, frame = frames[0]
+        air_time = len(data) * 8 / float(self.settings.get("bit_rate"))
+        self.assertEqual(frame.from_id, 1)
+        self.assertEqual(frame.to_id, 2)
+        self.assertEqual(frame.start, 0.5 + self.settings.get("latency"))
+        self.assertAlmostEqual(frame.end, frame.start + air_time)
+        self.assertEqual(end, frame.end)
+        self.assertEqual(frame.data, data)
+        self.assertFalse(frame.collided)
+        self.assertIsNone(frame.link)
+        self.assertEqual(self.network_simulator._statistics["sent"], 1)
+        self.assertAlmostEqual(self.network_simulator._air_times[1], air_time)
+
+        # A frame that overlaps with another frame to the same sensor must
+        # collide with it.
+        self.network_simulator.sensors[0].clock.sleep(0.5)
+        self.network_simulator.transmit(0, ("127.0.0.1", self.port + 2), data)
+        self.assertEqual(len(frames), 2)
+        self.assertTrue(frames[0][2].collided)
+        self.assertTrue(frames[1][2].collided)
+
+        # Frames that have arrived are no longer considered for collisions.
+        self.network_simulator._safe_time = 1.0
+        sensor.clock.sleep(0.5)
+        self.network_simulator.transmit(1, ("127.0.0.1", self.port + 2), data)
+        self.assertEqual(len(self.network_simulator._intervals[2]), 1)
+        self.assertFalse(self.network_simulator._intervals[2][0].collided)
+
+        # A packet for the ground station must carry the oldest measurement.
+        self.network_simulator._measurements[1].append(((2, 1), 0.75))
+        data = self._create_packet("rssi_ground_station", 1)
+        self.network_simulator.transmit(1, ("127.0.0.1", self.port), data)
+        frame = self.network_simulator._frames[0][0][2]
+        self.assertEqual(frame.link, ((2, 1), 0.75))
+        self.assertEqual(len(self.network_simulator._measurements[1]), 0)
+
+        # Without collisions, overlapping frames must both be kept.
+        self.network_simulator._collisions = False
+        self.network_simulator.transmit(2, ("127.0.0.1", self.port), data)
+        self.assertEqual(len(self.network_simulator._frames[0]), 2)
+        self.assertFalse(self.network_simulator._frames[0][0][2].collided)
+
+        # Lost frames must not be placed in the medium.
+        self.network_simulator._loss_rate = 1.0
+        self.network_simulator.transmit(2, ("127.0.0.1", self.port + 1), data)
+        self.assertEqual(self.network_simulator._frames[1], [])
+        self.assertEqual(self.network_simulator._statistics["lost"], 1)
+        self.assertEqual(self.network_simulator._statistics["sent"], 6)
+
+    def test_receive(self):
+        data = self._create_packet("rssi_broadcast", 1)
+
+        # Frames that have not completely arrived cannot be received.
+        self.network_simulator.transmit(1, ("127.0.0.1", self.port + 2), data)
+        with self.assertRaises(socket.error):
+            self.network_simulator.receive(2, 1024)
+
+        # Arrived frames must be received, limited to the buffer size, and
+        # vehicle sensors must create measurements for them.
+        self.network_simulator._safe_time = 1.0
+        self.network_simulator.sensors[2].clock.sleep(1.0)
+        self.assertEqual(self.network_simulator.receive(2, 4), data[:4])
+        self.assertEqual(list(self.network_simulator._measurements[2]),
+                         [((1, 2), 1.0)])
+        self.assertEqual(self.network_simulator._statistics["delivered"], 1)
+        self.assertEqual(self.network_simulator._statistics["bytes"], len(data))
+
+        # Collided frames must be dropped.
+        self.network_simulator.sensors[0].clock.sleep(1.0)
+        self.network_simulator.sensors[1].clock.sleep(1.0)
+        self.network_simulator.transmit(1, ("127.0.0.1", self.port + 2), data)
+        self.network_simulator.transmit(0, ("127.0.0.1", self.port + 2), data)
+        self.network_simulator._safe_time = 2.0
+        with self.assertRaises(socket.error):
+            self.network_simulator.receive(2, 1024)
+
+        self.assertEqual(self.network_simulator._statistics["collided"], 2)
+
+        # The ground station must register the time of the measurements.
+        self.network_simulator.sensors[2].clock.sleep(1.0)
+        self.network_simulator._safe_time = 3.0
+        data = self._create_packet("rssi_ground_station", 2)
+        self.network_simulator.transmit(2, ("127.0.0.1", self.port), data)
+        self.network_simulator.transmit(1, ("127.0.0.1", self.port), data)
+        self.network_simulator._safe_time = 4.0
+
+        # Packets without measurements must not change the link times. The 
+        # frame of the sensor that is behind in time arrives first.
+        self.assertEqual(self.network_simulator.receive(0, 1024), data)
+        self.assertEqual(self.network_simulator._link_times, {})
+
+        self.assertEqual(self.network_simulator.receive(0, 1024), data)
+        self.assertEqual(self.network_simulator._link_times, {(1, 2): 1.0})
+        self.assertEqual(self.network_simulator._statistics["measurements"], 1)
+
+    def test_run(self):
+        state = random.getstate()
+        report = self.network_simulator.run()
+
+        # The global random number generator must not be affected.
+        self.assertEqual(random.getstate(), state)
+
+        # The simulation must run for the configured virtual time.
+        self.assertGreaterEqual(report["duration"], 2.0)
+        for sensor in self.network_simulator.sensors:
+            self.assertGreaterEqual(sensor.clock.time(), 2.0)
+            self.assertFalse(sensor._started)
+
+        # Measurements must have been exchanged without losses.
+        frames = report["frames"]
+        self.assertGreater(frames["sent"], 0)
+        self.assertEqual(frames["lost"], 0)
+        self.assertGreater(frames["measurements"], 0)
+        self.assertIsNotNone(report["link_ages"]["1-2"])
+        self.assertIsNotNone(report["link_ages"]["2-1"])
+
+        # The slots of the sensors in each sweep must be tracked.
+        sweep_delay = self.arguments.get_settings("zigbee_tdma_scheduler").get("sweep_delay")
+        for sensor_id in (1, 2):
+            slot_time = self.network_simulator._slot_times[sensor_id]
+            self.assertAlmostEqual(slot_time, 2.0 / 2, delta=sweep_delay)
+            self.assertGreater(report["slot_utilization"][str(sensor_id)], 0.0)
+
+        # A slot is tracked once the sensor is done sending in it, even if the 
+        # simulation ends before the slot ends.
+        self.settings.set("network_duration", sweep_delay * 0.75)
+        network_simulator = RF_Network_Simulator(self.arguments, self.thread_manager)
+        network_simulator.run()
+        self.assertEqual(network_simulator._slot_times, [0.0, sweep_delay / 2, 0.0])
+
+        # The simulation must be deterministic.
+        self.tearDown()
+        self.setUp()
+        self.assertEqual(self.network_simulator.run(), report)
+
+    def test_run_adaptive_slots(self):
+        arguments = Arguments("settings.json", [
+            "--number-of-sensors", "4", "--network-duration", "5.0",
+            "--adaptive-slots"
+        ])
+        network_simulator = RF_Network_Simulator(arguments, self.thread_manager)
+
+        # Record the slot of each sensor at the moment that it starts sending.
+        slots = []
+        send_slot = RF_Sensor_Simulator._send_slot
+        def record_slot(sensor):
+            scheduler = sensor.scheduler
+            slots.append((sensor.id, scheduler.sweep, scheduler.timestamp,
+                          scheduler.timestamp + scheduler.slot_time))
+            return send_slot(sensor)
+
+        with patch.object(RF_Sensor_Simulator, "_send_slot", autospec=True,
+                          side_effect=record_slot):
+            network_simulator.run()
+
+        # The sensors must allocate their adaptive slots based on the same 
+        # backlogs, so the slot times differ, but the slots never overlap.
+        self.assertEqual(set(slot[0] for slot in slots), set(range(1, 5)))
+        self.assertGreater(len(set(round(end - start, 6)
+                                   for _, _, start, end in slots)), 1)
+        slots.sort(key=lambda slot: slot[2])
+        for previous, slot in zip(slots, slots[1:]):
+            self.assertLessEqual(previous[3], slot[2] + 1e-9)
+
+    def test_get_report(self):
+        # Without any simulated time, the report must contain empty values.
+        report = self.network_simulator.get_report()
+        self.assertEqual(report, {
+            "duration": 0.0,
+            "frames": self.network_simulator._statistics,
+            "frame_throughput": 0.0,
+            "byte_throughput": 0.0,
+            "slot_utilization": {"1": 0.0, "2": 0.0},
+            "link_ages": {"1-2": None, "2-1": None}
+        })
+
+        # The report must contain the throughput, slot utilization and the
+        # ages of links with measurements.
+        self.network_simulator._safe_time = 10.0
+        self.network_simulator._statistics["delivered"] = 20
+        self.network_simulator._statistics["bytes"] = 500
+        self.network_simulator._air_times = [0.0, 1.0, 0.5]
+        self.network_simulator._slot_times = [0.0, 4.0, 5.0]
+        self.network_simulator._link_times = {(1, 2): 7.5}
+
+        report = self.network_simulator.get_report()
+        self.assertEqual(report["duration"], 10.0)
+        self.assertEqual(report["frame_throughput"], 2.0)
+        self.assertEqual(report["byte_throughput"], 50.0)
+        self.assertAlmostEqual(report["slot_utilization"]["1"], 0.25)
+        self.assertAlmostEqual(report["slot_utilization"]["2"], 0.1)
+        self.assertEqual(report["link_ages"], {"1-2": 2.5, "2-1": None})
@@ -1,5 +1,9 @@
 # Core imports
+import json
+import os
 import Queue
+import shutil
+import tempfile
 import thread
 import time
 
@@ -11,8 +15,11 @@ from ..core.Thread_Manager import Thread_Manager
 from ..core.Threadable import Threadable
 from ..settings.Arguments import Arguments
 from ..reconstruction.Buffer import Buffer
+from ..zigbee.Clock import Clock
 from ..zigbee.Packet import Packet
+from ..zigbee.Packet_Capture import Packet_Capture
 from ..zigbee.RF_Sensor import RF_Sensor, DisabledException
+from ..zigbee.RF_Sensor_Metrics import RF_Sensor_Metrics
 from ..zigbee.TDMA_Scheduler import TDMA_Scheduler
 from settings import SettingsTestCase
 from zigbee_packet import ZigBeePacketTestCase
@@ -76,7 +83,9 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
         self.assertEqual(self.rf_sensor._address, None)
         self.assertEqual(self.rf_sensor._connection, None)
         self.assertEqual(self.rf_sensor._buffer, None)
+        self.assertIsInstance(self.rf_sensor._clock, Clock)
         self.assertIsInstance(self.rf_sensor._scheduler, TDMA_Scheduler)
+        self.assertEqual(self.rf_sensor._scheduler.clock, self.rf_sensor._clock)
         self.assertIsInstance(self.rf_sensor._packets, Queue.Queue)
         self.assertEqual(self.rf_sensor._packets.qsize(), 0)
         self.assertIsInstance(self.rf_sensor._custom_packets, Queue.Queue)
@@ -87,6 +96,15 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
         self.assertEqual(self.rf_sensor._started, False)
 
         self.assertEqual(self.rf_sensor._loop_delay, self.settings.get("loop_delay"))
+        self.assertIsNone(self.rf_sensor._reactor)
+        self.assertIsNone(self.rf_sensor._timer)
+        self.assertIsNone(self.rf_sensor._capture)
+        self.assertIsInstance(self.rf_sensor._metrics, RF_Sensor_Metrics)
+        self.assertEqual(self.rf_sensor._metrics.clock, self.rf_sensor._clock)
+        self.assertEqual(self.rf_sensor._metrics_file, "")
+        self.assertEqual(self.rf_sensor._metrics_interval,
+                         self.settings.get("metrics_interval"))
+        self.assertIsNone(self.rf_sensor._missed_timestamp)
 
         self.assertTrue(hasattr(self.rf_sensor._location_callback, "__call__"))
         self.assertTrue(hasattr(self.rf_sensor._receive_callback, "__call__"))
@@ -111,6 +129,57 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
         self.rf_sensor.buffer = buffer
         self.assertEqual(self.rf_sensor.buffer, buffer)
 
+    def test_clock(self):
+        # Providing an invalid clock raises an exception.
+        with self.assertRaises(ValueError):
+            self.rf_sensor.clock = None
+
+        # A valid clock must be set and returned, and the scheduler must use 
+        # the same clock.
+        clock = Clock()
+        self.rf_sensor.clock = clock
+        self.assertEqual(self.rf_sensor.clock, clock)
+        self.assertEqual(self.rf_sensor._scheduler.clock, clock)
+        self.assertEqual(self.rf_sensor._metrics.clock, clock)
+
+    def test_capture(self):
+        # Providing an invalid packet capture raises an exception.
+        with self.assertRaises(ValueError):
+            self.rf_sensor.capture = "capture.bin"
+
+        # A valid packet capture must be set and returned.
+        capture = Packet_Capture("capture.bin")
+        self.rf_sensor.capture = capture
+        self.assertEqual(self.rf_sensor.capture, capture)
+
+        # A packet capture is created when a capture file is given in the 
+        # settings.
+        self.settings.set("capture_file", "capture.bin")
+        self.settings.set("capture_max_size", 2048)
+        self.settings.set("capture_max_files", 2)
+        type_mock = PropertyMock(return_value="zigbee_base")
+        with patch.object(RF_Sensor, "type", new_callable=type_mock):
+            rf_sensor = self._create_sensor(RF_Sensor)
+
+        self.assertIsInstance(rf_sensor.capture, Packet_Capture)
+        self.assertEqual(rf_sensor.capture.filename, "capture.bin")
+        self.assertEqual(rf_sensor.capture._max_size, 2048)
+        self.assertEqual(rf_sensor.capture._max_files, 2)
+
+    def test_metrics(self):
+        self.rf_sensor._metrics.increment("frames_sent", 3)
+        self.rf_sensor._packets.put(self.packet)
+        self.rf_sensor._packets.put(self.packet)
+        self.rf_sensor._custom_packets.put({"packet": self.packet, "to": 2})
+
+        # The metrics snapshot must include the depths of the queues.
+        metrics = self.rf_sensor.metrics
+        self.assertEqual(metrics["counters"], {"frames_sent": 3})
+        self.assertEqual(metrics["queues"], {
+            "packets": 2,
+            "custom_packets": 1
+        })
+
     def test_type(self):
         # Verify that the interface requires subclasses to implement
         # the `type` property.
@@ -125,6 +194,46 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
             "joined": self.rf_sensor._joined
         })
 
+    def test_reactor(self):
+        # Providing an invalid reactor raises an exception.
+        with self.assertRaises(ValueError):
+            self.rf_sensor.reactor = None
+
+        # A valid reactor must be set and returned.
+        reactor = self.thread_manager.reactor
+        self.rf_sensor.reactor = reactor
+        self.assertEqual(self.rf_sensor.reactor, reactor)
+
+        # The reactor of the thread manager is used when it is enabled in 
+        # the settings.
+        self.settings.set("reactor", True)
+        type_mock = PropertyMock(return_value="zigbee_base")
+        with patch.object(RF_Sensor, "type", new_callable=type_mock):
+            rf_sensor = self._create_sensor(RF_Sensor)
+
+        self.assertEqual(rf_sensor.reactor, reactor)
+
+    def test_connection(self):
+        # The sensor has no connection until it is set up.
+        self.assertIsNone(self.rf_sensor.connection)
+
+        connection = MagicMock()
+        self.rf_sensor.connection = connection
+        self.assertEqual(self.rf_sensor.connection, connection)
+
+        # A connection that is set beforehand is not replaced on activation.
+        with patch.object(RF_Sensor, "_setup") as setup_mock:
+            with patch.object(thread, "start_new_thread"):
+                self.rf_sensor.activate()
+
+        setup_mock.assert_not_called()
+        self.assertEqual(self.rf_sensor.connection, connection)
+
+    def test_scheduler(self):
+        self.assertIsInstance(self.rf_sensor.scheduler, TDMA_Scheduler)
+        self.assertEqual(self.rf_sensor.scheduler.id, self.rf_sensor.id)
+        self.assertEqual(self.rf_sensor.scheduler.clock, self.rf_sensor.clock)
+
     def test_activate(self):
         with patch.object(RF_Sensor, "_setup") as setup_mock:
             with patch.object(thread, "start_new_thread") as start_new_thread_mock:
@@ -135,6 +244,18 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
                 self.assertEqual(setup_mock.call_count, 1)
                 self.assertEqual(start_new_thread_mock.call_count, 1)
 
+        # When a reactor is used, the sensor is registered with the reactor 
+        # instead of starting its own thread.
+        self.rf_sensor._activated = False
+        self.rf_sensor.reactor = self.thread_manager.reactor
+        with patch.object(RF_Sensor, "_setup"):
+            with patch.object(RF_Sensor, "_register_reactor") as register_reactor_mock:
+                with patch.object(thread, "start_new_thread") as start_new_thread_mock:
+                    self.rf_sensor.activate()
+
+                    register_reactor_mock.assert_called_once_with()
+                    start_new_thread_mock.assert_not_called()
+
     def test_deactivate(self):
         connection_mock = MagicMock()
 
@@ -149,6 +270,26 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
                 self.assertEqual(connection_mock.close.call_count, 1)
                 self.assertEqual(self.rf_sensor._connection, None)
 
+        # The sensor must be unregistered from its reactor.
+        self.rf_sensor.reactor = self.thread_manager.reactor
+        with patch.object(RF_Sensor, "_setup"):
+            with patch.object(RF_Sensor, "_register_reactor"):
+                self.rf_sensor.activate()
+
+        with patch.object(RF_Sensor, "_unregister_reactor") as unregister_reactor_mock:
+            self.rf_sensor.deactivate()
+            unregister_reactor_mock.assert_called_once_with()
+
+        # The packet capture must be closed.
+        capture_mock = MagicMock(spec=Packet_Capture)
+        self.rf_sensor.capture = capture_mock
+        with patch.object(RF_Sensor, "_setup"):
+            with patch.object(thread, "start_new_thread"):
+                self.rf_sensor.activate()
+                self.rf_sensor.deactivate()
+
+        capture_mock.close.assert_called_once_with()
+
     def test_start(self):
         # The sensor must be started for sending RSSI broadcast/ground
         # station packets. Make sure that the schedule will try to shift again 
@@ -158,6 +299,11 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
         self.assertEqual(self.rf_sensor._packets.qsize(), 0)
         self.assertNotEqual(self.rf_sensor._scheduler.timestamp, 0.0)
 
+        # The reactor timer must expire immediately to start measuring.
+        with patch.object(RF_Sensor, "_schedule_tick") as schedule_tick_mock:
+            self.rf_sensor.start()
+            schedule_tick_mock.assert_called_once_with(0.0)
+
     def test_stop(self):
         # Pretend that we start the RF sensor so that we know that `stop` 
         # functions.
@@ -188,20 +334,25 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
         self.packet.set("to_id", 2)
         self.rf_sensor.enqueue(self.packet)
 
+        # All destinations share one copy of the packet.
         self.assertEqual(self.rf_sensor._custom_packets.qsize(),
                          self.rf_sensor.number_of_sensors - 1)
+        packets = []
         for to_id in xrange(1, self.rf_sensor.number_of_sensors + 1):
             if to_id == self.rf_sensor.id:
                 continue
 
             item = self.rf_sensor._custom_packets.get()
             self.assertIsInstance(item["packet"], Packet)
+            self.assertIsNot(item["packet"], self.packet)
+            packets.append(item["packet"])
             self.assertEqual(item["packet"].get_all(), {
                 "specification": "waypoint_clear",
                 "to_id": 2
             })
             self.assertEqual(item["to"], to_id)
 
+        self.assertTrue(all(packet is packets[0] for packet in packets))
         self.assertEqual(self.rf_sensor._custom_packets.qsize(), 0)
 
         # Packets that do contain a destination must be enqueued directly.
@@ -214,6 +365,11 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
         })
         self.assertEqual(self.rf_sensor._custom_packets.qsize(), 0)
 
+        # The reactor timer must expire immediately to send the packets.
+        with patch.object(RF_Sensor, "_schedule_tick") as schedule_tick_mock:
+            self.rf_sensor.enqueue(self.packet, to=2)
+            schedule_tick_mock.assert_called_once_with(0.0)
+
     def test_discover(self):
         # Providing an invalid callback raises an exception.
         with self.assertRaisesRegexp(TypeError, "callback is not callable"):
@@ -258,10 +414,24 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
                 interrupt_mock.assert_not_called()
 
     def test_loop_body(self):
+        with patch.object(RF_Sensor, "_tick") as tick_mock:
+            with patch.object(Clock, "sleep") as sleep_mock:
+                # The scheduled work must be performed, followed by a delay.
+                self.rf_sensor._loop_body()
+
+                tick_mock.assert_called_once_with()
+                sleep_mock.assert_called_once_with(self.rf_sensor._loop_delay)
+
+    def test_step(self):
+        with patch.object(RF_Sensor, "_loop_body") as loop_body_mock:
+            self.rf_sensor.step()
+            loop_body_mock.assert_called_once_with()
+
+    def test_tick(self):
         with patch.object(RF_Sensor, "_send_custom_packets") as send_custom_packets_mock:
             # Send custom packets when the sensor has been activated,
             # but not started.
-            self.rf_sensor._loop_body()
+            self.rf_sensor._tick()
             send_custom_packets_mock.assert_called_once_with()
 
         # If the current time is inside an allocated slot, then packets
@@ -274,7 +444,7 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
 
                     # Send RSSI broadcast/ground station packets when the sensor
                     # has been activated and started.
-                    self.rf_sensor._loop_body()
+                    self.rf_sensor._tick()
 
                     update_mock.assert_called_once_with()
                     send_mock.assert_called_once_with()
@@ -289,11 +459,297 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
 
                     # Send RSSI broadcast/ground station packets when the sensor
                     # has been activated and started.
-                    self.rf_sensor._loop_body()
+                    self.rf_sensor._tick()
 
                     update_mock.assert_not_called()
                     send_mock.assert_not_called()
 
+        # The duration of sending and the latency from the slot start must 
+        # be tracked.
+        histograms = self.rf_sensor.metrics["histograms"]
+        self.assertEqual(histograms["slot_latency"]["count"], 1)
+        self.assertEqual(histograms["send_duration"]["count"], 1)
+
+        # The slot has passed without sending, which is counted only once.
+        self.assertEqual(self.rf_sensor._metrics.get_counter("slot_misses"), 1)
+        self.assertEqual(self.rf_sensor._missed_timestamp,
+                         self.rf_sensor._scheduler.timestamp)
+        self.rf_sensor._tick()
+        self.assertEqual(self.rf_sensor._metrics.get_counter("slot_misses"), 1)
+
+        # The metrics must be written.
+        with patch.object(RF_Sensor, "_write_metrics") as write_metrics_mock:
+            self.rf_sensor._tick()
+            write_metrics_mock.assert_called_once_with()
+
+    def test_write_metrics(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        filename = os.path.join(directory, "metrics.json")
+
+        # Nothing is written when no metrics file is given.
+        self.rf_sensor._metrics_time = 0.0
+        self.rf_sensor._write_metrics()
+
+        # A JSON line is appended once the metrics interval has passed.
+        self.rf_sensor._metrics_file = filename
+        self.rf_sensor._metrics_interval = 5.0
+        self.rf_sensor._metrics.increment("frames_sent")
+        with patch.object(Clock, "time", return_value=4.0):
+            self.rf_sensor._write_metrics()
+            self.assertFalse(os.path.exists(filename))
+
+        for current_time in (5.0, 7.0, 10.0):
+            with patch.object(Clock, "time", return_value=current_time):
+                self.rf_sensor._write_metrics()
+
+        self.assertEqual(self.rf_sensor._metrics_time, 10.0)
+
+        with open(filename, "r") as metrics_file:
+            lines = metrics_file.read().splitlines()
+
+        self.assertEqual(len(lines), 2)
+        for line in lines:
+            metrics = json.loads(line)
+            self.assertEqual(metrics["id"], self.rf_sensor.id)
+            self.assertEqual(metrics["counters"], {"frames_sent": 1})
+            self.assertIn("queues", metrics)
+
+    def test_read(self):
+        # The base class does not read any data.
+        self.rf_sensor._read()
+
+    def test_get_reactor_file(self):
+        # The base class has no connection to register with the reactor.
+        self.assertIsNone(self.rf_sensor._get_reactor_file())
+
+    def _activate_reactor(self, connection=None):
+        """
+        Activate the RF sensor with the reactor of the thread manager, where 
+        the `connection` is registered for reading. The reactor loop is not
+        started, and the reactor is returned.
+        """
+
+        reactor = self.thread_manager.reactor
+        self.rf_sensor.reactor = reactor
+        self.rf_sensor._connection = connection
+        with patch.object(RF_Sensor, "_setup"):
+            with patch.object(RF_Sensor, "_get_reactor_file", return_value=connection):
+                with patch.object(thread, "start_new_thread"):
+                    self.rf_sensor.activate()
+
+        return reactor
+
+    def test_register_reactor(self):
+        connection = MagicMock()
+        connection.fileno.return_value = 42
+        reactor = self._activate_reactor(connection)
+
+        # The connection must be registered, the reactor must be activated and 
+        # the timer must be scheduled to expire immediately.
+        self.assertEqual(reactor._readers, {
+            42: (connection, self.rf_sensor._reactor_read)
+        })
+        self.assertTrue(reactor._activated)
+        self.assertIsNotNone(self.rf_sensor._timer)
+        self.assertEqual(self.rf_sensor._timer[2], self.rf_sensor._reactor_tick)
+        self.assertEqual(reactor._timers, [self.rf_sensor._timer])
+
+        # Without a connection, only the timer is scheduled.
+        reactor._readers = {}
+        self.rf_sensor._activated = False
+        with patch.object(thread, "start_new_thread"):
+            self.rf_sensor.activate()
+
+        self.assertEqual(reactor._readers, {})
+        self.assertIsNotNone(self.rf_sensor._timer)
+
+    def test_unregister_reactor(self):
+        connection = MagicMock()
+        connection.fileno.return_value = 42
+        reactor = self._activate_reactor(connection)
+        timer = self.rf_sensor._timer
+
+        # The connection and timer must be removed from the reactor.
+        with patch.object(RF_Sensor, "_get_reactor_file", return_value=connection):
+            self.rf_sensor._unregister_reactor()
+
+        self.assertEqual(reactor._readers, {})
+        self.assertIsNone(timer[2])
+        self.assertIsNone(self.rf_sensor._timer)
+
+        # Unregistering again without a connection or timer does nothing.
+        self.rf_sensor._unregister_reactor()
+        self.assertIsNone(self.rf_sensor._timer)
+
+    def test_schedule_tick(self):
+        # Nothing is scheduled without a reactor.
+        self.rf_sensor._schedule_tick(1.0)
+        self.assertIsNone(self.rf_sensor._timer)
+
+        # Nothing is scheduled when the sensor is not activated.
+        reactor = self.thread_manager.reactor
+        self.rf_sensor.reactor = reactor
+        self.rf_sensor._schedule_tick(1.0)
+        self.assertIsNone(self.rf_sensor._timer)
+
+        # An earlier timer must be replaced.
+        reactor = self._activate_reactor()
+        timer = self.rf_sensor._timer
+        with patch.object(time, "time", return_value=100.0):
+            self.rf_sensor._schedule_tick(1.0)
+
+        self.assertIsNone(timer[2])
+        self.assertEqual(self.rf_sensor._timer[0], 101.0)
+        self.assertEqual(self.rf_sensor._timer[2], self.rf_sensor._reactor_tick)
+
+    def test_reactor_read(self):
+        with patch.object(RF_Sensor, "_read") as read_mock:
+            with patch.object(RF_Sensor, "_unregister_reactor") as unregister_reactor_mock:
+                # Data must be read from the connection.
+                self.rf_sensor._reactor_read()
+                read_mock.assert_called_once_with()
+                unregister_reactor_mock.assert_not_called()
+
+                # The sensor must be unregistered when it is disabled.
+                read_mock.configure_mock(side_effect=DisabledException)
+                self.rf_sensor._reactor_read()
+                unregister_reactor_mock.assert_called_once_with()
+
+    def test_reactor_tick(self):
+        self.rf_sensor._timer = [0.0, 0, self.rf_sensor._reactor_tick]
+
+        with patch.object(RF_Sensor, "_tick") as tick_mock:
+            with patch.object(RF_Sensor, "_schedule_tick") as schedule_tick_mock:
+                # The timer is not scheduled again when there is nothing to 
+                # send.
+                self.rf_sensor._reactor_tick()
+                tick_mock.assert_called_once_with()
+                self.assertIsNone(self.rf_sensor._timer)
+                schedule_tick_mock.assert_not_called()
+
+                # The timer is scheduled again for remaining custom packets.
+                self.rf_sensor._custom_packets.put({
+                    "packet": self.packet,
+                    "to": 2
+                })
+                self.rf_sensor._reactor_tick()
+                schedule_tick_mock.assert_called_once_with(self.rf_sensor._loop_delay)
+
+                # The timer is scheduled again for the next slot when the 
+                # sensor performs measurements.
+                schedule_tick_mock.reset_mock()
+                self.rf_sensor._started = True
+                self.rf_sensor._scheduler._timestamp = 12.5
+                with patch.object(Clock, "time", return_value=10.0):
+                    self.rf_sensor._reactor_tick()
+
+                schedule_tick_mock.assert_called_once_with(2.5)
+
+                # If the slot has passed, then the timer is scheduled again 
+                # after the loop delay.
+                schedule_tick_mock.reset_mock()
+                with patch.object(Clock, "time", return_value=20.0):
+                    self.rf_sensor._reactor_tick()
+
+                schedule_tick_mock.assert_called_once_with(self.rf_sensor._loop_delay)
+
+        with patch.object(RF_Sensor, "_tick", side_effect=DisabledException):
+            with patch.object(RF_Sensor, "_unregister_reactor") as unregister_reactor_mock:
+                with patch.object(RF_Sensor, "_schedule_tick") as schedule_tick_mock:
+                    # The sensor must be unregistered when it is disabled.
+                    self.rf_sensor._reactor_tick()
+                    unregister_reactor_mock.assert_called_once_with()
+                    schedule_tick_mock.assert_not_called()
+
+    def test_reactor_tick_frames(self):
+        self._activate_reactor()
+        self.packet.set("specification", "waypoint_clear")
+        self.rf_sensor.enqueue(self.packet, to=2)
+        self.rf_sensor.enqueue(self.packet, to=3)
+
+        with patch.object(RF_Sensor, "_send_tx_frame") as send_tx_frame_mock:
+            with patch.object(RF_Sensor, "_schedule_tick") as schedule_tick_mock:
+                # Only the first custom packet is sent, and the timer sends 
+                # the next one after the loop delay.
+                self.rf_sensor._reactor_tick()
+                self.assertEqual(send_tx_frame_mock.call_count, 1)
+                self.assertIsNotNone(self.rf_sensor._frames)
+                schedule_tick_mock.assert_called_once_with(self.rf_sensor._loop_delay)
+
+                # Enqueuing packets does not make the timer skip the delay.
+                schedule_tick_mock.reset_mock()
+                self.rf_sensor.enqueue(self.packet, to=4)
+                schedule_tick_mock.assert_not_called()
+
+                with patch.object(RF_Sensor, "_tick") as tick_mock:
+                    self.rf_sensor._reactor_tick()
+                    tick_mock.assert_not_called()
+
+                self.assertEqual(send_tx_frame_mock.call_count, 2)
+                schedule_tick_mock.assert_called_with(self.rf_sensor._loop_delay)
+                self.rf_sensor._reactor_tick()
+                self.assertEqual(send_tx_frame_mock.call_count, 3)
+
+                # Once all frames are sent, the timer is scheduled as usual.
+                schedule_tick_mock.reset_mock()
+                self.rf_sensor._reactor_tick()
+                self.assertIsNone(self.rf_sensor._frames)
+                schedule_tick_mock.assert_not_called()
+
+        # Frames that are being sent are forgotten when the sensor starts 
+        # or is unregistered.
+        self.rf_sensor._frames = iter([])
+        self.rf_sensor.start()
+        self.assertIsNone(self.rf_sensor._frames)
+        self.rf_sensor._frames = iter([])
+        self.rf_sensor._unregister_reactor()
+        self.assertIsNone(self.rf_sensor._frames)
+
+    def test_send_frames(self):
+        sent = []
+        def frames():
+            for frame in range(3):
+                sent.append(frame)
+                yield
+
+        # Without a reactor, all frames are sent at once.
+        self.rf_sensor._send_frames(frames())
+        self.assertEqual(sent, [0, 1, 2])
+        self.assertIsNone(self.rf_sensor._frames)
+
+        # With a reactor, only the first frame is sent.
+        del sent[:]
+        self.rf_sensor.reactor = self.thread_manager.reactor
+        self.rf_sensor._send_frames(frames())
+        self.assertEqual(sent, [0])
+
+        # The next frames are sent one at a time, and the frames are 
+        # forgotten once all of them have been sent.
+        self.rf_sensor._send_next_frame()
+        self.rf_sensor._send_next_frame()
+        self.assertEqual(sent, [0, 1, 2])
+        self.assertIsNotNone(self.rf_sensor._frames)
+        self.rf_sensor._send_next_frame()
+        self.assertIsNone(self.rf_sensor._frames)
+
+    def test_send_slot(self):
+        self.rf_sensor._scheduler._timestamp = 10.0
+        with patch.object(RF_Sensor, "_send", return_value=iter([None, None])):
+            with patch.object(TDMA_Scheduler, "update") as update_mock:
+                with patch.object(Clock, "time", side_effect=[10.5, 11.0]):
+                    frames = self.rf_sensor._send_slot()
+
+                    # The scheduler is only updated after all frames are sent.
+                    next(frames)
+                    update_mock.assert_not_called()
+                    self.assertEqual(list(frames), [None])
+                    update_mock.assert_called_once_with()
+
+        histograms = self.rf_sensor.metrics["histograms"]
+        self.assertEqual(histograms["slot_latency"]["count"], 1)
+        self.assertEqual(histograms["send_duration"]["count"], 1)
+
     @patch.object(RF_Sensor, "_send_tx_frame")
     def test_send(self, send_tx_frame_mock):
         self.rf_sensor._packets.put(self.rf_sensor._create_rssi_broadcast_packet(2))
@@ -302,7 +758,9 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
         # may be sent.
         in_slot_mock = PropertyMock(return_value=True)
         with patch.object(TDMA_Scheduler, "in_slot", new_callable=in_slot_mock):
-            self.rf_sensor._send()
+            # The generator yields after each sent frame.
+            frames = list(self.rf_sensor._send())
+            self.assertEqual(len(frames), self.rf_sensor.number_of_sensors)
 
             calls = send_tx_frame_mock.call_args_list
 
@@ -335,16 +793,61 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
         # packets may be sent.
         in_slot_mock = PropertyMock(return_value=False)
         with patch.object(TDMA_Scheduler, "in_slot", new_callable=in_slot_mock):
-            self.rf_sensor._send()
+            self.assertEqual(list(self.rf_sensor._send()), [])
             send_tx_frame_mock.assert_not_called()
 
+    def test_send_rssi_broadcast_packets(self):
+        sent_packets = []
+
+        def send_tx_frame(packet, to):
+            sent_packets.append((packet.serialize(), to))
+
+        in_slot_mock = PropertyMock(return_value=True)
+        with patch.object(TDMA_Scheduler, "in_slot", new_callable=in_slot_mock):
+            with patch.object(RF_Sensor, "_send_tx_frame", side_effect=send_tx_frame):
+                with patch.object(Packet, "_pack_field", wraps=Packet()._pack_field) as pack_field_mock:
+                    self.valid_callback.configure_mock(side_effect=lambda request: (request.other_id == 2, True))
+                    frames = list(self.rf_sensor._send_rssi_broadcast_packets())
+                    self.assertEqual(len(frames),
+                                     self.rf_sensor.number_of_sensors - 1)
+
+                    # The packet is only created and serialized once, after 
+                    # which the fields per destination are updated in place.
+                    self.location_callback.assert_called_once_with()
+                    self.assertEqual(self.valid_callback.call_count,
+                                     self.rf_sensor.number_of_sensors - 1)
+                    self.assertEqual(pack_field_mock.call_count,
+                                     len(Packet._specifications["rssi_broadcast"]))
+
+        # The serialized packets must contain the fields per destination.
+        self.assertEqual([to for _, to in sent_packets],
+                         range(2, self.rf_sensor.number_of_sensors + 1))
+        first_packet = Packet()
+        first_packet.unserialize(sent_packets[0][0])
+        self.assertTrue(first_packet.get("valid"))
+        second_packet = Packet()
+        second_packet.unserialize(sent_packets[1][0])
+        self.assertFalse(second_packet.get("valid"))
+        self.assertGreaterEqual(second_packet.get("timestamp"),
+                                first_packet.get("timestamp"))
+
+        # Nothing is sent outside of the allocated slot.
+        in_slot_mock = PropertyMock(return_value=False)
+        with patch.object(TDMA_Scheduler, "in_slot", new_callable=in_slot_mock):
+            with patch.object(RF_Sensor, "_send_tx_frame") as send_tx_frame_mock:
+                self.assertEqual(list(self.rf_sensor._send_rssi_broadcast_packets()), [])
+                send_tx_frame_mock.assert_not_called()
+
+        # Running out of the slot is counted as a slot overrun.
+        self.assertEqual(self.rf_sensor._metrics.get_counter("slot_overruns"), 1)
+
     def test_send_custom_packets(self):
         self.packet.set("specification", "waypoint_clear")
         self.packet.set("to_id", 2)
         self.rf_sensor.enqueue(self.packet, to=2)
 
         with patch.object(RF_Sensor, "_send_tx_frame") as send_tx_frame_mock:
-            self.rf_sensor._send_custom_packets()
+            self.assertEqual(len(list(self.rf_sensor._send_custom_packets())), 1)
 
             # Custom packets must be sent to their destinations.
             packet, to = send_tx_frame_mock.call_args[0]
@@ -369,13 +872,81 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
             with self.assertRaises(TypeError):
                 self.rf_sensor._send_tx_frame(self.packet)
 
+            # Sent frames must be counted, followed by a delay.
+            with patch.object(Clock, "sleep") as sleep_mock:
+                self.rf_sensor._send_tx_frame(self.packet, to=2)
+                sleep_mock.assert_called_once_with(self.rf_sensor._loop_delay)
+
+            self.assertEqual(self.rf_sensor._metrics.get_counter("frames_sent"), 1)
+
+            # The reactor must not be blocked by a delay.
+            self.rf_sensor.reactor = self.thread_manager.reactor
+            with patch.object(Clock, "sleep") as sleep_mock:
+                self.rf_sensor._send_tx_frame(self.packet, to=2)
+                sleep_mock.assert_not_called()
+
+            self.assertEqual(self.rf_sensor._metrics.get_counter("frames_sent"), 2)
+
     def test_receive(self):
         # Verify that the interface requires subclasses to implement
         # the `_receive` method.
         with self.assertRaises(NotImplementedError):
             self.rf_sensor._receive(packet=self.packet)
 
+    def test_unserialize(self):
+        # Valid data must be converted to a packet.
+        packet = self.rf_sensor._unserialize(self.waypoint_add_message)
+        self.assertIsInstance(packet, Packet)
+        self.assertEqual(packet.get_all(), self.waypoint_add_packet.get_all())
+        self.assertEqual(self.rf_sensor._metrics.get_counter("unserialize_errors"), 0)
+
+        # Invalid data must be counted as an unserialize error.
+        for data in ["\xff", self.waypoint_add_message[:10]]:
+            self.assertIsNone(self.rf_sensor._unserialize(data))
+
+        self.assertEqual(self.rf_sensor._metrics.get_counter("unserialize_errors"), 2)
+
+    def test_track_packet(self):
+        # Received packets must be counted, and RSSI packets update the time 
+        # of their link. Nothing is captured when packet capture is disabled.
+        with patch.object(Clock, "time", return_value=100.0):
+            broadcast_packet = self.rf_sensor._create_rssi_broadcast_packet(1)
+            broadcast_packet.set("sensor_id", 2)
+            self.rf_sensor._track_packet(broadcast_packet)
+
+            ground_station_packet = self.rf_sensor._create_rssi_ground_station_packet(broadcast_packet)
+            self.rf_sensor._track_packet(ground_station_packet)
+
+            self.rf_sensor._track_packet(self.waypoint_add_packet)
+
+        with patch.object(Clock, "time", return_value=102.5):
+            metrics = self.rf_sensor.metrics
+
+        self.assertEqual(metrics["counters"], {"frames_received": 3})
+        self.assertEqual(metrics["links"], [
+            {"from": 1, "to": 0, "age": 2.5},
+            {"from": 2, "to": 1, "age": 2.5}
+        ])
+
+        # The packet must be written with the time of the clock.
+        capture_mock = MagicMock(spec=Packet_Capture)
+        self.rf_sensor.capture = capture_mock
+        with patch.object(Clock, "time", return_value=123.5):
+            self.rf_sensor._track_packet(self.packet)
+
+        capture_mock.write.assert_called_once_with(self.packet, 123.5)
+
+    def test_get_backlog(self):
+        # The backlog is the number of packets queued for the ground station.
+        self.assertEqual(self.rf_sensor._get_backlog(), 0)
+
+        self.rf_sensor._packets.put(self.rf_sensor._create_rssi_broadcast_packet(2))
+        self.assertEqual(self.rf_sensor._get_backlog(), 1)
+
     def test_create_rssi_broadcast_packet(self):
+        for _ in range(3):
+            self.rf_sensor._packets.put(self.packet)
+
         packet = self.rf_sensor._create_rssi_broadcast_packet(2)
 
         self.assertIsInstance(packet, Packet)
@@ -386,6 +957,33 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
         self.assertEqual(packet.get("waypoint_index"), 0)
         self.assertEqual(packet.get("sensor_id"), self.rf_sensor.id)
         self.assertAlmostEqual(packet.get("timestamp"), time.time(), delta=0.1)
+        self.assertEqual((packet.get("sweep"), packet.get("backlog")), (0, 3))
+
+        # The scheduler must know the backlog of the sensor in the sweep, and 
+        # the backlog is limited to the packet field and changes per sweep.
+        self.assertEqual(self.rf_sensor._scheduler._backlogs[self.rf_sensor.id], {0: 3})
+        self.rf_sensor._scheduler._set_sweep(1)
+        with patch.object(RF_Sensor, "_get_backlog", return_value=1000):
+            packet = self.rf_sensor._create_rssi_broadcast_packet(2)
+            self.assertEqual(packet.get("backlog"), 255)
+
+    def test_update_rssi_broadcast_packet(self):
+        packet = self.rf_sensor._create_rssi_broadcast_packet(2)
+        packet.serialize()
+        serialized = packet._serialized
+
+        # The validity and timestamp must be updated for the destination 
+        # without serializing the packet again.
+        self.valid_callback.configure_mock(return_value=(False, True))
+        with patch.object(Clock, "time", return_value=123.0):
+            self.rf_sensor._update_rssi_broadcast_packet(packet, 3)
+
+        request = self.valid_callback.call_args[0][0]
+        self.assertEqual(request.other_id, 3)
+        self.assertFalse(packet.get("valid"))
+        self.assertTrue(packet.get("valid_pair"))
+        self.assertEqual(packet.get("timestamp"), 123.0)
+        self.assertIs(packet._serialized, serialized)
 
     def test_create_rssi_ground_station_packet(self):
         rssi_broadcast_packet = self.rf_sensor._create_rssi_broadcast_packet(2)
@@ -0,0 +1,129 @@
+import json
+import unittest
+from mock import MagicMock
+from ..zigbee.Clock import Clock
+from ..zigbee.RF_Sensor_Metrics import RF_Sensor_Metrics
+
+class TestZigBeeRFSensorMetrics(unittest.TestCase):
+    def setUp(self):
+        super(TestZigBeeRFSensorMetrics, self).setUp()
+
+        self.clock = MagicMock(spec=Clock)
+        self.clock.time.return_value = 100.0
+
+        self.metrics = RF_Sensor_Metrics(self.clock)
+
+    def test_initialization(self):
+        self.assertEqual(self.metrics._clock, self.clock)
+        self.assertEqual(self.metrics._start_time, 100.0)
+        self.assertEqual(self.metrics._counters, {})
+        self.assertEqual(self.metrics._histograms, {})
+        self.assertEqual(self.metrics._links, {})
+        self.assertEqual(self.metrics._window_time, 100.0)
+        self.assertEqual(self.metrics._window_counters, {})
+
+    def test_clock(self):
+        self.assertEqual(self.metrics.clock, self.clock)
+
+        clock = Clock()
+        self.metrics.clock = clock
+        self.assertEqual(self.metrics.clock, clock)
+
+    def test_reset(self):
+        self.metrics.increment("frames_sent")
+        self.metrics.observe("send_duration", 0.01)
+        self.metrics.update_link(1, 2)
+
+        self.clock.time.return_value = 110.0
+        self.metrics.reset()
+
+        self.assertEqual(self.metrics._start_time, 110.0)
+        self.assertEqual(self.metrics._counters, {})
+        self.assertEqual(self.metrics._histograms, {})
+        self.assertEqual(self.metrics._links, {})
+        self.assertEqual(self.metrics._window_time, 110.0)
+        self.assertEqual(self.metrics._window_counters, {})
+
+    def test_increment(self):
+        self.metrics.increment("frames_sent")
+        self.metrics.increment("frames_sent", 4)
+        self.assertEqual(self.metrics._counters, {"frames_sent": 5})
+
+    def test_get_counter(self):
+        # Unknown counters have not been incremented yet.
+        self.assertEqual(self.metrics.get_counter("frames_sent"), 0)
+
+        self.metrics.increment("frames_sent", 2)
+        self.assertEqual(self.metrics.get_counter("frames_sent"), 2)
+
+    def test_observe(self):
+        # Values are counted in the first bucket with an upper bound that is
+        # at least the value, or in the overflow bucket.
+        for value in (0.0005, 0.001, 0.003, 10.0):
+            self.metrics.observe("send_duration", value)
+
+        histogram = self.metrics._histograms["send_duration"]
+        expected_counts = [0] * (len(RF_Sensor_Metrics.BUCKETS) + 1)
+        expected_counts[0] = 2
+        expected_counts[2] = 1
+        expected_counts[-1] = 1
+        self.assertEqual(histogram["counts"], expected_counts)
+        self.assertEqual(histogram["count"], 4)
+        self.assertAlmostEqual(histogram["sum"], 10.0045)
+
+    def test_update_link(self):
+        self.metrics.update_link(1, 2)
+        self.clock.time.return_value = 105.0
+        self.metrics.update_link(1, 2)
+        self.metrics.update_link(2, 0)
+
+        self.assertEqual(self.metrics._links, {
+            (1, 2): 105.0,
+            (2, 0): 105.0
+        })
+
+    def test_get_snapshot(self):
+        # Rates are zero before any time has passed.
+        self.metrics.increment("frames_sent", 5)
+        snapshot = self.metrics.get_snapshot()
+        self.assertEqual(snapshot["rates"], {"frames_sent": 0.0})
+        self.assertEqual(snapshot["queues"], {})
+
+        self.metrics.increment("frames_sent", 5)
+        self.metrics.observe("send_duration", 0.05)
+        self.metrics.update_link(2, 1)
+        self.metrics.update_link(1, 0)
+
+        # The rates are measured over the window since the previous snapshot.
+        self.clock.time.return_value = 110.0
+        snapshot = self.metrics.get_snapshot(queues={"packets": 3})
+
+        self.assertEqual(snapshot["time"], 110.0)
+        self.assertEqual(snapshot["uptime"], 10.0)
+        self.assertEqual(snapshot["window"], 10.0)
+        self.assertEqual(snapshot["counters"], {"frames_sent": 10})
+        self.assertEqual(snapshot["rates"], {"frames_sent": 0.5})
+        self.assertEqual(snapshot["histograms"]["send_duration"]["buckets"],
+                         list(RF_Sensor_Metrics.BUCKETS))
+        self.assertEqual(snapshot["histograms"]["send_duration"]["count"], 1)
+        self.assertEqual(snapshot["histograms"]["send_duration"]["sum"], 0.05)
+        self.assertEqual(snapshot["links"], [
+            {"from": 1, "to": 0, "age": 10.0},
+            {"from": 2, "to": 1, "age": 10.0}
+        ])
+        self.assertEqual(snapshot["queues"], {"packets": 3})
+
+        # The snapshot must not change along with the metrics.
+        self.metrics.increment("frames_sent")
+        self.assertEqual(snapshot["counters"], {"frames_sent": 10})
+
+        # Counters that did not change much in the window have a low rate, 
+        # regardless of their total value.
+        self.clock.time.return_value = 114.0
+        later_snapshot = self.metrics.get_snapshot()
+        self.assertEqual(later_snapshot["uptime"], 14.0)
+        self.assertEqual(later_snapshot["window"], 4.0)
+        self.assertEqual(later_snapshot["rates"], {"frames_sent": 0.25})
+
+        # The snapshot must be serializable as JSON.
+        self.assertEqual(json.loads(json.dumps(snapshot)), snapshot)
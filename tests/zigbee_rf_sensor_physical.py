@@ -1,6 +1,3 @@
-# Core imports
-import time
-
 # Library imports
 from mock import patch, MagicMock, PropertyMock
 
@@ -36,6 +33,8 @@ class TestZigBeeRFSensorPhysical(ZigBeeRFSensorTestCase):
         self.assertEqual(self.rf_sensor._discovery_callback, None)
 
         self.assertIsInstance(self.rf_sensor._ntp, NTP)
+        self.assertEqual(self.rf_sensor._ntp._samples, self.settings.get("ntp_samples"))
+        self.assertEqual(self.rf_sensor._ntp._drift, self.settings.get("ntp_drift"))
         self.assertEqual(self.rf_sensor._ntp_delay, self.settings.get("ntp_delay"))
 
     def test_discover(self):
@@ -50,8 +49,9 @@ class TestZigBeeRFSensorPhysical(ZigBeeRFSensorTestCase):
         # Enable synchronization mode and mock the NTP component.
         self.settings.set("synchronize", True)
 
-        # Let `time.sleep` raise an exception to exit the loop.
-        with patch.object(time, "sleep", side_effect=RuntimeError) as sleep_mock:
+        # Let the wait for the NTP exchange raise an exception to exit the 
+        # loop.
+        with patch.object(NTP, "wait", side_effect=RuntimeError) as wait_mock:
             with self.assertRaises(RuntimeError):
                 self.rf_sensor._synchronize()
 
@@ -59,14 +59,29 @@ class TestZigBeeRFSensorPhysical(ZigBeeRFSensorTestCase):
             ntp_start_mock.assert_called_once_with()
 
             # The NTP delay must be applied.
-            sleep_mock.assert_any_call(self.settings.get("ntp_delay"))
+            wait_mock.assert_called_once_with(self.settings.get("ntp_delay"))
+
+        # The exchanges are retried until the clock is synchronized.
+        ntp_start_mock.reset_mock()
+
+        def wait(timeout):
+            self.rf_sensor._synchronized = ntp_start_mock.call_count == 2
+            return True
+
+        with patch.object(NTP, "wait", side_effect=wait):
+            self.rf_sensor._synchronize()
+
+            self.assertEqual(ntp_start_mock.call_count, 2)
 
     def test_process(self):
         # Private packets must be passed along to the receive callback.
         with patch.object(self.rf_sensor, "_receive_callback") as receive_callback_mock:
             self.packet.set("specification", "waypoint_clear")
 
-            self.rf_sensor._process(self.packet)
+            with patch.object(self.rf_sensor, "_track_packet") as track_packet_mock:
+                self.rf_sensor._process(self.packet)
+                track_packet_mock.assert_called_once_with(self.packet)
+
             receive_callback_mock.assert_called_once_with(self.packet)
 
         with patch.object(NTP, "process") as ntp_process_mock:
@@ -10,7 +10,7 @@ from mock import call, patch, MagicMock
 from ..core.Thread_Manager import Thread_Manager
 from ..core.WiringPi import WiringPi
 from ..zigbee.Packet import Packet
-from ..zigbee.RF_Sensor import DisabledException
+from ..zigbee.RF_Sensor import RF_Sensor
 from ..zigbee.RF_Sensor_Physical_Texas_Instruments import RF_Sensor_Physical_Texas_Instruments
 from ..zigbee.RF_Sensor_Physical_Texas_Instruments import CC2530_Packet, Raspberry_Pi_GPIO_Pin_Mode
 from ..zigbee.TDMA_Scheduler import TDMA_Scheduler
@@ -39,6 +39,9 @@ class TestZigBeeRFSensorPhysicalTexasInstruments(ZigBeeRFSensorTestCase, USBMana
         self.assertEqual(self.rf_sensor._shift_minimum, self.settings.get("shift_minimum"))
         self.assertEqual(self.rf_sensor._shift_maximum, self.settings.get("shift_maximum"))
 
+        self.assertEqual(self.rf_sensor._frame_length, self.settings.get("packet_length") + 2)
+        self.assertEqual(self.rf_sensor._read_buffer, bytearray())
+
         self.assertEqual(self.rf_sensor._pins["rx_pin"], self.settings.get("rx_pin"))
         self.assertEqual(self.rf_sensor._pins["tx_pin"], self.settings.get("tx_pin"))
         self.assertEqual(self.rf_sensor._pins["rts_pin"], self.settings.get("rts_pin"))
@@ -66,6 +69,10 @@ class TestZigBeeRFSensorPhysicalTexasInstruments(ZigBeeRFSensorTestCase, USBMana
         # The `type` property must be implemented and correct.
         self.assertEqual(self.rf_sensor.type, "rf_sensor_physical_texas_instruments")
 
+    def test_framing_errors(self):
+        # The number of framing errors must be returned.
+        self.assertEqual(self.rf_sensor.framing_errors, 0)
+
     @patch.object(RF_Sensor_Physical_Texas_Instruments, "_synchronize")
     def test_activate(self, synchronize_mock):
         with patch.object(RF_Sensor_Physical_Texas_Instruments, "_setup"):
@@ -112,11 +119,14 @@ class TestZigBeeRFSensorPhysicalTexasInstruments(ZigBeeRFSensorTestCase, USBMana
         }
         with patch.object(self.rf_sensor, "_usb_manager", **methods) as usb_manager_mock:
             # The ground station must be a CC2531 device and its connection 
-            # must be established and configured.
+            # must be established and configured. Partial frames from an 
+            # earlier connection must be discarded.
             self.rf_sensor._id = 0
+            self.rf_sensor._read_buffer.extend("\x02\x05")
             self.rf_sensor._setup()
             usb_manager_mock.get_cc2531_device.assert_called_once_with()
             self.assertEqual(self.rf_sensor._connection, connection_mock)
+            self.assertEqual(self.rf_sensor._read_buffer, bytearray())
 
             configuration_packet = struct.pack("<BB", CC2530_Packet.CONFIGURATION, self.rf_sensor.id)
             connection_mock.write.assert_called_once_with(configuration_packet)
@@ -156,31 +166,55 @@ class TestZigBeeRFSensorPhysicalTexasInstruments(ZigBeeRFSensorTestCase, USBMana
                     connection_mock.reset_input_buffer.assert_called_once_with()
 
     def test_loop_body(self):
+        with patch.object(RF_Sensor_Physical_Texas_Instruments, "_read") as read_mock:
+            with patch.object(RF_Sensor, "_loop_body") as loop_body_mock:
+                # Data must be read before the scheduled work is performed.
+                self.rf_sensor._loop_body()
+
+                read_mock.assert_called_once_with()
+                loop_body_mock.assert_called_once_with()
+
+    def test_tick(self):
         # Shifting the schedule must be handled.
         self.rf_sensor._started = True
 
         with patch.object(TDMA_Scheduler, "shift") as shift_mock:
             with patch.object(TDMA_Scheduler, "update") as update_mock:
-                with patch.object(RF_Sensor_Physical_Texas_Instruments, "_receive") as receive_mock:
-                    try:
-                        self.rf_sensor._loop_body()
-                    except DisabledException:
-                        pass
+                with patch.object(RF_Sensor, "_tick") as tick_mock:
+                    self.rf_sensor._tick()
 
-                    receive_mock.assert_called_once_with()
                     self.assertEqual(shift_mock.call_count, 1)
                     self.assertEqual(update_mock.call_count, 1)
                     self.assertNotEqual(self.rf_sensor._polling_time, 0.0)
+                    tick_mock.assert_called_once_with()
+
+                    # The shift must be counted.
+                    self.assertEqual(self.rf_sensor._metrics.get_counter("schedule_shifts"), 1)
 
         # Regular updates must be handled.
         self.rf_sensor._started = False
 
+        with patch.object(TDMA_Scheduler, "shift") as shift_mock:
+            with patch.object(RF_Sensor, "_tick") as tick_mock:
+                self.rf_sensor._tick()
+
+                shift_mock.assert_not_called()
+                tick_mock.assert_called_once_with()
+
+    def test_read(self):
         with patch.object(RF_Sensor_Physical_Texas_Instruments, "_receive") as receive_mock:
             # The receive method must be called.
-            self.rf_sensor._loop_body()
+            self.rf_sensor._read()
 
             receive_mock.assert_called_once_with()
 
+    def test_get_reactor_file(self):
+        # The serial connection must be registered with the reactor.
+        self.rf_sensor._connection = MagicMock()
+
+        self.assertEqual(self.rf_sensor._get_reactor_file(),
+                         self.rf_sensor._connection)
+
     def test_send_tx_frame(self):
         self.packet.set("specification", "waypoint_clear")
         self.packet.set("to_id", 2)
@@ -198,31 +232,46 @@ class TestZigBeeRFSensorPhysicalTexasInstruments(ZigBeeRFSensorTestCase, USBMana
 
     @patch.object(RF_Sensor_Physical_Texas_Instruments, "_process")
     def test_receive(self, process_mock):
+        # The serialized packet is padded to 80 (packet length setting) bytes 
+        # and followed by the RSSI.
+        serialized_packet = "\x02\x05\x02{}\x2A".format("\x00" * 78)
+
         with patch.object(self.rf_sensor, "_connection") as connection_mock:
-            # Nothing should be done when there is not enough data in the 
+            # Nothing should be read or processed when there is no data in the 
             # serial buffer.
             connection_mock.in_waiting = 0
             self.rf_sensor._receive()
             connection_mock.read.assert_not_called()
+            process_mock.assert_not_called()
 
-            # Create the `Packet` object for processing if there is enough data 
-            # in the serial buffer.
-            serialized_packet = "\x02\x05\x02{}\x2A".format("\x00" * 78)
-            connection_mock.in_waiting = len(serialized_packet)
-            connection_mock.read.configure_mock(return_value=serialized_packet)
+            # Partial frames must be read into the buffer, but not processed.
+            connection_mock.in_waiting = 10
+            connection_mock.read.configure_mock(return_value=serialized_packet[:10])
+            self.rf_sensor._receive()
+
+            connection_mock.read.assert_called_once_with(size=10)
+            self.assertEqual(self.rf_sensor._read_buffer, serialized_packet[:10])
+            process_mock.assert_not_called()
+
+            # Create the `Packet` objects for processing for all complete 
+            # frames once there is enough data in the serial buffer.
+            data = serialized_packet[10:] + serialized_packet
+            connection_mock.in_waiting = len(data)
+            connection_mock.read.configure_mock(return_value=data)
 
             self.rf_sensor._receive()
 
             self.assertNotEqual(self.rf_sensor._polling_time, 0.0)
+            self.assertEqual(self.rf_sensor._read_buffer, bytearray())
+            self.assertEqual(process_mock.call_count, 2)
 
-            arguments = process_mock.call_args[0]
-            keyword_arguments = process_mock.call_args[1]
-            self.assertIsInstance(arguments[0], Packet)
-            self.assertEqual(arguments[0].get_all(), {
-                "specification": "waypoint_clear",
-                "to_id": 2
-            })
-            self.assertEqual(keyword_arguments["rssi"], 42)
+            for arguments, keyword_arguments in process_mock.call_args_list:
+                self.assertIsInstance(arguments[0], Packet)
+                self.assertEqual(arguments[0].get_all(), {
+                    "specification": "waypoint_clear",
+                    "to_id": 2
+                })
+                self.assertEqual(keyword_arguments["rssi"], 42)
 
             # Any errors must be logged, but must not crash the process.
             connection_mock.in_waiting = len(serialized_packet)
@@ -234,6 +283,44 @@ class TestZigBeeRFSensorPhysicalTexasInstruments(ZigBeeRFSensorTestCase, USBMana
 
                     log_mock.assert_called_once_with(self.rf_sensor.type)
 
+    def test_parse_frames(self):
+        serialized_packet = "\x02\x05\x02{}\xD6".format("\x00" * 78)
+
+        # Incomplete frames must be kept in the buffer.
+        self.rf_sensor._read_buffer.extend(serialized_packet[:-1])
+        self.assertEqual(self.rf_sensor._parse_frames(), [])
+        self.assertEqual(len(self.rf_sensor._read_buffer), len(serialized_packet) - 1)
+
+        # Complete frames must be parsed and removed from the buffer.
+        self.rf_sensor._read_buffer.extend(serialized_packet[-1:] + serialized_packet)
+        frames = self.rf_sensor._parse_frames()
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(frames[0][0].get_all(), {
+            "specification": "waypoint_clear",
+            "to_id": 2
+        })
+        self.assertEqual(frames[0][1], -42)
+        self.assertEqual(self.rf_sensor._read_buffer, bytearray())
+        self.assertEqual(self.rf_sensor.framing_errors, 0)
+
+        # Corrupt data must be skipped to resynchronize with the frames, which 
+        # counts as one framing error. Frames with an invalid length or an 
+        # invalid packet are corrupt.
+        invalid_length = "\x00{}".format("\x00" * 81)
+        invalid_packet = "\x02\xFF\x02{}\xD6".format("\x00" * 78)
+        self.rf_sensor._read_buffer.extend("\x51\x51" + serialized_packet +
+                                           invalid_length + serialized_packet +
+                                           invalid_packet[:2] + serialized_packet)
+
+        frames = self.rf_sensor._parse_frames()
+        self.assertEqual(len(frames), 3)
+        for packet, rssi in frames:
+            self.assertEqual(packet.get("specification"), "waypoint_clear")
+            self.assertEqual(rssi, -42)
+
+        self.assertEqual(self.rf_sensor._read_buffer, bytearray())
+        self.assertEqual(self.rf_sensor.framing_errors, 3)
+
     @patch.object(RF_Sensor_Physical_Texas_Instruments, "_process_rssi_broadcast_packet")
     def test_process(self, process_rssi_broadcast_packet_mock):
         # RSSI value must be provided.
@@ -1,4 +1,5 @@
 # Core imports
+import Queue
 import thread
 import time
 
@@ -8,6 +9,7 @@ from mock import patch, MagicMock, PropertyMock
 
 # Package imports
 from ..core.Threadable import Threadable
+from ..zigbee.Clock import Clock
 from ..zigbee.Packet import Packet
 from ..zigbee.TDMA_Scheduler import TDMA_Scheduler
 from core_usb_manager import USBManagerTestCase
@@ -40,8 +42,12 @@ class TestZigBeeRFSensorPhysicalXBee(ZigBeeRFSensorTestCase, USBManagerTestCase)
         self._xbee_patcher.stop()
 
     def test_initialization(self):
-        self.assertEqual(self.rf_sensor._packets, {})
-        
+        self.assertIsInstance(self.rf_sensor._packets, Queue.Queue)
+        self.assertEqual(self.rf_sensor._pending, {})
+        self.assertEqual(self.rf_sensor._frame_id, 0)
+        self.assertEqual(self.rf_sensor._rssi_window, self.settings.get("rssi_window"))
+        self.assertEqual(self.rf_sensor._rssi_timeout, self.settings.get("rssi_timeout"))
+
         self.assertEqual(self.rf_sensor._sensor, None)
         self.assertEqual(self.rf_sensor._port, self.settings.get("port"))
         self.assertFalse(self.rf_sensor._node_identifier_set)
@@ -94,9 +100,11 @@ class TestZigBeeRFSensorPhysicalXBee(ZigBeeRFSensorTestCase, USBManagerTestCase)
                 sensor_mock.halt.assert_called_once_with()
 
     def test_start(self):
-        # The packet list must be an empty dictionary.
+        # The packets and pending RSSI requests must be cleared.
+        self.rf_sensor._pending["\x01"] = (self.packet, 0.0)
         self.rf_sensor.start()
-        self.assertEqual(self.rf_sensor._packets, {})
+        self.assertEqual(self.rf_sensor._packets.qsize(), 0)
+        self.assertEqual(self.rf_sensor._pending, {})
 
     def test_discover(self):
         with patch.object(self.rf_sensor, "_sensor") as sensor_mock:
@@ -154,35 +162,39 @@ class TestZigBeeRFSensorPhysicalXBee(ZigBeeRFSensorTestCase, USBManagerTestCase)
 
             interrupt_mock.assert_called_once_with()
 
-    def test_loop_body(self):
+    def test_tick(self):
         with patch.object(self.rf_sensor, "_send_custom_packets") as send_custom_packets_mock:
             # The sensor must wait until it has joined the network.
-            self.rf_sensor._loop_body()
+            self.rf_sensor._tick()
             send_custom_packets_mock.assert_not_called()
 
             # When the sensor has joined the network, the rest of the
-            # loop body must be executed.
+            # scheduled work must be executed.
             self.rf_sensor._joined = True
 
-            self.rf_sensor._loop_body()
-            send_custom_packets_mock.assert_called_once_with()
+            with patch.object(self.rf_sensor, "_evict_rssi_requests") as evict_rssi_requests_mock:
+                self.rf_sensor._tick()
+                send_custom_packets_mock.assert_called_once_with()
+
+                # Timed out RSSI requests must be evicted.
+                evict_rssi_requests_mock.assert_called_once_with()
 
     def test_send(self):
         # Create two dummy packets, one of them having an associated RSSI 
-        # value.
+        # value and the other one still waiting for it.
         first_packet = self.rf_sensor._create_rssi_broadcast_packet(2)
         first_packet.set("rssi", 42)
-        self.rf_sensor._packets[0] = first_packet
+        self.rf_sensor._packets.put(first_packet)
 
         second_packet = self.rf_sensor._create_rssi_broadcast_packet(2)
-        self.rf_sensor._packets[1] = second_packet
+        self.rf_sensor._pending["\x01"] = (second_packet, time.time())
 
         # If the current time is inside an allocated slot, then packets
         # may be sent.
         with patch.object(self.rf_sensor, "_send_tx_frame") as send_tx_frame_mock:
             in_slot_mock = PropertyMock(return_value=True)
             with patch.object(TDMA_Scheduler, "in_slot", new_callable=in_slot_mock):
-                self.rf_sensor._send()
+                list(self.rf_sensor._send())
 
                 calls = send_tx_frame_mock.call_args_list
 
@@ -201,17 +213,18 @@ class TestZigBeeRFSensorPhysicalXBee(ZigBeeRFSensorTestCase, USBManagerTestCase)
 
                 # RSSI ground station packets that have an associated RSSI value must
                 # be sent to the ground station. If the RSSI value is missing, then the
-                # packet must remain in the packet dictionary. We added two packets
-                # to the dictionary at the start of this test, so only the first one
-                # may be sent.
+                # packet must remain pending. Only the first packet that we added at
+                # the start of this test may be sent.
                 packet, to = calls.pop(0)[0]
                 self.assertIsInstance(packet, Packet)
                 self.assertEqual(packet.get("specification"), "rssi_broadcast")
                 self.assertEqual(packet.get("rssi"), 42)
                 self.assertEqual(to, 0)
 
-                self.assertEqual(self.rf_sensor._packets, {
-                    1: second_packet
+                self.assertEqual(calls, [])
+                self.assertEqual(self.rf_sensor._packets.qsize(), 0)
+                self.assertEqual(self.rf_sensor._pending, {
+                    "\x01": (second_packet, self.rf_sensor._pending["\x01"][1])
                 })
 
         # If the current time is not inside an allocated slot, then no
@@ -219,9 +232,21 @@ class TestZigBeeRFSensorPhysicalXBee(ZigBeeRFSensorTestCase, USBManagerTestCase)
         with patch.object(self.rf_sensor, "_send_tx_frame") as send_tx_frame_mock:
             in_slot_mock = PropertyMock(return_value=False)
             with patch.object(TDMA_Scheduler, "in_slot", new_callable=in_slot_mock):
-                self.rf_sensor._send()
+                self.assertEqual(list(self.rf_sensor._send()), [])
                 send_tx_frame_mock.assert_not_called()
 
+    def test_get_backlog(self):
+        # Packets that are waiting for their RSSI value must be included in 
+        # the backlog.
+        self.assertEqual(self.rf_sensor._get_backlog(), 0)
+
+        packet = self.rf_sensor._create_rssi_broadcast_packet(2)
+        self.rf_sensor._pending["\x01"] = (packet, time.time())
+        self.assertEqual(self.rf_sensor._get_backlog(), 1)
+
+        self.rf_sensor._packets.put(packet)
+        self.assertEqual(self.rf_sensor._get_backlog(), 2)
+
     def test_send_tx_frame(self):
         self.packet.set("specification", "waypoint_clear")
         self.packet.set("to_id", 2)
@@ -267,6 +292,8 @@ class TestZigBeeRFSensorPhysicalXBee(ZigBeeRFSensorTestCase, USBManagerTestCase)
         self.packet.set("waypoint_index", 1)
         self.packet.set("sensor_id", 2)
         self.packet.set("timestamp", time.time())
+        self.packet.set("sweep", 0)
+        self.packet.set("backlog", 0)
 
         with patch.object(self.rf_sensor, "_process_rssi_broadcast_packet") as process_rssi_broadcast_packet_mock:
             self.rf_sensor._process({
@@ -275,6 +302,26 @@ class TestZigBeeRFSensorPhysicalXBee(ZigBeeRFSensorTestCase, USBManagerTestCase)
 
             arguments = process_rssi_broadcast_packet_mock.call_args[0]
             self.assertEqual(arguments[0].get_all(), self.packet.get_all())
+            self.assertIsNone(process_rssi_broadcast_packet_mock.call_args[1]["rssi"])
+            process_rssi_broadcast_packet_mock.reset_mock()
+
+            # The RSSI value of RX packets must be used if it is included.
+            self.rf_sensor._process({
+                "rf_data": self.packet.serialize(),
+                "rssi": "\x4E"
+            })
+
+            kwargs = process_rssi_broadcast_packet_mock.call_args[1]
+            self.assertEqual(kwargs["rssi"], -ord("\x4E"))
+            process_rssi_broadcast_packet_mock.reset_mock()
+
+            # Invalid RF data must be ignored.
+            self.rf_sensor._process({
+                "rf_data": "\xff"
+            })
+
+            process_rssi_broadcast_packet_mock.assert_not_called()
+            self.assertEqual(self.rf_sensor._metrics.get_counter("unserialize_errors"), 1)
 
     def test_process_rssi_broadcast_packet(self):
         self.packet.set("specification", "rssi_broadcast")
@@ -288,25 +335,71 @@ class TestZigBeeRFSensorPhysicalXBee(ZigBeeRFSensorTestCase, USBManagerTestCase)
         with patch.object(self.rf_sensor, "_sensor") as sensor_mock:
             self.rf_sensor._process_rssi_broadcast_packet(self.packet)
 
-            self.assertTrue(len(self.rf_sensor._packets), 1)
-            frame_id = self.rf_sensor._packets.keys()[0]
+            self.assertEqual(len(self.rf_sensor._pending), 1)
+            frame_id = self.rf_sensor._pending.keys()[0]
             sensor_mock.send.assert_called_once_with("at", command="DB",
                                                      frame_id=frame_id)
+            sensor_mock.send.reset_mock()
+
+            # Packets with a known RSSI value are queued immediately.
+            self.rf_sensor._process_rssi_broadcast_packet(self.packet, rssi=-42)
+
+            sensor_mock.send.assert_not_called()
+            self.assertEqual(self.rf_sensor._packets.qsize(), 1)
+            self.assertEqual(self.rf_sensor._packets.get().get("rssi"), -42)
+
+            # Measurements are dropped when the in-flight window is full.
+            self.rf_sensor._rssi_window = 1
+            self.rf_sensor._process_rssi_broadcast_packet(self.packet)
+
+            sensor_mock.send.assert_not_called()
+            self.assertEqual(len(self.rf_sensor._pending), 1)
+            self.assertEqual(self.rf_sensor._metrics.get_counter("rssi_window_full"), 1)
+
+    def test_allocate_frame_id(self):
+        # Frame IDs are allocated in order, skipping those that are in flight 
+        # and wrapping around without using zero.
+        self.assertEqual(self.rf_sensor._allocate_frame_id(), "\x01")
+        self.rf_sensor._pending["\x02"] = (self.packet, 0.0)
+        self.assertEqual(self.rf_sensor._allocate_frame_id(), "\x03")
+
+        self.rf_sensor._frame_id = 254
+        self.assertEqual(self.rf_sensor._allocate_frame_id(), "\xff")
+        self.assertEqual(self.rf_sensor._allocate_frame_id(), "\x01")
+
+        # No frame ID is allocated when the window is full.
+        self.rf_sensor._rssi_window = 1
+        self.assertIsNone(self.rf_sensor._allocate_frame_id())
+
+    def test_evict_rssi_requests(self):
+        self.rf_sensor._rssi_timeout = 1.0
+        self.rf_sensor._pending["\x01"] = (self.packet, 10.0)
+        self.rf_sensor._pending["\x02"] = (self.packet, 10.5)
+        self.rf_sensor._pending["\x03"] = (self.packet, 12.0)
+
+        # Only requests that are older than the timeout are evicted.
+        with patch.object(Clock, "time", return_value=11.6):
+            self.rf_sensor._evict_rssi_requests()
+
+        self.assertEqual(self.rf_sensor._pending.keys(), ["\x03"])
+        self.assertEqual(self.rf_sensor._metrics.get_counter("rssi_timeouts"), 2)
+
+        with patch.object(Clock, "time", return_value=20.0):
+            self.rf_sensor._evict_rssi_requests()
+
+        self.assertEqual(self.rf_sensor._pending, {})
 
     def test_process_at_response(self):
-        # AT response DB packets should be processed. The parsed RSSI value
-        # should be placed in the original packet in the data object.
-        self.rf_sensor._packets = {
-            1: self.rf_sensor._create_rssi_broadcast_packet(2)
-        }
+        # AT response DB packets should be processed.
         raw_packet = {
             "id": "at_response",
-            "frame_id": 1,
+            "frame_id": "\x01",
             "command": "DB",
             "parameter": "\x4E"
         }
-        self.rf_sensor._process_at_response(raw_packet)
-        self.assertEqual(self.rf_sensor._packets[1].get("rssi"), -ord("\x4E"))
+        with patch.object(self.rf_sensor, "_process_rssi_response") as process_rssi_response_mock:
+            self.rf_sensor._process_at_response(raw_packet)
+            process_rssi_response_mock.assert_called_once_with(raw_packet)
 
         # AT response SH packets should be processed.
         raw_packet = {
@@ -398,6 +491,28 @@ class TestZigBeeRFSensorPhysicalXBee(ZigBeeRFSensorTestCase, USBManagerTestCase)
                 "address": "00:13:A2:00:40:E6:6E:BD"
             })
 
+    def test_process_rssi_response(self):
+        # The parsed RSSI value should be placed in the original packet, which
+        # is then queued.
+        packet = self.rf_sensor._create_rssi_broadcast_packet(2)
+        self.rf_sensor._pending["\x01"] = (packet, time.time())
+        raw_packet = {
+            "id": "at_response",
+            "frame_id": "\x01",
+            "command": "DB",
+            "parameter": "\x4E"
+        }
+        self.rf_sensor._process_rssi_response(raw_packet)
+        self.assertEqual(self.rf_sensor._pending, {})
+        self.assertEqual(self.rf_sensor._packets.get(), packet)
+        self.assertEqual(packet.get("rssi"), -ord("\x4E"))
+        self.assertEqual(self.rf_sensor.metrics["histograms"]["rssi_round_trip"]["count"], 1)
+
+        # Responses to evicted requests are ignored.
+        self.rf_sensor._process_rssi_response(raw_packet)
+        self.assertEqual(self.rf_sensor._packets.qsize(), 0)
+        self.assertEqual(self.rf_sensor._metrics.get_counter("rssi_late"), 1)
+
     def test_format_address(self):
         expectations = {
             None: "-",
@@ -1,5 +1,6 @@
 # Core imports
 import errno
+import random
 import socket
 
 # Library imports
@@ -7,7 +8,8 @@ from mock import patch, MagicMock
 
 # Package imports
 from ..reconstruction.Buffer import Buffer
-from ..zigbee.RF_Sensor import DisabledException
+from ..reconstruction.RSSI_Synthesizer import RSSI_Synthesizer
+from ..zigbee.RF_Sensor import RF_Sensor, DisabledException
 from ..zigbee.RF_Sensor_Simulator import RF_Sensor_Simulator
 from zigbee_rf_sensor import ZigBeeRFSensorTestCase
 
@@ -32,10 +34,31 @@ class TestZigBeeRFSensorSimulator(ZigBeeRFSensorTestCase):
         # The buffer size must be set.
         self.assertEqual(self.rf_sensor._buffer_size, self.settings.get("buffer_size"))
 
+        # The RSSI synthesizer must only be created if synthesis is enabled.
+        self.assertIsNone(self.rf_sensor._synthesizer)
+
+        self.settings.set("rssi_synthesis", True)
+        rf_sensor = self._create_sensor(RF_Sensor_Simulator)
+        self.assertIsInstance(rf_sensor._synthesizer, RSSI_Synthesizer)
+
+        # The sensor must have its own random number generator.
+        self.assertIsInstance(self.rf_sensor._random, random.Random)
+        self.assertIsNot(self.rf_sensor._random, rf_sensor._random)
+
     def test_type(self):
         # The `type` property must be implemented and correct.
         self.assertEqual(self.rf_sensor.type, "rf_sensor_simulator")
 
+    def test_synthesizer(self):
+        # The `synthesizer` property must return the RSSI synthesizer.
+        self.assertEqual(self.rf_sensor.synthesizer, self.rf_sensor._synthesizer)
+
+    def test_random(self):
+        # It must be possible to set and get the random number generator.
+        random_generator = random.Random(42)
+        self.rf_sensor.random = random_generator
+        self.assertEqual(self.rf_sensor.random, random_generator)
+
     @patch.object(socket.socket, "bind")
     def test_discover(self, bind_mock):
         bind_mock.configure_mock(side_effect=socket.error(errno.EADDRINUSE, "port in use"))
@@ -78,9 +101,24 @@ class TestZigBeeRFSensorSimulator(ZigBeeRFSensorTestCase):
 
         self.assertIsInstance(self.rf_sensor._connection, socket.socket)
 
+    def test_get_reactor_file(self):
+        # The socket connection must be registered with the reactor.
+        self.rf_sensor._setup()
+
+        self.assertEqual(self.rf_sensor._get_reactor_file(),
+                         self.rf_sensor._connection)
+
+    def test_loop_body(self):
+        with patch.object(RF_Sensor, "_loop_body") as loop_body_mock:
+            with patch.object(RF_Sensor_Simulator, "_read") as read_mock:
+                # The scheduled work must be performed before reading.
+                self.rf_sensor._loop_body()
+
+                loop_body_mock.assert_called_once_with()
+                read_mock.assert_called_once_with()
+
     @patch.object(RF_Sensor_Simulator, "_receive")
-    @patch.object(RF_Sensor_Simulator, "_send")
-    def test_loop_body(self, send_mock, receive_mock):
+    def test_read(self, receive_mock):
         with patch.object(self.rf_sensor, "_connection") as connection_mock:
             recv_mock = connection_mock.recv
 
@@ -88,7 +126,7 @@ class TestZigBeeRFSensorSimulator(ZigBeeRFSensorTestCase):
             # error occurs (i.e., when there is no data available), we ignore
             # the error and continue.
             recv_mock.configure_mock(side_effect=socket.error)
-            self.rf_sensor._loop_body()
+            self.rf_sensor._read()
             recv_mock.assert_called_once_with(self.settings.get("buffer_size"))
             recv_mock.reset_mock()
 
@@ -97,7 +135,7 @@ class TestZigBeeRFSensorSimulator(ZigBeeRFSensorTestCase):
             # deactivated), a `DisabledException` must be raised.
             recv_mock.configure_mock(side_effect=AttributeError)
             with self.assertRaises(DisabledException):
-                self.rf_sensor._loop_body()
+                self.rf_sensor._read()
 
             recv_mock.assert_called_once_with(self.settings.get("buffer_size"))
             recv_mock.reset_mock()
@@ -106,13 +144,22 @@ class TestZigBeeRFSensorSimulator(ZigBeeRFSensorTestCase):
             recv_mock.configure_mock(side_effect=None,
                                      return_value=self.waypoint_add_message)
 
-            self.rf_sensor._loop_body()
+            self.rf_sensor._read()
 
             recv_mock.assert_called_once_with(self.settings.get("buffer_size"))
             self.assertEqual(receive_mock.call_count, 1)
             kwargs = receive_mock.call_args[1]
             self.assertEqual(kwargs["packet"].get_all(),
                              self.waypoint_add_packet.get_all())
+            receive_mock.reset_mock()
+
+            # Invalid serialized packets must be ignored.
+            recv_mock.configure_mock(return_value="\xff")
+
+            self.rf_sensor._read()
+
+            receive_mock.assert_not_called()
+            self.assertEqual(self.rf_sensor._metrics.get_counter("unserialize_errors"), 1)
 
     def test_send_tx_frame(self):
         self.packet.set("specification", "waypoint_clear")
@@ -136,7 +183,11 @@ class TestZigBeeRFSensorSimulator(ZigBeeRFSensorTestCase):
         timestamp = self.rf_sensor._scheduler.timestamp
 
         packet = self.rf_sensor._create_rssi_broadcast_packet(2)
-        self.rf_sensor._receive(packet=packet)
+        with patch.object(self.rf_sensor, "_track_packet") as track_packet_mock:
+            self.rf_sensor._receive(packet=packet)
+
+            # The packet must be tracked.
+            track_packet_mock.assert_called_once_with(packet)
 
         # The receive callback must be called with the packet.
         self.receive_callback.assert_called_once_with(packet)
@@ -151,6 +202,30 @@ class TestZigBeeRFSensorSimulator(ZigBeeRFSensorTestCase):
         self.assertEqual(packet.get("specification"), "rssi_ground_station")
         self.assertIsInstance(packet.get("rssi"), int)
 
+        # The signal strength is drawn from the random number generator of 
+        # the sensor.
+        self.rf_sensor.random = MagicMock(spec=random.Random)
+        self.rf_sensor.random.randint.configure_mock(return_value=40)
+        self.rf_sensor._receive(packet=self.rf_sensor._create_rssi_broadcast_packet(2))
+        self.rf_sensor.random.randint.assert_called_once_with(30, 70)
+        self.assertEqual(self.rf_sensor._packets.get().get("rssi"), -40)
+
+        # The RSSI synthesizer must determine the signal strength of the link 
+        # between the sensor locations if it is available.
+        self.location_callback.configure_mock(return_value=((0, 5), 0))
+        synthesizer_mock = MagicMock(spec=RSSI_Synthesizer)
+        synthesizer_mock.synthesize.configure_mock(return_value=[-55])
+        self.rf_sensor._synthesizer = synthesizer_mock
+
+        broadcast_packet = self.rf_sensor._create_rssi_broadcast_packet(2)
+        broadcast_packet.set("latitude", 2.0)
+        broadcast_packet.set("longitude", 3.0)
+        self.rf_sensor._receive(packet=broadcast_packet)
+
+        synthesizer_mock.synthesize.assert_called_once_with([(2.0, 3.0)],
+                                                            [(0, 5)])
+        self.assertEqual(self.rf_sensor._packets.get().get("rssi"), -55)
+
         # If the sensor is the ground station, the packet must be put
         # into the buffer if it is available.
         self.rf_sensor.buffer = MagicMock(spec=Buffer)
@@ -5,6 +5,7 @@ from ..core.Thread_Manager import Thread_Manager
 from ..settings import Settings
 from ..zigbee.Packet import Packet
 from ..zigbee.RF_Sensor import RF_Sensor
+from ..zigbee.Receive_Window import Receive_Window
 from ..zigbee.Settings_Receiver import Settings_Receiver
 from environment import EnvironmentTestCase
 
@@ -22,7 +23,8 @@ class TestZigBeeSettingsReceiver(EnvironmentTestCase):
         self.assertEqual(self.settings_receiver._arguments, self.arguments)
         self.assertEqual(self.settings_receiver._rf_sensor, self.rf_sensor)
         self.assertEqual(self.settings_receiver._thread_manager, self.environment.thread_manager)
-        self.assertEqual(self.settings_receiver._next_index, 0)
+        self.assertIsInstance(self.settings_receiver._window, Receive_Window)
+        self.assertEqual(self.settings_receiver._window.next_index, 0)
         self.assertEqual(self.settings_receiver._new_settings, {})
         self.assertIn("setting_clear", self.environment._packet_callbacks.keys())
         self.assertIn("setting_add", self.environment._packet_callbacks.keys())
@@ -53,13 +55,14 @@ class TestZigBeeSettingsReceiver(EnvironmentTestCase):
         self.assertEqual(args[0].get_all(), {
             "specification": "setting_ack",
             "next_index": 0,
+            "window": 0,
             "sensor_id": self.rf_sensor.id
         })
         self.assertEqual(kwargs, {"to": 0})
 
         self.assertEqual(Settings.settings_files, {})
         self.assertEqual(self.arguments.groups, {})
-        self.assertEqual(self.settings_receiver._next_index, 0)
+        self.assertEqual(self.settings_receiver._window.next_index, 0)
 
     @patch.object(RF_Sensor, "enqueue")
     def test_add(self, enqueue_mock):
@@ -87,6 +90,7 @@ class TestZigBeeSettingsReceiver(EnvironmentTestCase):
         self.assertEqual(args[0].get_all(), {
             "specification": "setting_ack",
             "next_index": 1,
+            "window": 0,
             "sensor_id": self.rf_sensor.id
         })
         self.assertEqual(kwargs, {"to": 0})
@@ -94,7 +98,32 @@ class TestZigBeeSettingsReceiver(EnvironmentTestCase):
         self.assertEqual(self.settings_receiver._new_settings, {
             "home_location": (1, 2)
         })
-        self.assertEqual(self.settings_receiver._next_index, 1)
+        self.assertEqual(self.settings_receiver._window.next_index, 1)
+
+        # Settings that arrive out of order are only stored once the settings 
+        # before them are received, so that later values of a key win.
+        enqueue_mock.reset_mock()
+        packet.set("index", 2)
+        packet.set("value", (5, 6))
+        self.environment.receive_packet(packet)
+
+        args = enqueue_mock.call_args[0]
+        self.assertEqual(args[0].get("next_index"), 1)
+        self.assertEqual(args[0].get("window"), 1 << 0)
+        self.assertEqual(self.settings_receiver._new_settings, {
+            "home_location": (1, 2)
+        })
+
+        packet.set("index", 1)
+        packet.set("value", (3, 4))
+        self.environment.receive_packet(packet)
+
+        args = enqueue_mock.call_args[0]
+        self.assertEqual(args[0].get("next_index"), 3)
+        self.assertEqual(args[0].get("window"), 0)
+        self.assertEqual(self.settings_receiver._new_settings, {
+            "home_location": (5, 6)
+        })
 
     @patch.object(RF_Sensor, "enqueue")
     @patch.object(Thread_Manager, "interrupt")
@@ -106,7 +135,8 @@ class TestZigBeeSettingsReceiver(EnvironmentTestCase):
         }
         pretty_json = json.dumps(new_settings, indent=4, sort_keys=True)
         self.settings_receiver._new_settings = new_settings
-        self.settings_receiver._next_index = 3
+        for dummy in range(3):
+            self.settings_receiver._window.advance()
 
         # Packets not meant for the current RF sensor are ignored.
         packet = Packet()
@@ -143,6 +173,7 @@ class TestZigBeeSettingsReceiver(EnvironmentTestCase):
         self.assertEqual(args[0].get_all(), {
             "specification": "setting_ack",
             "next_index": 4,
+            "window": 0,
             "sensor_id": self.rf_sensor.id
         })
         self.assertEqual(kwargs, {"to": 0})
@@ -1,4 +1,6 @@
 import time
+from collections import OrderedDict
+from ..zigbee.Clock import Clock
 from ..zigbee.Packet import Packet
 from ..zigbee.TDMA_Scheduler import TDMA_Scheduler
 from ..settings import Arguments
@@ -32,15 +34,59 @@ class TestZigBeeTDMAScheduler(SettingsTestCase):
         self.assertEqual(self.scheduler._number_of_sensors, self.number_of_sensors)
         self.assertEqual(self.scheduler._sweep_delay, self.sweep_delay)
 
+        self.assertEqual(self.scheduler._adaptive, False)
+        self.assertEqual(self.scheduler._minimum_slot_time,
+                         self.settings.get("minimum_slot_time"))
+        self.assertEqual(self.scheduler._ground_station_slot_time,
+                         self.settings.get("ground_station_slot_time"))
+
+        self.assertIsInstance(self.scheduler._clock, Clock)
         self.assertEqual(self.scheduler._id, self.id)
         self.assertEqual(self.scheduler._timestamp, 0)
+        self.assertEqual(self.scheduler._sweep, 0)
         self.assertEqual(self.scheduler._slot_time, self.slot_time)
+        self.assertEqual(self.scheduler._sweep_time, self.sweep_delay)
+
+        # Without adaptive slots, the ground station has no slot and the 
+        # vehicle sensors have equally large slots.
+        self.assertEqual(self.scheduler._backlogs,
+                         [OrderedDict()] * (self.number_of_sensors + 1))
+        self.assertEqual(len(self.scheduler._offsets),
+                         self.number_of_sensors + 1)
+        self.assertEqual(self.scheduler._offsets[0], 0.0)
+        for i in range(1, self.number_of_sensors + 1):
+            self.assertAlmostEqual(self.scheduler._offsets[i],
+                                   (i - 1) * self.slot_time)
+
+        # With adaptive slots, the ground station has a reserved slot.
+        scheduler = self._create_adaptive_scheduler()
+        self.assertTrue(scheduler._adaptive)
+        self.assertEqual(scheduler._offsets[1], 0.1)
+        self.assertAlmostEqual(scheduler._sweep_time, 0.9)
+
+    def _create_adaptive_scheduler(self):
+        arguments = Arguments("settings.json", [
+            "--number-of-sensors", "4", "--sweep-delay", "0.9",
+            "--adaptive-slots", "--minimum-slot-time", "0.05",
+            "--ground-station-slot-time", "0.1"
+        ])
+        return TDMA_Scheduler(self.id, arguments)
 
     def test_id(self):
         # It must be possible to set and get the ID of the sensor.
         self.scheduler.id = 1
         self.assertEqual(self.scheduler.id, 1)
 
+    def test_clock(self):
+        # It must be possible to set and get the clock of the scheduler.
+        clock = Clock()
+        self.scheduler.clock = clock
+        self.assertEqual(self.scheduler.clock, clock)
+
+        # A clock given at initialization must be used.
+        scheduler = TDMA_Scheduler(self.id, self.arguments, clock=clock)
+        self.assertEqual(scheduler.clock, clock)
+
     def test_timestamp(self):
         # It must be possible to get and set the timestamp for sending packets.
         self.assertEqual(self.scheduler.timestamp, 0)
@@ -48,6 +94,23 @@ class TestZigBeeTDMAScheduler(SettingsTestCase):
         self.scheduler.timestamp = 12345678.90
         self.assertEqual(self.scheduler.timestamp, 12345678.90)
 
+    def test_slot_time(self):
+        # The slot time is an equal share of the sweep delay.
+        self.scheduler._slot_time = 0.25
+        self.assertEqual(self.scheduler.slot_time, 0.25)
+
+    def test_sweep_time(self):
+        self.scheduler._sweep_time = 1.5
+        self.assertEqual(self.scheduler.sweep_time, 1.5)
+
+    def test_sweep(self):
+        # The sweep number advances with each update after the first one.
+        self.assertEqual(self.scheduler.sweep, 0)
+        self.scheduler.update()
+        self.assertEqual(self.scheduler.sweep, 0)
+        self.scheduler.update()
+        self.assertEqual(self.scheduler.sweep, 1)
+
     def test_in_slot(self):
         # The scheduler must correctly report if the sensor is allowed to send
         # packets, i.e., if the current time is inside an allocated slot.
@@ -58,6 +121,120 @@ class TestZigBeeTDMAScheduler(SettingsTestCase):
         self.scheduler._slot_time = -5
         self.assertFalse(self.scheduler.in_slot)
 
+    def test_missed(self):
+        # The scheduler must correctly report if the current time is past the 
+        # end of the allocated slot.
+        self.scheduler._timestamp = time.time()
+        self.scheduler._slot_time = 5
+        self.assertFalse(self.scheduler.missed)
+
+        self.scheduler._timestamp = time.time() + 10
+        self.assertFalse(self.scheduler.missed)
+
+        self.scheduler._timestamp = time.time() - 10
+        self.assertTrue(self.scheduler.missed)
+
+    def test_set_backlog(self):
+        # The backlog of a sensor must be registered for the current sweep.
+        self.assertEqual(self.scheduler.set_backlog(3, 12), 12)
+        self.assertEqual(self.scheduler._backlogs[3], {0: 12})
+
+        # Only the first report of a sensor in a sweep is kept.
+        self.assertEqual(self.scheduler.set_backlog(3, 20), 12)
+        self.assertEqual(self.scheduler._backlogs[3], {0: 12})
+
+        # Only the reports of the most recent sweeps are kept.
+        for sweep in range(1, 6):
+            self.scheduler.set_backlog(3, sweep, sweep)
+
+        self.assertEqual(self.scheduler._backlogs[3].keys(), [2, 3, 4, 5])
+
+    def test_allocate(self):
+        scheduler = self._create_adaptive_scheduler()
+
+        # Without any backlog, the remaining time is divided equally. The 
+        # ground station slot comes first, followed by the sensor slots.
+        slot_times = scheduler._allocate(0)
+        self.assertEqual(len(slot_times), 5)
+        self.assertAlmostEqual(slot_times[0], 0.1)
+        for i in range(1, 5):
+            self.assertAlmostEqual(slot_times[i], 0.2)
+
+        self.assertEqual(scheduler._offsets[0], 0.0)
+        for i in range(1, 5):
+            self.assertAlmostEqual(scheduler._offsets[i], 0.1 + (i - 1) * 0.2)
+
+        self.assertAlmostEqual(scheduler._slot_time, 0.2)
+        self.assertAlmostEqual(scheduler._sweep_time, 0.9)
+
+        # Sensors with a backlog receive the remaining time in proportion to 
+        # their backlog, while idle sensors only keep the minimum slot time. 
+        # The backlogs reported in a sweep are used two sweeps later.
+        scheduler.set_backlog(1, 0)
+        scheduler.set_backlog(2, 30)
+        scheduler.set_backlog(3, 10)
+        scheduler.set_backlog(4, 0)
+        self.assertEqual(scheduler._allocate(0), scheduler._allocate(1))
+
+        expected = [0.1, 0.05, 0.5, 0.2, 0.05]
+        for slot_time, expected_slot_time in zip(scheduler._allocate(2), expected):
+            self.assertAlmostEqual(slot_time, expected_slot_time)
+
+        scheduler._set_sweep(2)
+        expected = [0.0, 0.1, 0.15, 0.65, 0.85]
+        for offset, expected_offset in zip(scheduler._offsets, expected):
+            self.assertAlmostEqual(offset, expected_offset)
+
+        self.assertAlmostEqual(scheduler._slot_time, 0.5)
+        self.assertAlmostEqual(scheduler._sweep_time, 0.9)
+
+        # Later sweeps use the latest reports before them.
+        scheduler.set_backlog(2, 0, 1)
+        self.assertEqual(scheduler._allocate(2), scheduler._allocate(2))
+        self.assertAlmostEqual(scheduler._allocate(3)[2], 0.05)
+
+        # If the minimum slot times do not fit in the sweep, then the sweep 
+        # becomes longer.
+        scheduler._minimum_slot_time = 0.3
+        scheduler._set_sweep(2)
+        self.assertAlmostEqual(scheduler._slot_time, 0.3)
+        self.assertAlmostEqual(scheduler._sweep_time, 1.3)
+
+        # Without adaptive slots, the ground station has no slot and the 
+        # backlogs are ignored.
+        self.scheduler.set_backlog(1, 10)
+        self.assertEqual(self.scheduler._allocate(2),
+                         [0.0] + [self.slot_time] * self.number_of_sensors)
+
+    def test_update_adaptive(self):
+        scheduler = self._create_adaptive_scheduler()
+
+        # The first update places the timestamp at the offset of the slot of 
+        # the sensor in the sweep.
+        scheduler.update()
+
+        expected = time.time() + 0.3
+        self.assertAlmostEqual(scheduler.timestamp, expected,
+                               delta=self.time_delta)
+
+        # Subsequent updates move to the next sweep, with a slot offset based 
+        # on the backlogs that the sensors reported two sweeps before.
+        scheduler.set_backlog(1, 10)
+        scheduler.update()
+
+        expected += 0.9
+        self.assertEqual(scheduler.sweep, 1)
+        self.assertAlmostEqual(scheduler.timestamp, expected,
+                               delta=self.time_delta)
+
+        scheduler.update()
+
+        expected += 0.6 + 0.1 + 0.05 + 0.6
+        self.assertEqual(scheduler.sweep, 2)
+        self.assertAlmostEqual(scheduler.timestamp, expected,
+                               delta=self.time_delta)
+        self.assertAlmostEqual(scheduler._slot_time, 0.05)
+
     def test_update(self):
         # The first time the method is called, the timestamp is based on the
         # current time `c`. If the total sweep takes `t` seconds, then the
@@ -131,6 +308,58 @@ class TestZigBeeTDMAScheduler(SettingsTestCase):
         self.assertAlmostEqual(self.scheduler.timestamp, expected,
                                delta=self.time_delta)
 
+    def test_synchronize_adaptive(self):
+        scheduler = self._create_adaptive_scheduler()
+        scheduler.set_backlog(3, 10)
+
+        # The timestamp is based on the slot times inbetween the sensors in 
+        # the sweep of the other sensor, and the backlog in the packet must be 
+        # registered for that sweep.
+        packet = Packet()
+        packet.set("specification", "rssi_broadcast")
+        packet.set("sensor_id", 1)
+        packet.set("timestamp", time.time())
+        packet.set("sweep", 2)
+        packet.set("backlog", 10)
+
+        scheduler.synchronize(packet)
+
+        expected = packet.get("timestamp") + 0.05
+        self.assertAlmostEqual(scheduler.timestamp, expected,
+                               delta=self.time_delta)
+        self.assertEqual(scheduler._backlogs[1], {2: 10})
+
+        # The sensor adopts the sweep number of the other sensor, and uses the 
+        # slots allocated for that sweep.
+        self.assertEqual(scheduler.sweep, 2)
+        self.assertAlmostEqual(scheduler.slot_time, 0.05)
+
+        # Packets from sensors after the current sensor must complete the 
+        # sweep, which includes the ground station slot. The slots of the 
+        # next sweep take the backlog of the first sensor into account.
+        packet.set("sensor_id", 3)
+        packet.set("timestamp", time.time())
+        packet.set("sweep", 3)
+
+        scheduler.synchronize(packet)
+
+        expected = packet.get("timestamp") - 0.2 + 0.9 + 0.45
+        self.assertAlmostEqual(scheduler.timestamp, expected,
+                               delta=self.time_delta)
+        self.assertEqual(scheduler.sweep, 4)
+        self.assertAlmostEqual(scheduler.slot_time, 0.05)
+
+        # Packets from sensors that are ahead in the sweep numbering change 
+        # the sweep number even if the timestamp is not accepted.
+        packet.set("timestamp", 0)
+        packet.set("sweep", 9)
+
+        scheduler.synchronize(packet)
+
+        self.assertAlmostEqual(scheduler.timestamp, expected,
+                               delta=self.time_delta)
+        self.assertEqual(scheduler.sweep, 10)
+
     def test_shift(self):
         # The schedule must be shited by the provided number of seconds.
         timestamp = self.scheduler.timestamp
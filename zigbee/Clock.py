@@ -0,0 +1,78 @@
+# Core imports
+import time
+
+class Clock(object):
+    """
+    Clock that provides the current time and delays for the RF sensors and
+    their schedulers.
+
+    The clock can be adjusted with an offset and drift relative to the system
+    clock, for example after synchronizing with another clock, without
+    changing the system clock itself.
+
+    Subclasses may provide a different notion of time, such as a virtual time
+    for simulations.
+    """
+
+    def __init__(self):
+        self._offset = 0.0
+        self._drift = 0.0
+        self._reference_time = 0.0
+
+    @property
+    def offset(self):
+        """
+        Get the current offset in seconds of the clock relative to the system
+        clock, including any drift since the clock was adjusted.
+        """
+
+        return self._get_offset(time.time())
+
+    @property
+    def drift(self):
+        """
+        Get the drift of the clock relative to the system clock in seconds
+        per second.
+        """
+
+        return self._drift
+
+    def adjust(self, offset, drift=0.0, reference_time=None):
+        """
+        Adjust the clock such that it has the given `offset` in seconds
+        relative to the system clock at the system time `reference_time`.
+
+        The offset changes by `drift` seconds per second of system time
+        afterward. If `reference_time` is not given, then the offset applies
+        to the current system time.
+        """
+
+        if reference_time is None:
+            reference_time = time.time()
+
+        self._offset = float(offset)
+        self._drift = float(drift)
+        self._reference_time = reference_time
+
+    def time(self):
+        """
+        Get the current time in seconds since the epoch.
+        """
+
+        current_time = time.time()
+        return current_time + self._get_offset(current_time)
+
+    def sleep(self, seconds):
+        """
+        Delay execution for the given number of `seconds`.
+        """
+
+        time.sleep(seconds)
+
+    def _get_offset(self, current_time):
+        """
+        Get the offset in seconds of the clock relative to the system clock at
+        the system time `current_time`.
+        """
+
+        return self._offset + self._drift * (current_time - self._reference_time)
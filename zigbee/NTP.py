@@ -1,20 +1,29 @@
-import os
-import subprocess
+import threading
 import time
 from Packet import Packet
 from RF_Sensor import RF_Sensor
 
 class NTP(object):
-    def __init__(self, sensor):
+    def __init__(self, sensor, samples=1, drift=False):
         """
         Initialize the NTP object. This object takes care of performing
         the NTP (network time protocol) algorithm.
+
+        The clock of the `sensor` is synchronized once the given number of
+        `samples` of exchanges with the server have finished. If `drift` is
+        enabled, then the drift of the clock is estimated from the exchanges
+        as well.
         """
 
         if not isinstance(sensor, RF_Sensor):
             raise TypeError("`sensor` must be an `RF_Sensor` object")
 
         self._sensor = sensor
+        self._samples = samples
+        self._drift = drift
+
+        self._measurements = []
+        self._finished = threading.Event()
 
     def start(self):
         """
@@ -22,6 +31,8 @@ class NTP(object):
         server (ground station) for synchronization.
         """
 
+        self._finished.clear()
+
         # Construct the NTP packet.
         packet = Packet()
         packet.set("specification", "ntp")
@@ -34,6 +45,14 @@ class NTP(object):
         # Send the NTP packet to the ground station.
         self._sensor._send_tx_frame(packet, 0)
 
+    def wait(self, timeout):
+        """
+        Wait at most `timeout` seconds for the exchange that was started last
+        to finish. Returns whether the exchange has finished.
+        """
+
+        return self._finished.wait(timeout)
+
     def process(self, packet):
         """
         Process an incoming NTP packet `packet`. On the server (ground
@@ -52,26 +71,77 @@ class NTP(object):
 
     def finish(self, packet):
         """
-        Finish the NTP algorithm to synchronize the clock of the client
-        (sensor) with the clock of the server (ground station).
+        Finish an exchange of the NTP algorithm and return the clock offset
+        between the client (sensor) and the server (ground station) that it
+        measured. When enough exchanges have finished, the clock of the
+        client is synchronized with the clock of the server.
 
         Refer to the original paper "Internet time synchronization: the
         network time protocol" by David L. Mills (IEEE, 1991) for more
         information.
         """
 
-        # Calculate the clock offset.
-        a = packet.get("timestamp_2") - packet.get("timestamp_1")
-        b = packet.get("timestamp_3") - packet.get("timestamp_4")
+        timestamp_1 = packet.get("timestamp_1")
+        timestamp_4 = packet.get("timestamp_4")
+
+        # Calculate the clock offset and the round-trip delay.
+        a = packet.get("timestamp_2") - timestamp_1
+        b = packet.get("timestamp_3") - timestamp_4
         clock_offset = float(a + b) / 2
+        delay = float(a - b)
 
-        # Apply the offset to the current clock to synchronize.
-        synchronized = time.time() + clock_offset
+        # The offset is measured halfway through the exchange.
+        self._measurements.append((delay, clock_offset,
+                                   float(timestamp_1 + timestamp_4) / 2))
+        self._finished.set()
 
-        # Update the system clock with the synchronized clock.
-        with open(os.devnull, 'w') as FNULL:
-            subprocess.call(["date", "-s", "@{}".format(synchronized)],
-                            stdout=FNULL, stderr=FNULL)
+        if len(self._measurements) >= self._samples:
+            self._synchronize()
 
-        self._sensor._synchronized = True
         return clock_offset
+
+    def _synchronize(self):
+        """
+        Synchronize the clock of the client (sensor) using the measurements of
+        the finished exchanges.
+
+        The exchange with the minimum round-trip delay provides the offset,
+        since the error of the offset is bounded by half of the delay. The
+        clock of the client keeps the offset in-process instead of changing
+        the system clock.
+        """
+
+        clock_offset, reference_time = min(self._measurements)[1:]
+
+        drift = 0.0
+        if self._drift:
+            drift = self._estimate_drift()
+
+        self._sensor.clock.adjust(clock_offset, drift=drift,
+                                  reference_time=reference_time)
+
+        self._measurements = []
+        self._sensor._synchronized = True
+
+    def _estimate_drift(self):
+        """
+        Estimate the drift of the client (sensor) clock in seconds per second
+        as the least-squares slope of the measured offsets over time.
+
+        If the measurements do not span any time, then no drift is estimated.
+        """
+
+        times = [measurement[2] for measurement in self._measurements]
+        offsets = [measurement[1] for measurement in self._measurements]
+
+        mean_time = sum(times) / len(times)
+        mean_offset = sum(offsets) / len(offsets)
+
+        variance = sum((t - mean_time) ** 2 for t in times)
+        if variance == 0.0:
+            return 0.0
+
+        covariance = sum((t - mean_time) * (offset - mean_offset)
+                         for t, offset in zip(times, offsets))
+
+        return covariance / variance
@@ -7,6 +7,10 @@ class Packet(object):
     # The specifications are cached between packets.
     _specifications = None
 
+    # Byte offsets of the fields in the serialized packets of each
+    # specification. The offsets are cached between packets.
+    _offsets = {}
+
     def __init__(self):
         """
         Initialize the packet with an empty contents key-value store.
@@ -16,10 +20,11 @@ class Packet(object):
 
         if self._specifications is None:
             with open("zigbee/specifications.json") as specifications_file:
-                self._specifications = json.load(specifications_file)
+                Packet._specifications = json.load(specifications_file)
 
         self._private = True
         self._contents = {}
+        self._serialized = None
         self._object_types = {
             bool: "?",
             int: "i",
@@ -37,6 +42,8 @@ class Packet(object):
             specification = self._specifications[value]
             self._private = specification[0]["private"]
 
+        self._update_serialized(key, value)
+
     def unset(self, key):
         """
         Unset a key in the contents key-value store.
@@ -44,6 +51,7 @@ class Packet(object):
 
         if key in self._contents:
             self._contents.pop(key)
+            self._serialized = None
 
     def get(self, key):
         """
@@ -117,8 +125,16 @@ class Packet(object):
         'value' key. The remaining bytes are added in order according to
         the specification. For instance, if the specification has two fields
         that are both doubles, then 16 additional bytes will be added.
+
+        The serialized packet is kept, such that serializing the packet again
+        after changing fields with a fixed size and offset only requires
+        updating those fields in place. This makes it cheap to send the same
+        packet to many destinations with small differences.
         """
 
+        if self._serialized is not None:
+            return str(self._serialized)
+
         # Verify that the specification has been provided.
         if "specification" not in self._contents:
             raise KeyError("No specification has been provided")
@@ -150,8 +166,71 @@ class Packet(object):
             except struct.error as e:
                 raise ValueError("Unable to serialize packet with specification '{}': struct error for field '{}': {}".format(specification_name, field["name"], e.message))
 
+        self._serialized = bytearray(packed_message)
         return packed_message
 
+    def _get_offsets(self, specification_name):
+        """
+        Get the byte offsets of the fields in serialized packets with the
+        specification `specification_name`.
+
+        The offsets are returned as a dictionary with the field names as keys.
+        Each value is a tuple of the offset and the format of the field, or
+        `None` if the field does not have a fixed size and offset because it
+        has or follows a field with a special format.
+        """
+
+        if specification_name not in self._offsets:
+            offsets = {}
+            offset = 0
+            for field in self._specifications[specification_name]:
+                if "value" in field:
+                    offset += struct.calcsize(field["format"])
+                    continue
+
+                if offset is None or field["format"] in ("$", "@"):
+                    offsets[field["name"]] = None
+                    offset = None
+                else:
+                    offsets[field["name"]] = (offset, field["format"])
+                    offset += struct.calcsize(field["format"])
+
+            self._offsets[specification_name] = offsets
+
+        return self._offsets[specification_name]
+
+    def _update_serialized(self, key, value):
+        """
+        Update the field `key` in the serialized packet, if there is one, to
+        the new `value`.
+
+        The serialized packet is discarded when the field cannot be updated
+        in place, in which case the packet is serialized again when needed.
+        Keys that are not part of the specification do not affect the
+        serialized packet.
+        """
+
+        if self._serialized is None:
+            return
+
+        if key == "specification":
+            self._serialized = None
+            return
+
+        offsets = self._get_offsets(self._contents["specification"])
+        if key not in offsets:
+            return
+
+        if offsets[key] is None:
+            self._serialized = None
+            return
+
+        offset, format = offsets[key]
+        try:
+            struct.pack_into(format, self._serialized, offset, value)
+        except struct.error:
+            self._serialized = None
+
     def _pack_field(self, format, value):
         if format == "$":
             # Special string format: pack the full length of the string. Track 
@@ -195,6 +274,8 @@ class Packet(object):
         using an offset.
         """
 
+        self._serialized = None
+
         # Unpack the specification identifier.
         specification_id, offset = self._read_packed("B", contents, 0)
 
@@ -229,6 +310,10 @@ class Packet(object):
 
             self._contents[name] = data
 
+        # Keep the received bytes as the serialized packet, so that the packet 
+        # does not need to be serialized again when it is captured or sent on.
+        self._serialized = bytearray(contents[:offset])
+
     def _read_format(self, format, contents, offset):
         if format == "$":
             length, offset = self._read_packed("B", contents, offset)
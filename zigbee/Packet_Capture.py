@@ -0,0 +1,171 @@
+# Core imports
+import os
+import struct
+
+# Package imports
+from Packet import Packet
+
+class Packet_Capture(object):
+    """
+    Capture of received packets in a rotating binary log.
+
+    Each file in the log starts with a header, followed by a record for each
+    packet. A record consists of the arrival timestamp of the packet, the
+    length of the serialized packet and the serialized packet itself. When
+    a file would grow larger than the maximum size, it is rotated: older files
+    get a numerical suffix, and the oldest file is removed once the maximum
+    number of files is reached.
+    """
+
+    HEADER = "RFCAP\x01"
+    RECORD_FORMAT = "<dH"
+
+    def __init__(self, filename, max_size=10485760, max_files=5):
+        """
+        Initialize the packet capture.
+
+        The `filename` is the name of the current file of the log. The file is
+        opened for appending when the first packet is written. Each file has
+        at most `max_size` bytes, except when a single record is larger, and
+        there are at most `max_files` files including the current file.
+        """
+
+        self._filename = filename
+        self._max_size = max_size
+        self._max_files = max_files
+
+        self._file = None
+        self._size = 0
+        self._record_size = struct.calcsize(self.RECORD_FORMAT)
+
+    @property
+    def filename(self):
+        """
+        Get the name of the current file of the log.
+        """
+
+        return self._filename
+
+    def write(self, packet, timestamp):
+        """
+        Write a record for a `Packet` object `packet` that arrived at the
+        given `timestamp` to the log.
+        """
+
+        if not isinstance(packet, Packet):
+            raise TypeError("Only `Packet` objects can be captured")
+
+        data = packet.serialize()
+        size = self._record_size + len(data)
+
+        if self._file is None:
+            self._open()
+        elif self._size + size > self._max_size and self._size > len(self.HEADER):
+            self._rotate()
+
+        self._file.write(struct.pack(self.RECORD_FORMAT, timestamp, len(data)))
+        self._file.write(data)
+        self._size += size
+
+    def flush(self):
+        """
+        Write any buffered records to the current file.
+        """
+
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """
+        Close the current file of the log.
+
+        The log can still be written to afterward, which appends to the same
+        file again.
+        """
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def get_filenames(self):
+        """
+        Get the names of the existing files of the log, ordered from the
+        oldest to the current file.
+        """
+
+        filenames = []
+        for index in range(self._max_files - 1, -1, -1):
+            filename = self._get_filename(index)
+            if os.path.exists(filename):
+                filenames.append(filename)
+
+        return filenames
+
+    def read(self, filename):
+        """
+        Read the records from a file of the log with the given `filename`.
+
+        This is a generator that yields a tuple of the arrival timestamp and
+        the `Packet` object for each record. An incomplete record at the end
+        of the file, which may be caused by an interrupted capture, is ignored.
+        """
+
+        with open(filename, "rb") as capture_file:
+            if capture_file.read(len(self.HEADER)) != self.HEADER:
+                raise ValueError("File '{}' is not a packet capture".format(filename))
+
+            while True:
+                record = capture_file.read(self._record_size)
+                if len(record) < self._record_size:
+                    return
+
+                timestamp, length = struct.unpack(self.RECORD_FORMAT, record)
+                data = capture_file.read(length)
+                if len(data) < length:
+                    return
+
+                packet = Packet()
+                packet.unserialize(data)
+
+                yield timestamp, packet
+
+    def _get_filename(self, index):
+        """
+        Get the name of the file of the log with the given rotation `index`,
+        where the current file has index zero.
+        """
+
+        if index == 0:
+            return self._filename
+
+        return "{}.{}".format(self._filename, index)
+
+    def _open(self):
+        """
+        Open the current file of the log for appending, and write the header
+        if the file is new.
+        """
+
+        self._file = open(self._filename, "ab")
+        self._file.seek(0, os.SEEK_END)
+        self._size = self._file.tell()
+        if self._size == 0:
+            self._file.write(self.HEADER)
+            self._size = len(self.HEADER)
+
+    def _rotate(self):
+        """
+        Rotate the files of the log and start a new current file.
+        """
+
+        self.close()
+
+        for index in range(self._max_files - 1, 0, -1):
+            source = self._get_filename(index - 1)
+            if os.path.exists(source):
+                os.rename(source, self._get_filename(index))
+
+        if os.path.exists(self._filename):
+            os.remove(self._filename)
+
+        self._open()
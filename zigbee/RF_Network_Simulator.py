@@ -0,0 +1,394 @@
+# Core imports
+import errno
+import heapq
+import itertools
+import random
+import socket
+from collections import deque
+
+# Package imports
+from ..settings import Arguments
+from Clock import Clock
+from Packet import Packet
+from RF_Sensor_Simulator import RF_Sensor_Simulator
+
+class Virtual_Clock(Clock):
+    """
+    Clock with a virtual time that only advances when the sensor sleeps.
+    """
+
+    def __init__(self, start=0.0):
+        super(Virtual_Clock, self).__init__()
+
+        self._time = start
+
+    def time(self):
+        """
+        Get the current virtual time in seconds.
+        """
+
+        return self._time
+
+    def sleep(self, seconds):
+        """
+        Advance the virtual time by the given number of `seconds`.
+        """
+
+        self._time += seconds
+
+class Virtual_Connection(object):
+    """
+    Socket-like connection of a simulated RF sensor to the medium of an
+    `RF_Network_Simulator`.
+    """
+
+    def __init__(self, network, sensor_id):
+        self._network = network
+        self._sensor_id = sensor_id
+
+    def sendto(self, data, address):
+        """
+        Send the byte-encoded string `data` to the sensor with the socket
+        `address` through the medium.
+        """
+
+        self._network.transmit(self._sensor_id, address, data)
+
+    def recv(self, buffer_size):
+        """
+        Receive a frame of at most `buffer_size` bytes from the medium.
+
+        If no frame has arrived yet, then a `socket.error` is raised just like
+        a nonblocking socket would do.
+        """
+
+        return self._network.receive(self._sensor_id, buffer_size)
+
+    def close(self):
+        """
+        Close the connection. The medium keeps no resources for connections.
+        """
+
+        pass
+
+class Virtual_Frame(object):
+    """
+    A frame that travels through the medium of an `RF_Network_Simulator`.
+    """
+
+    def __init__(self, from_id, to_id, start, end, data):
+        self.from_id = from_id
+        self.to_id = to_id
+        self.start = start
+        self.end = end
+        self.data = data
+        self.collided = False
+
+        # The link and measurement time of the RSSI measurement that the frame
+        # carries to the ground station, if any.
+        self.link = None
+
+class RF_Network_Simulator(object):
+    """
+    Simulator for a network of RF sensors that communicate through an in-process
+    medium in virtual time.
+
+    The network consists of `RF_Sensor_Simulator` objects for the ground station
+    and each vehicle sensor, which run their actual sensor loops, schedulers and
+    packet handling. Instead of sockets and the system clock, they use virtual
+    connections to the medium and virtual clocks. Sensors are stepped in order
+    of their virtual time, which makes the simulation deterministic and much
+    faster than real time.
+    """
+
+    def __init__(self, arguments, thread_manager, locations=None):
+        """
+        Initialize the network simulator.
+
+        The `arguments` must be an `Arguments` object, and `thread_manager` is
+        the `Thread_Manager` object that is passed to the RF sensors. If given,
+        `locations` is a list of coordinate tuples for each sensor in the
+        network, including the ground station at index 0. Otherwise, all
+        sensors are located at the origin.
+        """
+
+        if not isinstance(arguments, Arguments):
+            raise TypeError("'arguments' must be an instance of Arguments")
+
+        self._settings = arguments.get_settings("rf_network_simulator")
+        self._number_of_sensors = self._settings.get("number_of_sensors")
+        self._port = self._settings.get("socket_port")
+        self._duration = self._settings.get("network_duration")
+        self._loss_rate = self._settings.get("loss_rate")
+        self._latency = self._settings.get("latency")
+        self._bit_rate = float(self._settings.get("bit_rate"))
+        self._collisions = self._settings.get("collisions")
+        self._seed = self._settings.get("random_seed")
+
+        if self._settings.get("loop_delay") <= 0.0:
+            raise ValueError("The loop delay must be positive for the virtual time to advance")
+
+        sensor_ids = range(self._number_of_sensors + 1)
+        if locations is None:
+            locations = [(0, 0) for _ in sensor_ids]
+        elif len(locations) != len(sensor_ids):
+            raise ValueError("A location must be given for each sensor")
+
+        self._locations = locations
+
+        self._random = random.Random(self._seed)
+        self._sequence = itertools.count()
+
+        # The virtual time up to which all sensors have progressed. Frames
+        # whose air time ends before this time can no longer collide with
+        # frames that are sent later on, so they are ready to be received.
+        self._safe_time = 0.0
+
+        # Frames that are in transit to each sensor, ordered by the end of
+        # their air time, and frames whose air time may still overlap with
+        # newly sent frames to each sensor.
+        self._frames = dict([(i, []) for i in sensor_ids])
+        self._intervals = dict([(i, []) for i in sensor_ids])
+
+        # Measurements that each vehicle sensor has made but not yet sent to
+        # the ground station, in order, and the time of the freshest
+        # measurement per link that arrived at the ground station.
+        self._measurements = dict([(i, deque()) for i in sensor_ids])
+        self._link_times = {}
+
+        # The air time of the frames that each sensor sent, and the total time 
+        # of the slots that each sensor had in the sweeps that started.
+        self._air_times = [0.0 for _ in sensor_ids]
+        self._slot_times = [0.0 for _ in sensor_ids]
+        self._statistics = {
+            "sent": 0,
+            "delivered": 0,
+            "lost": 0,
+            "collided": 0,
+            "bytes": 0,
+            "measurements": 0
+        }
+
+        sensor_settings = arguments.get_settings("rf_sensor_simulator")
+        original_id = sensor_settings.get("rf_sensor_id")
+
+        self._sensors = []
+        for sensor_id in sensor_ids:
+            sensor_settings.set("rf_sensor_id", sensor_id)
+            sensor = RF_Sensor_Simulator(arguments, thread_manager,
+                                         self._get_location_callback(sensor_id),
+                                         self._receive, self._validate)
+            sensor.clock = Virtual_Clock()
+            sensor.connection = Virtual_Connection(self, sensor_id)
+            sensor.random = self._random
+            self._sensors.append(sensor)
+
+        sensor_settings.set("rf_sensor_id", original_id)
+
+    @property
+    def sensors(self):
+        """
+        Get the list of simulated RF sensors, ordered by their ID.
+        """
+
+        return self._sensors
+
+    def _get_location_callback(self, sensor_id):
+        """
+        Create a location callback for the sensor with ID `sensor_id`.
+        """
+
+        return lambda: (self._locations[sensor_id], 0)
+
+    def _receive(self, packet):
+        """
+        Receive callback for the simulated RF sensors.
+
+        The medium already tracks the frames, so the packets are not used.
+        """
+
+        pass
+
+    def _validate(self, request):
+        """
+        Valid location callback for the simulated RF sensors.
+
+        The sensors do not move, so each measurement is valid.
+        """
+
+        return True, True
+
+    def transmit(self, from_id, address, data):
+        """
+        Transmit the byte-encoded string `data` from the sensor with ID
+        `from_id` to the sensor with the socket `address` through the medium.
+
+        The frame may be lost, or it may collide with other frames that arrive
+        at the same sensor during its air time.
+        """
+
+        to_id = address[1] - self._port
+        start = self._sensors[from_id].clock.time() + self._latency
+        end = start + len(data) * 8 / self._bit_rate
+
+        frame = Virtual_Frame(from_id, to_id, start, end, data)
+
+        self._statistics["sent"] += 1
+        self._air_times[from_id] += end - start
+
+        # Match packets for the ground station with the measurements that
+        # caused them. The sensors queue these packets in order.
+        packet = Packet()
+        packet.unserialize(data)
+        if packet.get("specification") == "rssi_ground_station":
+            measurements = self._measurements[from_id]
+            if measurements:
+                frame.link = measurements.popleft()
+
+        if self._random.random() < self._loss_rate:
+            self._statistics["lost"] += 1
+            return
+
+        if self._collisions:
+            # Forget about frames that can no longer overlap with new frames,
+            # and mark the frames that overlap with the new frame.
+            intervals = [
+                other for other in self._intervals[to_id]
+                if other.end > self._safe_time
+            ]
+            for other in intervals:
+                if other.start < end and start < other.end:
+                    other.collided = True
+                    frame.collided = True
+
+            intervals.append(frame)
+            self._intervals[to_id] = intervals
+
+        heapq.heappush(self._frames[to_id], (end, next(self._sequence), frame))
+
+    def receive(self, sensor_id, buffer_size):
+        """
+        Receive a frame for the sensor with ID `sensor_id` from the medium.
+
+        The byte-encoded string of the frame is returned, limited to at most
+        `buffer_size` bytes. Frames that collided are dropped. If no frame has
+        completely arrived yet, then a `socket.error` is raised.
+        """
+
+        frames = self._frames[sensor_id]
+        while frames and frames[0][0] <= self._safe_time:
+            frame = heapq.heappop(frames)[2]
+            if frame.collided:
+                self._statistics["collided"] += 1
+                continue
+
+            self._statistics["delivered"] += 1
+            self._statistics["bytes"] += len(frame.data)
+
+            current_time = self._sensors[sensor_id].clock.time()
+            if sensor_id > 0:
+                # The vehicle sensor creates a measurement for each received
+                # packet, which it later sends to the ground station.
+                link = (frame.from_id, sensor_id)
+                self._measurements[sensor_id].append((link, current_time))
+            elif frame.link is not None:
+                link, measurement_time = frame.link
+                self._statistics["measurements"] += 1
+                self._link_times[link] = max(measurement_time,
+                                             self._link_times.get(link, 0.0))
+
+            return frame.data[:buffer_size]
+
+        raise socket.error(errno.EAGAIN, "No frame has arrived")
+
+    def run(self):
+        """
+        Run the simulation for the configured duration of virtual time.
+
+        The sensors start their measurements and are repeatedly stepped
+        through their sensor loops, where the sensor that is furthest behind
+        in virtual time goes first. The slot time of each sensor is tracked
+        whenever it is done sending in its slot and moves to the next sweep.
+        Afterward, the sensors stop and the report from `get_report` is
+        returned.
+        """
+
+        for sensor in self._sensors:
+            sensor.start()
+
+        queue = [(sensor.clock.time(), sensor.id) for sensor in self._sensors]
+        heapq.heapify(queue)
+
+        while queue[0][0] < self._duration:
+            current_time, sensor_id = queue[0]
+            self._safe_time = current_time
+
+            sensor = self._sensors[sensor_id]
+            scheduler = sensor.scheduler
+            sweep, slot_time = scheduler.sweep, scheduler.slot_time
+            sensor.step()
+            if scheduler.sweep != sweep:
+                self._slot_times[sensor_id] += slot_time
+
+            heapq.heapreplace(queue, (sensor.clock.time(), sensor_id))
+
+        self._safe_time = queue[0][0]
+
+        for sensor in self._sensors:
+            sensor.stop()
+
+        return self.get_report()
+
+    def get_report(self):
+        """
+        Create a report of the performance of the simulated network.
+
+        The report is a dictionary that can be exported as JSON. It contains
+        the simulated duration, frame counts, the throughput of frames and
+        bytes per second, the slot utilization of each vehicle sensor and the
+        age of the freshest measurement that arrived at the ground station for
+        each link. The slot utilization is the ratio between the air time of
+        the frames that a sensor sent and the total time of the slots that it
+        had, which varies per sweep if the slots are adaptive. The age of a
+        link is `None` if no measurement of it arrived.
+        """
+
+        duration = self._safe_time
+
+        slot_utilization = {}
+        link_ages = {}
+        for sensor in self._sensors[1:]:
+            slot_time = self._slot_times[sensor.id]
+            if slot_time > 0.0:
+                utilization = self._air_times[sensor.id] / slot_time
+            else:
+                utilization = 0.0
+
+            slot_utilization[str(sensor.id)] = utilization
+
+            for other in self._sensors[1:]:
+                if other.id == sensor.id:
+                    continue
+
+                link = (other.id, sensor.id)
+                key = "{}-{}".format(*link)
+                if link in self._link_times:
+                    link_ages[key] = duration - self._link_times[link]
+                else:
+                    link_ages[key] = None
+
+        if duration > 0.0:
+            frame_throughput = self._statistics["delivered"] / duration
+            byte_throughput = self._statistics["bytes"] / duration
+        else:
+            frame_throughput = 0.0
+            byte_throughput = 0.0
+
+        return {
+            "duration": duration,
+            "frames": dict(self._statistics),
+            "frame_throughput": frame_throughput,
+            "byte_throughput": byte_throughput,
+            "slot_utilization": slot_utilization,
+            "link_ages": link_ages
+        }
@@ -1,14 +1,18 @@
 # Core imports
 import copy
+import json
 import Queue
 import thread
-import time
 
 # Package imports
+from ..core.Reactor import Reactor
 from ..core.Threadable import Threadable
 from ..reconstruction.Buffer import Buffer
 from ..settings import Arguments
+from Clock import Clock
 from Packet import Packet
+from Packet_Capture import Packet_Capture
+from RF_Sensor_Metrics import RF_Sensor_Metrics
 from TDMA_Scheduler import TDMA_Scheduler
 
 # pylint: disable=undefined-all-variable
@@ -130,7 +134,8 @@ class RF_Sensor(Threadable):
         self._address = None
         self._connection = None
         self._buffer = None
-        self._scheduler = TDMA_Scheduler(self._id, arguments)
+        self._clock = Clock()
+        self._scheduler = TDMA_Scheduler(self._id, arguments, clock=self._clock)
         self._packets = Queue.Queue()
         self._custom_packets = Queue.Queue()
 
@@ -140,6 +145,36 @@ class RF_Sensor(Threadable):
 
         self._loop_delay = self._settings.get("loop_delay")
 
+        # The reactor handles the I/O and schedule of the sensor instead of 
+        # a separate thread, if enabled.
+        if self._settings.get("reactor"):
+            self._reactor = thread_manager.reactor
+        else:
+            self._reactor = None
+
+        self._timer = None
+
+        # Generator of the frames that the reactor timer is sending, which 
+        # yields after each frame.
+        self._frames = None
+
+        # Received packets are captured in a binary log, if enabled.
+        capture_file = self._settings.get("capture_file")
+        if capture_file:
+            self._capture = Packet_Capture(capture_file,
+                                           max_size=self._settings.get("capture_max_size"),
+                                           max_files=self._settings.get("capture_max_files"))
+        else:
+            self._capture = None
+
+        # Radio performance metrics, which are periodically logged as JSON 
+        # lines if a metrics file is given.
+        self._metrics = RF_Sensor_Metrics(self._clock)
+        self._metrics_file = self._settings.get("metrics_file")
+        self._metrics_interval = self._settings.get("metrics_interval")
+        self._metrics_time = self._clock.time()
+        self._missed_timestamp = None
+
         self._location_callback = location_callback
         self._receive_callback = receive_callback
         self._valid_callback = valid_callback
@@ -181,6 +216,120 @@ class RF_Sensor(Threadable):
 
         self._buffer = buffer
 
+    @property
+    def clock(self):
+        """
+        Get the clock that provides the current time to the RF sensor.
+        """
+
+        return self._clock
+
+    @clock.setter
+    def clock(self, clock):
+        """
+        Set the clock that provides the current time to the RF sensor and its
+        scheduler.
+
+        The `clock` argument must be a `Clock` object.
+        """
+
+        if not isinstance(clock, Clock):
+            raise ValueError("The `clock` argument must be a `Clock` object")
+
+        self._clock = clock
+        self._scheduler.clock = clock
+        self._metrics.clock = clock
+
+    @property
+    def capture(self):
+        """
+        Get the packet capture that logs the received packets, or `None` if
+        the received packets are not captured.
+        """
+
+        return self._capture
+
+    @capture.setter
+    def capture(self, capture):
+        """
+        Set the packet capture that logs the received packets.
+
+        The `capture` argument must be a `Packet_Capture` object.
+        """
+
+        if not isinstance(capture, Packet_Capture):
+            raise ValueError("The `capture` argument must be a `Packet_Capture` object")
+
+        self._capture = capture
+
+    @property
+    def metrics(self):
+        """
+        Get a snapshot of the radio performance metrics of the RF sensor.
+
+        The snapshot is a dictionary that can be serialized as JSON. It
+        contains the counters, their average rates per second since the
+        previous snapshot, histograms of durations in seconds, the age in
+        seconds of the last measurement of each link and the depths of the
+        packet queues.
+        """
+
+        return self._metrics.get_snapshot(queues={
+            "packets": self._get_backlog(),
+            "custom_packets": self._custom_packets.qsize()
+        })
+
+    @property
+    def reactor(self):
+        """
+        Get the reactor that handles the I/O and schedule of the RF sensor, or
+        `None` if the RF sensor runs its own thread.
+        """
+
+        return self._reactor
+
+    @reactor.setter
+    def reactor(self, reactor):
+        """
+        Set the reactor that handles the I/O and schedule of the RF sensor.
+
+        The `reactor` argument must be a `Reactor` object. It is only used
+        when the RF sensor is activated afterward.
+        """
+
+        if not isinstance(reactor, Reactor):
+            raise ValueError("The `reactor` argument must be a `Reactor` object")
+
+        self._reactor = reactor
+
+    @property
+    def connection(self):
+        """
+        Get the connection that the RF sensor sends and receives frames with,
+        or `None` if the RF sensor is not connected.
+        """
+
+        return self._connection
+
+    @connection.setter
+    def connection(self, connection):
+        """
+        Set the connection that the RF sensor sends and receives frames with.
+
+        A connection that is set before the RF sensor is activated is used
+        instead of the connection that the RF sensor sets up itself.
+        """
+
+        self._connection = connection
+
+    @property
+    def scheduler(self):
+        """
+        Get the TDMA scheduler that determines when the RF sensor may send.
+        """
+
+        return self._scheduler
+
     @property
     def type(self):
         raise NotImplementedError("Subclasses must implement the `type` property")
@@ -215,7 +364,10 @@ class RF_Sensor(Threadable):
             if self._connection is None:
                 self._setup()
 
-            thread.start_new_thread(self._loop, ())
+            if self._reactor is None:
+                thread.start_new_thread(self._loop, ())
+            else:
+                self._register_reactor()
 
     def deactivate(self):
         """
@@ -229,12 +381,18 @@ class RF_Sensor(Threadable):
         if self._activated:
             self._activated = False
 
+            if self._reactor is not None:
+                self._unregister_reactor()
+
         if self._connection is not None:
             # Close the connection and clean up so that the thread might get 
             # the signal faster and we can correctly reactivate later on.
             self._connection.close()
             self._connection = None
 
+        if self._capture is not None:
+            self._capture.close()
+
     def start(self):
         """
         Start the signal strength measurements (and stop sending custom packets).
@@ -246,6 +404,10 @@ class RF_Sensor(Threadable):
         self._packets = Queue.Queue()
         self._started = True
 
+        # Stop sending custom packets, if the reactor timer is doing so.
+        self._frames = None
+        self._schedule_tick(0.0)
+
     def stop(self):
         """
         Stop the signal strength measurements (and start sending custom packets).
@@ -271,12 +433,15 @@ class RF_Sensor(Threadable):
         if to is None:
             # No destination ID has been provided, so we broadcast the packet to
             # all sensors in the network except for ourself and the ground station.
+            # All destinations share one copy of the packet, which is therefore 
+            # only serialized once.
+            packet = copy.deepcopy(packet)
             for to_id in xrange(1, self._number_of_sensors + 1):
                 if to_id == self._id:
                     continue
 
                 self._custom_packets.put({
-                    "packet": copy.deepcopy(packet),
+                    "packet": packet,
                     "to": to_id
                 })
         else:
@@ -285,6 +450,11 @@ class RF_Sensor(Threadable):
                 "to": to
             })
 
+        # If the reactor timer is sending frames, then it sends the custom 
+        # packets after those frames.
+        if self._frames is None:
+            self._schedule_tick(0.0)
+
     def discover(self, callback, required_sensors=None):
         """
         Discover RF sensors in the network. The `callback` callable function is
@@ -305,6 +475,16 @@ class RF_Sensor(Threadable):
         elif required_sensors is not None:
             raise TypeError("Provided required sensors must be a `set`")
 
+    def step(self):
+        """
+        Perform one iteration of the sensor loop.
+
+        This can be used to run the RF sensor without its own thread or
+        a reactor, such as in a simulation that controls the clock.
+        """
+
+        self._loop_body()
+
     def _setup(self):
         raise NotImplementedError("Subclasses must implement `_setup()`")
 
@@ -331,49 +511,270 @@ class RF_Sensor(Threadable):
         Classes that inherit this base class must extend this method.
         """
 
+        self._tick()
+
+        self._clock.sleep(self._loop_delay)
+
+    def _tick(self):
+        """
+        Perform the scheduled work of the sensor, which is sending packets.
+
+        This is called in each iteration of the sensor loop or whenever the
+        reactor timer of the sensor expires.
+
+        Classes that inherit this base class may extend this method.
+        """
+
         # If the sensor has been activated, we only send enqueued custom packets.
         # If the sensor has been started, we stop sending custom packets and
         # start performing signal strength measurements.
         if not self._started:
-            self._send_custom_packets()
+            self._send_frames(self._send_custom_packets())
         elif self._id > 0 and self._scheduler.in_slot:
-            self._send()
-            self._scheduler.update()
+            self._send_frames(self._send_slot())
+        elif self._id > 0 and self._scheduler.missed:
+            # Count each slot that has passed without sending only once.
+            if self._scheduler.timestamp != self._missed_timestamp:
+                self._missed_timestamp = self._scheduler.timestamp
+                self._metrics.increment("slot_misses")
+
+        self._write_metrics()
+
+    def _write_metrics(self):
+        """
+        Append a snapshot of the metrics as a JSON line to the metrics file,
+        if a metrics file is given and the metrics interval has passed since
+        the previous snapshot.
+        """
+
+        if not self._metrics_file:
+            return
+
+        current_time = self._clock.time()
+        if current_time - self._metrics_time < self._metrics_interval:
+            return
+
+        self._metrics_time = current_time
+        snapshot = self.metrics
+        snapshot["id"] = self._id
+
+        with open(self._metrics_file, "a") as metrics_file:
+            json.dump(snapshot, metrics_file, sort_keys=True)
+            metrics_file.write("\n")
+
+    def _read(self):
+        """
+        Read and process data from the connection, if available.
+
+        This is called in each iteration of the sensor loop or whenever the
+        reactor detects that the connection has data available.
+
+        Classes that inherit this base class may override this method.
+        """
+
+        pass
+
+    def _get_reactor_file(self):
+        """
+        Get the file-like object of the connection for which the reactor calls
+        the read handler of the sensor, or `None` if the sensor receives its
+        data in another way.
+
+        Classes that inherit this base class may override this method.
+        """
+
+        return None
+
+    def _register_reactor(self):
+        """
+        Register the read handler and timer of the sensor with the reactor.
+        """
+
+        reactor_file = self._get_reactor_file()
+        if reactor_file is not None:
+            self._reactor.register(reactor_file, self._reactor_read)
 
-        time.sleep(self._loop_delay)
+        self._reactor.activate()
+        self._schedule_tick(0.0)
+
+    def _unregister_reactor(self):
+        """
+        Unregister the read handler and timer of the sensor from the reactor.
+        """
+
+        reactor_file = self._get_reactor_file()
+        if reactor_file is not None:
+            self._reactor.unregister(reactor_file)
+
+        if self._timer is not None:
+            self._reactor.cancel(self._timer)
+            self._timer = None
+
+        self._frames = None
+
+    def _schedule_tick(self, delay):
+        """
+        Schedule the reactor timer of the sensor to expire after `delay`
+        seconds, replacing any earlier timer.
+
+        Nothing is scheduled if the sensor does not use an activated reactor.
+        """
+
+        if self._reactor is None or not self._activated:
+            return
+
+        if self._timer is not None:
+            self._reactor.cancel(self._timer)
+
+        self._timer = self._reactor.schedule(delay, self._reactor_tick)
+
+    def _reactor_read(self):
+        """
+        Read handler of the sensor for the reactor.
+        """
+
+        try:
+            self._read()
+        except DisabledException:
+            self._unregister_reactor()
+
+    def _reactor_tick(self):
+        """
+        Timer callback of the sensor for the reactor.
+
+        The timer sends the next frame if the sensor is sending frames, or
+        performs the scheduled work otherwise. Afterward, the timer is
+        scheduled again after the loop delay for the next frame, for the next
+        slot of the sensor if it performs measurements, or for the next custom
+        packets if there are any. Otherwise, the timer is only scheduled again
+        when the sensor starts or packets are enqueued.
+        """
+
+        self._timer = None
+        try:
+            if self._frames is not None:
+                self._send_next_frame()
+            else:
+                self._tick()
+        except DisabledException:
+            self._unregister_reactor()
+            return
+
+        if self._frames is not None:
+            self._schedule_tick(self._loop_delay)
+        elif self._started and self._id > 0:
+            delay = self._scheduler.timestamp - self._clock.time()
+            self._schedule_tick(delay if delay > 0 else self._loop_delay)
+        elif not self._started and not self._custom_packets.empty():
+            self._schedule_tick(self._loop_delay)
+
+    def _send_frames(self, frames):
+        """
+        Send the frames of the `frames` generator, which yields after each
+        frame that it sends.
+
+        Without a reactor, all frames are sent at once, with a short delay
+        after each frame. With a reactor, only the first frame is sent, and
+        the reactor timer sends each next frame after the delay, so that the
+        reactor is not blocked while sending.
+        """
+
+        if self._reactor is None:
+            for _ in frames:
+                pass
+
+            return
+
+        self._frames = frames
+        self._send_next_frame()
+
+    def _send_next_frame(self):
+        """
+        Send the next frame of the frames that the reactor timer is sending.
+        """
+
+        try:
+            next(self._frames)
+        except StopIteration:
+            self._frames = None
+
+    def _send_slot(self):
+        """
+        Send the packets of the sensor in its current slot, and update the
+        scheduler to the next slot afterward.
+
+        This is a generator that yields after each frame that it sends.
+        """
+
+        # Track how late we start sending in our slot and how long it takes 
+        # to send all packets.
+        start_time = self._clock.time()
+        self._metrics.observe("slot_latency", start_time - self._scheduler.timestamp)
+        for _ in self._send():
+            yield
+
+        self._metrics.observe("send_duration", self._clock.time() - start_time)
+        self._scheduler.update()
 
     def _send(self):
         """
         Send a broadcast packet to each other sensor in the network and
         send collected packets to the ground station.
 
+        This is a generator that yields after each frame that it sends.
         Classes that inherit this base class may extend this method.
         """
 
-        # Create and send the RSSI broadcast packets.
+        for _ in self._send_rssi_broadcast_packets():
+            yield
+
+        # Send collected packets to the ground station, unless we ran out of 
+        # the allocated slot.
+        while not self._packets.empty() and self._scheduler.in_slot:
+            packet = self._packets.get()
+            self._send_tx_frame(packet, 0)
+            yield
+
+    def _send_rssi_broadcast_packets(self):
+        """
+        Send an RSSI broadcast packet to each other sensor in the network.
+
+        The packet is only created and serialized for the first destination.
+        For the other destinations, only the fields that differ per destination
+        are updated in place in the serialized packet.
+
+        This is a generator that yields after each frame that it sends. It
+        stops when the current time is no longer inside the allocated slot.
+        """
+
+        packet = None
         for to_id in xrange(1, self._number_of_sensors + 1):
             if not self._scheduler.in_slot:
+                self._metrics.increment("slot_overruns")
                 return
 
             if to_id == self._id:
                 continue
 
-            packet = self._create_rssi_broadcast_packet(to_id)
-            self._send_tx_frame(packet, to_id)
+            if packet is None:
+                packet = self._create_rssi_broadcast_packet(to_id)
+            else:
+                self._update_rssi_broadcast_packet(packet, to_id)
 
-        # Send collected packets to the ground station.
-        while not self._packets.empty() and self._scheduler.in_slot:
-            packet = self._packets.get()
-            self._send_tx_frame(packet, 0)
+            self._send_tx_frame(packet, to_id)
+            yield
 
     def _send_custom_packets(self):
         """
         Send custom packets to their destinations.
+
+        This is a generator that yields after each frame that it sends.
         """
 
         while not self._custom_packets.empty():
             item = self._custom_packets.get()
             self._send_tx_frame(item["packet"], item["to"])
+            yield
 
     def _send_tx_frame(self, packet, to=None):
         """
@@ -391,13 +792,64 @@ class RF_Sensor(Threadable):
         if to is None:
             raise TypeError("Invalid destination '{}' has been provided".format(to))
 
+        self._metrics.increment("frames_sent")
+
         # Introduce a short delay to give the hardware more time to send
-        # packets when this method is called many times in a row.
-        time.sleep(self._loop_delay)
+        # packets when this method is called many times in a row. With 
+        # a reactor, the reactor timer sends the next frame after the delay 
+        # instead, since sleeping would block the reactor.
+        if self._reactor is None:
+            self._clock.sleep(self._loop_delay)
 
     def _receive(self, packet=None):
         raise NotImplementedError("Subclasses must implement `_receive(packet=None)`")
 
+    def _unserialize(self, data):
+        """
+        Convert serialized `data` received from another sensor to a `Packet`
+        object.
+
+        Returns `None` if the data does not contain a valid packet, which is
+        counted as an unserialize error.
+        """
+
+        packet = Packet()
+        try:
+            packet.unserialize(data)
+        except (KeyError, ValueError):
+            self._metrics.increment("unserialize_errors")
+            return None
+
+        return packet
+
+    def _track_packet(self, packet):
+        """
+        Track a received `Packet` object `packet` in the metrics, and capture
+        it with its arrival time if packet capture is enabled.
+
+        RSSI packets update the time of the last measurement of their link.
+        """
+
+        self._metrics.increment("frames_received")
+
+        specification = packet.get("specification")
+        if specification == "rssi_broadcast":
+            self._metrics.update_link(packet.get("sensor_id"), self._id)
+        elif specification == "rssi_ground_station":
+            self._metrics.update_link(packet.get("sensor_id"), 0)
+
+        if self._capture is not None:
+            self._capture.write(packet, self._clock.time())
+
+    def _get_backlog(self):
+        """
+        Get the number of packets that are queued for the ground station.
+
+        Classes that inherit this base class may override this method.
+        """
+
+        return self._packets.qsize()
+
     def _create_rssi_broadcast_packet(self, to_id):
         """
         Create a `Packet` object according to the "rssi_broadcast" specification.
@@ -405,21 +857,41 @@ class RF_Sensor(Threadable):
         """
 
         location, waypoint_index = self._location_callback()
-        request = RSSI_Validity_Request("rssi_broadcast", other_id=to_id)
-        valid, valid_pair = self._valid_callback(request)
+
+        # Report the number of packets queued for the ground station, which 
+        # the schedulers use for adaptive slots. The backlog is limited to the 
+        # maximum value that fits in the packet field. The scheduler keeps the 
+        # first backlog of the sweep, so all packets in the slot report it.
+        backlog = min(self._get_backlog(), 255)
+        backlog = self._scheduler.set_backlog(self._id, backlog)
 
         packet = Packet()
         packet.set("specification", "rssi_broadcast")
         packet.set("latitude", location[0])
         packet.set("longitude", location[1])
-        packet.set("valid", valid)
-        packet.set("valid_pair", valid_pair)
         packet.set("waypoint_index", waypoint_index)
         packet.set("sensor_id", self._id)
-        packet.set("timestamp", time.time())
+        packet.set("sweep", self._scheduler.sweep)
+        packet.set("backlog", backlog)
+
+        self._update_rssi_broadcast_packet(packet, to_id)
 
         return packet
 
+    def _update_rssi_broadcast_packet(self, packet, to_id):
+        """
+        Update the fields of a `Packet` object `packet` created according to
+        the "rssi_broadcast" specification that differ per destination, such
+        that it can be sent to the sensor with ID `to_id`.
+        """
+
+        request = RSSI_Validity_Request("rssi_broadcast", other_id=to_id)
+        valid, valid_pair = self._valid_callback(request)
+
+        packet.set("valid", valid)
+        packet.set("valid_pair", valid_pair)
+        packet.set("timestamp", self._clock.time())
+
     def _create_rssi_ground_station_packet(self, rssi_broadcast_packet):
         """
         Create a `Packet` object according to the "rssi_ground_station"
@@ -0,0 +1,161 @@
+# Core imports
+import bisect
+import threading
+
+class RF_Sensor_Metrics(object):
+    """
+    Radio performance metrics of an RF sensor.
+
+    The metrics consist of counters, histograms of durations and the times
+    at which measurements of each link were last received. Updating them only
+    requires a few dictionary operations, so that the sensor loop can do so
+    for each packet. A snapshot of all metrics can be requested from another
+    thread, for example for logging or display.
+    """
+
+    # Upper bounds in seconds of the histogram buckets. Values above the last
+    # bound are counted in an additional overflow bucket.
+    BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+
+    def __init__(self, clock):
+        """
+        Initialize the metrics.
+
+        The `clock` is a `Clock` object that provides the current time.
+        """
+
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._start_time = 0.0
+        self._counters = {}
+        self._histograms = {}
+        self._links = {}
+
+        # The time and counter values of the previous snapshot, from which the 
+        # rates in the next snapshot are measured.
+        self._window_time = 0.0
+        self._window_counters = {}
+
+        self.reset()
+
+    @property
+    def clock(self):
+        """
+        Get the clock that provides the current time to the metrics.
+        """
+
+        return self._clock
+
+    @clock.setter
+    def clock(self, clock):
+        """
+        Set the clock that provides the current time to the metrics.
+        """
+
+        self._clock = clock
+
+    def reset(self):
+        """
+        Clear all metrics and start measuring rates from the current time.
+        """
+
+        with self._lock:
+            self._start_time = self._clock.time()
+            self._counters = {}
+            self._histograms = {}
+            self._links = {}
+            self._window_time = self._start_time
+            self._window_counters = {}
+
+    def increment(self, name, amount=1):
+        """
+        Increase the counter with the given `name` by `amount`.
+        """
+
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def get_counter(self, name):
+        """
+        Get the value of the counter with the given `name`.
+        """
+
+        return self._counters.get(name, 0)
+
+    def observe(self, name, value):
+        """
+        Add a duration `value` in seconds to the histogram with the given `name`.
+        """
+
+        index = bisect.bisect_left(self.BUCKETS, value)
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = {
+                    "counts": [0] * (len(self.BUCKETS) + 1),
+                    "count": 0,
+                    "sum": 0.0
+                }
+
+            histogram = self._histograms[name]
+            histogram["counts"][index] += 1
+            histogram["count"] += 1
+            histogram["sum"] += value
+
+    def update_link(self, from_id, to_id):
+        """
+        Register that a measurement of the link from the sensor with ID
+        `from_id` to the sensor with ID `to_id` has been received just now.
+        """
+
+        with self._lock:
+            self._links[(from_id, to_id)] = self._clock.time()
+
+    def get_snapshot(self, queues=None):
+        """
+        Get a dictionary with the current values of all metrics that can be
+        serialized as JSON.
+
+        The rates are averages per second over the window since the previous
+        snapshot, or since the metrics were reset if there is none. The
+        `queues` is an optional dictionary of queue names and their current
+        depths, which is included as is.
+        """
+
+        current_time = self._clock.time()
+        with self._lock:
+            uptime = current_time - self._start_time
+            window = current_time - self._window_time
+            counters = dict(self._counters)
+            previous_counters = self._window_counters
+            self._window_time = current_time
+            self._window_counters = counters
+            histograms = {}
+            for name, histogram in self._histograms.iteritems():
+                histograms[name] = {
+                    "buckets": list(self.BUCKETS),
+                    "counts": list(histogram["counts"]),
+                    "count": histogram["count"],
+                    "sum": histogram["sum"]
+                }
+
+            links = [
+                {"from": link[0], "to": link[1], "age": current_time - timestamp}
+                for link, timestamp in sorted(self._links.iteritems())
+            ]
+
+        rates = {}
+        for name, value in counters.iteritems():
+            change = value - previous_counters.get(name, 0)
+            rates[name] = change / window if window > 0 else 0.0
+
+        return {
+            "time": current_time,
+            "uptime": uptime,
+            "window": window,
+            "counters": counters,
+            "rates": rates,
+            "histograms": histograms,
+            "links": links,
+            "queues": {} if queues is None else dict(queues)
+        }
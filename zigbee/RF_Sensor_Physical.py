@@ -1,6 +1,3 @@
-# Core imports
-import time
-
 # Package imports
 from ..core.USB_Manager import USB_Manager
 from NTP import NTP
@@ -38,7 +35,8 @@ class RF_Sensor_Physical(RF_Sensor):
         self._synchronized = False
         self._discovery_callback = None
 
-        self._ntp = NTP(self)
+        self._ntp = NTP(self, samples=self._settings.get("ntp_samples"),
+                        drift=self._settings.get("ntp_drift"))
         self._ntp_delay = self._settings.get("ntp_delay")
 
     def discover(self, callback, required_sensors=None):
@@ -61,12 +59,14 @@ class RF_Sensor_Physical(RF_Sensor):
         Synchronize the clock with the ground station's clock before
         sending messages. This avoids clock skew caused by the fact that
         the Raspberry Pi devices do not have an onboard real time clock.
+
+        Exchanges are retried when no response arrives within the NTP delay.
         """
 
         if self._id > 0 and self._settings.get("synchronize"):
             while not self._synchronized:
                 self._ntp.start()
-                time.sleep(self._ntp_delay)
+                self._ntp.wait(self._ntp_delay)
 
     def _process(self, packet, **kwargs):
         """
@@ -76,6 +76,8 @@ class RF_Sensor_Physical(RF_Sensor):
         Classes that inherit this base class must extend this method.
         """
 
+        self._track_packet(packet)
+
         # Check if the packet is public and pass it along to the receive callback.
         if not packet.is_private():
             self._receive_callback(packet)
@@ -57,6 +57,12 @@ class RF_Sensor_Physical_Texas_Instruments(RF_Sensor_Physical):
         self._shift_minimum = self._settings.get("shift_minimum")
         self._shift_maximum = self._settings.get("shift_maximum")
 
+        # UART frames consist of the length of the serialized packet, the
+        # serialized packet padded to the packet length, and the RSSI. Data
+        # from the serial connection is buffered until frames are complete.
+        self._frame_length = struct.calcsize("<B{}sb".format(self._packet_length))
+        self._read_buffer = bytearray()
+
         # UART connection pins for RX, TX, RTS, CTS and reset. We use board pin
         # numbering. The pins must correspond to the GPIO pins that support RXD0/TXD0 on
         # ALT0 and RTS0/CTS0 on ALT3. Refer to http://elinux.org/RPi_BCM2835_GPIOs for an
@@ -95,6 +101,15 @@ class RF_Sensor_Physical_Texas_Instruments(RF_Sensor_Physical):
 
         return "rf_sensor_physical_texas_instruments"
 
+    @property
+    def framing_errors(self):
+        """
+        Get the number of times that the sensor had to resynchronize with the
+        UART frames because it received corrupt data.
+        """
+
+        return self._metrics.get_counter("framing_errors")
+
     def activate(self):
         """
         Activate the sensor to start sending and receiving packets.
@@ -170,6 +185,9 @@ class RF_Sensor_Physical_Texas_Instruments(RF_Sensor_Physical):
             # The ground station is a CC2531 device, which simply uses USB.
             self._connection = self._usb_manager.get_cc2531_device()
 
+        # Discard any partial frames from an earlier connection.
+        del self._read_buffer[:]
+
         # Configure the device using a configuration packet.
         self._connection.write(struct.pack("<BB", CC2530_Packet.CONFIGURATION, self._id))
 
@@ -181,7 +199,14 @@ class RF_Sensor_Physical_Texas_Instruments(RF_Sensor_Physical):
         as for keeping the `_loop` implementation in the base class.
         """
 
-        self._receive()
+        self._read()
+
+        super(RF_Sensor_Physical_Texas_Instruments, self)._loop_body()
+
+    def _tick(self):
+        """
+        Perform the scheduled work of the sensor, which is sending packets.
+        """
 
         # We should have received a packet from another sensor. If not, it is very
         # likely that their schedules interfere because of their activation time.
@@ -191,8 +216,23 @@ class RF_Sensor_Physical_Texas_Instruments(RF_Sensor_Physical):
             self._scheduler.shift(random.uniform(self._shift_minimum, self._shift_maximum))
             self._scheduler.update()
             self._polling_time = time.time()
+            self._metrics.increment("schedule_shifts")
 
-        super(RF_Sensor_Physical_Texas_Instruments, self)._loop_body()
+        super(RF_Sensor_Physical_Texas_Instruments, self)._tick()
+
+    def _read(self):
+        """
+        Read and process the UART frames from the serial connection, if available.
+        """
+
+        self._receive()
+
+    def _get_reactor_file(self):
+        """
+        Get the serial connection for the reactor.
+        """
+
+        return self._connection
 
     def _send_tx_frame(self, packet, to=None):
         """
@@ -212,29 +252,76 @@ class RF_Sensor_Physical_Texas_Instruments(RF_Sensor_Physical):
 
     def _receive(self, packet=None):
         """
-        Receive and process a `packet` from another sensor in the network.
+        Receive and process packets from other sensors in the network.
+
+        All data that is available on the serial connection is read into
+        a buffer, after which all complete UART frames in the buffer are
+        processed at once.
         """
 
-        # Read the UART packet from the serial connection (if available) and parse it.
-        serialized_packet_format = "<B{}sb".format(self._packet_length)
-        serialized_packet_length = struct.calcsize(serialized_packet_format)
-        if self._connection.in_waiting < serialized_packet_length:
-            return
+        in_waiting = self._connection.in_waiting
+        if in_waiting > 0:
+            self._read_buffer.extend(self._connection.read(size=in_waiting))
+
+        for frame in self._parse_frames():
+            packet, rssi = frame
 
-        uart_packet = self._connection.read(size=serialized_packet_length)
-        length, data, rssi = struct.unpack(serialized_packet_format, uart_packet)
-        data = data[0:length]
+            self._polling_time = time.time()
+            try:
+                self._process(packet, rssi=rssi)
+            except ValueError:
+                # Any errors must be logged, but must not crash the process.
+                self._thread_manager.log(self.type)
 
-        # Convert the packet to a `Packet` object according to specifications.
-        packet = Packet()
-        packet.unserialize(data)
+    def _parse_frames(self):
+        """
+        Extract all complete UART frames from the read buffer.
+
+        The frames are parsed in place using a memory view of the buffer. If
+        a frame has an invalid length or does not contain a valid packet, then
+        the data is corrupt, and we drop bytes one at a time until we are
+        synchronized with the frames again. Each resynchronization counts as
+        one framing error. The parsed data is removed from the buffer and
+        a list of tuples containing a `Packet` object and its RSSI value is
+        returned.
+        """
 
-        self._polling_time = time.time()
-        try:
-            self._process(packet, rssi=rssi)
-        except ValueError:
-            # Any errors must be logged, but must not crash the process.
-            self._thread_manager.log(self.type)
+        frames = []
+        synchronized = True
+
+        view = memoryview(self._read_buffer)
+        offset = 0
+        end = len(self._read_buffer) - self._frame_length
+        while offset <= end:
+            length = struct.unpack_from("<B", view, offset)[0]
+            if 0 < length <= self._packet_length:
+                # Convert the packet to a `Packet` object according to 
+                # specifications.
+                packet = Packet()
+                try:
+                    packet.unserialize(view[offset + 1:offset + 1 + length].tobytes())
+                except (KeyError, ValueError):
+                    pass
+                else:
+                    rssi_offset = offset + self._frame_length - 1
+                    rssi = struct.unpack_from("<b", view, rssi_offset)[0]
+                    frames.append((packet, rssi))
+
+                    synchronized = True
+                    offset += self._frame_length
+                    continue
+
+            if synchronized:
+                self._metrics.increment("framing_errors")
+                synchronized = False
+
+            offset += 1
+
+        # The memory view must be released before the buffer can be resized.
+        del view
+        del self._read_buffer[:offset]
+
+        return frames
 
     def _process(self, packet, rssi=None, **kwargs):
         """
@@ -1,6 +1,6 @@
 # Core imports
-import random
 import struct
+import threading
 import time
 from collections import OrderedDict
 
@@ -8,7 +8,6 @@ from collections import OrderedDict
 from xbee import ZigBee
 
 # Package imports
-from ..zigbee.Packet import Packet
 from ..zigbee.RF_Sensor_Physical import RF_Sensor_Physical
 
 class RF_Sensor_Physical_XBee(RF_Sensor_Physical):
@@ -28,7 +27,15 @@ class RF_Sensor_Physical_XBee(RF_Sensor_Physical):
                                                       valid_callback,
                                                       usb_manager=usb_manager)
 
-        self._packets = OrderedDict()
+        # Packets that are waiting for the response to their RSSI (DB command) 
+        # request, keyed by the frame ID of the request, in order of the time 
+        # of the request. At most a window of requests are in flight, and 
+        # requests without response are evicted after a timeout.
+        self._pending = OrderedDict()
+        self._pending_lock = threading.Lock()
+        self._frame_id = 0
+        self._rssi_window = self._settings.get("rssi_window")
+        self._rssi_timeout = self._settings.get("rssi_timeout")
 
         self._sensor = None
         self._port = self._settings.get("port")
@@ -104,7 +111,8 @@ class RF_Sensor_Physical_XBee(RF_Sensor_Physical):
 
         super(RF_Sensor_Physical_XBee, self).start()
 
-        self._packets = OrderedDict()
+        with self._pending_lock:
+            self._pending = OrderedDict()
 
     def discover(self, callback, required_sensors=None):
         """
@@ -163,52 +171,29 @@ class RF_Sensor_Physical_XBee(RF_Sensor_Physical):
 
         super(RF_Sensor_Physical_XBee, self).interrupt()
 
-    def _loop_body(self):
+    def _tick(self):
         """
-        Body of the sensor loop.
+        Perform the scheduled work of the sensor, which is sending packets.
 
-        This is extracted into a separate method to make testing easier, as well
-        as for keeping the `_loop` implementation in the base class.
+        The XBee library thread receives the packets, so the sensor does not
+        register its connection with the reactor.
         """
 
         # Ensure that the sensor has joined the network.
         if not self._joined:
-            time.sleep(self._loop_delay)
             return
 
-        super(RF_Sensor_Physical_XBee, self)._loop_body()
+        self._evict_rssi_requests()
 
-    def _send(self):
+        super(RF_Sensor_Physical_XBee, self)._tick()
+
+    def _get_backlog(self):
         """
-        Send a broadcast packet to each other sensor in the network and
-        send collected packets to the ground station.
+        Get the number of packets that are queued for the ground station,
+        including those that are still waiting for their RSSI value.
         """
 
-        # Create and send the RSSI broadcast packets.
-        for to_id in xrange(1, self._number_of_sensors + 1):
-            if not self._scheduler.in_slot:
-                return
-
-            if to_id == self._id:
-                continue
-
-            packet = self._create_rssi_broadcast_packet(to_id)
-            self._send_tx_frame(packet, to_id)
-
-        # Send collected packets to the ground station. Only send completed 
-        # packets and remove them after sending. 
-        iterator = self._packets.iteritems()
-        while self._scheduler.in_slot:
-            try:
-                frame_id, packet = next(iterator)
-            except StopIteration:
-                break
-
-            if packet.get("rssi") is None:
-                continue
-
-            self._send_tx_frame(packet, 0)
-            self._packets.pop(frame_id)
+        return self._packets.qsize() + len(self._pending)
 
     def _send_tx_frame(self, packet, to=None):
         """
@@ -239,39 +224,100 @@ class RF_Sensor_Physical_XBee(RF_Sensor_Physical):
         """
 
         # Convert the RX packet to a `Packet` object according to specifications.
-        rx_packet = Packet()
-        rx_packet.unserialize(packet["rf_data"])
+        rx_packet = self._unserialize(packet["rf_data"])
+        if rx_packet is None:
+            return
+
+        # Firmware that reports the RSSI of the received frame in the RX 
+        # packet itself, such as the 802.15.4 firmware, does not require an 
+        # additional request for the RSSI value.
+        rssi = packet.get("rssi")
+        if rssi is not None:
+            rssi = -ord(rssi)
 
         is_broadcast = super(RF_Sensor_Physical_XBee, self)._process(rx_packet)
         if is_broadcast:
-            self._process_rssi_broadcast_packet(rx_packet)
+            self._process_rssi_broadcast_packet(rx_packet, rssi=rssi)
 
     def _process_rssi_broadcast_packet(self, packet, **kwargs):
         """
         Process a `Packet` object `packet` that has been created according to
         the "rssi_broadcast" specification.
+
+        If the `rssi` keyword argument with the RSSI value of the received
+        frame is not given, then the RSSI value is requested from the device.
         """
 
+        rssi = kwargs.get("rssi")
         packet = super(RF_Sensor_Physical_XBee, self)._process_rssi_broadcast_packet(packet)
 
-        # Generate a frame ID to be able to match this packet and the
+        if rssi is not None:
+            packet.set("rssi", rssi)
+            self._packets.put(packet)
+            return
+
+        self._evict_rssi_requests()
+
+        # Allocate a frame ID to be able to match this packet and the
         # associated RSSI (DB command) request.
-        frame_id = chr(random.randint(1, 255))
-        self._packets[frame_id] = packet
+        with self._pending_lock:
+            frame_id = self._allocate_frame_id()
+            if frame_id is not None:
+                self._pending[frame_id] = (packet, self._clock.time())
+
+        if frame_id is None:
+            # Too many requests are in flight, so drop the measurement.
+            self._metrics.increment("rssi_window_full")
+            return
 
         # Request the RSSI value for the received packet.
         self._sensor.send("at", command="DB", frame_id=frame_id)
 
+    def _allocate_frame_id(self):
+        """
+        Allocate a frame ID for an RSSI request.
+
+        Frame IDs are allocated in order and wrap around, skipping those of
+        requests that are still in flight, so that responses can never be
+        matched with the wrong packet. Returns `None` if the in-flight window
+        is full. The pending lock must be held by the caller.
+        """
+
+        if len(self._pending) >= self._rssi_window:
+            return None
+
+        # The window is at most the number of frame IDs, so there is always 
+        # a free frame ID at this point. Frame ID zero disables responses.
+        while True:
+            self._frame_id = self._frame_id % 255 + 1
+            frame_id = chr(self._frame_id)
+            if frame_id not in self._pending:
+                return frame_id
+
+    def _evict_rssi_requests(self):
+        """
+        Remove the packets of RSSI requests that have not received a response
+        within the timeout, so that their frame IDs can be reused.
+        """
+
+        deadline = self._clock.time() - self._rssi_timeout
+        with self._pending_lock:
+            while self._pending:
+                frame_id, pending = next(self._pending.iteritems())
+                if pending[1] > deadline:
+                    return
+
+                del self._pending[frame_id]
+                self._metrics.increment("rssi_timeouts")
+
     def _process_at_response(self, at_packet):
         """
         Helper method for processing an XBee `at_packet`.
         """
 
         if at_packet["command"] == "DB":
-            # RSSI value has been received. Update the original packet.
-            if at_packet["frame_id"] in self._packets:
-                original_packet = self._packets[at_packet["frame_id"]]
-                original_packet.set("rssi", -ord(at_packet["parameter"]))
+            # RSSI value has been received.
+            self._process_rssi_response(at_packet)
         elif at_packet["command"] == "SH":
             # Serial number (high) has been received.
             if self._address is None:
@@ -303,6 +349,26 @@ class RF_Sensor_Physical_XBee(RF_Sensor_Physical):
                 "address": self._format_address(packet["source_addr_long"])
             })
 
+    def _process_rssi_response(self, at_packet):
+        """
+        Complete the original packet of an RSSI request using the RSSI value
+        in the DB command response `at_packet`, and queue it for the ground
+        station.
+        """
+
+        with self._pending_lock:
+            pending = self._pending.pop(at_packet["frame_id"], None)
+
+        if pending is None:
+            # The request has already been evicted.
+            self._metrics.increment("rssi_late")
+            return
+
+        original_packet, request_time = pending
+        original_packet.set("rssi", -ord(at_packet["parameter"]))
+        self._packets.put(original_packet)
+        self._metrics.observe("rssi_round_trip", self._clock.time() - request_time)
+
     def _format_address(self, address):
         """
         Format a given `address` for pretty printing.
@@ -4,7 +4,7 @@ import random
 import socket
 
 # Package imports
-from ..zigbee.Packet import Packet
+from ..reconstruction.RSSI_Synthesizer import RSSI_Synthesizer
 from ..zigbee.RF_Sensor import RF_Sensor, DisabledException
 
 class RF_Sensor_Simulator(RF_Sensor):
@@ -41,6 +41,20 @@ class RF_Sensor_Simulator(RF_Sensor):
         # socket connection.
         self._buffer_size = self._settings.get("buffer_size")
 
+        # Simulated RF sensors may synthesize the signal strength of their 
+        # measurements for the network in which the reconstruction takes place.
+        if self._settings.get("rssi_synthesis"):
+            stream_settings = arguments.get_settings("reconstruction_stream")
+            origin = stream_settings.get("stream_network_origin")
+            size = stream_settings.get("stream_network_size")
+            self._synthesizer = RSSI_Synthesizer(arguments, origin, size)
+        else:
+            self._synthesizer = None
+
+        # The random number generator for the signal strengths of unsynthesized 
+        # measurements, which a simulation may replace with a seeded one.
+        self._random = random.Random()
+
     @property
     def type(self):
         """
@@ -51,6 +65,33 @@ class RF_Sensor_Simulator(RF_Sensor):
 
         return "rf_sensor_simulator"
 
+    @property
+    def synthesizer(self):
+        """
+        Get the `RSSI_Synthesizer` object of the RF sensor, or `None` if the
+        RF sensor does not synthesize signal strengths.
+        """
+
+        return self._synthesizer
+
+    @property
+    def random(self):
+        """
+        Get the `random.Random` object that the RF sensor uses for drawing the
+        signal strengths of measurements that it does not synthesize.
+        """
+
+        return self._random
+
+    @random.setter
+    def random(self, random_generator):
+        """
+        Set the `random.Random` object that the RF sensor uses for drawing the
+        signal strengths of measurements that it does not synthesize.
+        """
+
+        self._random = random_generator
+
     def discover(self, callback, required_sensors=None):
         """
         Discover RF sensors in the network. The `callback` callable function is
@@ -95,6 +136,13 @@ class RF_Sensor_Simulator(RF_Sensor):
         self._connection.bind((self._ip, self._port + self._id))
         self._connection.setblocking(0)
 
+    def _get_reactor_file(self):
+        """
+        Get the socket connection for the reactor.
+        """
+
+        return self._connection
+
     def _loop_body(self):
         """
         Body of the sensor loop.
@@ -105,14 +153,20 @@ class RF_Sensor_Simulator(RF_Sensor):
 
         super(RF_Sensor_Simulator, self)._loop_body()
 
-        # Process any data in the socket's buffer.
+        self._read()
+
+    def _read(self):
+        """
+        Read and process a packet from the socket's buffer, if available.
+        """
+
         try:
             data = self._connection.recv(self._buffer_size)
 
             # Unserialize the data (byte-encoded string).
-            packet = Packet()
-            packet.unserialize(data)
-            self._receive(packet=packet)
+            packet = self._unserialize(data)
+            if packet is not None:
+                self._receive(packet=packet)
         except AttributeError:
             raise DisabledException
         except socket.error:
@@ -135,6 +189,8 @@ class RF_Sensor_Simulator(RF_Sensor):
         if packet is None:
             raise TypeError("Packet must be provided")
 
+        self._track_packet(packet)
+
         # Show all received packets (including private ones) in simulation mode.
         self._receive_callback(packet)
 
@@ -144,7 +200,15 @@ class RF_Sensor_Simulator(RF_Sensor):
 
             # Create and complete the packet for the ground station.
             ground_station_packet = self._create_rssi_ground_station_packet(packet)
-            ground_station_packet.set("rssi", -random.randint(30, 70))
+            if self._synthesizer is not None:
+                source = (packet.get("latitude"), packet.get("longitude"))
+                destination = (ground_station_packet.get("to_latitude"),
+                               ground_station_packet.get("to_longitude"))
+                rssi = self._synthesizer.synthesize([source], [destination])[0]
+            else:
+                rssi = -self._random.randint(30, 70)
+
+            ground_station_packet.set("rssi", int(rssi))
             self._packets.put(ground_station_packet)
         elif self._buffer is not None:
             self._buffer.put(packet)
@@ -0,0 +1,90 @@
+class Receive_Window(object):
+    """
+    Receiver side of a sliding window transfer of indexed items.
+
+    The sender may send items with an index within a window that starts at
+    the next index that the receiver expects. Items that arrive out of order
+    are buffered until all items before them have been received, so that they
+    are delivered in order. Acknowledgements contain the next expected index
+    as a cumulative acknowledgement, and a bitmap of the buffered items so
+    that the sender only retransmits the missing ones.
+    """
+
+    # Maximum number of items that the sender may send beyond the next index.
+    # This is limited by the number of bits in the "window" field of the
+    # acknowledgement packets.
+    SIZE = 32
+
+    def __init__(self):
+        self._next_index = 0
+        self._buffer = {}
+
+    @property
+    def next_index(self):
+        """
+        Get the index of the item that should be received next.
+        """
+
+        return self._next_index
+
+    @property
+    def selective_acks(self):
+        """
+        Get a bitmap of the buffered items beyond the next index.
+
+        Bit `i` of the bitmap is set if the item with index
+        `next_index + 1 + i` has been received.
+        """
+
+        bitmap = 0
+        for index in self._buffer:
+            bitmap |= 1 << (index - self._next_index - 1)
+
+        return bitmap
+
+    def reset(self):
+        """
+        Forget all received items and expect the first index again.
+        """
+
+        self._next_index = 0
+        self._buffer = {}
+
+    def advance(self):
+        """
+        Move the window beyond the next index without receiving an item.
+
+        This is used when an item is delivered in another way, or when the
+        transfer is completed. Returns a list of buffered items that can now
+        be delivered in order.
+        """
+
+        self._buffer.pop(self._next_index, None)
+        self._next_index += 1
+
+        return self._deliver()
+
+    def receive(self, index, item):
+        """
+        Register the `item` with the given `index`.
+
+        Returns a list of items that can be delivered in order. This list is
+        empty if the item is a duplicate, if it is outside the window, or if
+        items before it are still missing. The window moves beyond the
+        delivered items.
+        """
+
+        if not self._next_index <= index <= self._next_index + self.SIZE:
+            return []
+
+        self._buffer[index] = item
+
+        return self._deliver()
+
+    def _deliver(self):
+        items = []
+        while self._next_index in self._buffer:
+            items.append(self._buffer.pop(self._next_index))
+            self._next_index += 1
+
+        return items
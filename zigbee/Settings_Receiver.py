@@ -1,6 +1,7 @@
 import json
 from ..settings import Settings
 from Packet import Packet
+from Receive_Window import Receive_Window
 
 class Settings_Receiver(object):
     """
@@ -13,7 +14,7 @@ class Settings_Receiver(object):
         self._rf_sensor = self._environment.get_rf_sensor()
         self._thread_manager = self._environment.thread_manager
         self._new_settings = {}
-        self._next_index = 0
+        self._window = Receive_Window()
 
         self._environment.add_packet_action("setting_clear", self._clear)
         self._environment.add_packet_action("setting_add", self._add)
@@ -23,12 +24,13 @@ class Settings_Receiver(object):
         Settings.settings_files = {}
         self._arguments.groups = {}
         self._new_settings = {}
-        self._next_index = 0
+        self._window.reset()
 
     def _send_ack(self):
         packet = Packet()
         packet.set("specification", "setting_ack")
-        packet.set("next_index", self._next_index)
+        packet.set("next_index", self._window.next_index)
+        packet.set("window", self._window.selective_acks)
         packet.set("sensor_id", self._rf_sensor.id)
 
         self._rf_sensor.enqueue(packet, to=0)
@@ -47,12 +49,13 @@ class Settings_Receiver(object):
             return
 
         index = packet.get("index")
-        key = packet.get("key")
-        value = packet.get("value")
+        item = (packet.get("key"), packet.get("value"))
 
-        self._new_settings[key] = value
+        # Settings may arrive out of order. Later values of a key replace 
+        # earlier ones, so only store the settings in order of their index.
+        for key, value in self._window.receive(index, item):
+            self._new_settings[key] = value
 
-        self._next_index = index + 1
         self._send_ack()
 
     def _done(self, packet):
@@ -63,7 +66,7 @@ class Settings_Receiver(object):
         with open(self._arguments.settings_file, 'w') as settings_file:
             json.dump(self._new_settings, settings_file, indent=4, sort_keys=True)
 
-        self._next_index += 1
+        self._window.advance()
         self._send_ack()
 
         # Clean up cached settings and stop the program so that we can restart 
@@ -1,10 +1,19 @@
-import time
+from collections import OrderedDict
 from ..settings import Arguments
+from Clock import Clock
 
 class TDMA_Scheduler(object):
-    def __init__(self, id, arguments):
+    # The number of recent sweeps for which the backlog reports of each sensor 
+    # are kept. The allocation of a sweep uses the reports of two sweeps 
+    # before, and synchronization may look one sweep ahead.
+    REPORT_SWEEPS = 4
+
+    def __init__(self, id, arguments, clock=None):
         """
         Initialize the TDMA scheduler.
+
+        The `clock` is a `Clock` object that provides the current time. If it
+        is not given, then the system time is used.
         """
 
         if isinstance(arguments, Arguments):
@@ -14,10 +23,33 @@ class TDMA_Scheduler(object):
 
         self._number_of_sensors = self._settings.get("number_of_sensors")
         self._sweep_delay = self._settings.get("sweep_delay")
+        self._adaptive = self._settings.get("adaptive_slots")
+        self._minimum_slot_time = self._settings.get("minimum_slot_time")
+        self._ground_station_slot_time = self._settings.get("ground_station_slot_time")
+
+        self._clock = Clock() if clock is None else clock
 
         self._id = id
         self._timestamp = 0
-        self._slot_time = float(self._sweep_delay) / self._number_of_sensors
+
+        # The number of the sweep that the next slot of the sensor is in. The 
+        # sensors number the sweeps in the same way by synchronizing with the 
+        # sweep numbers in the packets of the other sensors.
+        self._sweep = 0
+
+        # The number of packets that each sensor has queued for the ground 
+        # station, as reported by the sensor in each of the recent sweeps.
+        self._backlogs = [
+            OrderedDict() for _ in range(self._number_of_sensors + 1)
+        ]
+
+        # The offsets of the slots of the ground station and each sensor from 
+        # the start of the current sweep, the duration of the sweep and the 
+        # slot time of the sensor.
+        self._offsets = []
+        self._sweep_time = 0.0
+        self._slot_time = 0.0
+        self._set_sweep(self._sweep)
 
     @property
     def id(self):
@@ -35,6 +67,22 @@ class TDMA_Scheduler(object):
 
         self._id = id
 
+    @property
+    def clock(self):
+        """
+        Get the clock that provides the current time to the scheduler.
+        """
+
+        return self._clock
+
+    @clock.setter
+    def clock(self, clock):
+        """
+        Set the clock that provides the current time to the scheduler.
+        """
+
+        self._clock = clock
+
     @property
     def timestamp(self):
         """
@@ -57,6 +105,31 @@ class TDMA_Scheduler(object):
 
         self._timestamp = value
 
+    @property
+    def slot_time(self):
+        """
+        Get the duration in seconds of the slot allocated for the sensor.
+        """
+
+        return self._slot_time
+
+    @property
+    def sweep_time(self):
+        """
+        Get the duration in seconds of a sweep, in which each sensor in the
+        network has one slot.
+        """
+
+        return self._sweep_time
+
+    @property
+    def sweep(self):
+        """
+        Get the number of the sweep that the next slot of the sensor is in.
+        """
+
+        return self._sweep
+
     @property
     def in_slot(self):
         """
@@ -64,44 +137,169 @@ class TDMA_Scheduler(object):
         is inside a slot allocated for the sensor.
         """
 
-        current_time = time.time()
+        current_time = self._clock.time()
         slot_start_time = self._timestamp
         slot_end_time = self._timestamp + self._slot_time
 
         return slot_start_time <= current_time <= slot_end_time
 
+    @property
+    def missed(self):
+        """
+        Determine if the current time is past the end of the slot allocated
+        for the sensor, i.e., if the sensor has missed its slot.
+        """
+
+        return self._clock.time() > self._timestamp + self._slot_time
+
+    def set_backlog(self, sensor_id, backlog, sweep=None):
+        """
+        Register the number of packets `backlog` that the sensor with ID
+        `sensor_id` has queued for the ground station in the sweep with number
+        `sweep`, which is the current sweep if it is not given.
+
+        Only the first report of a sensor in a sweep is kept, so that all
+        sensors register the same backlog even though the queue of the sensor
+        changes while it sends. The registered backlog is returned.
+
+        If the slots are adaptive, then the backlogs reported in a sweep
+        determine the slot times of the sensors two sweeps later.
+        """
+
+        if sweep is None:
+            sweep = self._sweep
+
+        reports = self._backlogs[sensor_id]
+        if sweep not in reports:
+            reports[sweep] = backlog
+            while len(reports) > self.REPORT_SWEEPS:
+                reports.popitem(last=False)
+
+        return reports[sweep]
+
     def update(self):
         """
         Update the timestamp for sending packets.
         """
 
         if self._timestamp == 0:
-            self._timestamp = time.time() + ((float(self._id) / self._number_of_sensors) *
-                                             self._sweep_delay)
-        else: 
-            self._timestamp += self._sweep_delay
+            self._set_sweep(self._sweep)
+            if self._adaptive:
+                self._timestamp = self._clock.time() + self._offsets[self._id]
+            else:
+                self._timestamp = self._clock.time() + ((float(self._id) / self._number_of_sensors) *
+                                                        self._sweep_delay)
+        else:
+            # Move to the start of the next sweep, and then to the slot offset 
+            # of this sensor that is determined for that sweep.
+            sweep_start = self._timestamp - self._offsets[self._id] + self._sweep_time
+            self._set_sweep(self._sweep + 1)
+            self._timestamp = sweep_start + self._offsets[self._id]
+
+    def _set_sweep(self, sweep):
+        """
+        Change the sweep that the next slot of the sensor is in to the sweep
+        with number `sweep`, and use the slots allocated for that sweep.
+        """
+
+        self._sweep = sweep
+        self._offsets, self._sweep_time = self._get_schedule(sweep)
+        self._slot_time = self._allocate(sweep)[self._id]
+
+    def _get_schedule(self, sweep):
+        """
+        Determine the offsets of the slots from the start of the sweep with
+        number `sweep` and the duration of that sweep.
+        """
+
+        slot_times = self._allocate(sweep)
+        offsets = [sum(slot_times[:i]) for i in range(len(slot_times))]
+        return offsets, sum(slot_times)
+
+    def _allocate(self, sweep):
+        """
+        Determine the slot times of the ground station and the sensors in the
+        sweep with number `sweep`.
+
+        Without adaptive slots, the ground station has no slot and the sensors
+        have equally large slots. With adaptive slots, the ground station
+        receives its reserved slot at the start of the sweep. Each vehicle
+        sensor receives the minimum slot time, and the remaining time of the
+        sweep is divided over the sensors in proportion to their backlogs.
+        Idle sensors therefore only keep the minimum slot time. If no sensor
+        has a backlog, then the remaining time is divided equally.
+
+        The backlogs are the latest ones that the sensors reported at least two
+        sweeps before. All sensors have received these reports before they
+        determine their slots for the sweep, so they allocate the same slots.
+        """
+
+        if not self._adaptive:
+            slot_time = float(self._sweep_delay) / self._number_of_sensors
+            return [0.0] + [slot_time] * self._number_of_sensors
+
+        backlogs = []
+        for reports in self._backlogs[1:]:
+            previous = [report for report in reports if report <= sweep - 2]
+            backlogs.append(reports[max(previous)] if previous else 0)
+
+        total = float(sum(backlogs))
+        reserved = self._ground_station_slot_time + \
+                   self._number_of_sensors * self._minimum_slot_time
+        remaining = max(0.0, self._sweep_delay - reserved)
+
+        slot_times = [self._ground_station_slot_time]
+        for backlog in backlogs:
+            if total == 0:
+                share = 1.0 / self._number_of_sensors
+            else:
+                share = backlog / total
+
+            slot_times.append(self._minimum_slot_time + share * remaining)
+
+        return slot_times
 
     def synchronize(self, packet):
         """
         Synchronize the scheduler after receiving a `packet` from another sensor
         in the network. The transmission timestamp of this sensor is the received
-        transmission timestamp plus the number of slots inbetween that sensor
-        and this sensor.
+        transmission timestamp plus the slots inbetween that sensor and this
+        sensor.
+
+        The slots inbetween the sensors are those of the sweep that the other
+        sensor reports in the packet, and of the sweep after it if this sensor
+        comes after the other sensor. The sensor adopts the sweep numbers of
+        the other sensor if they are ahead. If the packet reports the backlog
+        of the other sensor, then this is registered for the adaptive slots.
         """
 
         from_sensor = int(packet.get("sensor_id"))
         timestamp = float(packet.get("timestamp"))
 
-        if from_sensor < self._id:
-            timestamp += (self._id - from_sensor) * self._slot_time
-        else:
-            # Calculate how much time remains to complete the current sweep.
-            completed_round = (self._number_of_sensors - from_sensor + 1) * self._slot_time
-            timestamp += completed_round + ((self._id - 1) * self._slot_time)
+        sweep = packet.get("sweep")
+        if sweep is None:
+            sweep = self._sweep if from_sensor < self._id else self._sweep - 1
+
+        backlog = packet.get("backlog")
+        if backlog is not None:
+            self.set_backlog(from_sensor, backlog, sweep)
+
+        offsets, sweep_time = self._get_schedule(sweep)
+        sweep_start = timestamp - offsets[from_sensor]
+        if from_sensor >= self._id:
+            # Complete the current sweep and move to the next sweep.
+            sweep += 1
+            sweep_start += sweep_time
+            offsets = self._get_schedule(sweep)[0]
+
+        timestamp = sweep_start + offsets[self._id]
 
         # Only accept future timestamps.
         if timestamp > self._timestamp:
             self._timestamp = timestamp
+            self._set_sweep(max(self._sweep, sweep))
+        elif sweep > self._sweep:
+            self._set_sweep(sweep)
 
     def shift(self, seconds):
         """